@@ -0,0 +1,312 @@
+"""
+Bench Fixtures - payload sintetis (deterministik, seeded) yang meniru response provider asli
+Jupiter toptraded/search/quote, DexScreener, Meteora datapi, Helius enhanced transactions.
+SyntheticProviders bisa dipasang sebagai responder di http_cassette.CassetteServer supaya
+pipeline main.py bisa dijalankan di skala berapa pun tanpa network.
+"""
+
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import base58
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+def fake_address(rng: random.Random) -> str:
+    return base58.b58encode(bytes(rng.getrandbits(8) for _ in range(32))).decode()
+
+
+def fake_signature(rng: random.Random) -> str:
+    return base58.b58encode(bytes(rng.getrandbits(8) for _ in range(64))).decode()
+
+
+def jupiter_token(rng: random.Random, mint: Optional[str] = None, with_fees: bool = True) -> Dict:
+    """One token from /tokens/v2/toptraded (subset of fields the bot reads + realistic filler)."""
+    mint = mint or fake_address(rng)
+    symbol = "".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ") for _ in range(rng.randint(3, 6)))
+    mcap = rng.uniform(50_000, 20_000_000)
+    token = {
+        "id": mint,
+        "name": f"{symbol.title()} Token",
+        "symbol": symbol,
+        "icon": f"https://example.invalid/{mint[:8]}.png",
+        "decimals": 6,
+        "usdPrice": mcap / 1_000_000_000,
+        "mcap": mcap,
+        "fdv": mcap * rng.uniform(1.0, 1.2),
+        "liquidity": rng.uniform(5_000, 800_000),
+        "holderCount": rng.randint(50, 40_000),
+        "organicScore": rng.uniform(0, 100),
+        "tags": rng.sample(["verified", "community", "pump", "moonshot", "lst"], k=2),
+        "createdAt": "2025-01-01T00:00:00Z",
+        "firstPool": {"id": fake_address(rng), "createdAt": "2025-01-01T00:00:00Z"},
+        "stats1h": {
+            "priceChange": rng.uniform(-60, 180),
+            "buyVolume": rng.uniform(1_000, 400_000),
+            "sellVolume": rng.uniform(1_000, 400_000),
+            "numBuys": rng.randint(10, 5_000),
+            "numSells": rng.randint(10, 5_000),
+        },
+        "stats24h": {
+            "priceChange": rng.uniform(-80, 600),
+            "buyVolume": rng.uniform(10_000, 6_000_000),
+            "sellVolume": rng.uniform(10_000, 6_000_000),
+            "numBuys": rng.randint(100, 60_000),
+            "numSells": rng.randint(100, 60_000),
+        },
+    }
+    if with_fees:
+        token["fees"] = rng.uniform(0.5, 120)
+    return token
+
+
+def jupiter_toptraded(n: int, rng: random.Random, fee_ratio: float = 1.0) -> List[Dict]:
+    return [jupiter_token(rng, with_fees=rng.random() < fee_ratio) for _ in range(n)]
+
+
+def meteora_pool_row(rng: random.Random, mint: str, kind: str = "dlmm") -> Dict:
+    """One row of Meteora datapi GET /pools (DLMM atau DAMM v2)."""
+    quote = rng.choice([SOL_MINT, USDC_MINT])
+    x_first = rng.random() < 0.5
+    tvl = rng.uniform(100, 2_000_000)
+    return {
+        "address": fake_address(rng),
+        "name": f"TKN-{'SOL' if quote == SOL_MINT else 'USDC'}" + (" DLMM" if kind == "dlmm" else ""),
+        "token_x": {"address": mint if x_first else quote, "symbol": "TKN"},
+        "token_y": {"address": quote if x_first else mint, "symbol": "SOL"},
+        "tvl": tvl,
+        "volume": {"30m": tvl * 0.01, "1h": tvl * 0.05, "24h": tvl * rng.uniform(0.2, 8)},
+        "fees": {"30m": tvl * 0.0001, "1h": tvl * 0.0005, "24h": tvl * rng.uniform(0.001, 0.05)},
+        "pool_config": {"bin_step": rng.choice([1, 5, 10, 20, 80, 100]), "base_fee_pct": rng.choice([0.01, 0.1, 0.25, 1, 2, 5])},
+        "created_at": int(time.time()) - rng.randint(60, 90 * 86400),
+    }
+
+
+def meteora_pools(rng: random.Random, mint: str, n: int, kind: str = "dlmm") -> Dict:
+    return {"data": [meteora_pool_row(rng, mint, kind) for _ in range(n)], "total": n}
+
+
+def dexscreener_pair(rng: random.Random, mint: str) -> Dict:
+    vol = rng.uniform(1_000, 3_000_000)
+    return {
+        "chainId": "solana",
+        "dexId": rng.choice(["raydium", "meteora", "orca", "pumpswap"]),
+        "pairAddress": fake_address(rng),
+        "baseToken": {"address": mint, "name": "Synthetic", "symbol": "SYN"},
+        "quoteToken": {"address": SOL_MINT, "name": "Wrapped SOL", "symbol": "SOL"},
+        "priceUsd": f"{rng.uniform(0.00001, 2):.8f}",
+        "txns": {w: {"buys": rng.randint(0, 3_000), "sells": rng.randint(0, 3_000)} for w in ("m5", "h1", "h6", "h24")},
+        "volume": {"m5": vol / 200, "h1": vol / 20, "h6": vol / 4, "h24": vol},
+        "priceChange": {"m5": rng.uniform(-20, 40), "h1": rng.uniform(-50, 150), "h6": rng.uniform(-60, 300), "h24": rng.uniform(-80, 900)},
+        "liquidity": {"usd": rng.uniform(2_000, 900_000), "base": 1e9, "quote": 100},
+        "fdv": rng.uniform(20_000, 30_000_000),
+        "marketCap": rng.uniform(20_000, 30_000_000),
+        "pairCreatedAt": int(time.time() * 1000) - rng.randint(60_000, 30 * 86_400_000),
+        "info": {
+            "websites": [{"url": "https://example.invalid"}] if rng.random() < 0.6 else [],
+            "socials": [{"type": "twitter", "url": "https://x.com/example"}] if rng.random() < 0.7 else [],
+        },
+    }
+
+
+def dexscreener_tokens(rng: random.Random, mint: str, n_pairs: int = 3) -> Dict:
+    return {"schemaVersion": "1.0.0", "pairs": [dexscreener_pair(rng, mint) for _ in range(n_pairs)]}
+
+
+def helius_swap(rng: random.Random, wallet: str, buy: bool = True, n_transfers: int = 2, timestamp: Optional[int] = None,
+                signature: Optional[str] = None) -> Dict:
+    """Helius enhanced transaction (type SWAP). n_transfers = jumlah token/native transfer tambahan (ukuran tx)."""
+    mint = fake_address(rng)
+    pool = fake_address(rng)
+    lamports = rng.randint(10_000_000, 5_000_000_000)
+    native = [{"fromUserAccount": wallet if buy else pool, "toUserAccount": pool if buy else wallet, "amount": lamports}]
+    transfers = [{
+        "fromUserAccount": pool if buy else wallet,
+        "toUserAccount": wallet if buy else pool,
+        "mint": mint,
+        "tokenAmount": rng.uniform(1, 1e7),
+        "tokenStandard": "Fungible",
+    }]
+    for _ in range(n_transfers):
+        other = fake_address(rng)
+        native.append({"fromUserAccount": other, "toUserAccount": fake_address(rng), "amount": rng.randint(5_000, 2_000_000)})
+        transfers.append({"fromUserAccount": other, "toUserAccount": fake_address(rng), "mint": fake_address(rng),
+                          "tokenAmount": rng.uniform(1, 1e6), "tokenStandard": "Fungible"})
+    return {
+        "signature": signature or fake_signature(rng),
+        "type": "SWAP",
+        "source": rng.choice(["JUPITER", "RAYDIUM", "METEORA", "PUMP_AMM"]),
+        "description": f"{wallet[:6]} swapped SOL for TKN",
+        "fee": 5000,
+        "feePayer": wallet,
+        "slot": rng.randint(250_000_000, 350_000_000),
+        "timestamp": timestamp if timestamp is not None else int(time.time()),
+        "nativeTransfers": native,
+        "tokenTransfers": transfers,
+        "accountData": [{"account": wallet, "nativeBalanceChange": -lamports if buy else lamports, "tokenBalanceChanges": []}],
+        "tokenBalanceChanges": [],
+        "events": {"swap": {"nativeInput": {"account": wallet, "amount": str(lamports)}}},
+    }
+
+
+def jupiter_quote(rng: random.Random, mint: str, routes: int = 2) -> Dict:
+    return {
+        "inputMint": SOL_MINT,
+        "outputMint": mint,
+        "inAmount": "10000000",
+        "outAmount": str(rng.randint(1_000, 10**9)),
+        "priceImpactPct": f"{rng.uniform(0, 3):.4f}",
+        "routePlan": [{"swapInfo": {"ammKey": fake_address(rng), "label": "Meteora DAMM v2"}, "percent": 100} for _ in range(routes)],
+    }
+
+
+def metadao_item(rng: random.Random, index: int = 0) -> Dict:
+    """One project/fundraise entry as embedded in the metadao.fi projects page."""
+    slug = f"project-{index}-{rng.randint(1000, 9999)}"
+    return {
+        "id": f"{index:04d}-{fake_address(rng)[:12]}",
+        "name": f"Project {index}",
+        "organizationSlug": slug,
+        "description": "Lorem ipsum dolor sit amet. " * rng.randint(2, 20),
+        "tokenSymbol": slug[:4].upper(),
+        "price": rng.uniform(0.001, 2),
+        "minimumRaise": str(rng.randint(50_000, 2_000_000) * 10**6),
+        "finalRaiseAmount": str(rng.randint(0, 3_000_000) * 10**6),
+        "timeRemaining": {"total": rng.randint(-86400, 7 * 86400), "days": rng.randint(0, 7)},
+        "fundraise": {"mint": fake_address(rng), "status": rng.choice(["active", "completed", "refunding"])},
+        "socials": {"x": f"https://x.com/{slug}", "website": f"https://{slug}.example"},
+    }
+
+
+def metadao_page(rng: random.Random, n_items: int, layout: str = "next", filler_kb: int = 200) -> str:
+    """Rendered metadao.fi HTML. layout: next (__NEXT_DATA__), marker ({"items":[...]} inline), pattern (bare array).
+    filler_kb = markup/script sebelum blob data (halaman asli ratusan KB)."""
+    items = [metadao_item(rng, i) for i in range(n_items)]
+    filler = '<div class="card"><span>MetaDAO</span></div>\n' * (filler_kb * 1024 // 45)
+    if layout == "next":
+        blob = json.dumps({"props": {"pageProps": {"projects": items, "dehydratedState": {"queries": []}}}, "page": "/projects"})
+        data = f'<script id="__NEXT_DATA__" type="application/json">{blob}</script>'
+    elif layout == "marker":
+        data = f'<script>self.__next_f.push({json.dumps({"items": items})})</script>'
+    else:
+        data = f"<script>window.__projects = {json.dumps(items)};</script>"
+    return f"<!DOCTYPE html><html><head><title>MetaDAO</title></head><body>{filler}{data}</body></html>"
+
+
+def rugcheck_report(rng: random.Random, mint: Optional[str] = None, n_holders: int = 20, n_risks: int = 4, n_markets: int = 2) -> Dict:
+    """GET api.rugcheck.xyz/v1/tokens/{mint}/report (field yang dibaca bot + filler)."""
+    mint = mint or fake_address(rng)
+    levels = ["danger", "warn", "info"]
+    return {
+        "mint": mint,
+        "score": rng.randint(0, 30_000),
+        "score_normalised": rng.randint(0, 100) if rng.random() < 0.8 else None,
+        "tokenMeta": {"name": "Bench Token", "symbol": "BNCH", "mutable": rng.random() < 0.3, "uri": "https://example.invalid/meta.json"},
+        "fileMeta": {"name": "Bench Token", "symbol": "BNCH", "image": "https://example.invalid/img.png"},
+        "token": {"mintAuthority": None if rng.random() < 0.8 else fake_address(rng),
+                  "freezeAuthority": None if rng.random() < 0.9 else fake_address(rng),
+                  "supply": 10**15, "decimals": 6},
+        "topHolders": [{"address": fake_address(rng), "owner": fake_address(rng), "pct": rng.uniform(0.01, 12),
+                        "amount": rng.randint(1, 10**12), "insider": rng.random() < 0.1} for _ in range(n_holders)],
+        "risks": [{"name": f"Risk {i}", "description": f"Risk description {i}", "level": rng.choice(levels),
+                   "score": rng.randint(100, 5000), "value": ""} for i in range(n_risks)],
+        "markets": [{"pubkey": fake_address(rng), "marketType": rng.choice(["pump_amm", "raydium_cpmm", "meteora_damm_v2", "orca"]),
+                     "lp": {"lpLockedPct": rng.uniform(0, 100), "quoteUSD": rng.uniform(1_000, 500_000)}} for _ in range(n_markets)],
+    }
+
+
+def hype_data(rng: random.Random, passing: bool = True) -> Dict:
+    """Output get_token_hype_data (input token_meets_hype_criteria)."""
+    scale = 1.0 if passing else 0.1
+    return {
+        "volume_5m": rng.uniform(60_000, 400_000) * scale,
+        "txns_5m": int(rng.randint(60, 2_000) * scale),
+        "buys_5m": int(rng.randint(40, 1_200) * scale),
+        "price_change_5m": rng.uniform(6, 45) if passing else rng.uniform(-30, 120),
+        "market_cap": rng.uniform(150_000, 4_500_000) if passing else rng.uniform(5_000, 50_000_000),
+        "liquidity_usd": rng.uniform(6_000, 400_000) * scale,
+        "token_age_hours": rng.uniform(0.2, 60) if passing else rng.uniform(0, 500),
+        "buy_ratio_5m": rng.uniform(0.55, 0.9) if passing else rng.uniform(0.1, 0.5),
+    }
+
+
+def _json(data, status: int = 200) -> Tuple[int, bytes, Dict[str, str]]:
+    return status, json.dumps(data).encode(), {"Content-Type": "application/json"}
+
+
+class SyntheticProviders:
+    """Responder for http_cassette.CassetteServer that fabricates provider responses at a given scale.
+
+    Semua angka acak berasal dari `seed` + URL, jadi request yang sama selalu dapat response yang sama
+    (kecuali Helius: tiap poll wallet menghasilkan swap baru supaya ada buy yang diproses).
+    """
+
+    def __init__(self, seed: int = 0, toptraded: int = 100, fee_ratio: float = 1.0, pools_per_token: int = 3,
+                 boosted: int = 50, profiles: int = 30, swaps_per_wallet: int = 5, buy_ratio: float = 0.5,
+                 tx_transfers: int = 2, tradeable_ratio: float = 0.2, pairs_per_token: int = 3):
+        self.seed = seed
+        self.toptraded = toptraded
+        self.fee_ratio = fee_ratio
+        self.pools_per_token = pools_per_token
+        self.boosted = boosted
+        self.profiles = profiles
+        self.swaps_per_wallet = swaps_per_wallet
+        self.buy_ratio = buy_ratio
+        self.tx_transfers = tx_transfers
+        self.tradeable_ratio = tradeable_ratio
+        self.pairs_per_token = pairs_per_token
+        self._wallet_polls: Dict[str, int] = {}
+
+    def _rng(self, *parts) -> random.Random:
+        return random.Random(f"{self.seed}:" + ":".join(str(p) for p in parts))
+
+    def __call__(self, method: str, url: str, body: bytes):
+        parts = urlsplit(url)
+        host, path = parts.hostname or "", parts.path
+        query = dict(parse_qsl(parts.query))
+        if host.endswith("jup.ag"):
+            if any(f"/{endpoint}/" in path for endpoint in ("toptraded", "toptrending", "toporganicscore")):
+                # Semua window (5m/1h/6h/24h, trending) dapat set yang sama: worst case overlap penuh saat merge
+                return _json(jupiter_toptraded(self.toptraded, self._rng("toptraded"), self.fee_ratio))
+            if path.endswith("/search"):
+                # query bisa berisi banyak mint comma-separated (batch fee pass 2)
+                mints = [m for m in query.get("query", "").split(",") if m]
+                return _json([jupiter_token(self._rng("search", mint), mint=mint, with_fees=False) for mint in mints])
+            if path.endswith("/quote"):
+                mint = query.get("outputMint", "")
+                rng = self._rng("quote", mint)
+                if rng.random() >= self.tradeable_ratio:
+                    return _json({"error": "Could not find any route", "errorCode": "COULD_NOT_FIND_ANY_ROUTE"}, status=400)
+                return _json(jupiter_quote(rng, mint))
+            if "price" in path:
+                return _json({"data": {"SOL": {"id": SOL_MINT, "price": 150.0}}})
+        if host.endswith("coingecko.com"):
+            return _json({"solana": {"usd": 150.0}})
+        if host.endswith("meteora.ag") and path.endswith("/pools"):
+            mint = query.get("query", "")
+            kind = "damm" if host.startswith("damm") else "dlmm"
+            return _json(meteora_pools(self._rng("pools", kind, mint), mint, self.pools_per_token, kind))
+        if host.endswith("dexscreener.com"):
+            if path.startswith("/token-boosts/"):
+                rng = self._rng("boosts")
+                return _json([{"chainId": "solana", "tokenAddress": fake_address(rng), "amount": rng.randint(10, 500)} for _ in range(self.boosted)])
+            if path.startswith("/token-profiles/"):
+                rng = self._rng("profiles")
+                return _json([{"chainId": rng.choice(["solana", "solana", "base"]), "tokenAddress": fake_address(rng)} for _ in range(self.profiles)])
+            if path.startswith("/latest/dex/tokens/"):
+                mint = path.rsplit("/", 1)[-1]
+                return _json(dexscreener_tokens(self._rng("dex", mint), mint, self.pairs_per_token))
+        if host.endswith("helius.xyz") and "/addresses/" in path:
+            wallet = path.split("/addresses/", 1)[1].split("/", 1)[0]
+            poll = self._wallet_polls[wallet] = self._wallet_polls.get(wallet, 0) + 1
+            rng = self._rng("helius", wallet, poll)
+            now = int(time.time())
+            swaps = [helius_swap(rng, wallet, buy=rng.random() < self.buy_ratio, n_transfers=self.tx_transfers, timestamp=now - i * 5)
+                     for i in range(self.swaps_per_wallet)]
+            return _json(swaps)
+        return None
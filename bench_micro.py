@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Bench Micro - microbenchmark fungsi parsing/keputusan murni di main.py
+Tiap fungsi diukur dengan payload kecil sampai sangat besar (bench_fixtures, atau payload asli dari
+cassette rekaman http_cassette via --cassette). Dilaporkan waktu per call (min dari beberapa repeat)
+dan alokasi per call (peak tracemalloc + ukuran hasil yang tertahan). Hasil di-append ke bench_results/micro.jsonl.
+
+Usage:
+    python bench_micro.py
+    python bench_micro.py -k metadao -k helius --compare
+    python bench_micro.py --cassette cassettes/bot_call.json   # tambah case dari payload rekaman
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from bench_pipelines import _git_rev, _import_main  # noqa: E402
+
+RESULTS_FILE = os.path.join(ROOT, "bench_results", "micro.jsonl")
+
+# (function, case, args)
+Case = Tuple[str, str, tuple]
+
+
+def _worst_order(tx: Dict) -> Dict:
+    """Transfer milik wallet dipindah ke akhir list (tx besar dari aggregator/bundle)."""
+    tx = dict(tx)
+    for key in ("nativeTransfers", "tokenTransfers"):
+        tx[key] = list(reversed(tx[key]))
+    return tx
+
+
+def synthetic_cases(seed: int) -> List[Case]:
+    import bench_fixtures as bf
+
+    rng = random.Random(seed)
+    cases: List[Case] = []
+
+    # Helius enhanced transactions: jumlah transfer tambahan per tx
+    wallet = bf.fake_address(rng)
+    for label, n in (("small", 2), ("medium", 20), ("large", 200), ("xlarge", 2000)):
+        buy = bf.helius_swap(rng, wallet, buy=True, n_transfers=n)
+        sell = bf.helius_swap(rng, wallet, buy=False, n_transfers=n)
+        for fn in ("is_buy_transaction", "_get_token_in_transfer", "_calculate_sol_spent"):
+            cases.append((fn, f"{label}-buy", (buy, wallet)))
+            cases.append((fn, f"{label}-sell", (sell, wallet)))
+        cases.append(("is_buy_transaction", f"{label}-buy-worst", (_worst_order(buy), wallet)))
+
+    # MetaDAO projects page
+    for label, n, filler in (("small", 5, 50), ("medium", 50, 200), ("large", 500, 1000), ("xlarge", 2000, 4000)):
+        cases.append(("_extract_metadao_items", f"{label}-next", (bf.metadao_page(rng, n, "next", filler),)))
+    for layout in ("marker", "pattern"):
+        cases.append(("_extract_metadao_items", f"medium-{layout}", (bf.metadao_page(rng, 50, layout, 200),)))
+    cases.append(("_extract_metadao_items", "large-empty", ("<html>" + "<div></div>" * 100_000 + "</html>",)))
+
+    # Meteora datapi /pools rows
+    mint = bf.fake_address(rng)
+    for label, n in (("small", 1), ("medium", 10), ("large", 100), ("xlarge", 1000)):
+        rows = bf.meteora_pools(rng, mint, n)["data"]
+        rows += bf.meteora_pools(rng, bf.fake_address(rng), n)["data"]  # pool mint lain dari hasil query
+        cases.append(("_aggregate_meteora_datapi_pool_rows", label, (rows, mint)))
+
+    # Rugcheck report
+    for label, holders, risks, markets in (("small", 5, 1, 1), ("medium", 20, 5, 3), ("large", 100, 20, 10), ("xlarge", 1000, 100, 50)):
+        report = bf.rugcheck_report(rng, n_holders=holders, n_risks=risks, n_markets=markets)
+        cases.append(("_build_metina_token_safety_from_rugcheck", label, (report, report["mint"])))
+
+    # Jupiter fee fields: root `fees`, fallback stats24h, tidak ada fee sama sekali
+    token = bf.jupiter_token(rng, with_fees=True)
+    cases.append(("_parse_jupiter_fees_sol_from_dict", "root-fees", (token, token["symbol"])))
+    stats_only = bf.jupiter_token(rng, with_fees=False)
+    stats_only["stats24h"] = dict(stats_only["stats24h"], totalFees=12.5)
+    cases.append(("_parse_jupiter_fees_sol_from_dict", "stats24h-fallback", (stats_only, stats_only["symbol"])))
+    no_fees = bf.jupiter_token(rng, with_fees=False)
+    cases.append(("_parse_jupiter_fees_sol_from_dict", "missing", (no_fees, no_fees["symbol"])))
+
+    cases.append(("token_meets_hype_criteria", "passing", (bf.hype_data(rng, passing=True),)))
+    cases.append(("token_meets_hype_criteria", "failing", (bf.hype_data(rng, passing=False),)))
+
+    nested = {"data": [{"x": None}, {"vol": [None, "n/a", {"usd": "123.4"}]}]}
+    for _ in range(8):
+        nested = [None, {"value": nested}]
+    for label, value in (("float", 1.5), ("str", "42.0"), ("bad-str", "n/a"), ("dict", {"usd": "9.5"}),
+                         ("list", [None, "x", 3]), ("deep", nested)):
+        cases.append(("_extract_first_float", label, (value,)))
+    return cases
+
+
+def recorded_cases(path: str) -> List[Case]:
+    """Case dari payload asli di cassette rekaman (Helius, Meteora datapi, Rugcheck, MetaDAO, Jupiter)."""
+    from http_cassette import Cassette
+
+    cassette = Cassette(path).load()
+    cases: List[Case] = []
+    for entries in cassette.interactions.values():
+        for entry in entries[:1]:
+            if entry["status"] != 200:
+                continue
+            parts = urlsplit(entry["url"])
+            body = Cassette.body_bytes(entry).decode("utf-8", errors="replace")
+            host, route = parts.netloc, parts.path
+            label = f"recorded-{len(body) // 1024}KB"
+            try:
+                if "metadao" in host:
+                    cases.append(("_extract_metadao_items", label, (body,)))
+                    continue
+                data = json.loads(body)
+            except ValueError:
+                continue
+            if "helius" in host and route.endswith("/transactions") and isinstance(data, list):
+                wallet = route.split("/")[-2]
+                for i, tx in enumerate(data[:20]):
+                    for fn in ("is_buy_transaction", "_get_token_in_transfer", "_calculate_sol_spent"):
+                        cases.append((fn, f"{label}-tx{i}", (tx, wallet)))
+            elif "meteora" in host and route.endswith("/pools") and isinstance(data, dict):
+                query = parse_qs(parts.query).get("query", [""])[0]
+                cases.append(("_aggregate_meteora_datapi_pool_rows", label, (data.get("data") or [], query)))
+            elif "rugcheck" in host and route.endswith("/report") and isinstance(data, dict):
+                cases.append(("_build_metina_token_safety_from_rugcheck", label, (data, route.split("/")[-2])))
+            elif "jup.ag" in host and "/tokens/" in route and isinstance(data, list):
+                for i, item in enumerate(data[:10]):
+                    cases.append(("_parse_jupiter_fees_sol_from_dict", f"{label}-{i}", (item, str(item.get("symbol")))))
+    return cases
+
+
+def _time_per_call(func: Callable, args: tuple, min_time: float, repeat: int) -> Tuple[float, int]:
+    """Min seconds per call over `repeat` rounds; tiap round diperbesar sampai >= min_time."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        best = min(best, (time.perf_counter() - started) / number)
+    return best, number
+
+
+def _allocations(func: Callable, args: tuple) -> Tuple[int, int]:
+    """(peak bytes, bytes still held by the returned value) for a single call."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = func(*args)
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+        return peak - before, current - before
+    finally:
+        tracemalloc.stop()
+
+
+def _fmt_time(sec: float) -> str:
+    if sec >= 1e-3:
+        return f"{sec * 1e3:.2f} ms"
+    if sec >= 1e-6:
+        return f"{sec * 1e6:.2f} us"
+    return f"{sec * 1e9:.0f} ns"
+
+
+def run(cases: List[Case], main_module, min_time: float, repeat: int) -> List[Dict]:
+    rows = []
+    # Fungsi-fungsi ini print [DEBUG]; output dibuang supaya terminal tidak ikut diukur
+    with open(os.devnull, "w") as devnull:
+        for fn_name, label, args in cases:
+            func = getattr(main_module, fn_name)
+            with contextlib.redirect_stdout(devnull):
+                per_call, number = _time_per_call(func, args, min_time, repeat)
+                peak, held = _allocations(func, args)
+            payload_kb = len(json.dumps(args[0], default=str)) / 1024 if not isinstance(args[0], str) else len(args[0]) / 1024
+            rows.append({
+                "function": fn_name,
+                "case": label,
+                "payload_kb": round(payload_kb, 1),
+                "per_call_sec": per_call,
+                "calls": number,
+                "alloc_peak_kb": round(peak / 1024, 2),
+                "alloc_result_kb": round(held / 1024, 2),
+            })
+            print(f"[BENCH] {fn_name}[{label}] {_fmt_time(per_call)}", file=sys.stderr)
+    return rows
+
+
+def _print_table(rows: List[Dict], history: List[Dict], compare: bool):
+    print()
+    print(f"{'function':<42}{'case':<22}{'payload KB':>11}{'per call':>12}{'peak KB':>10}{'result KB':>10}")
+    for row in rows:
+        line = (f"{row['function']:<42}{row['case']:<22}{row['payload_kb']:>11.1f}{_fmt_time(row['per_call_sec']):>12}"
+                f"{row['alloc_peak_kb']:>10.1f}{row['alloc_result_kb']:>10.1f}")
+        if compare:
+            prev = next((h for h in reversed(history) if h["function"] == row["function"] and h["case"] == row["case"]), None)
+            if prev and prev["per_call_sec"]:
+                delta = (row["per_call_sec"] - prev["per_call_sec"]) / prev["per_call_sec"] * 100
+                line += f"  {delta:+.1f}% vs {prev.get('git_rev') or '?'}"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for pure parsing/decision functions in main.py")
+    parser.add_argument("-k", "--filter", action="append", default=[], help="Only cases whose function/case contains this text")
+    parser.add_argument("--cassette", action="append", default=[], help="Recorded cassette to pull real payloads from")
+    parser.add_argument("--no-synthetic", dest="synthetic", action="store_false")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-save", dest="save", action="store_false")
+    parser.add_argument("--compare", action="store_true", help="Compare against the previous saved run")
+    args = parser.parse_args(argv)
+
+    main_module = _import_main(tempfile.mkdtemp(prefix="bench_state_"))
+    cases = synthetic_cases(args.seed) if args.synthetic else []
+    for path in args.cassette:
+        cases += recorded_cases(path)
+    if args.filter:
+        cases = [c for c in cases if any(f in f"{c[0]}[{c[1]}]" for f in args.filter)]
+
+    history = []
+    if os.path.exists(RESULTS_FILE):
+        with open(RESULTS_FILE) as f:
+            history = [json.loads(line) for line in f if line.strip()]
+    rows = run(cases, main_module, args.min_time, args.repeat)
+    ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+    for row in rows:
+        row.update({"ts": ts, "git_rev": _git_rev(), "python": sys.version.split()[0]})
+    _print_table(rows, history, args.compare)
+    if args.save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, "a") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        print(f"\n[BENCH] Saved {len(rows)} result(s) to {os.path.relpath(RESULTS_FILE, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Bench Pipelines - benchmark end-to-end pipeline polling main.py terhadap stub provider lokal
+Menjalankan fetch_new_tokens, scan_for_hype_tokens, poll_wallet_buys dan poll_token_launches satu cycle
+per skenario (http_cassette stub + bench_fixtures data sintetis), lalu melaporkan cycle time,
+jumlah request keluar, peak memory dan event-loop lag. Hasil di-append ke bench_results/pipelines.jsonl.
+
+Usage:
+    python bench_pipelines.py                       # semua skenario default (wallets:10000 ~10 menit @20ms)
+    python bench_pipelines.py -s wallets:1000 -s bot_call:100 --latency-ms 50
+    python bench_pipelines.py --compare             # bandingkan dengan run sebelumnya
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import asyncio
+import inspect
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+DEFAULT_SCENARIOS = [
+    "bot_call:100", "bot_call:1000",
+    "hype:50",
+    "wallets:10", "wallets:1000", "wallets:10000",
+    "launches:10", "launches:500",
+]
+RESULTS_FILE = os.path.join(ROOT, "bench_results", "pipelines.jsonl")
+
+
+class _SleepScaler:
+    """Module proxy (asyncio / time) yang menskalakan sleep di main.py dan mencatat total sleep yang diminta.
+
+    Throttle bawaan pipeline (0.45s fee pass 2, 1s per launch, 0.2s hype) tetap terhitung di
+    `requested` tapi tidak membuat benchmark berjalan berjam-jam.
+    """
+
+    def __init__(self, scale: float):
+        self.scale = scale
+        self.requested = 0.0
+
+    def proxy(self, module, is_async: bool):
+        scaler = self
+        real_sleep = module.sleep
+        proxy = types.ModuleType(module.__name__)
+        proxy.__dict__.update(module.__dict__)
+        if is_async:
+            async def sleep(delay, result=None):
+                scaler.requested += max(0.0, delay)
+                return await real_sleep(max(0.0, delay) * scaler.scale, result)
+        else:
+            def sleep(delay):
+                scaler.requested += max(0.0, delay)
+                real_sleep(max(0.0, delay) * scaler.scale)
+        proxy.sleep = sleep
+        return proxy
+
+
+class _BenchChannel:
+    """Stand-in TextChannel: dispatch queue cuma perlu .id (worker tidak dijalankan)."""
+
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.name = f"bench-{channel_id}"
+        self.mention = f"<#{channel_id}>"
+
+    async def send(self, *args, **kwargs):
+        return None
+
+
+def _import_main(state_dir: str):
+    os.environ.setdefault("HELIUS_API_KEY", "bench")
+    os.environ.setdefault("JUPITER_API_KEY", "bench")
+    os.environ.setdefault("USE_GMGN_FOR_FEES", "false")
+    os.environ.setdefault("METRICS_ENABLED", "false")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.chdir(state_dir)
+    import main
+    return main
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def _prepare(main, scenario: str, scale: int, providers, sleep_scaler: _SleepScaler):
+    """Reset state main.py yang relevan dan siapkan input skenario. Returns coroutine factory."""
+    import random
+    from bench_fixtures import fake_address
+    from discord_dispatch import DispatchQueue
+
+    # Throttle provider dimatikan; sleep sisanya diskalakan lewat proxy
+    main.RATE_LIMIT_REQUESTS = 10**9
+    main.MIN_DELAY_BETWEEN_REQUESTS = 0
+    main.MAX_DELAY_BETWEEN_REQUESTS = 0
+    main.METEORA_MIN_DELAY = 0
+    main.meteora_last_request_time = 0
+    main.circuit_breaker_active = False
+    main.meteora_circuit_breaker_active = False
+    main.request_timestamps.clear()
+    main.token_metadata_cache.clear()
+    main.dispatch_queue = DispatchQueue()
+    main.bot.get_channel = lambda cid: _BenchChannel(cid)
+    main.asyncio = sleep_scaler.proxy(asyncio, is_async=True)
+    main.time = sleep_scaler.proxy(time, is_async=False)
+    rng = random.Random(f"bench:{scenario}:{scale}")
+
+    if scenario == "bot_call":
+        providers.toptraded = scale
+        return main.fetch_new_tokens, None
+    if scenario == "hype":
+        providers.boosted = scale
+        main.hype_traded_tokens.clear()
+        return main.scan_for_hype_tokens, None
+    if scenario == "wallets":
+        main.tracked_wallets.clear()
+        main.default_tracked_wallets[:] = [{"wallet": fake_address(rng), "alias": f"w{i}", "last_sig": None} for i in range(scale)]
+        main.save_default_wallets = lambda: None
+        # Cycle pertama cuma inisialisasi last_sig (tidak ada notifikasi) -> jalankan sebagai warm-up
+        return inspect.unwrap(main.poll_wallet_buys.coro), inspect.unwrap(main.poll_wallet_buys.coro)
+    if scenario == "launches":
+        main.LAUNCH_TRACKER_ENABLED = True
+        main.launch_detected_pools.clear()
+        main.launch_tracker_tokens.clear()
+        for i in range(scale):
+            main.launch_tracker_tokens[fake_address(rng)] = {
+                "name": f"Launch {i}", "symbol": f"L{i}", "status": "tracking", "existing_pools": [],
+                "added_at": "2025-01-01T00:00:00+00:00", "added_by": "bench",
+            }
+        main.save_launch_tracker_state = lambda: None
+        return inspect.unwrap(main.poll_token_launches.coro), None
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def _run_one(main, server, providers, scenario: str, scale: int, args) -> Dict:
+    from loop_monitor import LoopLagMonitor
+
+    sleep_scaler = _SleepScaler(args.sleep_scale)
+    pipeline, warmup = _prepare(main, scenario, scale, providers, sleep_scaler)
+    if warmup is not None:
+        await warmup()
+    sleep_scaler.requested = 0.0
+    before_requests = dict(server.host_counts)
+    before_total = server.stats["requests"]
+
+    monitor = LoopLagMonitor(interval=0.05, threshold=args.stall_ms / 1000)
+    monitor.start()
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = await pipeline()
+    elapsed = time.perf_counter() - started
+    peak_mb = None
+    if args.trace_memory:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    await asyncio.sleep(monitor.interval * 2)  # biar heartbeat terakhir sempat mencatat stall
+    monitor.stop()
+
+    by_host = {h: n - before_requests.get(h, 0) for h, n in server.host_counts.items() if n - before_requests.get(h, 0)}
+    return {
+        "scenario": scenario,
+        "scale": scale,
+        "cycle_sec": round(elapsed, 4),
+        "requests": server.stats["requests"] - before_total,
+        "requests_by_host": by_host,
+        "peak_mem_mb": round(peak_mb, 2) if peak_mb is not None else None,
+        "loop_lag_max_ms": round(monitor.max_lag * 1000, 1),
+        "loop_stalls": monitor.stall_count,
+        "worst_blocker": monitor.worst(1)[0]["location"] if monitor.offenders else None,
+        "sleep_requested_sec": round(sleep_scaler.requested, 2),
+        "dispatched": len(main.dispatch_queue),
+        "output": len(result) if isinstance(result, list) else None,
+    }
+
+
+def _load_history() -> List[Dict]:
+    if not os.path.exists(RESULTS_FILE):
+        return []
+    with open(RESULTS_FILE) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _print_table(rows: List[Dict], history: List[Dict], compare: bool):
+    print()
+    print(f"{'scenario':<18}{'cycle s':>10}{'req':>8}{'peak MB':>9}{'lag max ms':>12}{'stalls':>8}{'slept s':>9}  worst blocker")
+    for row in rows:
+        name = f"{row['scenario']}:{row['scale']}"
+        peak = f"{row['peak_mem_mb']:.1f}" if row["peak_mem_mb"] is not None else "-"
+        print(f"{name:<18}{row['cycle_sec']:>10.3f}{row['requests']:>8}{peak:>9}{row['loop_lag_max_ms']:>12.1f}"
+              f"{row['loop_stalls']:>8}{row['sleep_requested_sec']:>9.1f}  {row['worst_blocker'] or '-'}")
+        if compare:
+            prev = next((h for h in reversed(history) if h["scenario"] == row["scenario"] and h["scale"] == row["scale"]
+                         and h.get("params") == row.get("params")), None)
+            if prev:
+                delta = (row["cycle_sec"] - prev["cycle_sec"]) / prev["cycle_sec"] * 100 if prev["cycle_sec"] else 0
+                print(f"{'':<18}vs {prev.get('git_rev') or '?'} ({prev['ts'][:19]}): cycle {prev['cycle_sec']:.3f}s "
+                      f"({delta:+.1f}%), req {prev['requests']} -> {row['requests']}")
+
+
+async def _amain(args) -> List[Dict]:
+    import http_cassette
+    from bench_fixtures import SyntheticProviders
+
+    providers = SyntheticProviders(seed=args.seed, fee_ratio=args.fee_ratio, tradeable_ratio=args.tradeable_ratio)
+    faults = http_cassette.FaultConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=args.seed)
+    state_dir = tempfile.mkdtemp(prefix="bench_state_")
+    main = _import_main(state_dir)
+    rows = []
+    with http_cassette.cassette(args.cassette, faults=faults, responder=providers) as server:
+        for spec in args.scenarios:
+            scenario, _, scale = spec.partition(":")
+            print(f"[BENCH] {scenario}:{scale} ...")
+            rows.append(await _run_one(main, server, providers, scenario, int(scale or 10), args))
+        await main.http_manager.close()
+    return rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark for main.py polling pipelines (offline)")
+    parser.add_argument("-s", "--scenario", action="append", dest="scenarios", help="scenario:scale (bot_call, hype, wallets, launches)")
+    parser.add_argument("--cassette", default=None, help="Optional recorded cassette (response asli didahulukan)")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--sleep-scale", type=float, default=0.0, help="Multiplier for in-pipeline sleeps (0 = skip)")
+    parser.add_argument("--fee-ratio", type=float, default=0.9, help="Fraction of toptraded tokens that carry fees")
+    parser.add_argument("--tradeable-ratio", type=float, default=0.2, help="Fraction of launches with a Jupiter route")
+    parser.add_argument("--stall-ms", type=float, default=100.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false")
+    parser.add_argument("--no-save", dest="save", action="store_false")
+    parser.add_argument("--compare", action="store_true", help="Compare against the previous saved run")
+    args = parser.parse_args(argv)
+    args.scenarios = args.scenarios or DEFAULT_SCENARIOS
+
+    history = _load_history()
+    rows = asyncio.run(_amain(args))
+    params = {k: getattr(args, k) for k in ("latency_ms", "jitter_ms", "sleep_scale", "fee_ratio", "tradeable_ratio", "seed", "trace_memory")}
+    ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+    for row in rows:
+        row.update({"ts": ts, "git_rev": _git_rev(), "python": sys.version.split()[0], "params": params})
+    _print_table(rows, history, args.compare)
+    if args.save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, "a") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        print(f"\n[BENCH] Saved {len(rows)} result(s) to {os.path.relpath(RESULTS_FILE, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
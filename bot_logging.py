@@ -0,0 +1,135 @@
+"""
+Bot Logging - leveled, per-subsystem logging untuk hot path (ganti print() sinkron)
+Record masuk ke queue (non-blocking di event loop), ditulis ke stdout oleh thread listener.
+Debug line yang berulang di-rate-limit per template supaya production di INFO nyaris tanpa biaya.
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import logging.handlers
+from typing import Dict, Optional, Tuple
+
+ROOT_LOGGER_NAME = "metina"
+
+# Subsystem yang punya logger di main.py (untuk /log_level choices + LOG_LEVELS env). Tambah di sini hanya
+# kalau path-nya benar-benar log lewat get_logger(); subsystem lain masih print() dan tidak terpengaruh level
+SUBSYSTEMS = ("bot_call", "meteora", "wallet", "message")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most `burst` records per (logger, message template) per `window_sec`.
+
+    Only records at or below `max_level` are limited; warnings and errors always pass.
+    The first record after a suppressed window is annotated with the suppressed count.
+    """
+
+    def __init__(self, burst: int = 20, window_sec: float = 60, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.burst = burst
+        self.window_sec = window_sec
+        self.max_level = max_level
+        self._buckets: Dict[Tuple[str, str], list] = {}  # {(logger, template): [window_start, count, suppressed]}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.burst <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None or now - bucket[0] >= self.window_sec:
+            suppressed = bucket[2] if bucket else 0
+            self._buckets[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} [+{suppressed} similar suppressed]"
+            if len(self._buckets) > 4096:
+                # Template dinamis (f-string) bisa bikin key tak terbatas: buang bucket yang sudah expired
+                self._buckets = {k: b for k, b in self._buckets.items() if now - b[0] < self.window_sec}
+            return True
+        if bucket[1] < self.burst:
+            bucket[1] += 1
+            return True
+        bucket[2] += 1
+        return False
+
+
+def _parse_level(value) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {value}")
+    return level
+
+
+def setup_logging(level: Optional[str] = None, subsystem_levels: Optional[str] = None):
+    """Configure the `metina` logger tree with a non-blocking queue handler.
+
+    level: default level (env LOG_LEVEL, default INFO)
+    subsystem_levels: "bot_call=DEBUG,wallet=WARNING" (env LOG_LEVELS)
+    """
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    if _listener is not None:
+        return root
+    root.setLevel(_parse_level(level or os.getenv("LOG_LEVEL", "INFO")))
+    root.propagate = False
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s", "%H:%M:%S"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(
+        burst=int(os.getenv("LOG_DEBUG_BURST", "20")),
+        window_sec=float(os.getenv("LOG_DEBUG_WINDOW", "60")),
+    ))
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+    for item in (subsystem_levels if subsystem_levels is not None else os.getenv("LOG_LEVELS", "")).split(","):
+        if "=" in item:
+            name, lvl = item.split("=", 1)
+            try:
+                set_level(name.strip(), lvl)
+            except ValueError as e:
+                print(f"[WARN] LOG_LEVELS: {e}")
+    return root
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
+
+
+def set_level(subsystem: str, level) -> str:
+    """Change the level of one subsystem at runtime ("all" = root). Returns the new level name."""
+    if subsystem in ("", "all", ROOT_LOGGER_NAME):
+        logger = logging.getLogger(ROOT_LOGGER_NAME)
+    elif subsystem in SUBSYSTEMS:
+        logger = get_logger(subsystem)
+    else:
+        raise ValueError(f"Unknown subsystem: {subsystem} (available: all, {', '.join(SUBSYSTEMS)})")
+    logger.setLevel(_parse_level(level))
+    return logging.getLevelName(logger.getEffectiveLevel())
+
+
+def get_levels() -> Dict[str, str]:
+    """Effective level of the root and every known subsystem."""
+    levels = {"all": logging.getLevelName(logging.getLogger(ROOT_LOGGER_NAME).getEffectiveLevel())}
+    for name in SUBSYSTEMS:
+        levels[name] = logging.getLevelName(get_logger(name).getEffectiveLevel())
+    return levels
+
+
+def shutdown_logging():
+    """Flush and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,195 @@
+"""
+Call Queue - ranking kandidat bot call + antrean prioritas top-K lintas cycle
+Discovery (poll_new_tokens) memasukkan semua token yang qualified dan belum di-notifikasi; notifier
+mengambil token dengan skor tertinggi dengan ritme sendiri, jadi kandidat nomor 2, 3, dst. tidak dibuang
+tiap cycle. Skor = jumlah scorer berbobot (RankingEngine) yang meluruh eksponensial (half-life) sejak
+terakhir di-refresh; token yang muncul lagi di discovery berikutnya di-refresh (skor dihitung ulang).
+"""
+
+import os
+import math
+import heapq
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Callable, Dict, List, Optional, Tuple
+
+import json_codec
+
+Scorer = Callable[[Dict], float]
+
+_LN2 = math.log(2)
+
+
+class RankingEngine:
+    """Skor kandidat = sum(weight * scorer(token)). Scorer dengan bobot 0 tidak dihitung."""
+
+    def __init__(self):
+        self.scorers: Dict[str, Scorer] = {}
+        self.weights: Dict[str, float] = {}
+
+    def register(self, name: str, scorer: Scorer, weight: float = 0.0):
+        self.scorers[name] = scorer
+        self.weights[name] = weight
+
+    def apply_weights(self, spec: str):
+        """Parse "market_cap=0.6,fees=0.4,momentum=0.1" (env BOT_CALL_SCORE_WEIGHTS)."""
+        for item in (spec or "").split(","):
+            if "=" not in item:
+                continue
+            name, value = (x.strip() for x in item.split("=", 1))
+            if name not in self.scorers:
+                print(f"[WARN] BOT_CALL_SCORE_WEIGHTS: unknown scorer {name} (available: {', '.join(self.scorers)})")
+                continue
+            try:
+                self.weights[name] = float(value)
+            except ValueError:
+                print(f"[WARN] BOT_CALL_SCORE_WEIGHTS: invalid weight {item!r}")
+
+    def breakdown(self, token: Dict) -> Dict[str, float]:
+        parts = {}
+        for name, scorer in self.scorers.items():
+            weight = self.weights.get(name, 0.0)
+            if not weight:
+                continue
+            try:
+                parts[name] = weight * float(scorer(token) or 0.0)
+            except (TypeError, ValueError):
+                parts[name] = 0.0
+        return parts
+
+    def score(self, token: Dict) -> float:
+        return sum(self.breakdown(token).values())
+
+
+@dataclass
+class QueuedCall:
+    mint: str
+    token: Dict
+    score: float  # skor saat refresh terakhir (sebelum peluruhan)
+    refreshed_at: float
+    queued_at: float
+    refreshes: int = 0
+
+
+class CallQueue:
+    """Top-K kandidat per skor efektif. Persist ke JSON supaya antrean selamat dari restart.
+
+    Skor efektif = score * 0.5 ** ((now - refreshed_at) / half_life). Urutan antar entry tidak berubah
+    seiring waktu (semua meluruh dengan laju sama), jadi heap memakai kunci log-domain yang konstan:
+    log(score) + refreshed_at * ln2 / half_life.
+    """
+
+    def __init__(self, path: str, capacity: int = 20, half_life_sec: float = 1800.0, max_age_sec: float = 3600.0):
+        self.path = path
+        self.capacity = max(1, capacity)
+        self.half_life_sec = half_life_sec
+        self.max_age_sec = max_age_sec
+        self.entries: Dict[str, QueuedCall] = {}
+        self.stats = {"offered": 0, "refreshed": 0, "evicted": 0, "rejected": 0, "popped": 0, "expired": 0}
+        self._heap: List[Tuple[float, int, str]] = []  # (-key, versi, mint), entry lama dibuang saat pop
+        self._version: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, mint: str) -> bool:
+        return mint in self.entries
+
+    def _key(self, entry: QueuedCall) -> float:
+        if entry.score <= 0:
+            return float("-inf")
+        decay = entry.refreshed_at * _LN2 / self.half_life_sec if self.half_life_sec > 0 else 0.0
+        return math.log(entry.score) + decay
+
+    def effective_score(self, entry: QueuedCall, now: Optional[float] = None) -> float:
+        if self.half_life_sec <= 0:
+            return entry.score
+        now = time.time() if now is None else now
+        return entry.score * 0.5 ** (max(0.0, now - entry.refreshed_at) / self.half_life_sec)
+
+    def _push(self, entry: QueuedCall):
+        version = self._version.get(entry.mint, 0) + 1
+        self._version[entry.mint] = version
+        heapq.heappush(self._heap, (-self._key(entry), version, entry.mint))
+        if len(self._heap) > 4 * len(self.entries) + 16:
+            self._heap = [(-self._key(e), self._version[m], m) for m, e in self.entries.items()]
+            heapq.heapify(self._heap)
+
+    def offer(self, mint: str, token: Dict, score: float, now: Optional[float] = None) -> bool:
+        """Masukkan / refresh kandidat. False kalau antrean penuh dan skornya di bawah semua entry."""
+        now = time.time() if now is None else now
+        entry = self.entries.get(mint)
+        if entry is not None:
+            entry.token, entry.score, entry.refreshed_at = token, score, now
+            entry.refreshes += 1
+            self.stats["refreshed"] += 1
+        else:
+            entry = self.entries[mint] = QueuedCall(mint=mint, token=token, score=score, refreshed_at=now, queued_at=now)
+            self.stats["offered"] += 1
+        self._push(entry)
+        if len(self.entries) > self.capacity:
+            # O(K) dengan K kecil (BOT_CALL_QUEUE_SIZE); heap hanya untuk pop kandidat terbaik
+            victim = min(self.entries.values(), key=self._key)
+            del self.entries[victim.mint]
+            if victim.mint == mint:
+                self.stats["rejected"] += 1
+                return False
+            self.stats["evicted"] += 1
+        return True
+
+    def discard(self, mint: str) -> bool:
+        return self.entries.pop(mint, None) is not None
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Buang entry yang tidak di-refresh discovery lebih dari max_age_sec."""
+        now = time.time() if now is None else now
+        stale = [m for m, e in self.entries.items() if self.max_age_sec > 0 and now - e.refreshed_at > self.max_age_sec]
+        for mint in stale:
+            del self.entries[mint]
+        self.stats["expired"] += len(stale)
+        return len(stale)
+
+    def pop(self, skip: Optional[Callable[[str], bool]] = None, now: Optional[float] = None) -> Optional[QueuedCall]:
+        """Ambil kandidat dengan skor efektif tertinggi. Entry dengan skip(mint) True dibuang."""
+        self.prune(now)
+        while self._heap:
+            _, version, mint = heapq.heappop(self._heap)
+            entry = self.entries.get(mint)
+            if entry is None or self._version.get(mint) != version:
+                continue
+            del self.entries[mint]
+            if skip is not None and skip(mint):
+                continue
+            self.stats["popped"] += 1
+            return entry
+        return None
+
+    def ranked(self, now: Optional[float] = None) -> List[Tuple[QueuedCall, float]]:
+        """Semua entry + skor efektif, tertinggi dulu (untuk log / admin)."""
+        now = time.time() if now is None else now
+        rows = [(e, self.effective_score(e, now)) for e in self.entries.values()]
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return rows
+
+    def load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    data = json_codec.load(f)
+                known = {f.name for f in fields(QueuedCall)}
+                self.entries = {}
+                self._heap, self._version = [], {}
+                for item in data if isinstance(data, list) else []:
+                    if isinstance(item, dict) and item.get("mint"):
+                        entry = QueuedCall(**{k: v for k, v in item.items() if k in known})
+                        self.entries[entry.mint] = entry
+                        self._push(entry)
+        except Exception as e:
+            print(f"[ERROR] Failed to load bot call queue: {e}")
+
+    def save(self):
+        try:
+            with open(self.path, "w") as f:
+                json_codec.dump([asdict(e) for e in self.entries.values()], f)
+        except Exception as e:
+            print(f"[ERROR] Failed to save bot call queue: {e}")
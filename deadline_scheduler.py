@@ -0,0 +1,148 @@
+"""
+Deadline Scheduler - persistent min-heap untuk reminder berbasis waktu (ICO tracker, MetaDAO)
+Setiap event punya timestamp jatuh tempo; runner tidur sampai event terdekat, bukan scan periodik.
+"""
+
+import os
+import json
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Dict, List, Optional, Tuple
+
+
+class DeadlineScheduler:
+    """Min-heap of (due_ts, key, kind) events, persisted to a JSON file.
+
+    Each (key, kind) pair has at most one live event: scheduling it again
+    replaces the previous deadline. Replaced/cancelled entries are dropped
+    lazily when they reach the top of the heap.
+    """
+
+    def __init__(self, state_file: str, max_sleep_sec: float = 3600):
+        self.state_file = state_file
+        self.max_sleep_sec = max_sleep_sec
+        self._heap: List[list] = []  # [due_ts, seq, key, kind, payload, alive]
+        self._entries: Dict[Tuple[str, str], list] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dirty = False  # ada perubahan sejak save terakhir
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _event(self) -> asyncio.Event:
+        # Event dibuat lazily supaya terikat ke event loop yang sedang jalan
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        return self._wakeup
+
+    def schedule(self, key: str, kind: str, due_ts: float, payload: Optional[Dict] = None) -> bool:
+        """Schedule (or reschedule) the `kind` event for `key` at `due_ts`.
+
+        Returns False when the live event already has this deadline (poller yang memanggil ulang tiap poll
+        tidak menambah entry heap; payload yang berubah cukup diganti di tempat).
+        """
+        payload = payload or {}
+        old = self._entries.get((key, kind))
+        if old is not None and old[0] == float(due_ts):
+            if old[4] != payload:
+                old[4] = payload
+                self._dirty = True
+            return False
+        if old is not None:
+            old[5] = False
+        self._dirty = True
+        entry = [float(due_ts), next(self._seq), key, kind, payload, True]
+        self._entries[(key, kind)] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def cancel(self, key: str, kind: Optional[str] = None):
+        """Cancel one event kind for `key`, or all of its events when kind is None."""
+        if kind is not None:
+            targets = [(key, kind)]
+        else:
+            targets = [k for k in self._entries if k[0] == key]
+        for target in targets:
+            entry = self._entries.pop(target, None)
+            if entry is not None:
+                entry[5] = False
+                self._dirty = True
+
+    def get(self, key: str, kind: str) -> Optional[float]:
+        """Return the due timestamp of a live event, or None."""
+        entry = self._entries.get((key, kind))
+        return entry[0] if entry else None
+
+    def keys(self) -> List[str]:
+        return sorted({k for k, _ in self._entries})
+
+    def next_due(self) -> Optional[float]:
+        """Timestamp of the earliest live event (drops dead heads)."""
+        while self._heap and not self._heap[0][5]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[Tuple[str, str, Dict]]:
+        """Pop every live event with due_ts <= now, earliest first."""
+        now = time.time() if now is None else now
+        due = []
+        while self._heap and (not self._heap[0][5] or self._heap[0][0] <= now):
+            entry = heapq.heappop(self._heap)
+            if not entry[5]:
+                continue
+            entry[5] = False
+            self._entries.pop((entry[2], entry[3]), None)
+            self._dirty = True
+            due.append((entry[2], entry[3], entry[4]))
+        return due
+
+    async def wait_due(self) -> List[Tuple[str, str, Dict]]:
+        """Sleep until the earliest event is due (or a sooner one is scheduled), then pop due events."""
+        wakeup = self._event()
+        while True:
+            head = self.next_due()
+            delay = self.max_sleep_sec if head is None else head - time.time()
+            if delay <= 0:
+                return self.pop_due()
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=min(delay, self.max_sleep_sec))
+            except asyncio.TimeoutError:
+                pass
+
+    def load(self):
+        """Load persisted events from disk (missing/corrupt file = empty schedule)."""
+        self._heap = []
+        self._entries = {}
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, "r") as f:
+                    data = json.load(f)
+                for item in data.get("events", []):
+                    self.schedule(item["key"], item["kind"], item["due_ts"], item.get("payload"))
+                print(f"[SCHEDULER] Loaded {len(self._entries)} scheduled event(s)")
+            self._dirty = False
+        except Exception as e:
+            print(f"[ERROR] Failed to load scheduler state: {e}")
+            self._heap = []
+            self._entries = {}
+
+    def save(self):
+        """Persist live events to disk (no-op when nothing changed since the last save)."""
+        if not self._dirty:
+            return
+        try:
+            events = [
+                {"key": e[2], "kind": e[3], "due_ts": e[0], "payload": e[4]}
+                for e in sorted(self._entries.values())
+            ]
+            with open(self.state_file, "w") as f:
+                json.dump({"events": events}, f, indent=2)
+            self._dirty = False
+        except Exception as e:
+            print(f"[ERROR] Failed to save scheduler state: {e}")
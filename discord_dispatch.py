@@ -0,0 +1,398 @@
+"""
+Discord Dispatch Queue - outbound notification queue dengan priority class + rate budget per channel
+Poller cukup enqueue lalu lanjut; worker yang kirim ke Discord, menggabungkan beberapa embed
+(maks 10 per message) kalau beberapa alert menuju channel yang sama.
+Channel yang punya webhook dikirim lewat webhook (rate-limit bucket terpisah dari bot token);
+message dengan View ikut lewat webhook hanya kalau pemanggil memberi varian embed tanpa button.
+Error sementara (5xx, 429, timeout, koneksi putus) di-retry dengan backoff; callback on_delivered /
+on_failed per message supaya pemanggil baru commit state (mis. "sudah di-notifikasi") setelah terkirim.
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+import discord
+
+# Priority classes (angka kecil = dikirim duluan)
+PRIORITY_TRADING = 0  # trading entries/exits
+PRIORITY_ALERT = 1    # buy alerts, bot call, launch, hype
+PRIORITY_DIGEST = 2   # ICO / MetaDAO / Futardio updates & digests
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000  # Discord limit: total karakter semua embed dalam 1 message
+
+Callback = Callable[[], None]
+
+
+def _transient(error: Exception) -> bool:
+    """Error yang layak di-retry: server Discord 5xx / 429, timeout, koneksi putus."""
+    if isinstance(error, discord.HTTPException):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError, ConnectionError))
+
+
+@dataclass(order=True)
+class _Outbound:
+    priority: int
+    seq: int
+    target: object = field(compare=False)
+    content: Optional[str] = field(default=None, compare=False)
+    embeds: List[discord.Embed] = field(default_factory=list, compare=False)
+    view: Optional[discord.ui.View] = field(default=None, compare=False)
+    fallback: Optional[Tuple[object, Optional[str]]] = field(default=None, compare=False)
+    label: str = field(default="", compare=False)
+    on_delivered: Optional[Callback] = field(default=None, compare=False)
+    on_failed: Optional[Callback] = field(default=None, compare=False)
+    webhook_embeds: Optional[List[discord.Embed]] = field(default=None, compare=False)
+    fence: Optional[str] = field(default=None, compare=False)  # kunci fencing saat enqueue (mis. nama loop)
+
+    @property
+    def batchable(self) -> bool:
+        return bool(self.embeds) and self.view is None
+
+    @property
+    def webhook_ready(self) -> bool:
+        """Bisa dikirim lewat webhook: embed-only, atau punya varian tanpa button."""
+        return self.batchable or bool(self.webhook_embeds)
+
+
+class Delivery:
+    """Hasil kirim satu message untuk pemanggil yang perlu menunggu (mis. command test).
+
+    Pakai `enqueue(..., on_delivered=d.delivered, on_failed=d.failed)` lalu `await d.wait(timeout)`.
+    """
+
+    def __init__(self):
+        self._future = asyncio.get_running_loop().create_future()
+
+    def delivered(self):
+        if not self._future.done():
+            self._future.set_result(True)
+
+    def failed(self):
+        if not self._future.done():
+            self._future.set_result(False)
+
+    async def wait(self, timeout: float = 15.0) -> Optional[bool]:
+        """True = terkirim, False = gagal, None = masih di antrean setelah timeout."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class DispatchQueue:
+    """Priority queue of outbound messages, one heap per target channel/user.
+
+    Each target gets a sliding-window budget of `rate_limit` sends per `rate_window`
+    seconds and at most one send in flight, so a slow or rate-limited channel never
+    blocks the others (or the poller that produced the message). Transient send errors
+    are retried up to `max_retries` times with exponential backoff from `retry_base` seconds.
+    """
+
+    def __init__(self, rate_limit: int = 5, rate_window: float = 5.0, max_retries: int = 3, retry_base: float = 1.0):
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self._queues: Dict[int, List[_Outbound]] = {}
+        self._targets: Dict[int, object] = {}
+        self._sent_at: Dict[int, deque] = {}
+        self._inflight: set = set()
+        self._tasks: set = set()  # task _send yang sedang jalan (referensi supaya tidak di-GC)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._webhook_urls: Dict[int, str] = {}
+        self._webhooks: Dict[int, discord.Webhook] = {}
+        self._webhook_session: Optional[aiohttp.ClientSession] = None
+        self.webhook_username: Optional[str] = None
+        self.webhook_avatar_url: Optional[str] = None
+        # Opsional gate() -> bool dicek saat enqueue, harus murah (jalan di event loop); False = message dibuang.
+        # fence_key() dicatat per message saat enqueue, fence(key) -> bool (blocking, mis. query SQLite lease)
+        # dicek sekali per batch di thread sebelum kirim.
+        self.gate: Optional[Callable[[], bool]] = None
+        self.fence_key: Optional[Callable[[], Optional[str]]] = None
+        self.fence: Optional[Callable[[str], bool]] = None
+        self.stats = {"enqueued": 0, "messages": 0, "batched": 0, "failed": 0, "webhook": 0, "retried": 0, "fenced": 0}
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def set_webhook(self, channel_id: Optional[int], url: Optional[str]):
+        """Route embed-only messages for `channel_id` through an incoming webhook URL."""
+        if not channel_id or not url:
+            return
+        self._webhook_urls[channel_id] = url
+        self._webhooks.pop(channel_id, None)
+
+    @property
+    def webhook_channels(self) -> List[int]:
+        return list(self._webhook_urls)
+
+    def _get_webhook(self, key: int) -> Optional[discord.Webhook]:
+        url = self._webhook_urls.get(key)
+        if not url:
+            return None
+        webhook = self._webhooks.get(key)
+        if webhook is None:
+            if self._webhook_session is None or self._webhook_session.closed:
+                # Satu session pooled untuk semua webhook (keep-alive ke discord.com)
+                self._webhook_session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit_per_host=10, ttl_dns_cache=300),
+                    timeout=aiohttp.ClientTimeout(total=15),
+                )
+            webhook = discord.Webhook.from_url(url, session=self._webhook_session)
+            self._webhooks[key] = webhook
+        return webhook
+
+    def start(self):
+        """Start the worker task (call from a running event loop, e.g. on_ready)."""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+        if len(self):
+            self._wakeup.set()
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._webhook_session is not None and not self._webhook_session.closed:
+            await self._webhook_session.close()
+        self._webhook_session = None
+        self._webhooks = {}
+
+    def enqueue(
+        self,
+        target,
+        content: Optional[str] = None,
+        *,
+        embed: Optional[discord.Embed] = None,
+        embeds: Optional[List[discord.Embed]] = None,
+        view: Optional[discord.ui.View] = None,
+        priority: int = PRIORITY_DIGEST,
+        fallback: Optional[Tuple[object, Optional[str]]] = None,
+        label: str = "",
+        on_delivered: Optional[Callback] = None,
+        on_failed: Optional[Callback] = None,
+        webhook_embeds: Optional[List[discord.Embed]] = None,
+    ):
+        """Queue a message for `target` (TextChannel / Thread / User). Never blocks.
+
+        fallback: (target, content) dipakai kalau kirim ke target gagal dengan Forbidden (mis. DM ditutup).
+        on_delivered / on_failed: dipanggil setelah message terkirim / gagal permanen (retry habis).
+        webhook_embeds: varian tanpa button untuk message dengan `view`; dipakai kalau channel punya webhook
+        (webhook dari URL tidak bisa kirim button interaktif). Tanpa ini message dengan View selalu lewat bot.
+        """
+        if target is None:
+            if on_failed is not None:
+                on_failed()
+            return
+        if self.gate is not None and not self.gate():
+            self.stats["fenced"] += 1
+            print(f"[DISPATCH] Dropped {label or 'message'}: this replica no longer holds the loop lease")
+            if on_failed is not None:
+                on_failed()
+            return
+        all_embeds = list(embeds or [])
+        if embed is not None:
+            all_embeds.append(embed)
+        item = _Outbound(priority, next(self._seq), target, content or None, all_embeds, view, fallback, label,
+                         on_delivered, on_failed, list(webhook_embeds) if webhook_embeds else None,
+                         self.fence_key() if self.fence_key is not None else None)
+        key = target.id
+        self._targets[key] = target
+        heapq.heappush(self._queues.setdefault(key, []), item)
+        self.stats["enqueued"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _budget_wait(self, key: int, now: float) -> float:
+        """Seconds until `key` may send again (0 = budget available)."""
+        sent = self._sent_at.setdefault(key, deque())
+        while sent and now - sent[0] >= self.rate_window:
+            sent.popleft()
+        if len(sent) < self.rate_limit:
+            return 0.0
+        return self.rate_window - (now - sent[0])
+
+    def _take_batch(self, key: int) -> List[_Outbound]:
+        queue = self._queues[key]
+        batch = [heapq.heappop(queue)]
+        if not batch[0].batchable:
+            return batch
+        n_embeds = len(batch[0].embeds)
+        n_chars = sum(len(e) for e in batch[0].embeds)
+        while queue and queue[0].batchable:
+            nxt = queue[0]
+            nxt_chars = sum(len(e) for e in nxt.embeds)
+            if n_embeds + len(nxt.embeds) > MAX_EMBEDS_PER_MESSAGE or n_chars + nxt_chars > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(heapq.heappop(queue))
+            n_embeds += len(nxt.embeds)
+            n_chars += nxt_chars
+        return batch
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            ready = []
+            next_wait = None
+            for key, queue in self._queues.items():
+                if not queue or key in self._inflight:
+                    continue
+                wait = self._budget_wait(key, now)
+                if wait <= 0:
+                    ready.append((queue[0], key))
+                elif next_wait is None or wait < next_wait:
+                    next_wait = wait
+            for _, key in sorted(ready):
+                batch = self._take_batch(key)
+                self._sent_at[key].append(now)
+                self._inflight.add(key)
+                task = asyncio.create_task(self._send(key, batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            for key in [k for k, q in self._queues.items() if not q and k not in self._inflight]:
+                del self._queues[key]
+                self._targets.pop(key, None)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=next_wait)
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    def _merged_content(batch: List[_Outbound]) -> Optional[str]:
+        """Gabungkan content unik (mis. mention) dari beberapa message jadi satu."""
+        contents = []
+        for item in batch:
+            if item.content and item.content not in contents:
+                contents.append(item.content)
+        return " ".join(contents) or None
+
+    async def _send_webhook(self, webhook: discord.Webhook, batch: List[_Outbound]):
+        kwargs = {"embeds": [e for item in batch for e in (item.embeds if item.batchable else item.webhook_embeds)]}
+        if self.webhook_username:
+            kwargs["username"] = self.webhook_username
+        if self.webhook_avatar_url:
+            kwargs["avatar_url"] = self.webhook_avatar_url
+        await webhook.send(self._merged_content(batch) or discord.utils.MISSING, **kwargs)
+
+    async def _send_bot(self, target, batch: List[_Outbound]):
+        head = batch[0]
+        if len(batch) == 1:
+            kwargs = {"embeds": head.embeds} if head.embeds else {}
+            if head.view is not None:
+                kwargs["view"] = head.view
+            await target.send(head.content, **kwargs)
+        else:
+            await target.send(self._merged_content(batch), embeds=[e for item in batch for e in item.embeds])
+
+    @staticmethod
+    def _notify(item: _Outbound, delivered: bool):
+        callback = item.on_delivered if delivered else item.on_failed
+        if callback is None:
+            return
+        try:
+            callback()
+        except Exception as e:
+            print(f"[DISPATCH] {'on_delivered' if delivered else 'on_failed'} callback for {item.label or 'message'} failed: {e}")
+
+    async def _deliver(self, key: int, target, batch: List[_Outbound]):
+        # Message dengan View (button) lewat bot, kecuali ada varian tanpa button (webhook_embeds):
+        # webhook dari URL tidak bisa kirim komponen interaktif
+        webhook = self._get_webhook(key) if batch[0].webhook_ready else None
+        if webhook is not None:
+            try:
+                await self._send_webhook(webhook, batch)
+                self.stats["webhook"] += 1
+                return
+            except (discord.NotFound, discord.Forbidden) as e:
+                # Webhook dihapus / invalid: matikan dan fallback ke bot token
+                print(f"[DISPATCH] Webhook for channel {key} unusable ({e}); falling back to bot")
+                self._webhook_urls.pop(key, None)
+                self._webhooks.pop(key, None)
+        await self._send_bot(target, batch)
+
+    async def _fenced(self, batch: List[_Outbound]) -> List[_Outbound]:
+        """Buang message yang fence-nya tidak lolos (sekali per kunci per batch, di thread)."""
+        keys = {item.fence for item in batch if item.fence is not None}
+        if self.fence is None or not keys:
+            return batch
+        passed = {}
+        for fence_key in keys:
+            passed[fence_key] = await asyncio.to_thread(self.fence, fence_key)
+        kept = []
+        for item in batch:
+            if item.fence is None or passed[item.fence]:
+                kept.append(item)
+                continue
+            self.stats["fenced"] += 1
+            print(f"[DISPATCH] Dropped {item.label or 'message'}: lease {item.fence} lost before send")
+            self._notify(item, False)
+        return kept
+
+    async def _send(self, key: int, batch: List[_Outbound]):
+        target = self._targets.get(key) or batch[0].target
+        try:
+            batch = await self._fenced(batch)
+            if not batch:
+                return
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await self._deliver(key, target, batch)
+                    break
+                except Exception as e:
+                    if attempt >= self.max_retries or not _transient(e):
+                        raise
+                    delay = self.retry_base * 2 ** attempt
+                    self.stats["retried"] += 1
+                    print(f"[DISPATCH] Transient error sending to {key} ({type(e).__name__}: {e}); "
+                          f"retry {attempt + 1}/{self.max_retries} in {delay:.0f}s")
+                    await asyncio.sleep(delay)
+            self.stats["messages"] += 1
+            self.stats["batched"] += len(batch) - 1
+            for item in batch:
+                self._notify(item, True)
+        except discord.Forbidden:
+            for item in batch:
+                if item.fallback:
+                    fb_target, fb_content = item.fallback
+                    self.enqueue(fb_target, fb_content, embeds=item.embeds, view=item.view, priority=item.priority,
+                                 label=item.label, on_delivered=item.on_delivered, on_failed=item.on_failed,
+                                 webhook_embeds=item.webhook_embeds)
+                else:
+                    self.stats["failed"] += 1
+                    print(f"[DISPATCH] Forbidden sending {item.label or 'message'} to {key}")
+                    self._notify(item, False)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            print(f"[DISPATCH] Failed to send {len(batch)} message(s) to {key}: {e}")
+            for item in batch:
+                self._notify(item, False)
+        finally:
+            self._inflight.discard(key)
+            if self._wakeup is not None:
+                self._wakeup.set()
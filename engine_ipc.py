@@ -0,0 +1,398 @@
+"""
+Engine IPC - jembatan proses gateway Discord <-> proses engine poller (Unix socket, satu JSON per baris)
+Proses engine (headless.py --gateway PATH) mengganti dispatch_queue dengan EngineClient: tiap enqueue
+dikirim ke gateway, yang me-resolve channel/user asli lalu enqueue ke DispatchQueue miliknya (rate
+budget, batching dan webhook tetap di gateway). Perubahan state file bersama (wallet, launch tracker,
+posisi trading) diumumkan ke sisi lain supaya di-reload dari disk.
+
+Message:
+  engine -> gateway: {"op": "hello", "pid", "worker_id", "engines"} | {"op": "enqueue", ...} | {"op": "state", "name"}
+  gateway -> engine: {"op": "state", "name"} | {"op": "members", "members": {engine: [worker_id, ...]}}
+                     | {"op": "delivered", "ack", "ok"}  (hasil kirim untuk enqueue yang membawa "ack")
+"""
+
+import os
+import asyncio
+import itertools
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+import json_codec
+from discord_dispatch import PRIORITY_DIGEST, Callback, DispatchQueue
+
+STREAM_LIMIT = 2**20  # embed maks 6000 karakter, tapi beri ruang untuk batch besar
+
+
+def _encode(message: Dict) -> bytes:
+    return json_codec.dumps_bytes(message, default=str) + b"\n"
+
+
+def target_spec(target) -> Dict:
+    """{"kind": "user"|"channel", "id"} untuk TextChannel / Thread / User / HeadlessTarget."""
+    kind = getattr(target, "kind", None) or ("user" if isinstance(target, (discord.User, discord.Member)) else "channel")
+    return {"kind": kind, "id": target.id}
+
+
+# {nama class: (class, serializer)}: View yang boleh lewat IPC, didaftarkan lewat register_view
+_VIEW_TYPES: Dict[str, Tuple[type, Callable[[discord.ui.View], Dict]]] = {}
+
+
+def register_view(cls: type, to_args: Callable[[discord.ui.View], Dict]):
+    """Daftarkan View untuk IPC: to_args(view) -> kwargs constructor (JSON) supaya gateway bisa cls(**kwargs).
+    Dipanggil saat import (worker dan gateway sama-sama import main)."""
+    _VIEW_TYPES[cls.__name__] = (cls, to_args)
+
+
+def view_spec(view: Optional[discord.ui.View]) -> Optional[Dict]:
+    """View dikirim sebagai nama class + argumen constructor dari serializer yang didaftarkan."""
+    if view is None:
+        return None
+    entry = _VIEW_TYPES.get(type(view).__name__)
+    if entry is None or type(view) is not entry[0]:
+        print(f"[ENGINE] View {type(view).__name__} not registered for IPC, sending without buttons")
+        return None
+    return {"type": type(view).__name__, "args": entry[1](view)}
+
+
+class EngineClient:
+    """Engine-side drop-in for DispatchQueue: enqueue() forwards messages to the gateway.
+
+    Message di-buffer selama belum/terputus dari gateway (maks `buffer`, yang terlama dibuang).
+    on_state: dipanggil dengan nama state saat gateway mengumumkan perubahan state file.
+    on_members: dipanggil dengan {engine: [worker_id]} saat worker join/leave di gateway.
+    """
+
+    def __init__(self, path: str, engines: Optional[List[str]] = None, on_state: Optional[Callable[[str], None]] = None,
+                 buffer: int = 10000, reconnect_delay: float = 1.0, worker_id: Optional[str] = None,
+                 on_members: Optional[Callable[[Dict[str, List[str]]], None]] = None):
+        self.path = path
+        self.engines = engines or []
+        self.on_state = on_state
+        self.worker_id = worker_id or str(os.getpid())
+        self.on_members = on_members
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+        self.stats = {"enqueued": 0, "forwarded": 0, "dropped": 0, "reconnects": 0, "state_received": 0}
+        self._outbox: deque = deque(maxlen=buffer)
+        self._acks = itertools.count(1)
+        self._callbacks: "OrderedDict[int, tuple]" = OrderedDict()  # ack -> (on_delivered, on_failed)
+        self._max_callbacks = buffer
+        self._sent_acks: set = set()  # ack yang sudah ditulis ke koneksi saat ini, hasilnya belum datang
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._outbox)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _fail(self, ack: Optional[int]):
+        """Hasil kirim tidak akan pernah datang: jalankan on_failed supaya pemanggil bisa rollback state."""
+        _, on_failed = self._callbacks.pop(ack, (None, None))
+        self._sent_acks.discard(ack)
+        if on_failed is not None:
+            try:
+                on_failed()
+            except Exception as e:
+                print(f"[ENGINE] Delivery callback failed: {e}")
+
+    def _push(self, message: Dict):
+        if len(self._outbox) == self._outbox.maxlen:
+            self.stats["dropped"] += 1
+            dropped = self._outbox.popleft()
+            if dropped.get("ack") is not None:
+                self._fail(dropped["ack"])
+        self._outbox.append(message)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def enqueue(self, target, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None,
+                embeds: Optional[List[discord.Embed]] = None, view: Optional[discord.ui.View] = None,
+                priority: int = PRIORITY_DIGEST, fallback=None, label: str = "",
+                on_delivered: Optional[Callback] = None, on_failed: Optional[Callback] = None,
+                webhook_embeds: Optional[List[discord.Embed]] = None):
+        """Same signature as DispatchQueue.enqueue. Callback dipanggil saat gateway melaporkan hasil kirim."""
+        if target is None:
+            if on_failed is not None:
+                on_failed()
+            return
+        all_embeds = list(embeds or []) + ([embed] if embed is not None else [])
+        self.stats["enqueued"] += 1
+        ack = None
+        if on_delivered is not None or on_failed is not None:
+            ack = next(self._acks)
+            self._callbacks[ack] = (on_delivered, on_failed)
+            while len(self._callbacks) > self._max_callbacks:
+                self._fail(next(iter(self._callbacks)))  # terlalu banyak yang belum dijawab gateway
+        self._push({
+            "op": "enqueue",
+            "target": target_spec(target),
+            "content": content or None,
+            "embeds": [e.to_dict() for e in all_embeds],
+            "view": view_spec(view),
+            "priority": priority,
+            "label": label,
+            "fallback": {"target": target_spec(fallback[0]), "content": fallback[1]} if fallback else None,
+            "ack": ack,
+            "webhook_embeds": [e.to_dict() for e in webhook_embeds] if webhook_embeds else None,
+        })
+
+    def state_changed(self, name: str):
+        self._push({"op": "state", "name": name})
+
+    def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, flush_timeout: float = 5.0):
+        """Kirim sisa outbox (maks flush_timeout detik) lalu berhenti."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + flush_timeout
+        while self._outbox and self.connected and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=STREAM_LIMIT)
+            except (FileNotFoundError, ConnectionRefusedError, OSError) as e:
+                if self.stats["reconnects"] % 30 == 0:
+                    print(f"[ENGINE] Gateway {self.path} unavailable ({e}); buffering {len(self._outbox)} message(s)")
+                self.stats["reconnects"] += 1
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            self.connected = True
+            print(f"[ENGINE] Connected to gateway {self.path}")
+            reader_task = asyncio.create_task(self._read(reader))
+            try:
+                writer.write(_encode({"op": "hello", "pid": os.getpid(), "worker_id": self.worker_id,
+                                      "engines": self.engines}))
+                await writer.drain()
+                while not reader_task.done():
+                    self._wakeup.clear()
+                    while self._outbox:
+                        message = self._outbox.popleft()
+                        try:
+                            writer.write(_encode(message))
+                            await writer.drain()
+                        except (ConnectionError, OSError):
+                            self._outbox.appendleft(message)
+                            raise
+                        if message["op"] == "enqueue":
+                            self.stats["forwarded"] += 1
+                            if message.get("ack") is not None:
+                                self._sent_acks.add(message["ack"])
+                    waiter = asyncio.create_task(self._wakeup.wait())
+                    await asyncio.wait([reader_task, waiter], return_when=asyncio.FIRST_COMPLETED)
+                    waiter.cancel()
+            except (ConnectionError, OSError) as e:
+                print(f"[ENGINE] Lost gateway connection: {e}")
+            finally:
+                self.connected = False
+                reader_task.cancel()
+                writer.close()
+                # Hasil untuk message yang sudah terkirim ke koneksi ini tidak akan datang lagi
+                for ack in list(self._sent_acks):
+                    self._fail(ack)
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _read(self, reader: asyncio.StreamReader):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json_codec.loads(line)
+            if message.get("op") == "state" and self.on_state is not None:
+                self.stats["state_received"] += 1
+                try:
+                    self.on_state(message["name"])
+                except Exception as e:
+                    print(f"[ENGINE] Failed to reload state {message['name']}: {e}")
+            elif message.get("op") == "delivered":
+                self._sent_acks.discard(message.get("ack"))
+                on_delivered, on_failed = self._callbacks.pop(message.get("ack"), (None, None))
+                callback = on_delivered if message.get("ok") else on_failed
+                if callback is not None:
+                    try:
+                        callback()
+                    except Exception as e:
+                        print(f"[ENGINE] Delivery callback failed: {e}")
+            elif message.get("op") == "members" and self.on_members is not None:
+                try:
+                    self.on_members(message.get("members") or {})
+                except Exception as e:
+                    print(f"[ENGINE] Failed to apply membership: {e}")
+
+
+class EngineBridge:
+    """Gateway-side Unix socket server: menerima message dari satu atau lebih engine worker.
+
+    resolve_target: async (spec) -> channel/user asli (None = skip)
+    View dibangun ulang dari view_spec lewat class yang didaftarkan dengan register_view
+    on_state: dipanggil saat engine mengumumkan perubahan state file (gateway reload dari disk)
+    """
+
+    def __init__(self, path: str, dispatch: DispatchQueue, resolve_target: Callable[[Dict], Awaitable[object]],
+                 on_state: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.dispatch = dispatch
+        self.resolve_target = resolve_target
+        self.on_state = on_state
+        self.clients: Dict[int, Dict] = {}  # {id(writer): {pid, worker_id, engines, received}}
+        self.stats = {"received": 0, "unresolved": 0, "state_changes": 0}
+        self._writers: Dict[int, asyncio.StreamWriter] = {}
+        self._handlers: set = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start(self):
+        if self._server is not None:
+            return
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # socket sisa proses sebelumnya
+        self._server = await asyncio.start_unix_server(self._handle, self.path, limit=STREAM_LIMIT)
+        os.chmod(self.path, 0o600)
+
+    async def stop(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers.values()):
+            writer.close()
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def state_changed(self, name: str, exclude: Optional[int] = None):
+        """Umumkan perubahan state ke semua engine (kecuali pengirimnya)."""
+        data = _encode({"op": "state", "name": name})
+        for key, writer in list(self._writers.items()):
+            if key != exclude:
+                writer.write(data)
+
+    def members(self) -> Dict[str, List[str]]:
+        """{engine: [worker_id]} dari worker yang sudah hello."""
+        members: Dict[str, set] = {}
+        for info in self.clients.values():
+            if info["worker_id"] is None:
+                continue
+            for engine in info["engines"]:
+                members.setdefault(engine, set()).add(info["worker_id"])
+        return {engine: sorted(ids) for engine, ids in members.items()}
+
+    def members_changed(self):
+        """Broadcast membership ke semua engine (worker join/leave)."""
+        data = _encode({"op": "members", "members": self.members()})
+        for writer in list(self._writers.values()):
+            if not writer.is_closing():
+                writer.write(data)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        key = id(writer)
+        self._writers[key] = writer
+        self._handlers.add(asyncio.current_task())
+        info = self.clients.setdefault(key, {"pid": None, "worker_id": None, "engines": [], "received": 0})
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json_codec.loads(line)
+                except ValueError:
+                    print(f"[ENGINE] Ignoring malformed message from pid {info['pid']}")
+                    continue
+                op = message.get("op")
+                if op == "hello":
+                    info["pid"], info["engines"] = message.get("pid"), message.get("engines") or []
+                    info["worker_id"] = message.get("worker_id") or str(info["pid"])
+                    duplicate = [other for k, other in self.clients.items()
+                                 if k != key and other["worker_id"] == info["worker_id"]
+                                 and set(other["engines"]) & set(info["engines"])]
+                    if duplicate:
+                        # Satu node di hash ring untuk dua proses: keduanya polling wallet yang sama
+                        print(f"[WARN] Worker id {info['worker_id']} already connected (pid {duplicate[0]['pid']}); "
+                              f"set a unique WORKER_ID per worker")
+                    print(f"[ENGINE] Worker pid {info['pid']} connected ({', '.join(info['engines']) or 'no engines'})")
+                    self.members_changed()
+                elif op == "enqueue":
+                    info["received"] += 1
+                    self.stats["received"] += 1
+                    await self._enqueue(message, writer)
+                elif op == "state":
+                    self.stats["state_changes"] += 1
+                    if self.on_state is not None:
+                        self.on_state(message["name"])
+                    self.state_changed(message["name"], exclude=key)
+        except (ConnectionError, OSError) as e:
+            print(f"[ENGINE] Worker pid {info['pid']} connection error: {e}")
+        except asyncio.CancelledError:
+            pass  # bridge.stop()
+        finally:
+            print(f"[ENGINE] Worker pid {info['pid']} disconnected")
+            self._writers.pop(key, None)
+            self._handlers.discard(asyncio.current_task())
+            left = self.clients.pop(key, None)
+            writer.close()
+            if left and left["worker_id"] is not None and self._server is not None and self._server.is_serving():
+                self.members_changed()
+
+    def _build_view(self, spec: Optional[Dict]) -> Optional[discord.ui.View]:
+        if not spec:
+            return None
+        entry = _VIEW_TYPES.get(spec.get("type"))
+        if entry is None:
+            print(f"[ENGINE] Unknown view {spec.get('type')}, sending without buttons")
+            return None
+        return entry[0](**spec.get("args", {}))
+
+    @staticmethod
+    def _ack(writer: asyncio.StreamWriter, ack: Optional[int], ok: bool):
+        if ack is not None and not writer.is_closing():
+            writer.write(_encode({"op": "delivered", "ack": ack, "ok": ok}))
+
+    async def _enqueue(self, message: Dict, writer: asyncio.StreamWriter):
+        ack = message.get("ack")
+        target = await self.resolve_target(message["target"])
+        if target is None:
+            self.stats["unresolved"] += 1
+            print(f"[ENGINE] Target {message['target']} not found, dropping {message.get('label') or 'message'}")
+            self._ack(writer, ack, False)
+            return
+        fallback = None
+        if message.get("fallback"):
+            fb_target = await self.resolve_target(message["fallback"]["target"])
+            if fb_target is not None:
+                fallback = (fb_target, message["fallback"].get("content"))
+        self.dispatch.enqueue(
+            target,
+            message.get("content"),
+            embeds=[discord.Embed.from_dict(e) for e in message.get("embeds", [])],
+            view=self._build_view(message.get("view")),
+            priority=message.get("priority", PRIORITY_DIGEST),
+            fallback=fallback,
+            label=message.get("label", ""),
+            on_delivered=(lambda: self._ack(writer, ack, True)) if ack is not None else None,
+            on_failed=(lambda: self._ack(writer, ack, False)) if ack is not None else None,
+            webhook_embeds=[discord.Embed.from_dict(e) for e in message.get("webhook_embeds") or []] or None,
+        )
@@ -0,0 +1,131 @@
+"""
+Engine Sink - tujuan notifikasi saat engine jalan headless (tanpa koneksi Discord)
+HeadlessDirectory menggantikan bot.get_channel / bot.fetch_user dengan target stand-in; DispatchQueue
+tetap jalan seperti biasa, tapi target.send() menulis record ke sink (JSONL file, stdout, atau
+asyncio.Queue in-process) alih-alih ke Discord.
+"""
+
+import sys
+import json
+import time
+import asyncio
+from typing import Dict, List, Optional
+
+import discord
+
+
+class Sink:
+    """Base sink: emit(record) dipanggil sekali per message yang akan dikirim ke Discord."""
+
+    def __init__(self):
+        self.emitted = 0
+
+    def emit(self, record: Dict):
+        self.emitted += 1
+        self._write(record)
+
+    def _write(self, record: Dict):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonlSink(Sink):
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _write(self, record: Dict):
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class StdoutSink(Sink):
+    def _write(self, record: Dict):
+        titles = ", ".join(e.get("title") or "?" for e in record["embeds"]) or "-"
+        print(f"[SINK] -> {record['target']}: {record['content'] or ''} [{titles}]")
+        sys.stdout.flush()
+
+
+class QueueSink(Sink):
+    """In-process sink untuk load test / profiling: consumer await sink.queue.get()."""
+
+    def __init__(self, queue: Optional[asyncio.Queue] = None):
+        super().__init__()
+        self.queue = queue if queue is not None else asyncio.Queue()
+        self.dropped = 0
+
+    def _write(self, record: Dict):
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+def make_sink(spec: str) -> Sink:
+    """Parse "stdout", "queue" atau "jsonl:<path>"."""
+    kind, _, arg = spec.partition(":")
+    if kind == "stdout":
+        return StdoutSink()
+    if kind == "queue":
+        return QueueSink()
+    if kind == "jsonl":
+        return JsonlSink(arg or "engine_output.jsonl")
+    raise ValueError(f"Unknown sink: {spec} (use stdout, queue or jsonl:<path>)")
+
+
+class HeadlessTarget:
+    """Stand-in TextChannel / User: cukup atribut yang dipakai poller + DispatchQueue."""
+
+    def __init__(self, sink: Sink, target_id: int, kind: str = "channel", name: Optional[str] = None):
+        self.sink = sink
+        self.id = target_id
+        self.kind = kind
+        self.name = name or f"{kind}-{target_id}"
+        self.mention = f"<@{target_id}>" if kind == "user" else f"<#{target_id}>"
+
+    def __repr__(self) -> str:
+        return f"<HeadlessTarget {self.kind} {self.id}>"
+
+    async def send(self, content: Optional[str] = None, *, embed: Optional[discord.Embed] = None,
+                   embeds: Optional[List[discord.Embed]] = None, view: Optional[discord.ui.View] = None, **kwargs):
+        all_embeds = list(embeds or []) + ([embed] if embed is not None else [])
+        self.sink.emit({
+            "ts": time.time(),
+            "kind": self.kind,
+            "target_id": self.id,
+            "target": self.name,
+            "content": content,
+            "embeds": [e.to_dict() for e in all_embeds],
+            "components": view.to_components() if view is not None else [],
+        })
+        return None
+
+
+class HeadlessDirectory:
+    """Resolves channel/user ids to HeadlessTarget (cached, satu object per id)."""
+
+    def __init__(self, sink: Sink, names: Optional[Dict[int, str]] = None):
+        self.sink = sink
+        self.names = names or {}
+        self._targets: Dict[int, HeadlessTarget] = {}
+
+    def get_channel(self, channel_id: Optional[int]) -> Optional[HeadlessTarget]:
+        if not channel_id:
+            return None
+        return self._target(int(channel_id), "channel")
+
+    async def fetch_user(self, user_id: int) -> HeadlessTarget:
+        return self._target(int(user_id), "user")
+
+    def _target(self, target_id: int, kind: str) -> HeadlessTarget:
+        target = self._targets.get(target_id)
+        if target is None:
+            target = HeadlessTarget(self.sink, target_id, kind, self.names.get(target_id))
+            self._targets[target_id] = target
+        return target
@@ -0,0 +1,98 @@
+"""
+Futardio Feed - shared snapshot of Futardio/MetaDAO v0_7_launches
+Satu fetch per interval dipakai bersama oleh new-ICO notifier dan top-funded ranking,
+dengan diff incremental (added / removed / changed + committed delta) antar snapshot.
+"""
+
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Field yang dibandingkan antar snapshot untuk deteksi "changed"
+TRACKED_FIELDS = ("state", "total_committed_amount", "minimum_raise_amount", "seconds_for_launch")
+
+
+@dataclass
+class FutardioDelta:
+    """Difference between two consecutive feed snapshots."""
+    added: List[Dict] = field(default_factory=list)
+    removed: List[Dict] = field(default_factory=list)
+    changed: List[Dict] = field(default_factory=list)  # {"launch", "fields", "committed_delta"}
+    fetched_at: float = 0.0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _committed(launch: Dict) -> float:
+    try:
+        return float(launch.get("total_committed_amount") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class FutardioFeed:
+    """Fetches launches at most once per `min_interval_sec` and keeps the last snapshot in memory."""
+
+    def __init__(self, fetch_fn: Callable[[], Awaitable[List[Dict]]], min_interval_sec: float, slack_sec: float = 30):
+        self.fetch_fn = fetch_fn
+        self.min_interval_sec = min_interval_sec
+        self.slack_sec = slack_sec  # toleransi jitter tasks.loop supaya poll tepat-interval tetap refresh
+        self.snapshot: Dict[str, Dict] = {}  # {launch_addr: launch}
+        self.fetched_at: float = 0.0
+        self.last_delta = FutardioDelta()
+        self._lock = asyncio.Lock()
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return not self.snapshot or now - self.fetched_at >= self.min_interval_sec - self.slack_sec
+
+    async def refresh(self, force: bool = False) -> FutardioDelta:
+        """Fetch a new snapshot if stale (or forced) and return the delta vs the previous one.
+
+        Callers that arrive while a fetch is in flight wait for it and share its result.
+        Returns an empty delta when the cached snapshot is still fresh or the fetch failed.
+        """
+        async with self._lock:
+            if not force and not self.is_stale():
+                return FutardioDelta(fetched_at=self.fetched_at)
+            launches = await self.fetch_fn()
+            if not launches:
+                # Fetch gagal / rate limited: pertahankan snapshot lama
+                return FutardioDelta(fetched_at=self.fetched_at)
+            current = {str(l["launch_addr"]): l for l in launches if l.get("launch_addr")}
+            delta = self._diff(self.snapshot, current)
+            self.snapshot = current
+            self.fetched_at = delta.fetched_at = time.time()
+            self.last_delta = delta
+            return delta
+
+    @staticmethod
+    def _diff(previous: Dict[str, Dict], current: Dict[str, Dict]) -> FutardioDelta:
+        delta = FutardioDelta()
+        for addr, launch in current.items():
+            old = previous.get(addr)
+            if old is None:
+                delta.added.append(launch)
+                continue
+            changed_fields = [f for f in TRACKED_FIELDS if old.get(f) != launch.get(f)]
+            if changed_fields:
+                delta.changed.append({
+                    "launch": launch,
+                    "fields": changed_fields,
+                    "committed_delta": _committed(launch) - _committed(old),
+                })
+        delta.removed = [launch for addr, launch in previous.items() if addr not in current]
+        return delta
+
+    async def launches(self) -> List[Dict]:
+        """Current snapshot (refreshed first if stale)."""
+        await self.refresh()
+        return list(self.snapshot.values())
+
+    async def top_funded(self, n: int, state: str = "Live") -> List[Dict]:
+        """Top `n` launches in `state`, ordered by committed amount (desc)."""
+        launches = [l for l in await self.launches() if (l.get("state") or "").strip() == state]
+        launches.sort(key=_committed, reverse=True)
+        return launches[: max(1, n)]
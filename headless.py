@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Headless Engine - jalankan poller main.py (bot call, wallet, launch, MetaDAO, Futardio, hype, trading)
+tanpa koneksi Discord gateway. Poller yang sama jalan sebagai asyncio task biasa; notifikasi lewat
+DispatchQueue seperti biasa tapi berakhir di sink (engine_sink) alih-alih channel Discord.
+Berguna untuk profiling, load test, dan menjalankan engine di worker terpisah: dengan --gateway, notifikasi
+dikirim lewat Unix socket ke proses bot yang jalan dengan ENGINE_MODE=gateway (engine_ipc).
+
+Usage:
+    python headless.py                                  # engine sesuai env (sama seperti on_ready), output ke stdout
+    python headless.py -e bot_call -e wallets --sink jsonl:calls.jsonl
+    python headless.py -e launches --once                # satu cycle tiap engine lalu keluar
+    python headless.py --gateway /tmp/metina-engine.sock -e wallets   # worker untuk bot ENGINE_MODE=gateway
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from typing import Dict, List, Optional
+
+import main
+import metrics
+from engine_ipc import EngineClient
+from engine_sink import HeadlessDirectory, QueueSink, Sink, make_sink
+
+# name -> nama tasks.Loop di main.py
+ENGINES: Dict[str, List[str]] = {
+    "bot_call": ["poll_new_tokens", "notify_bot_call_queue"],  # discovery -> antrean -> notifier
+    "wallets": ["poll_wallet_buys"],
+    "launches": ["poll_token_launches"],
+    "metadao": ["poll_metadao_launches"],
+    "futardio": ["poll_futardio_new_icos", "poll_futardio_top_funded_hourly"],
+    "hype": ["scan_hype_tokens"],
+    "trading": ["monitor_trading_positions"],
+}
+
+
+def default_engines() -> List[str]:
+    """Engine yang aktif berdasarkan env, mengikuti urutan start di on_ready."""
+    enabled = []
+    if main.HELIUS_API_KEY:
+        enabled.append("wallets")
+    enabled.append("metadao")
+    if main.FUTARDIO_LAUNCHES_API_URL:
+        enabled.append("futardio")
+    if main.BOT_CALL_CHANNEL_ID:
+        enabled.append("bot_call")
+    if main.TRADING_ENABLED:
+        enabled.append("trading")
+        if main.TRADING_CONFIG.get("hype_trading_enabled"):
+            enabled.append("hype")
+    if main.LAUNCH_TRACKER_ENABLED:
+        enabled.append("launches")
+    return enabled
+
+
+def _channel_names() -> Dict[int, str]:
+    names = {
+        main.BOT_CALL_CHANNEL_ID: "bot-call",
+        main.DAMM_CHANNEL_ID: "damm-v2",
+        main.TRACK_WALLET_CHANNEL_ID: "track-wallet",
+        main.TRADING_CHANNEL_ID: "trading",
+        main.LAUNCH_TRACKER_CHANNEL_ID: "launch-tracker",
+        main.ICO_TRACKER_CHANNEL_ID: "ico-tracker",
+    }
+    return {cid: name for cid, name in names.items() if cid}
+
+
+async def _drive(name: str, loop, once: bool):
+    """Jalankan coroutine loop berulang. Loop yang di-manage loop_scheduler sudah mengatur jeda
+    sendiri (overrun policy), selain itu tidur sisa interval."""
+    managed = name in main.loop_scheduler.loops
+    interval = (loop.seconds or 0) + (loop.minutes or 0) * 60 + (loop.hours or 0) * 3600
+    while True:
+        started = time.monotonic()
+        try:
+            await loop.coro()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[HEADLESS] {name} iteration failed: {e}")
+        if once:
+            return
+        if not managed:
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+async def _drive_sequence(names: List[str], once: bool):
+    """--once: loop satu engine dijalankan berurutan (mis. discovery bot call dulu, baru notifier antrean)."""
+    for name in names:
+        await _drive(name, getattr(main, name), once)
+
+
+async def run_headless(sink: Sink, engines: Optional[List[str]] = None, once: bool = False,
+                       duration: Optional[float] = None, jitter: bool = True, dispatch_rate_limit: int = 0,
+                       gateway: Optional[str] = None) -> Dict:
+    """Start the selected engines against `sink`. Returns summary stats when done/stopped.
+
+    dispatch_rate_limit: 0 = tanpa budget per channel (throughput engine murni).
+    gateway: path Unix socket gateway; kalau diisi, notifikasi diteruskan ke gateway (bukan ke sink).
+    """
+    engines = engines or default_engines()
+    unknown = [e for e in engines if e not in ENGINES]
+    if unknown:
+        raise ValueError(f"Unknown engine(s): {', '.join(unknown)} (available: {', '.join(ENGINES)})")
+
+    directory = HeadlessDirectory(sink, _channel_names())
+    main.bot.get_channel = directory.get_channel
+    main.bot.fetch_user = directory.fetch_user
+
+    if not main.http_session:
+        main.http_session = main.http_manager.session()
+    if gateway:
+        if "wallets" in engines and not main.WORKER_ID:
+            # Default per proses berubah tiap restart: wallet pindah worker dan cursor lama yatim
+            raise ValueError("WORKER_ID must be set for a wallets worker (stable and unique per worker)")
+        client = EngineClient(gateway, engines, on_state=main.reload_shared_state, worker_id=main.WORKER_ID or None,
+                              on_members=lambda members: main.apply_wallet_partition(members.get("wallets", [])))
+        main.ENGINE_MODE = "worker"
+        main.dispatch_queue = client
+        main.engine_link = client
+    else:
+        main.dispatch_queue.rate_limit = dispatch_rate_limit if dispatch_rate_limit > 0 else 10**9
+        # Replica headless lokal ikut leader election (LEADER_LEASE_DB); worker gateway dibagi lewat membership
+        await main.start_lease_manager()
+    main.dispatch_queue.start()
+    main.sol_price_oracle.start()
+    if main.LOOP_LAG_MONITOR_ENABLED and not main.loop_lag_monitor.running:
+        main.loop_lag_monitor.start()
+    if main.METRICS_ENABLED and main.metrics_runner is None:
+        main.register_runtime_gauges()
+        main.metrics_runner = await metrics.start_metrics_server(main.METRICS_HOST, main.METRICS_PORT)
+        print(f"[METRICS] Serving http://{main.METRICS_HOST}:{main.METRICS_PORT}/metrics")
+
+    loop_names = [n for engine in engines for n in ENGINES[engine]]
+    if not jitter or once:
+        for n in loop_names:
+            if n in main.loop_scheduler.loops:
+                main.loop_scheduler.loops[n].jitter_sec = 0.0
+    output = f"gateway {gateway}" if gateway else type(sink).__name__
+    print(f"[HEADLESS] Starting engines: {', '.join(engines)} -> {output}")
+    started = time.time()
+    if once:
+        tasks = [asyncio.create_task(_drive_sequence(ENGINES[e], once), name=f"headless:{e}") for e in engines]
+    else:
+        tasks = [asyncio.create_task(_drive(n, getattr(main, n), once), name=f"headless:{n}") for n in loop_names]
+    try:
+        if duration:
+            await asyncio.wait(tasks, timeout=duration)
+        else:
+            await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Beri worker dispatch kesempatan mengosongkan antrean sebelum berhenti
+        deadline = time.monotonic() + 5
+        while len(main.dispatch_queue) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        await main.dispatch_queue.stop()
+        await main.sol_price_oracle.stop()
+        if main.lease_manager is not None:
+            await main.lease_manager.stop()
+        main.loop_lag_monitor.stop()
+        await main.http_manager.close()
+        main.http_session = None
+    return {
+        "engines": engines,
+        "elapsed_sec": round(time.time() - started, 3),
+        "emitted": sink.emitted,
+        "dispatch": dict(main.dispatch_queue.stats),
+        "loops": main.loop_scheduler.snapshot(),
+    }
+
+
+def cli(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run main.py pollers without a Discord connection")
+    parser.add_argument("-e", "--engine", action="append", dest="engines", choices=list(ENGINES),
+                        help="Engine to run (repeatable; default: enabled via env like on_ready)")
+    parser.add_argument("--sink", default="stdout", help="stdout, queue or jsonl:<path>")
+    parser.add_argument("--once", action="store_true", help="Run one iteration of each engine, then exit")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after N seconds")
+    parser.add_argument("--no-jitter", dest="jitter", action="store_false", help="Skip start jitter from loop_scheduler")
+    parser.add_argument("--dispatch-rate-limit", type=int, default=0, help="Messages per channel per window (0 = unlimited)")
+    parser.add_argument("--gateway", default=None, metavar="SOCKET",
+                        help="Forward notifications to a bot running with ENGINE_MODE=gateway (e.g. /tmp/metina-engine.sock)")
+    args = parser.parse_args(argv)
+
+    sink = make_sink(args.sink)
+    try:
+        summary = asyncio.run(run_headless(sink, args.engines, args.once, args.duration, args.jitter,
+                                           args.dispatch_rate_limit, args.gateway))
+    except KeyboardInterrupt:
+        print("\n[HEADLESS] Stopped")
+        return
+    finally:
+        sink.close()
+    if args.gateway:
+        result = f"{summary['dispatch']['forwarded']} message(s) forwarded to gateway"
+    else:
+        result = f"{summary['emitted']} message(s) emitted" + (f", {sink.dropped} dropped" if isinstance(sink, QueueSink) else "")
+    print(f"[HEADLESS] Done in {summary['elapsed_sec']:.1f}s: {result}")
+    for row in summary["loops"]:
+        if row["name"] in [n for e in summary["engines"] for n in ENGINES[e]]:
+            duration = f"{row['last_duration']:.2f}s" if row["last_duration"] is not None else "-"
+            print(f"[HEADLESS]   {row['name']}: runs={row['runs']} last={duration} overruns={row['overruns']}")
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
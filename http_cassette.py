@@ -0,0 +1,373 @@
+"""
+HTTP Cassette - record/replay harness untuk semua provider eksternal (Jupiter, Helius, DexScreener,
+Meteora datapi, Rugcheck, Futardio, MetaDAO, GMGN, ...)
+Stub server aiohttp lokal (thread sendiri, jadi caller `requests` sinkron juga aman) yang:
+  record - meneruskan request ke provider asli lalu menyimpan response ke file cassette JSON
+  replay - menjawab dari cassette dengan latency, error 5xx dan 429 yang bisa dikonfigurasi (seeded)
+patch_http() mengarahkan aiohttp.ClientSession dan requests ke stub, jadi pipeline main.py dan script
+test_*.py bisa jalan offline dan deterministik.
+
+Usage:
+    python http_cassette.py record cassettes/dexscreener.json test_dexscreener_api.py
+    python http_cassette.py replay --latency-ms 80 --rate-limit-every 20 cassettes/dexscreener.json test_dexscreener_api.py
+    python http_cassette.py serve --port 8765 cassettes/dexscreener.json
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import random
+import asyncio
+import hashlib
+import argparse
+import threading
+import contextlib
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import aiohttp
+import requests
+from aiohttp import web
+
+import metrics
+
+# Query param / header yang tidak boleh masuk cassette (API key dsb.)
+SECRET_PARAMS = {"api-key", "api_key", "apikey", "key", "token", "access_token"}
+FORWARD_HEADER_SKIP = {"host", "content-length", "transfer-encoding", "connection", "accept-encoding"}
+STORED_RESPONSE_HEADERS = ("Content-Type", "Retry-After", "ETag", "Last-Modified")
+
+# id() session upstream milik server record: tidak boleh ikut di-rewrite ke stub (loop)
+_PASSTHROUGH_SESSIONS = set()
+
+
+def normalize_url(url: str) -> str:
+    """Drop secret query params and sort the rest so equivalent requests share one key."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def _normalize_body(body: bytes) -> bytes:
+    if not body:
+        return b""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if isinstance(data, dict):
+        data.pop("id", None)  # JSON-RPC id berubah tiap request
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode()
+
+
+def request_key(method: str, url: str, body: bytes = b"") -> str:
+    key = f"{method.upper()} {normalize_url(url)}"
+    norm = _normalize_body(body)
+    if norm:
+        key += " #" + hashlib.sha1(norm).hexdigest()[:12]
+    return key
+
+
+class Cassette:
+    """Recorded interactions keyed by request_key; repeated requests replay their responses in order."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: Dict[str, List[Dict]] = {}
+        self._cursor: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.interactions.values())
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.interactions = {}
+            for item in data.get("interactions", []):
+                self.interactions.setdefault(item["key"], []).append(item)
+        self._cursor = {}
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        items = [item for entries in self.interactions.values() for item in entries]
+        with open(self.path, "w") as f:
+            json.dump({"version": 1, "interactions": items}, f, indent=1)
+
+    def record(self, method: str, url: str, request_body: bytes, status: int, headers: Dict[str, str], body: bytes, latency_ms: float):
+        key = request_key(method, url, request_body)
+        try:
+            body_text, encoding = body.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            body_text, encoding = base64.b64encode(body).decode(), "base64"
+        self.interactions.setdefault(key, []).append({
+            "key": key,
+            "method": method.upper(),
+            "url": normalize_url(url),
+            "status": status,
+            "headers": {h: headers[h] for h in STORED_RESPONSE_HEADERS if h in headers},
+            "body": body_text,
+            "encoding": encoding,
+            "latency_ms": round(latency_ms, 1),
+        })
+
+    def next_response(self, key: str) -> Optional[Dict]:
+        entries = self.interactions.get(key)
+        if not entries:
+            return None
+        idx = self._cursor.get(key, 0)
+        self._cursor[key] = idx + 1
+        return entries[min(idx, len(entries) - 1)]
+
+    @staticmethod
+    def body_bytes(entry: Dict) -> bytes:
+        if entry.get("encoding") == "base64":
+            return base64.b64decode(entry["body"])
+        return entry["body"].encode("utf-8")
+
+
+@dataclass
+class FaultConfig:
+    """Replay behaviour. latency_ms=None pakai latency yang terekam di cassette."""
+    latency_ms: Optional[float] = None
+    latency_scale: float = 1.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_every: int = 0  # tiap request ke-N per host dibalas 429
+    retry_after_sec: int = 1
+    seed: int = 0
+
+
+# responder(method, url, body) -> (status, body, headers) atau None; dipakai untuk request yang tidak ada di cassette
+Responder = Callable[[str, str, bytes], Optional[Tuple[int, bytes, Dict[str, str]]]]
+
+
+class CassetteServer:
+    """Local stub provider. Requests arrive as /<scheme>/<host>/<path>?<query>.
+
+    responder: optional synthetic provider (mis. bench_fixtures.SyntheticProviders) untuk request
+    yang tidak ada di cassette, supaya skala data bisa dibesarkan tanpa merekam ulang.
+    """
+
+    def __init__(self, cassette: Cassette, mode: str = "replay", faults: Optional[FaultConfig] = None,
+                 host: str = "127.0.0.1", port: int = 0, strict: bool = False, responder: Optional[Responder] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.cassette = cassette
+        self.mode = mode
+        self.faults = faults or FaultConfig()
+        self.host = host
+        self.port = port
+        self.strict = strict
+        self.responder = responder
+        self.base_url: Optional[str] = None
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "recorded": 0, "synthetic": 0, "injected_429": 0, "injected_errors": 0}
+        self.host_counts: Dict[str, int] = {}
+        self._rng = random.Random(self.faults.seed)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._upstream: Optional[aiohttp.ClientSession] = None
+        self._ready = threading.Event()
+
+    # --- lifecycle (server jalan di thread + event loop sendiri) ---
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._serve, name="cassette-server", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(10):
+            raise RuntimeError("Cassette server failed to start")
+        return self.base_url
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._loop = None
+        if self.mode == "record":
+            self.cassette.save()
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._startup())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.close()
+
+    async def _startup(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route("*", "/{scheme}/{host}/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{self.host}:{port}"
+
+    async def _shutdown(self):
+        if self._upstream is not None:
+            _PASSTHROUGH_SESSIONS.discard(id(self._upstream))
+            await self._upstream.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    # --- request handling ---
+    async def _handle(self, request: web.Request) -> web.Response:
+        scheme, host, path = request.match_info["scheme"], request.match_info["host"], request.match_info["path"]
+        upstream_url = f"{scheme}://{host}/{path}" + (f"?{request.query_string}" if request.query_string else "")
+        body = await request.read()
+        self.stats["requests"] += 1
+        if self.mode == "record":
+            return await self._record(request, upstream_url, body)
+        return await self._replay(request.method, host, upstream_url, body)
+
+    async def _record(self, request: web.Request, url: str, body: bytes) -> web.Response:
+        if self._upstream is None:
+            self._upstream = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+            _PASSTHROUGH_SESSIONS.add(id(self._upstream))
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in FORWARD_HEADER_SKIP}
+        started = time.perf_counter()
+        async with self._upstream.request(request.method, url, data=body or None, headers=headers, allow_redirects=True) as resp:
+            resp_body = await resp.read()
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.cassette.record(request.method, url, body, resp.status, dict(resp.headers), resp_body, latency_ms)
+            self.stats["recorded"] += 1
+            out_headers = {h: resp.headers[h] for h in STORED_RESPONSE_HEADERS if h in resp.headers}
+            return web.Response(status=resp.status, body=resp_body, headers=out_headers)
+
+    async def _replay(self, method: str, host: str, url: str, body: bytes) -> web.Response:
+        faults = self.faults
+        count = self.host_counts[host] = self.host_counts.get(host, 0) + 1
+        if faults.rate_limit_every and count % faults.rate_limit_every == 0:
+            self.stats["injected_429"] += 1
+            return web.json_response({"error": "rate limited (injected)"}, status=429,
+                                     headers={"Retry-After": str(faults.retry_after_sec)})
+        if faults.error_rate and self._rng.random() < faults.error_rate:
+            self.stats["injected_errors"] += 1
+            return web.json_response({"error": "upstream error (injected)"}, status=503)
+
+        entry = self.cassette.next_response(request_key(method, url, body))
+        latency = faults.latency_ms if faults.latency_ms is not None else (entry or {}).get("latency_ms", 0) * faults.latency_scale
+        if faults.jitter_ms:
+            latency += self._rng.uniform(0, faults.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+        if entry is None and self.responder is not None:
+            result = self.responder(method, url, body)
+            if result is not None:
+                self.stats["synthetic"] += 1
+                status, resp_body, headers = result
+                return web.Response(status=status, body=resp_body, headers=headers)
+        if entry is None:
+            self.stats["misses"] += 1
+            print(f"[CASSETTE] Miss: {method} {normalize_url(url)}")
+            if self.strict:
+                return web.json_response({"error": "not in cassette"}, status=599)
+            return web.json_response({"error": "not in cassette"}, status=404)
+        self.stats["hits"] += 1
+        return web.Response(status=entry["status"], body=Cassette.body_bytes(entry), headers=entry.get("headers") or {})
+
+
+def rewrite_url(url, base_url: str, hosts: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Map an external provider URL onto the stub server, or None if it should go out untouched."""
+    parts = urlsplit(str(url))
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host or str(url).startswith(base_url):
+        return None
+    if hosts is not None:
+        if not any(h in parts.netloc.lower() for h in hosts):
+            return None
+    elif metrics.provider_for(url) in ("other", "discord"):
+        # Discord gateway/API (session discord.py sendiri) tidak boleh ikut di-stub
+        return None
+    netloc = parts.netloc.lower()
+    return urlunsplit(("http", base_url.split("://", 1)[1], f"/{parts.scheme}/{netloc}{parts.path or '/'}", parts.query, ""))
+
+
+@contextlib.contextmanager
+def patch_http(base_url: str, hosts: Optional[Iterable[str]] = None):
+    """Route aiohttp.ClientSession and requests calls for provider hosts through the stub server."""
+    hosts = list(hosts) if hosts is not None else None
+    orig_aiohttp = aiohttp.ClientSession._request
+    orig_requests = requests.Session.request
+
+    def aiohttp_request(self, method, str_or_url, *args, **kwargs):
+        if id(self) in _PASSTHROUGH_SESSIONS:
+            return orig_aiohttp(self, method, str_or_url, *args, **kwargs)
+        return orig_aiohttp(self, method, rewrite_url(str_or_url, base_url, hosts) or str_or_url, *args, **kwargs)
+
+    def requests_request(self, method, url, *args, **kwargs):
+        return orig_requests(self, method, rewrite_url(url, base_url, hosts) or url, *args, **kwargs)
+
+    aiohttp.ClientSession._request = aiohttp_request
+    requests.Session.request = requests_request
+    try:
+        yield
+    finally:
+        aiohttp.ClientSession._request = orig_aiohttp
+        requests.Session.request = orig_requests
+
+
+@contextlib.contextmanager
+def cassette(path: Optional[str], mode: str = "replay", faults: Optional[FaultConfig] = None,
+             hosts: Optional[Iterable[str]] = None, strict: bool = False, responder: Optional[Responder] = None):
+    """Start a stub server for `path` and patch HTTP clients for the duration of the block.
+
+    path=None: cassette kosong (semua response dari `responder`).
+    """
+    cas = Cassette(path).load() if path else Cassette("")
+    server = CassetteServer(cas, mode=mode, faults=faults, strict=strict, responder=responder)
+    base_url = server.start()
+    try:
+        with patch_http(base_url, hosts):
+            yield server
+    finally:
+        server.stop()
+        print(f"[CASSETTE] {mode} {path}: {server.stats}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Record/replay external HTTP providers for offline runs")
+    parser.add_argument("mode", choices=("record", "replay", "serve"))
+    parser.add_argument("cassette", help="Path to cassette JSON")
+    parser.add_argument("script", nargs="?", help="Python script to run with HTTP patched (record/replay)")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=None, help="Fixed latency (default: recorded latency)")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strict", action="store_true", help="Cassette miss returns 599 instead of 404")
+    parser.add_argument("--host", action="append", dest="hosts", help="Only stub hosts containing this (repeatable)")
+    args = parser.parse_args(argv)
+
+    faults = FaultConfig(latency_ms=args.latency_ms, latency_scale=args.latency_scale, jitter_ms=args.jitter_ms,
+                         error_rate=args.error_rate, rate_limit_every=args.rate_limit_every, seed=args.seed)
+    if args.mode == "serve":
+        server = CassetteServer(Cassette(args.cassette).load(), faults=faults, port=args.port, strict=args.strict)
+        print(f"[CASSETTE] Serving {args.cassette} at {server.start()} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+        return
+    if not args.script:
+        parser.error("record/replay need a script to run")
+
+    import runpy
+    sys.argv = [args.script] + args.script_args
+    with cassette(args.cassette, mode=args.mode, faults=faults, hosts=args.hosts, strict=args.strict):
+        runpy.run_path(args.script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
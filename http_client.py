@@ -0,0 +1,184 @@
+"""
+HTTP Client - satu pool koneksi bersama untuk semua provider (Jupiter, Helius, DexScreener, Meteora, dst.)
+Semua request async lewat satu aiohttp.ClientSession dengan TCPConnector yang di-tune (limit per host,
+keep-alive, DNS cache, timeout default); request sync (requests) lewat satu requests.Session dengan
+pool per host. Koneksi TCP/TLS yang sudah hangat dipakai ulang, bukan dibuka baru tiap call.
+Statistik per host (request, error, koneksi baru vs reuse, latency) untuk /http_stats.
+response.json() dan body json= di-decode/encode lewat json_codec (orjson kalau terinstall).
+
+Env: HTTP_POOL_LIMIT, HTTP_POOL_LIMIT_PER_HOST, HTTP_KEEPALIVE_SEC, HTTP_DNS_CACHE_SEC,
+     HTTP_TIMEOUT_SEC, HTTP_CONNECT_TIMEOUT_SEC
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+import json_codec
+import metrics
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    errors: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    def observe(self, duration: float, error: bool = False):
+        self.requests += 1
+        self.errors += int(error)
+        self.total_latency += duration
+        self.max_latency = max(self.max_latency, duration)
+
+
+class CodecResponse(aiohttp.ClientResponse):
+    """ClientResponse yang json()-nya default ke json_codec.loads."""
+
+    async def json(self, *, encoding: Optional[str] = None, loads=None, content_type: Optional[str] = "application/json"):
+        return await super().json(encoding=encoding, loads=loads or json_codec.loads, content_type=content_type)
+
+
+class HttpClientManager:
+    """Lazily-created shared aiohttp + requests sessions. Panggil session() dari dalam event loop."""
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, keepalive_sec: float = 30.0,
+                 dns_cache_sec: int = 300, timeout_sec: float = 30.0, connect_timeout_sec: float = 10.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_sec = keepalive_sec
+        self.dns_cache_sec = dns_cache_sec
+        self.timeout = aiohttp.ClientTimeout(total=timeout_sec, connect=connect_timeout_sec)
+        self.hosts: Dict[str, HostStats] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._sync_session: Optional[requests.Session] = None
+
+    @classmethod
+    def from_env(cls) -> "HttpClientManager":
+        return cls(
+            limit=int(os.getenv("HTTP_POOL_LIMIT", "100")),
+            limit_per_host=int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10")),
+            keepalive_sec=float(os.getenv("HTTP_KEEPALIVE_SEC", "30")),
+            dns_cache_sec=int(os.getenv("HTTP_DNS_CACHE_SEC", "300")),
+            timeout_sec=float(os.getenv("HTTP_TIMEOUT_SEC", "30")),
+            connect_timeout_sec=float(os.getenv("HTTP_CONNECT_TIMEOUT_SEC", "10")),
+        )
+
+    def _host(self, url) -> HostStats:
+        host = (getattr(url, "host", None) or urlsplit(str(url)).hostname or "unknown").lower()
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = HostStats()
+        return stats
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        async def on_request_start(session, ctx, params):
+            ctx.host_start = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            self._host(params.url).observe(time.perf_counter() - ctx.host_start, error=params.response.status >= 500)
+
+        async def on_request_exception(session, ctx, params):
+            self._host(params.url).observe(time.perf_counter() - ctx.host_start, error=True)
+
+        async def on_connection_create_end(session, ctx, params):
+            ctx.new_connection = True
+
+        async def on_connection_reuseconn(session, ctx, params):
+            ctx.new_connection = False
+
+        async def on_request_headers_sent(session, ctx, params):
+            stats = self._host(params.url)
+            if getattr(ctx, "new_connection", True):
+                stats.new_connections += 1
+            else:
+                stats.reused_connections += 1
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_request_headers_sent.append(on_request_headers_sent)
+        return trace
+
+    def session(self) -> aiohttp.ClientSession:
+        """Shared aiohttp session (dibuat ulang kalau sudah ditutup)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_sec,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_sec,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                auto_decompress=True,  # Accept-Encoding gzip/deflate dikirim default oleh aiohttp
+                response_class=CodecResponse,
+                json_serialize=json_codec.dumps,
+                trace_configs=[metrics.http_trace_config(), self._trace_config()],
+            )
+        return self._session
+
+    def sync_session(self) -> requests.Session:
+        """Shared requests.Session untuk path sync (pool per host, keep-alive)."""
+        if self._sync_session is None:
+            session = requests.Session()
+            # pool_connections = jumlah host yang pool-nya disimpan, pool_maxsize = koneksi per host
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=self.limit_per_host)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.hooks["response"].append(self._on_sync_response)
+            self._sync_session = session
+        return self._sync_session
+
+    def _on_sync_response(self, response: requests.Response, *args, **kwargs):
+        self._host(response.url).observe(response.elapsed.total_seconds(), error=response.status_code >= 500)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._sync_session is not None:
+            self._sync_session.close()
+            self._sync_session = None
+
+    def snapshot(self) -> List[Dict]:
+        """Per-host stats, host paling sibuk dulu."""
+        rows = []
+        for host, s in self.hosts.items():
+            connections = s.new_connections + s.reused_connections
+            rows.append({
+                "host": host,
+                "requests": s.requests,
+                "errors": s.errors,
+                "new_connections": s.new_connections,
+                "reuse_ratio": s.reused_connections / connections if connections else None,
+                "avg_latency": s.total_latency / s.requests if s.requests else None,
+                "max_latency": s.max_latency,
+            })
+        rows.sort(key=lambda r: r["requests"], reverse=True)
+        return rows
+
+
+_shared: Optional[HttpClientManager] = None
+
+
+def shared() -> HttpClientManager:
+    """Manager bersama satu proses (main.py, MeteoraLPAgent, headless)."""
+    global _shared
+    if _shared is None:
+        _shared = HttpClientManager.from_env()
+    return _shared
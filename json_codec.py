@@ -0,0 +1,55 @@
+"""
+JSON Codec - encode/decode JSON lewat library native (orjson) kalau terinstall, fallback ke stdlib json
+Dipakai untuk body response provider (Jupiter toptraded, Meteora datapi, Helius, Rugcheck) lewat
+http_client, dan untuk state file yang hanya dibaca mesin (ditulis compact, tanpa indent).
+File yang diedit manusia (tracked wallets, KOL list) tetap pakai json.dump(indent=4) biasa.
+"""
+
+import json
+from typing import IO, Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # stdlib lebih longgar (NaN / Infinity dari sebagian provider); error aslinya dari sini
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode("utf-8")
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, default: Optional[Callable[[Any], Any]] = None, pretty: bool = False) -> bytes:
+    """Compact UTF-8 JSON (pretty = indent 2). Dict key non-string (int) diubah ke string seperti stdlib."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, default=default, option=option)
+    if pretty:
+        return json.dumps(obj, default=default, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, default=default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None, pretty: bool = False) -> str:
+    return dumps_bytes(obj, default=default, pretty=pretty).decode("utf-8")
+
+
+def load(f: IO) -> Any:
+    """Baca file JSON yang sudah dibuka (mode teks atau biner)."""
+    return loads(f.read())
+
+
+def dump(obj: Any, f: IO, default: Optional[Callable[[Any], Any]] = None, pretty: bool = False):
+    """Tulis JSON compact ke file yang sudah dibuka (mode teks atau biner)."""
+    data = dumps_bytes(obj, default=default, pretty=pretty)
+    if "b" in getattr(f, "mode", "w"):
+        f.write(data)
+    else:
+        f.write(data.decode("utf-8"))
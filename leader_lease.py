@@ -0,0 +1,226 @@
+"""
+Leader Lease - leader election per poller dengan lease di file SQLite bersama
+Beberapa replica bot bisa jalan bersamaan tanpa double-polling: tiap background loop punya lease
+(nama loop) yang dipegang satu replica. Pemegang memperbarui lease tiap ttl/3 detik; kalau replica
+mati, lease kedaluwarsa setelah `ttl` detik dan replica standby mengambil alih.
+  - hot standby : semua replica bersaing untuk semua loop, yang pertama menang
+  - split       : `preferred` = loop yang diutamakan replica ini; loop lain hanya diambil sebagai
+                  standby setelah lease kosong lebih dari `standby_delay` detik
+Token (fencing) naik setiap kali lease pindah tangan. holds() hanya melihat batas waktu lokal (murah, untuk
+gate tick); verify() juga mencocokkan holder + token di database, dipakai tepat sebelum side effect (kirim
+notifikasi, swap) karena iterasi yang memblok event loop bisa melewati ttl tanpa sempat renew.
+"""
+
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    token INTEGER NOT NULL DEFAULT 1
+)
+"""
+
+
+class LeaseStore:
+    """Tabel lease di SQLite. Semua operasi atomik lewat BEGIN IMMEDIATE (write lock file)."""
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()  # renew jalan di thread (asyncio.to_thread), release di event loop
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def acquire(self, name: str, holder: str, ttl: float, vacant_for: float = 0.0) -> Optional[int]:
+        """Ambil / perpanjang lease. Return token kalau `holder` memegang lease, None kalau dipegang replica lain.
+
+        vacant_for: lease milik replica lain baru boleh diambil kalau sudah kedaluwarsa selama ini (detik).
+        """
+        with self._lock:
+            return self._acquire(name, holder, ttl, vacant_for)
+
+    def _acquire(self, name: str, holder: str, ttl: float, vacant_for: float) -> Optional[int]:
+        now = time.time()
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT holder, expires_at, token FROM leases WHERE name = ?", (name,)).fetchone()
+            if row is None and vacant_for > 0:
+                # Lease belum pernah ada: catat kosong mulai sekarang, beri kesempatan replica preferred dulu
+                token = None
+                conn.execute("INSERT INTO leases (name, holder, expires_at, token) VALUES (?, '', ?, 0)", (name, now))
+            elif row is None:
+                token = 1
+                conn.execute("INSERT INTO leases (name, holder, expires_at, token) VALUES (?, ?, ?, ?)",
+                             (name, holder, now + ttl, token))
+            elif row[0] == holder:
+                token = row[2]
+                conn.execute("UPDATE leases SET expires_at = ? WHERE name = ?", (now + ttl, name))
+            elif row[1] + vacant_for <= now:
+                token = row[2] + 1
+                conn.execute("UPDATE leases SET holder = ?, expires_at = ?, token = ? WHERE name = ?",
+                             (holder, now + ttl, token, name))
+            else:
+                token = None
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return token
+
+    def check(self, name: str, holder: str, token: int) -> bool:
+        """True kalau lease `name` di database masih milik `holder` dengan token yang sama dan belum kedaluwarsa."""
+        with self._lock:
+            row = self._conn.execute("SELECT holder, expires_at, token FROM leases WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == holder and row[2] == token and row[1] > time.time()
+
+    def release(self, names: Iterable[str], holder: str):
+        """Lepas lease (expire sekarang) supaya standby bisa langsung mengambil alih."""
+        with self._lock:
+            self._conn.executemany("UPDATE leases SET expires_at = 0 WHERE name = ? AND holder = ?",
+                                   [(name, holder) for name in names])
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name, holder, expires_at, token FROM leases ORDER BY name").fetchall()
+        return [{"name": r[0], "holder": r[1], "expires_at": r[2], "token": r[3]} for r in rows]
+
+
+class LeaseManager:
+    """Perbarui lease untuk sekumpulan nama di background; holds(name) dipakai sebagai gate loop.
+
+    on_acquire: dipanggil (name) saat replica ini baru mendapat lease, mis. untuk reload state dari disk.
+    on_lose: dipanggil (name) saat lease diambil replica lain.
+    aliases: {nama: nama lease} untuk loop yang harus selalu dipegang replica yang sama dengan loop lain
+    (berbagi state di memori), mis. notifier antrean ikut lease discovery.
+    """
+
+    def __init__(self, store: LeaseStore, holder: str, names: Iterable[str], ttl: float = 15.0,
+                 preferred: Optional[Iterable[str]] = None, standby_delay: Optional[float] = None,
+                 on_acquire: Optional[Callable[[str], None]] = None, on_lose: Optional[Callable[[str], None]] = None,
+                 aliases: Optional[Dict[str, str]] = None):
+        self.store = store
+        self.holder = holder
+        self.aliases = dict(aliases or {})
+        self.names = list(dict.fromkeys(self.aliases.get(n, n) for n in names))
+        self.ttl = ttl
+        self.preferred = {self.aliases.get(n, n) for n in preferred} if preferred else set(self.names)
+        self.standby_delay = ttl if standby_delay is None else standby_delay
+        self.on_acquire = on_acquire
+        self.on_lose = on_lose
+        self.tokens: Dict[str, int] = {}
+        self.stats = {"renewals": 0, "acquired": 0, "lost": 0, "errors": 0, "fenced": 0}
+        self._valid_until: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def renew_interval(self) -> float:
+        return self.ttl / 3
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def holds(self, name: str) -> bool:
+        """True kalau lease `name` dipegang dan belum lewat batas aman (ttl dihitung dari renew terakhir).
+        Nama di luar `names` tidak di-gate."""
+        name = self.aliases.get(name, name)
+        if name not in self.names:
+            return True
+        return time.monotonic() < self._valid_until.get(name, 0.0)
+
+    def verify(self, name: str) -> bool:
+        """Fencing check sebelum side effect: holds(name) + holder/token di database masih cocok."""
+        name = self.aliases.get(name, name)
+        if name not in self.names:
+            return True
+        token = self.tokens.get(name)
+        ok = self.holds(name) and token is not None
+        if ok:
+            try:
+                ok = self.store.check(name, self.holder, token)
+            except sqlite3.Error as e:
+                print(f"[LEASE] Fencing check for {name} failed: {e}")  # database sibuk: percaya batas lokal
+        if not ok:
+            self.stats["fenced"] += 1
+        return ok
+
+    def renew_once(self) -> Tuple[List[str], List[str]]:
+        """Satu putaran acquire/renew (blocking, sqlite). Return (lease baru didapat, lease yang lepas)."""
+        gained, lost = [], []
+        for name in self.names:
+            started = time.monotonic()
+            vacant_for = 0.0 if name in self.preferred else self.standby_delay
+            try:
+                token = self.store.acquire(name, self.holder, self.ttl, vacant_for)
+            except sqlite3.Error as e:
+                self.stats["errors"] += 1
+                print(f"[LEASE] Failed to renew {name}: {e}")
+                continue  # lease lokal tetap valid sampai _valid_until, lalu gate menutup sendiri
+            held = name in self.tokens
+            if token is None:
+                self._valid_until.pop(name, None)
+                if held:
+                    del self.tokens[name]
+                    self.stats["lost"] += 1
+                    lost.append(name)
+                continue
+            self.stats["renewals"] += 1
+            # Batas aman dihitung dari sebelum query, supaya tidak lebih lama dari lease di database
+            self._valid_until[name] = started + self.ttl - 1.0
+            if not held or self.tokens[name] != token:
+                self.tokens[name] = token
+                self.stats["acquired"] += 1
+                gained.append(name)
+        return gained, lost
+
+    async def start(self):
+        """Putaran pertama langsung (supaya loop yang start bersamaan sudah melihat lease), lalu renew di background."""
+        if self.running:
+            return
+        await self._round()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, release: bool = True):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if release and self.tokens:
+            try:
+                self.store.release(list(self.tokens), self.holder)
+            except sqlite3.Error as e:
+                print(f"[LEASE] Failed to release leases: {e}")
+        self.tokens.clear()
+        self._valid_until.clear()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            await self._round()
+
+    async def _round(self):
+        gained, lost = await asyncio.to_thread(self.renew_once)
+        for name in lost:
+            print(f"[LEASE] Lost {name} to another replica")
+            if self.on_lose is not None:
+                self.on_lose(name)
+        for name in gained:
+            print(f"[LEASE] {self.holder} now owns {name} (token {self.tokens[name]})")
+            if self.on_acquire is not None:
+                try:
+                    self.on_acquire(name)
+                except Exception as e:
+                    print(f"[LEASE] on_acquire failed for {name}: {e}")
@@ -0,0 +1,141 @@
+"""
+Loop Monitor - deteksi event-loop lag dan callback yang blocking
+Coroutine heartbeat mengukur keterlambatan loop tiap interval; thread watchdog mengambil stack
+thread event loop saat heartbeat macet lebih dari threshold, jadi pelaku blocking (requests.get,
+time.sleep, subprocess.run, json.dump sinkron) terlihat lengkap dengan lokasinya.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque
+from typing import Dict, List, Optional
+
+import metrics
+
+LOOP_LAG = metrics.REGISTRY.histogram(
+    "bot_event_loop_lag_seconds", "Event loop scheduling lag measured by the heartbeat task",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+LOOP_STALLS = metrics.REGISTRY.counter("bot_event_loop_stalls_total", "Heartbeats delayed beyond the stall threshold", ("location",))
+
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _blocking_location(stack: traceback.StackSummary) -> str:
+    """Innermost frame from this project's code (bukan stdlib/site-packages), else innermost frame."""
+    for frame in reversed(stack):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(_PROJECT_DIR) and "site-packages" not in path and path != os.path.abspath(__file__):
+            return f"{os.path.basename(path)}:{frame.lineno} {frame.name}"
+    if stack:
+        frame = stack[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    return "unknown"
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag and records the stack of callbacks that block it.
+
+    interval: jarak heartbeat (detik)
+    threshold: lag di atas ini dihitung sebagai stall dan stack-nya diambil
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.25, stack_limit: int = 15, history: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.stack_limit = stack_limit
+        self.started_at: Optional[float] = None
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self.recent: deque = deque(maxlen=history)  # stall terakhir: {ts, lag, location, stack}
+        self.offenders: Dict[str, Dict] = {}  # {location: {count, max_lag, total_lag, last_seen, stack}}
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = 0.0
+        self._pending_stack: Optional[traceback.StackSummary] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start heartbeat task + watchdog thread (call from the running event loop)."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self.started_at = time.time()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                stack, self._pending_stack = self._pending_stack, None
+                self._record_stall(lag, stack)
+            else:
+                self._pending_stack = None
+
+    def _watch(self):
+        captured_for = None
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            overdue = time.monotonic() - heartbeat - self.interval
+            if overdue < self.threshold or captured_for == heartbeat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            # Ambil stack sekali per stall; heartbeat berikutnya yang mencatat durasinya
+            self._pending_stack = traceback.extract_stack(frame, limit=self.stack_limit)
+            captured_for = heartbeat
+
+    def _record_stall(self, lag: float, stack: Optional[traceback.StackSummary]):
+        location = _blocking_location(stack) if stack else "unknown (stall shorter than watchdog tick)"
+        formatted = "".join(stack.format()) if stack else ""
+        self.stall_count += 1
+        LOOP_STALLS.inc(location=location)
+        self.recent.append({"ts": time.time(), "lag": lag, "location": location, "stack": formatted})
+        entry = self.offenders.setdefault(location, {"count": 0, "max_lag": 0.0, "total_lag": 0.0, "last_seen": 0.0, "stack": ""})
+        entry["count"] += 1
+        entry["total_lag"] += lag
+        entry["last_seen"] = time.time()
+        if lag >= entry["max_lag"]:
+            entry["max_lag"] = lag
+            entry["stack"] = formatted
+        print(f"[LOOP_LAG] Event loop blocked {lag * 1000:.0f}ms at {location}")
+
+    def worst(self, n: int = 5) -> List[Dict]:
+        """Top `n` offenders by total blocked time."""
+        items = [dict(location=loc, **data) for loc, data in self.offenders.items()]
+        items.sort(key=lambda x: x["total_lag"], reverse=True)
+        return items[:n]
+
+    def reset(self):
+        self.max_lag = 0.0
+        self.stall_count = 0
+        self.recent.clear()
+        self.offenders.clear()
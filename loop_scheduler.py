@@ -0,0 +1,172 @@
+"""
+Loop Scheduler - overrun policy, start jitter dan introspeksi untuk discord.ext.tasks loop
+tasks.loop bawaan mengejar iterasi yang terlewat secara beruntun (burst) kalau satu iterasi lebih lama
+dari interval. Layer ini menentukan jadwal iterasi berikutnya per policy:
+  coalesce - iterasi yang terlewat digabung jadi satu run langsung, lalu kembali ke interval normal
+  skip     - tick yang terlewat dibuang, run berikutnya menunggu tick grid berikutnya (fase tetap)
+  shift    - run berikutnya mulai satu interval penuh setelah run yang overrun selesai
+Opsional `gate(name) -> bool` (mis. leader lease): tick saat gate tertutup dilewati tanpa menjalankan loop.
+`current_loop` berisi nama loop yang sedang jalan (context var, ikut ke task turunan) untuk fencing side effect.
+"""
+
+import time
+import random
+import asyncio
+import functools
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from discord.ext import tasks
+
+import metrics
+
+POLICIES = ("coalesce", "skip", "shift")
+
+current_loop: ContextVar[Optional[str]] = ContextVar("current_loop", default=None)
+
+LOOP_OVERRUNS = metrics.REGISTRY.counter("bot_loop_overruns_total", "Iterations that took longer than the loop interval", ("loop",))
+LOOP_SKIPPED_TICKS = metrics.REGISTRY.counter("bot_loop_skipped_ticks_total", "Ticks dropped or merged by the overrun policy", ("loop",))
+
+
+@dataclass
+class LoopState:
+    name: str
+    loop: tasks.Loop
+    policy: str = "coalesce"
+    jitter_sec: float = 0.0
+    anchor: Optional[float] = None  # start run pertama (basis grid untuk policy skip)
+    runs: int = 0
+    overruns: int = 0
+    skipped_ticks: int = 0
+    standby_ticks: int = 0  # tick yang dilewati karena gate tertutup (replica lain pemegang lease)
+    last_start: Optional[float] = None
+    last_end: Optional[float] = None
+    last_duration: Optional[float] = None
+    last_overran: bool = False
+    next_run: Optional[float] = None
+    running: bool = False
+
+    @property
+    def interval(self) -> float:
+        return (self.loop.seconds or 0) + (self.loop.minutes or 0) * 60 + (self.loop.hours or 0) * 3600
+
+    def desired_start(self) -> Optional[float]:
+        """Earliest start for the next iteration under this policy (None = run now)."""
+        if self.last_start is None or self.interval <= 0:
+            return None
+        natural = self.last_start + self.interval
+        if self.policy == "shift" and self.last_overran:
+            return self.last_end + self.interval
+        if self.policy == "skip":
+            # Tick grid dihitung dari index, bukan waktu aktual, supaya telat bangun beberapa ms tidak membuang 1 tick
+            last_tick = round((self.last_start - self.anchor) / self.interval)
+            end_tick = -(-((self.last_end or natural) - self.anchor) // self.interval)  # ceil
+            return self.anchor + max(last_tick + 1, end_tick) * self.interval
+        return natural
+
+
+class LoopScheduler:
+    """Registry of managed tasks.loop objects."""
+
+    def __init__(self, gate: Optional[Callable[[str], bool]] = None):
+        self.loops: Dict[str, LoopState] = {}
+        self.gate = gate
+
+    def manage(self, loop: tasks.Loop, name: Optional[str] = None, policy: str = "coalesce", jitter_sec: float = 0.0) -> tasks.Loop:
+        """Wrap `loop`'s coroutine with the overrun policy + start jitter. Call before `loop.start()`."""
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overrun policy: {policy}")
+        name = name or loop.coro.__name__
+        if name in self.loops:
+            return loop
+        state = LoopState(name=name, loop=loop, policy=policy, jitter_sec=jitter_sec)
+        self.loops[name] = state
+        loop.coro = self._wrap(loop.coro, state, self)
+        return loop
+
+    def set_policy(self, name: str, policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overrun policy: {policy}")
+        if name not in self.loops:
+            raise ValueError(f"Unknown loop: {name}")
+        self.loops[name].policy = policy
+
+    def apply_overrides(self, spec: str):
+        """Parse "poll_new_tokens=skip,poll_wallet_buys=shift" (env LOOP_POLICIES)."""
+        for item in (spec or "").split(","):
+            if "=" not in item:
+                continue
+            name, policy = (x.strip() for x in item.split("=", 1))
+            try:
+                self.set_policy(name, policy)
+            except ValueError as e:
+                print(f"[WARN] LOOP_POLICIES: {e}")
+
+    @staticmethod
+    def _wrap(coro, state: LoopState, scheduler: "LoopScheduler"):
+        @functools.wraps(coro)
+        async def wrapper(*args, **kwargs):
+            if state.anchor is None and state.jitter_sec > 0:
+                # Sebar start loop berat supaya tidak jalan bersamaan setelah bot online
+                await asyncio.sleep(random.uniform(0, state.jitter_sec))
+            desired = state.desired_start()
+            now = time.time()
+            if desired is not None and desired - now > 0.05:
+                await asyncio.sleep(desired - now)
+            start = time.time()
+            if state.anchor is None:
+                state.anchor = start
+            if state.last_start is not None and state.interval > 0:
+                missed = int((start - state.last_start) // state.interval) - 1
+                if missed > 0:
+                    state.skipped_ticks += missed
+                    LOOP_SKIPPED_TICKS.inc(missed, loop=state.name)
+            state.last_start = start
+            if scheduler.gate is not None and not scheduler.gate(state.name):
+                # Standby: jaga fase tick tanpa menjalankan loop, siap ambil alih di tick berikutnya
+                state.standby_ticks += 1
+                state.last_end = start
+                state.last_overran = False
+                state.next_run = state.desired_start()
+                return None
+            state.running = True
+            loop_token = current_loop.set(state.name)
+            try:
+                return await coro(*args, **kwargs)
+            finally:
+                current_loop.reset(loop_token)
+                end = time.time()
+                state.running = False
+                state.runs += 1
+                state.last_end = end
+                state.last_duration = end - start
+                state.last_overran = state.interval > 0 and state.last_duration > state.interval
+                if state.last_overran:
+                    state.overruns += 1
+                    LOOP_OVERRUNS.inc(loop=state.name)
+                    print(f"[LOOP] {state.name} overran: {state.last_duration:.1f}s > {state.interval:g}s interval ({state.policy})")
+                desired = state.desired_start()
+                state.next_run = max(desired, end) if desired is not None else end
+        return wrapper
+
+    def snapshot(self) -> List[Dict]:
+        """Per-loop status for the admin command, sorted by next run."""
+        rows = []
+        for state in self.loops.values():
+            rows.append({
+                "name": state.name,
+                "policy": state.policy,
+                "interval": state.interval,
+                "jitter_sec": state.jitter_sec,
+                "active": state.loop.is_running(),
+                "running": state.running,
+                "runs": state.runs,
+                "last_duration": state.last_duration,
+                "next_run": state.next_run,
+                "overruns": state.overruns,
+                "skipped_ticks": state.skipped_ticks,
+                "standby_ticks": state.standby_ticks,
+            })
+        rows.sort(key=lambda r: r["next_run"] or float("inf"))
+        return rows
@@ -5,24 +5,47 @@ import aiohttp
 import asyncio
 import os
 import re
-import sys
 import json
 import time
 import random
 import shutil
+import logging
+import hashlib
 from collections import deque
 from discord import app_commands
 from discord.ui import Button, View
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime, timedelta, timezone
+from deadline_scheduler import DeadlineScheduler
+from futardio_feed import FutardioFeed
+from discord_dispatch import Delivery, DispatchQueue, PRIORITY_TRADING, PRIORITY_ALERT, PRIORITY_DIGEST
+from engine_ipc import EngineBridge, register_view
+import bot_logging
+import metrics
+import http_client
+import json_codec
+from loop_monitor import LoopLagMonitor
+from loop_scheduler import LoopScheduler, current_loop
+from leader_lease import LeaseManager, LeaseStore
+from price_oracle import PriceOracle
+from toptraded_delta import DeltaThresholds, DeltaTracker, TokenSnapshot
+from call_queue import CallQueue, RankingEngine
+from ttl_map import TTLMap, TTLSet
+from shared_state import SharedStateFile
+from wallet_partition import WalletPartition
+from bot_logging import get_logger
+
+# --- LOGGING ---
+# Hot path pakai logger per-subsystem (LOG_LEVEL / LOG_LEVELS env, ubah runtime via /log_level)
+bot_logging.setup_logging()
+log_bot_call = get_logger("bot_call")
+log_meteora = get_logger("meteora")
+log_wallet = get_logger("wallet")
+log_message = get_logger("message")
 
 # --- TOKEN ---
+# Dicek di blok __main__, bukan saat import: headless / benchmark tidak connect ke Discord
 TOKEN = os.getenv('DISCORD_BOT_TOKEN')
-print(f"[DEBUG] Loaded TOKEN? {'✅ Yes' if TOKEN else '❌ No'}")
-
-if not TOKEN:
-    print("❌ ERROR: DISCORD_BOT_TOKEN environment variable not set!")
-    exit(1)
 
 # --- HELIUS RPC CONFIG ---
 HELIUS_API_KEY = os.getenv('HELIUS_API_KEY')
@@ -49,18 +72,95 @@ print("[DEBUG] Discord intents sudah diaktifkan")
 
 bot = commands.Bot(command_prefix='!', intents=intents)
 
+# --- OUTBOUND NOTIFICATION QUEUE ---
+# Poller enqueue notifikasi lalu lanjut; worker kirim dengan priority + rate budget per channel
+DISPATCH_RATE_LIMIT = int(os.getenv("DISPATCH_RATE_LIMIT", "5"))  # Max message per channel per window
+DISPATCH_RATE_WINDOW_SEC = float(os.getenv("DISPATCH_RATE_WINDOW", "5"))
+DISPATCH_MAX_RETRIES = int(os.getenv("DISPATCH_MAX_RETRIES", "3"))  # Retry error sementara (5xx / 429 / timeout)
+NOTIFY_RETRY_DELAY_SEC = float(os.getenv("NOTIFY_RETRY_DELAY_SEC", "120"))  # Reminder yang gagal terkirim dijadwalkan ulang
+dispatch_queue = DispatchQueue(rate_limit=DISPATCH_RATE_LIMIT, rate_window=DISPATCH_RATE_WINDOW_SEC,
+                               max_retries=DISPATCH_MAX_RETRIES)
+# Optional: incoming webhook per channel untuk notifikasi volume tinggi (bucket rate-limit terpisah dari bot token,
+# jadi tidak bersaing dengan respon slash command). Kosongkan untuk kirim lewat bot seperti biasa.
+BOT_CALL_WEBHOOK_URL = os.getenv("BOT_CALL_WEBHOOK_URL", "").strip()
+DAMM_WEBHOOK_URL = os.getenv("DAMM_WEBHOOK_URL", "").strip()
+ICO_WEBHOOK_URL = os.getenv("ICO_WEBHOOK_URL", "").strip()
+TRADING_WEBHOOK_URL = os.getenv("TRADING_WEBHOOK_URL", "").strip()
+
+# --- METRICS ENDPOINT ---
+# Prometheus text format di http://METRICS_HOST:METRICS_PORT/metrics (default hanya localhost)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1").strip()
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+metrics_runner = None
+
+# --- EVENT LOOP LAG MONITOR ---
+# Heartbeat tiap interval; kalau loop macet > threshold, stack callback yang blocking dicatat (/loop_lag)
+LOOP_LAG_MONITOR_ENABLED = os.getenv("LOOP_LAG_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_LAG_INTERVAL_SEC = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))
+LOOP_LAG_THRESHOLD_SEC = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "250")) / 1000
+loop_lag_monitor = LoopLagMonitor(interval=LOOP_LAG_INTERVAL_SEC, threshold=LOOP_LAG_THRESHOLD_SEC)
+
+# Engine split: "local" = semua poller jalan di proses ini; "gateway" = proses ini cuma Discord I/O + command,
+# poller jalan di worker terpisah (python headless.py --gateway $ENGINE_IPC_SOCKET), lihat engine_ipc.py
+ENGINE_MODE = os.getenv("ENGINE_MODE", "local").strip().lower()
+ENGINE_IPC_SOCKET = os.getenv("ENGINE_IPC_SOCKET", "/tmp/metina-engine.sock").strip()
+engine_link = None  # EngineBridge (gateway) atau EngineClient (worker)
+# Identitas worker (partisi wallet): harus stabil antar restart supaya wallet tidak pindah worker dan cursor
+# wallet_cursors/<id>.json tidak yatim. Wajib diisi untuk worker "-e wallets" (headless.py --gateway).
+WORKER_ID = os.getenv("WORKER_ID", "").strip()
+WALLET_CURSOR_DIR = os.getenv("WALLET_CURSOR_DIR", "wallet_cursors").strip()
+wallet_partition = WalletPartition(WORKER_ID or os.uname().nodename, cursor_dir=WALLET_CURSOR_DIR)
+# Holder leader lease cukup unik per proses (lease proses lama expire sendiri); default hostname-pid
+LEASE_HOLDER_ID = WORKER_ID or f"{os.uname().nodename}-{os.getpid()}"
+# Leader lease: beberapa replica berbagi file SQLite; tiap background loop hanya jalan di replica pemegang lease.
+# LEADER_PREFERRED_LOOPS kosong = hot standby (semua loop), diisi = split loop antar replica (lihat leader_lease.py)
+LEADER_LEASE_DB = os.getenv("LEADER_LEASE_DB", "").strip()
+LEADER_LEASE_TTL_SEC = float(os.getenv("LEADER_LEASE_TTL_SEC", "15"))
+LEADER_PREFERRED_LOOPS = [n.strip() for n in os.getenv("LEADER_PREFERRED_LOOPS", "").split(",") if n.strip()]
+lease_manager: Optional[LeaseManager] = None
+# Reply paste CA / wallet di on_message hanya dari satu replica (lease "message_replies"). Slash command tidak
+# di-gate: Discord hanya menerima respon pertama, replica lain gagal dengan "interaction already acknowledged".
+MESSAGE_REPLIES_LEASE = "message_replies"
+
+def lease_fence_ok(action: str = "side effect", verify: bool = True) -> bool:
+    """Fencing tepat sebelum side effect dari background loop: lease loop yang sedang jalan harus masih dipegang
+    (holder + token di database). Di luar loop (command, on_message) selalu True.
+    verify=False: cek batas lokal saja (holds, tanpa query SQLite) untuk path yang jalan di event loop."""
+    name = current_loop.get()
+    if lease_manager is None or name is None:
+        return True
+    if lease_manager.verify(name) if verify else lease_manager.holds(name):
+        return True
+    print(f"[LEASE] Skipping {action}: lease {name} expired or taken over mid-iteration")
+    return False
+
+def _publish_state_change(name: str):
+    """Beritahu proses gateway/worker lain bahwa state file `name` baru disimpan (mereka reload dari disk)."""
+    if engine_link is not None:
+        engine_link.state_changed(name)
+
+def _end_of_day(date_str: str) -> float:
+    """Timestamp tengah malam (waktu lokal) setelah tanggal "YYYY-MM-DD": expiry state dedup harian."""
+    return (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)).timestamp()
+
 # --- AIOHTTP SESSION FOR ASYNC HTTP REQUESTS ---
+# Pool koneksi bersama (limit per host, keep-alive, DNS cache, timeout default), lihat http_client.py
+http_manager = http_client.shared()
 http_session: Optional[aiohttp.ClientSession] = None
 
 # --- RATE LIMITING & CIRCUIT BREAKER ---
 # Rate limiter: max 8 requests per minute (Helius free tier biasanya 100/min, kita konservatif)
-RATE_LIMIT_REQUESTS = 8  # Max requests per window
-RATE_LIMIT_WINDOW = 60  # 60 seconds window
+HELIUS_RATE_LIMIT_PER_MIN = int(os.getenv("HELIUS_RATE_LIMIT_PER_MIN", "8"))  # Budget total, dibagi antar wallet worker
+RATE_LIMIT_REQUESTS = HELIUS_RATE_LIMIT_PER_MIN  # Max requests per window (bagian worker ini)
+RATE_LIMIT_WINDOW = 60  # 60 seconds window (diperpanjang kalau budget lebih kecil dari jumlah wallet worker)
 request_timestamps = deque()  # Track request timestamps
 circuit_breaker_active = False
 circuit_breaker_until = 0  # Timestamp when circuit breaker resets
 MIN_DELAY_BETWEEN_REQUESTS = 8  # Minimum 8 seconds between requests (conservative)
 MAX_DELAY_BETWEEN_REQUESTS = 12  # Max 12 seconds (with jitter)
+_HELIUS_DEFAULT_DELAYS = (MIN_DELAY_BETWEEN_REQUESTS, MAX_DELAY_BETWEEN_REQUESTS)
+_HELIUS_RATE_WINDOW = RATE_LIMIT_WINDOW
 
 # --- METEORA API RATE LIMITING ---
 # Rate limiter untuk Meteora API (synchronous)
@@ -76,6 +176,8 @@ METADAO_POLL_INTERVAL_MINUTES = int(os.getenv("METADAO_POLL_INTERVAL", "10"))
 DAMM_CHANNEL_ID = int(os.getenv("DAMM_V2_CHANNEL_ID", "1440565218739486881")) or None
 DAMM_CHANNEL_NAME = os.getenv("DAMM_V2_CHANNEL_NAME", "damm")
 metadao_notification_state: Dict[str, Dict[str, object]] = {}
+# Cache conditional GET (ETag / Last-Modified) + content hash supaya poll yang sepi tidak parse ulang HTML
+metadao_page_cache: Dict[str, object] = {"etag": None, "last_modified": None, "content_hash": None, "items": [], "parsed_at": 0.0}
 
 # --- THREAD AUTO-ARCHIVE CONFIG ---
 THREAD_AUTO_ARCHIVE_MINUTES = 15  # Auto-archive thread setelah 15 menit
@@ -89,6 +191,7 @@ AUTO_SCAN_OLD_THREADS_ON_STARTUP = os.getenv("AUTO_SCAN_OLD_THREADS", "false").l
 LAUNCH_TRACKER_ENABLED = os.getenv("LAUNCH_TRACKER_ENABLED", "true").lower() == "true"
 LAUNCH_TRACKER_POLL_INTERVAL_SEC = int(os.getenv("LAUNCH_TRACKER_POLL_INTERVAL", "10"))  # Poll setiap 10 detik
 LAUNCH_TRACKER_STATE_FILE = "launch_tracker_state.json"
+launch_tracker_store = SharedStateFile(LAUNCH_TRACKER_STATE_FILE)
 LAUNCH_TRACKER_CHANNEL_ID = int(os.getenv("LAUNCH_TRACKER_CHANNEL_ID", str(DAMM_CHANNEL_ID))) if DAMM_CHANNEL_ID else None  # Default ke DAMM channel
 
 # State untuk launch tracker
@@ -106,6 +209,13 @@ ICO_TRACKER_CHANNEL_ID = int(os.getenv("ICO_TRACKER_CHANNEL_ID", str(DAMM_CHANNE
 # Format: {ico_id: {name, token_symbol, end_time, target, committed, url, daily_notified_dates, hour_reminder_sent, ...}}
 ico_tracker_list: Dict[str, Dict] = {}
 
+# Deadline scheduler untuk ICO (daily / hour_warning / ended) + MetaDAO 1-hour reminder
+# Event disimpan di min-heap persistent; runner tidur sampai event terdekat jatuh tempo
+REMINDER_SCHEDULE_STATE_FILE = "reminder_schedule_state.json"
+ICO_HOUR_WARNING_LEAD_SEC = 3600  # Kirim hour warning tepat 1 jam sebelum end_time
+METADAO_REMINDER_LEAD_SEC = 3600  # Kirim MetaDAO reminder tepat 1 jam sebelum raise berakhir
+reminder_scheduler = DeadlineScheduler(REMINDER_SCHEDULE_STATE_FILE)
+
 # --- FUTARDIO / METADAO NEW ICO NOTIFIER ---
 # Notifikasi ke Discord ketika ada ICO baru dari Futardio/MetaDAO (API v0_7_launches)
 # GraphQL endpoint; call dengan POST. Kosongkan untuk disable.
@@ -113,7 +223,9 @@ FUTARDIO_LAUNCHES_API_URL = os.getenv("FUTARDIO_LAUNCHES_API_URL", "https://www.
 FUTARDIO_POLL_INTERVAL_MINUTES = int(os.getenv("FUTARDIO_POLL_INTERVAL", "10"))
 FUTARDIO_STATE_FILE = "futardio_ico_state.json"
 FUTARDIO_TOP_N_HOURLY = int(os.getenv("FUTARDIO_TOP_N_HOURLY", "3"))  # Kirim top N project (by committed) tiap jam
-futardio_known_launch_addrs: set = set()  # launch_addr yang sudah pernah dilihat (agar tidak double notif)
+FUTARDIO_KNOWN_TTL_DAYS = float(os.getenv("FUTARDIO_KNOWN_TTL_DAYS", "30"))  # Launch yang tidak listed lagi dilupakan setelah ini
+# launch_addr yang sudah pernah dilihat (agar tidak double notif); di-refresh tiap poll selama masih listed
+futardio_known_launch_addrs = TTLSet(ttl=FUTARDIO_KNOWN_TTL_DAYS * 86400, bucket_sec=3600)
 
 async def wait_for_rate_limit():
     """Wait if we're hitting rate limits, implements token bucket pattern."""
@@ -125,7 +237,7 @@ async def wait_for_rate_limit():
     if circuit_breaker_active:
         if now < circuit_breaker_until:
             wait_time = circuit_breaker_until - now
-            print(f"[RATE_LIMIT] Circuit breaker active, waiting {wait_time:.1f}s...")
+            log_wallet.info("Circuit breaker active, waiting %.1fs...", wait_time)
             await asyncio.sleep(wait_time)
             circuit_breaker_active = False
         else:
@@ -139,7 +251,7 @@ async def wait_for_rate_limit():
     if len(request_timestamps) >= RATE_LIMIT_REQUESTS:
         oldest = request_timestamps[0]
         wait_time = RATE_LIMIT_WINDOW - (now - oldest) + 1  # +1 for safety
-        print(f"[RATE_LIMIT] Rate limit reached ({len(request_timestamps)}/{RATE_LIMIT_REQUESTS}), waiting {wait_time:.1f}s...")
+        log_wallet.debug("Rate limit reached (%d/%d), waiting %.1fs...", len(request_timestamps), RATE_LIMIT_REQUESTS, wait_time)
         await asyncio.sleep(wait_time)
         # Clean again after waiting
         now = time.time()
@@ -161,6 +273,7 @@ def activate_circuit_breaker(duration: int = 300):
     global circuit_breaker_active, circuit_breaker_until
     circuit_breaker_active = True
     circuit_breaker_until = time.time() + duration
+    metrics.trip_circuit_breaker("helius")
     print(f"[CIRCUIT_BREAKER] Activated for {duration}s due to rate limiting")
 
 # --- GANTI DENGAN CHANNEL & ROLE ID KAMU ---
@@ -185,8 +298,50 @@ BOT_CALL_MAX_MARKET_CAP = float(os.getenv("BOT_CALL_MAX_MARKET_CAP", "10000000")
 BOT_CALL_MIN_FEES_SOL = float(os.getenv("BOT_CALL_MIN_FEES_SOL", "15"))  # Minimum total fees: 20 SOL (bukan USD)
 BOT_CALL_MIN_PRICE_CHANGE_1H = float(os.getenv("BOT_CALL_MIN_PRICE_CHANGE_1H", "35"))  # Minimum price change 1h: 35%
 BOT_CALL_POLL_INTERVAL_MINUTES = int(os.getenv("BOT_CALL_POLL_INTERVAL", "5"))  # Poll setiap 2 menit
+# Window Jupiter yang di-fetch bersamaan tiap cycle (endpoint/interval, urut prioritas payload saat merge):
+# toptraded / toptrending / toporganicscore dengan interval 5m, 1h, 6h, 24h
+BOT_CALL_TOPTRADED_WINDOWS = [
+    w.strip() for w in os.getenv("BOT_CALL_TOPTRADED_WINDOWS", "toptraded/1h,toptraded/5m,toptraded/6h,toptrending/1h").split(",")
+    if w.strip()
+] or ["toptraded/1h"]
+BOT_CALL_TOPTRADED_LIMIT = int(os.getenv("BOT_CALL_TOPTRADED_LIMIT", "100"))  # Token per window
+# Maks token yang di-enrich (fee provider + cek pool Meteora) per cycle; sisanya ditunda ke cycle berikutnya
+BOT_CALL_MAX_ENRICH_PER_CYCLE = int(os.getenv("BOT_CALL_MAX_ENRICH_PER_CYCLE", "40"))
+BOT_CALL_FEE_CACHE_TTL_SEC = float(os.getenv("BOT_CALL_FEE_CACHE_TTL_SEC", "900"))  # Fee 24h per mint di-cache antar cycle
+BOT_CALL_FEE_REFRESH_AHEAD = float(os.getenv("BOT_CALL_FEE_REFRESH_AHEAD", "0.75"))  # Refresh lebih awal setelah 75% TTL
+BOT_CALL_FEE_REFRESH_AHEAD_MAX = int(os.getenv("BOT_CALL_FEE_REFRESH_AHEAD_MAX", "5"))  # Maks refresh-ahead per cycle
+# Fee "calculated" (semua provider gagal / kosong, 0.3% volume) hanya di-cache sebentar: outage sesaat tidak boleh
+# menahan fee yang terlalu rendah sampai TTL penuh. 0 = tidak di-cache sama sekali
+BOT_CALL_FEE_NEGATIVE_TTL_SEC = float(os.getenv("BOT_CALL_FEE_NEGATIVE_TTL_SEC", "60"))
+bot_call_fee_cache = TTLMap(ttl=BOT_CALL_FEE_CACHE_TTL_SEC, max_size=5000)  # {mint: {timestamp, fees_sol, fees_usd, origin, native, volume}}
+BOT_CALL_SNAPSHOT_FILE = "bot_call_snapshots.json"  # Snapshot per token toptraded (delta antar cycle)
+BOT_CALL_SNAPSHOT_MAX_AGE_SEC = float(os.getenv("BOT_CALL_SNAPSHOT_MAX_AGE_SEC", "900"))  # Enrich ulang paling lambat setelah ini
+toptraded_tracker = DeltaTracker(
+    BOT_CALL_SNAPSHOT_FILE,
+    DeltaThresholds(
+        market_cap_pct=float(os.getenv("BOT_CALL_DELTA_MCAP_PCT", "10")),
+        volume_pct=float(os.getenv("BOT_CALL_DELTA_VOLUME_PCT", "15")),
+        price_change_pts=float(os.getenv("BOT_CALL_DELTA_PRICE_PTS", "5")),
+        fees_pct=float(os.getenv("BOT_CALL_DELTA_FEES_PCT", "10")),
+        bounds={
+            "market_cap": (BOT_CALL_MIN_MARKET_CAP, BOT_CALL_MAX_MARKET_CAP),
+            "price_change_1h": (BOT_CALL_MIN_PRICE_CHANGE_1H,),
+            "payload_fees_sol": (BOT_CALL_MIN_FEES_SOL,),
+        },
+    ),
+    max_age_sec=BOT_CALL_SNAPSHOT_MAX_AGE_SEC,
+    origin_max_age={"calculated": BOT_CALL_FEE_NEGATIVE_TTL_SEC},  # fee estimasi: jangan ditahan selama snapshot penuh
+)
+# Antrean kandidat bot call: discovery (poll_new_tokens) mengisi, notifier (notify_bot_call_queue) mengambil skor tertinggi
+BOT_CALL_QUEUE_FILE = "bot_call_queue.json"
+BOT_CALL_QUEUE_SIZE = int(os.getenv("BOT_CALL_QUEUE_SIZE", "20"))  # Top-K kandidat yang disimpan
+BOT_CALL_SCORE_HALF_LIFE_SEC = float(os.getenv("BOT_CALL_SCORE_HALF_LIFE_SEC", "1800"))  # Skor meluruh setengah tiap 30 menit tanpa refresh
+BOT_CALL_QUEUE_MAX_AGE_SEC = float(os.getenv("BOT_CALL_QUEUE_MAX_AGE_SEC", "3600"))  # Buang kandidat yang tidak muncul lagi selama 1 jam
+BOT_CALL_NOTIFY_INTERVAL_SEC = int(os.getenv("BOT_CALL_NOTIFY_INTERVAL_SEC", str((BOT_CALL_POLL_INTERVAL_MINUTES or 2) * 60)))  # Ritme notifikasi
+BOT_CALL_SCORE_WEIGHTS = os.getenv("BOT_CALL_SCORE_WEIGHTS", "market_cap=0.6,fees=0.4")  # Bobot scorer (market_cap, fees, momentum, windows)
 BOT_CALL_STATE_FILE = "bot_call_state.json"  # File untuk simpan state token yang sudah di-notifikasi
-bot_call_notified_tokens: Dict[str, str] = {}  # {token_address: date_notified (YYYY-MM-DD)}
+bot_call_notified_tokens = TTLMap(bucket_sec=3600)  # {token_address: date_notified (YYYY-MM-DD)}, expire tengah malam
+bot_call_pending_tokens = TTLSet(ttl=600)  # Sudah di-enqueue, menunggu hasil kirim (tidak dipilih ulang selama itu)
 JUPITER_API_KEY = os.getenv("JUPITER_API_KEY", "efd896ec-30ed-4c89-a990-32b315e13d20")  # Jupiter API key
 USE_METEORA_FOR_FEES = os.getenv("USE_METEORA_FOR_FEES", "false").lower() == "true"  # Use Meteora for volume/fees data
 USE_GMGN_FOR_FEES = os.getenv("USE_GMGN_FOR_FEES", "true").lower() == "true"  # Use GMGN CLI as fee fallback
@@ -263,8 +418,11 @@ KOL_WALLETS: List[Dict[str, object]] = []
 
 # Hype Detection State
 HYPE_TOKENS_FILE = "hype_tokens_state.json"
-hype_detected_tokens: Dict[str, Dict] = {}  # {token_address: detection_data}
-hype_traded_tokens: Dict[str, str] = {}  # {token_address: date_traded}
+hype_state_store = SharedStateFile(HYPE_TOKENS_FILE)
+HYPE_DETECTED_TTL_SEC = float(os.getenv("HYPE_DETECTED_TTL_SEC", str(7 * 86400)))  # Data deteksi disimpan 7 hari
+HYPE_DETECTED_MAX = int(os.getenv("HYPE_DETECTED_MAX", "2000"))
+hype_detected_tokens = TTLMap(ttl=HYPE_DETECTED_TTL_SEC, bucket_sec=3600, max_size=HYPE_DETECTED_MAX)  # {token_address: detection_data}
+hype_traded_tokens = TTLMap(bucket_sec=3600)  # {token_address: date_traded}, expire tengah malam
 
 def load_kol_wallets():
     """Load KOL wallet list from file."""
@@ -296,13 +454,18 @@ def save_kol_wallets():
 
 def load_hype_state():
     """Load hype detection state."""
-    global hype_detected_tokens, hype_traded_tokens
     try:
-        if os.path.exists(HYPE_TOKENS_FILE):
-            with open(HYPE_TOKENS_FILE, 'r') as f:
-                data = json.load(f)
-                hype_detected_tokens = data.get("detected", {})
-                hype_traded_tokens = data.get("traded", {})
+        data = hype_state_store.read()
+        if data is not None:
+            now = time.time()
+            hype_detected_tokens.restore({
+                addr: (info, (info.get("detected_at") or now) + HYPE_DETECTED_TTL_SEC)
+                for addr, info in (data.get("detected") or {}).items() if isinstance(info, dict)
+            })
+            hype_traded_tokens.restore({
+                addr: (date, _end_of_day(date))
+                for addr, date in (data.get("traded") or {}).items() if isinstance(date, str)
+            })
             print(f"[HYPE] Loaded state: {len(hype_detected_tokens)} detected, {len(hype_traded_tokens)} traded")
     except Exception as e:
         print(f"[ERROR] Failed to load hype state: {e}")
@@ -310,11 +473,13 @@ def load_hype_state():
 def save_hype_state():
     """Save hype detection state."""
     try:
-        with open(HYPE_TOKENS_FILE, 'w') as f:
-            json.dump({
-                "detected": hype_detected_tokens,
-                "traded": hype_traded_tokens
-            }, f, indent=4)
+        _, merged = hype_state_store.write({
+            "detected": dict(hype_detected_tokens.items()),
+            "traded": dict(hype_traded_tokens.items())
+        })
+        if merged:
+            load_hype_state()  # perubahan proses lain ikut digabung ke file
+        _publish_state_change("hype")
     except Exception as e:
         print(f"[ERROR] Failed to save hype state: {e}")
 
@@ -323,11 +488,10 @@ def load_launch_tracker_state():
     """Load launch tracker state from file."""
     global launch_tracker_tokens, launch_detected_pools
     try:
-        if os.path.exists(LAUNCH_TRACKER_STATE_FILE):
-            with open(LAUNCH_TRACKER_STATE_FILE, 'r') as f:
-                data = json.load(f)
-                launch_tracker_tokens = data.get("tokens", {})
-                launch_detected_pools = data.get("detected_pools", {})
+        data = launch_tracker_store.read()
+        if data is not None:
+            launch_tracker_tokens = data.get("tokens", {})
+            launch_detected_pools = data.get("detected_pools", {})
             print(f"[LAUNCH_TRACKER] Loaded {len(launch_tracker_tokens)} tracked token(s), {len(launch_detected_pools)} detected pool(s)")
     except Exception as e:
         print(f"[ERROR] Failed to load launch tracker state: {e}")
@@ -337,11 +501,13 @@ def load_launch_tracker_state():
 def save_launch_tracker_state():
     """Save launch tracker state to file."""
     try:
-        with open(LAUNCH_TRACKER_STATE_FILE, 'w') as f:
-            json.dump({
-                "tokens": launch_tracker_tokens,
-                "detected_pools": launch_detected_pools
-            }, f, indent=4)
+        _, merged = launch_tracker_store.write({
+            "tokens": launch_tracker_tokens,
+            "detected_pools": launch_detected_pools
+        })
+        if merged:
+            load_launch_tracker_state()  # perubahan proses lain ikut digabung ke file
+        _publish_state_change("launch_tracker")
     except Exception as e:
         print(f"[ERROR] Failed to save launch tracker state: {e}")
 
@@ -352,7 +518,7 @@ def load_ico_tracker_state():
     try:
         if os.path.exists(ICO_TRACKER_STATE_FILE):
             with open(ICO_TRACKER_STATE_FILE, 'r') as f:
-                ico_tracker_list = json.load(f)
+                ico_tracker_list = json_codec.load(f)
             print(f"[ICO_TRACKER] Loaded {len(ico_tracker_list)} tracked ICO(s)")
     except Exception as e:
         print(f"[ERROR] Failed to load ICO tracker state: {e}")
@@ -362,33 +528,42 @@ def save_ico_tracker_state():
     """Save ICO tracker state to file."""
     try:
         with open(ICO_TRACKER_STATE_FILE, 'w') as f:
-            json.dump(ico_tracker_list, f, indent=4)
+            json_codec.dump(ico_tracker_list, f)
     except Exception as e:
         print(f"[ERROR] Failed to save ICO tracker state: {e}")
 
 def load_futardio_ico_state():
     """Load known Futardio/MetaDAO launch addresses (untuk deteksi ICO baru)."""
-    global futardio_known_launch_addrs
     try:
         if os.path.exists(FUTARDIO_STATE_FILE):
             with open(FUTARDIO_STATE_FILE, "r") as f:
-                data = json.load(f)
-            futardio_known_launch_addrs = set(data.get("known_launch_addrs", []))
+                data = json_codec.load(f)
+            # File lama tanpa expires_at: expiry dihitung dari sekarang
+            default_expiry = time.time() + futardio_known_launch_addrs.ttl
+            expiries = data.get("expires_at") or {}
+            futardio_known_launch_addrs.restore({
+                addr: (True, expiries.get(addr, default_expiry)) for addr in data.get("known_launch_addrs", [])
+            })
             print(f"[FUTARDIO_ICO] Loaded {len(futardio_known_launch_addrs)} known launch(es)")
     except Exception as e:
         print(f"[ERROR] Failed to load Futardio ICO state: {e}")
-        futardio_known_launch_addrs = set()
+        futardio_known_launch_addrs.clear()
 
 def save_futardio_ico_state():
     """Save known Futardio launch addresses."""
     try:
+        snapshot = futardio_known_launch_addrs.snapshot()
         with open(FUTARDIO_STATE_FILE, "w") as f:
-            json.dump({"known_launch_addrs": list(futardio_known_launch_addrs)}, f, indent=2)
+            json_codec.dump({
+                "known_launch_addrs": list(snapshot),
+                "expires_at": {addr: expires for addr, (_, expires) in snapshot.items()},
+            }, f)
     except Exception as e:
         print(f"[ERROR] Failed to save Futardio ICO state: {e}")
 
 # Trading State
 TRADING_POSITIONS_FILE = "trading_positions.json"
+trading_positions_store = SharedStateFile(TRADING_POSITIONS_FILE, pretty=True)
 TRADING_HISTORY_FILE = "trading_history.json"
 active_positions: Dict[str, Dict] = {}  # {token_address: position_data}
 trading_history: List[Dict] = []  # History of closed trades
@@ -415,9 +590,9 @@ def load_trading_positions():
     """Load active trading positions from file."""
     global active_positions
     try:
-        if os.path.exists(TRADING_POSITIONS_FILE):
-            with open(TRADING_POSITIONS_FILE, 'r') as f:
-                active_positions = json.load(f)
+        data = trading_positions_store.read()
+        if data is not None:
+            active_positions = data
             print(f"[TRADING] Loaded {len(active_positions)} active position(s)")
     except Exception as e:
         print(f"[ERROR] Failed to load trading positions: {e}")
@@ -426,8 +601,10 @@ def load_trading_positions():
 def save_trading_positions():
     """Save active trading positions to file."""
     try:
-        with open(TRADING_POSITIONS_FILE, 'w') as f:
-            json.dump(active_positions, f, indent=4)
+        _, merged = trading_positions_store.write(active_positions)
+        if merged:
+            load_trading_positions()  # perubahan proses lain ikut digabung ke file
+        _publish_state_change("trading_positions")
     except Exception as e:
         print(f"[ERROR] Failed to save trading positions: {e}")
 
@@ -464,7 +641,7 @@ async def get_token_price(token_address: str) -> Optional[float]:
     """Get current token price in USD from Jupiter/DexScreener."""
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     try:
         # Try Jupiter Price API first
@@ -661,7 +838,7 @@ async def fetch_token_safety(token_address: str) -> Optional[Dict]:
     """Metina-compatible token safety: optional METINA_TOKEN_SAFETY_API, else Rugcheck (same as metina.id)."""
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
 
     try:
         if METINA_TOKEN_SAFETY_API:
@@ -895,7 +1072,7 @@ async def get_jupiter_quote(input_mint: str, output_mint: str, amount: int, slip
     """Get swap quote from Jupiter API."""
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     try:
         url = "https://quote-api.jup.ag/v6/quote"
@@ -935,7 +1112,7 @@ async def check_jupiter_tradeable(token_address: str, test_amount_sol: float = 0
     """
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     result = {
         "tradeable": False,
@@ -1009,8 +1186,11 @@ async def execute_jupiter_swap(quote: Dict) -> Optional[str]:
         print("[TRADING] No private key configured!")
         return None
     
+    if not lease_fence_ok("Jupiter swap"):
+        return None
+    
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     try:
         # Import solana libraries (lazy import to avoid startup errors if not installed)
@@ -1291,10 +1471,7 @@ async def send_trading_notification(title: str, description: str, color: int, po
     
     embed.set_footer(text=f"Daily P&L: {daily_pnl:+.4f} SOL | Positions: {len(active_positions)}/{TRADING_CONFIG['max_concurrent_positions']}")
     
-    try:
-        await channel.send(embed=embed)
-    except Exception as e:
-        print(f"[TRADING] Failed to send notification: {e}")
+    dispatch_queue.enqueue(channel, embed=embed, priority=PRIORITY_TRADING, label="trading")
 
 # ============================================================================
 # --- HYPE TRADING: Volume Spike + Social + KOL Detection ---
@@ -1304,7 +1481,7 @@ async def fetch_trending_tokens_dexscreener() -> List[Dict]:
     """Fetch trending/boosted tokens dari DexScreener dengan data real-time."""
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     trending_tokens = []
     
@@ -1338,7 +1515,7 @@ async def get_token_hype_data(token_address: str) -> Optional[Dict]:
     """Get detailed token data including volume, txns, social dari DexScreener."""
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     try:
         url = f"https://api.dexscreener.com/latest/dex/tokens/{token_address}"
@@ -1581,7 +1758,7 @@ async def scan_for_hype_tokens() -> List[Dict]:
     """Scan for tokens that meet hype criteria. Optimized for speed."""
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     qualifying_tokens = []
     scanned_count = 0
@@ -1697,7 +1874,7 @@ async def execute_hype_trade(hype_data: Dict) -> Tuple[bool, str]:
         
         # Mark as "traded" for today (to avoid repeated notifications)
         today = datetime.now().strftime("%Y-%m-%d")
-        hype_traded_tokens[token_address] = today
+        hype_traded_tokens.set(token_address, today, expires_at=_end_of_day(today))
         save_hype_state()
         
         # Store detection data for reference
@@ -1724,7 +1901,7 @@ async def execute_hype_trade(hype_data: Dict) -> Tuple[bool, str]:
     if success:
         # Mark as traded today
         today = datetime.now().strftime("%Y-%m-%d")
-        hype_traded_tokens[token_address] = today
+        hype_traded_tokens.set(token_address, today, expires_at=_end_of_day(today))
         save_hype_state()
         
         # Store detection data for reference
@@ -1829,25 +2006,24 @@ async def send_hype_notification(hype_data: Dict, trade_result: str = None, is_d
     
     embed.set_footer(text=f"Token: {token_address[:12]}...")
     
-    try:
-        await channel.send(embed=embed)
-    except Exception as e:
-        print(f"[HYPE] Failed to send notification: {e}")
+    dispatch_queue.enqueue(channel, embed=embed, priority=PRIORITY_ALERT, label="hype")
 
 # --- DATA STORAGE UNTUK TRACKED WALLETS (per user) ---
 TRACKED_WALLETS_FILE = 'tracked_wallets.json'
+tracked_wallets_store = SharedStateFile(TRACKED_WALLETS_FILE, pretty=True)
 tracked_wallets = {}  # {user_id: {wallet: {'alias': 'nama', 'last_sig': None}}}
 
 # --- GLOBAL DEFAULT TRACKED WALLETS (role-wide alerts) ---
 DEFAULT_WALLETS_FILE = 'default_wallets.json'
+default_wallets_store = SharedStateFile(DEFAULT_WALLETS_FILE, pretty=True)
 default_tracked_wallets: List[Dict[str, Optional[str]]] = []  # [{'wallet': str, 'alias': str, 'last_sig': Optional[str]}]
 
 def load_tracked_wallets():
     global tracked_wallets
     try:
-        if os.path.exists(TRACKED_WALLETS_FILE):
-            with open(TRACKED_WALLETS_FILE, 'r') as f:
-                tracked_wallets = json.load(f)
+        data = tracked_wallets_store.read()
+        if data is not None:
+            tracked_wallets = data
             print(f"[DEBUG] Loaded {len(tracked_wallets)} users' tracked wallets")
     except Exception as e:
         print(f"[ERROR] Failed to load tracked wallets: {e}")
@@ -1855,9 +2031,11 @@ def load_tracked_wallets():
 
 def save_tracked_wallets():
     try:
-        with open(TRACKED_WALLETS_FILE, 'w') as f:
-            json.dump(tracked_wallets, f, indent=4)
+        _, merged = tracked_wallets_store.write(tracked_wallets)
+        if merged:
+            load_tracked_wallets()  # perubahan proses lain ikut digabung ke file
         print("[DEBUG] Saved tracked wallets")
+        _publish_state_change("tracked_wallets")
     except Exception as e:
         print(f"[ERROR] Failed to save tracked wallets: {e}")
 
@@ -1865,21 +2043,20 @@ def load_default_wallets():
     """Load global default tracked wallets list (for role-wide notifications)."""
     global default_tracked_wallets
     try:
-        if os.path.exists(DEFAULT_WALLETS_FILE):
-            with open(DEFAULT_WALLETS_FILE, 'r') as f:
-                data = json.load(f)
-                # normalize structure
-                normalized = []
-                for item in data:
-                    if not isinstance(item, dict):
-                        continue
-                    wallet = item.get('wallet')
-                    alias = item.get('alias') or (wallet[:8] + '...') if wallet else None
-                    last_sig = item.get('last_sig') if isinstance(item.get('last_sig'), str) else None
-                    # Validate wallet format directly to avoid early dependency issues
-                    if wallet and re.fullmatch(r'[1-9A-HJ-NP-Za-km-z]{32,44}', wallet):
-                        normalized.append({'wallet': wallet, 'alias': alias, 'last_sig': last_sig})
-                default_tracked_wallets = normalized
+        data = default_wallets_store.read()
+        if data is not None:
+            # normalize structure
+            normalized = []
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                wallet = item.get('wallet')
+                alias = item.get('alias') or (wallet[:8] + '...') if wallet else None
+                last_sig = item.get('last_sig') if isinstance(item.get('last_sig'), str) else None
+                # Validate wallet format directly to avoid early dependency issues
+                if wallet and re.fullmatch(r'[1-9A-HJ-NP-Za-km-z]{32,44}', wallet):
+                    normalized.append({'wallet': wallet, 'alias': alias, 'last_sig': last_sig})
+            default_tracked_wallets = normalized
             print(f"[DEBUG] Loaded {len(default_tracked_wallets)} default wallets")
         else:
             default_tracked_wallets = []
@@ -1891,9 +2068,12 @@ def load_default_wallets():
 def save_default_wallets():
     """Persist global default tracked wallets list."""
     try:
-        with open(DEFAULT_WALLETS_FILE, 'w') as f:
-            json.dump(default_tracked_wallets, f, indent=4)
+        # List: tidak bisa digabung per key, perubahan proses lain ditimpa (dengan peringatan [STATE])
+        _, merged = default_wallets_store.write(default_tracked_wallets)
+        if merged:
+            load_default_wallets()
         print("[DEBUG] Saved default wallets")
+        _publish_state_change("default_wallets")
     except Exception as e:
         print(f"[ERROR] Failed to save default wallets: {e}")
 
@@ -1903,7 +2083,7 @@ def load_metadao_state():
     try:
         if os.path.exists(METADAO_STATE_FILE):
             with open(METADAO_STATE_FILE, "r") as f:
-                data = json.load(f)
+                data = json_codec.load(f)
                 if isinstance(data, dict):
                     metadao_notification_state = data
                     print(f"[DEBUG] Loaded MetaDAO state for {len(metadao_notification_state)} project(s)")
@@ -1915,20 +2095,19 @@ def save_metadao_state():
     """Persist MetaDAO notification state to disk."""
     try:
         with open(METADAO_STATE_FILE, "w") as f:
-            json.dump(metadao_notification_state, f, indent=4)
+            json_codec.dump(metadao_notification_state, f)
         print("[DEBUG] Saved MetaDAO notification state")
     except Exception as e:
         print(f"[ERROR] Failed to save MetaDAO notification state: {e}")
 
 def load_bot_call_state():
     """Load persisted bot call notification state and cleanup old dates."""
-    global bot_call_notified_tokens
     try:
         today = datetime.now().strftime("%Y-%m-%d")
         
         if os.path.exists(BOT_CALL_STATE_FILE):
             with open(BOT_CALL_STATE_FILE, "r") as f:
-                data = json.load(f)
+                data = json_codec.load(f)
                 if isinstance(data, dict):
                     # Migrate old timestamp format to date format if needed
                     cleaned_data = {}
@@ -1944,25 +2123,54 @@ def load_bot_call_state():
                             if value == today:
                                 cleaned_data[addr] = value
                     
-                    bot_call_notified_tokens = cleaned_data
+                    bot_call_notified_tokens.restore({addr: (date, _end_of_day(date)) for addr, date in cleaned_data.items()})
                     print(f"[DEBUG] Loaded bot call state for {len(bot_call_notified_tokens)} token(s) (today: {today})")
                     
                     # Save cleaned data if we removed old entries
                     if len(cleaned_data) != len(data):
                         save_bot_call_state()
                 else:
-                    bot_call_notified_tokens = {}
+                    bot_call_notified_tokens.clear()
         else:
-            bot_call_notified_tokens = {}
+            bot_call_notified_tokens.clear()
     except Exception as e:
         print(f"[ERROR] Failed to load bot call state: {e}")
-        bot_call_notified_tokens = {}
+        bot_call_notified_tokens.clear()
+
+def _log_toptraded_event(event):
+    """Subscriber default DeltaTracker: transisi kriteria di INFO, masuk/keluar list di DEBUG."""
+    snap = event.snapshot
+    if event.kind in ("qualified", "disqualified", "pool_ready"):
+        log_bot_call.info("[DELTA] %s %s (%s...): mcap=%s fees=%.2f SOL price1h=%s pool=%s",
+                          event.kind, event.symbol, event.mint[:8], snap.market_cap, snap.fees_sol,
+                          snap.price_change_1h, snap.pool_status)
+    else:
+        log_bot_call.debug("[DELTA] %s %s (%s...)", event.kind, event.symbol, event.mint[:8])
+
+toptraded_tracker.subscribe(_log_toptraded_event)
+
+# Ranking kandidat bot call: skor default = 60% market cap (per 1jt USD) + 40% fees (per 100 SOL)
+bot_call_ranking = RankingEngine()
+bot_call_ranking.register("market_cap", lambda t: (t.get("market_cap") or 0) / 1_000_000, 0.6)
+bot_call_ranking.register("fees", lambda t: (t.get("total_fees_sol") or 0) / 100, 0.4)
+bot_call_ranking.register("momentum", lambda t: (t.get("price_change_1h") or 0) / 100)
+bot_call_ranking.register("windows", lambda t: len(t.get("windows") or ()) / max(1, len(BOT_CALL_TOPTRADED_WINDOWS)))
+bot_call_ranking.apply_weights(BOT_CALL_SCORE_WEIGHTS)
+bot_call_queue = CallQueue(BOT_CALL_QUEUE_FILE, capacity=BOT_CALL_QUEUE_SIZE,
+                           half_life_sec=BOT_CALL_SCORE_HALF_LIFE_SEC, max_age_sec=BOT_CALL_QUEUE_MAX_AGE_SEC)
+
+def _drop_queued_bot_call(event):
+    """Token yang keluar dari kriteria / list toptraded tidak layak di-call lagi dari antrean."""
+    if event.kind in ("disqualified", "exited") and bot_call_queue.discard(event.mint):
+        log_bot_call.debug("Queue: %s (%s...) dibuang (%s)", event.symbol, event.mint[:8], event.kind)
+
+toptraded_tracker.subscribe(_drop_queued_bot_call)
 
 def save_bot_call_state():
     """Persist bot call notification state to disk."""
     try:
         with open(BOT_CALL_STATE_FILE, "w") as f:
-            json.dump(bot_call_notified_tokens, f, indent=4)
+            json_codec.dump(dict(bot_call_notified_tokens.items()), f)
         print("[DEBUG] Saved bot call state")
     except Exception as e:
         print(f"[ERROR] Failed to save bot call state: {e}")
@@ -1972,6 +2180,9 @@ load_tracked_wallets()
 load_default_wallets()
 load_metadao_state()
 load_bot_call_state()
+toptraded_tracker.load()
+bot_call_queue.load()
+reminder_scheduler.load()
 
 # --- HELPER: CEK VALID SOLANA WALLET ADDRESS ---
 def is_valid_solana_wallet(addr: str):
@@ -1980,7 +2191,8 @@ def is_valid_solana_wallet(addr: str):
 # --- HELPER CONSTS & UTILITIES ---
 SOL_MINT = "So11111111111111111111111111111111111111112"
 TOKEN_METADATA_TTL = 300  # seconds
-token_metadata_cache: Dict[str, Dict[str, object]] = {}
+TOKEN_METADATA_CACHE_MAX = int(os.getenv("TOKEN_METADATA_CACHE_MAX", "5000"))
+token_metadata_cache = TTLMap(ttl=TOKEN_METADATA_TTL, max_size=TOKEN_METADATA_CACHE_MAX)  # {mint: metadata}
 
 def _parse_amount(value):
     """Convert various Helius amount representations to float (preserve sign)."""
@@ -2076,15 +2288,16 @@ def _format_usd(value: Optional[float]) -> str:
 
 async def fetch_token_metadata(mint: str) -> Dict[str, Optional[object]]:
     """Fetch token metadata (name, symbol, market cap) with simple caching."""
-    now = time.time()
     cached = token_metadata_cache.get(mint)
-    if cached and now - cached.get("timestamp", 0) < TOKEN_METADATA_TTL:
-        return cached.get("data", {})
+    if cached is not None:
+        metrics.cache_lookup("token_metadata", True)
+        return cached
+    metrics.cache_lookup("token_metadata", False)
 
     metadata = {"name": None, "symbol": None, "market_cap": None}
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     try:
         url = f"https://api.dexscreener.com/latest/dex/tokens/{mint}"
@@ -2109,9 +2322,12 @@ async def fetch_token_metadata(mint: str) -> Dict[str, Optional[object]]:
     except Exception as e:
         print(f"[ERROR] Failed to fetch token metadata for {mint}: {e}")
 
-    token_metadata_cache[mint] = {"timestamp": now, "data": metadata}
+    token_metadata_cache[mint] = metadata
     return metadata
 
+_METADAO_JSON_DECODER = json.JSONDecoder()
+_METADAO_LEADING_WS = re.compile(r"\s*")
+
 def _extract_metadao_items(html: str) -> List[Dict[str, object]]:
     """Extract MetaDAO launch data blob from rendered HTML.
     Supports multiple parsing methods for different page structures.
@@ -2126,7 +2342,9 @@ def _extract_metadao_items(html: str) -> List[Dict[str, object]]:
         next_end = html.find('</script>', next_start)
         if next_end != -1:
             try:
-                next_data = json.loads(html[next_start:next_end])
+                # raw_decode tidak melewati whitespace di awal (newline setelah tag <script>)
+                next_start = _METADAO_LEADING_WS.match(html, next_start).end()
+                next_data, _ = _METADAO_JSON_DECODER.raw_decode(html, next_start)
                 # Try different paths where projects data might be
                 props = next_data.get("props", {}).get("pageProps", {})
                 
@@ -2160,41 +2378,18 @@ def _extract_metadao_items(html: str) -> List[Dict[str, object]]:
                 print(f"[DEBUG] MetaDAO: Failed to parse __NEXT_DATA__: {e}")
     
     # Method 2: Try direct JSON marker {"items":[
+    # raw_decode parse langsung dari offset marker dan berhenti di akhir object (tanpa loop per karakter)
     marker = '{"items":['
     start = html.find(marker)
     if start != -1:
-        depth = 0
-        in_string = False
-        escape = False
-        end = None
-        for idx in range(start, len(html)):
-            ch = html[idx]
-            if in_string:
-                if ch == '"' and not escape:
-                    in_string = False
-                escape = (ch == '\\' and not escape)
-                continue
-            if ch == '"':
-                in_string = True
-                escape = False
-                continue
-            if ch == '{':
-                depth += 1
-            elif ch == '}':
-                depth -= 1
-                if depth == 0:
-                    end = idx + 1
-                    break
-        if end is not None:
-            payload = html[start:end]
-            try:
-                data = json.loads(payload)
-                result = data.get("items", [])
-                if isinstance(result, list) and result:
-                    print(f"[DEBUG] MetaDAO: Found {len(result)} items via direct marker")
-                    return result
-            except json.JSONDecodeError as e:
-                print(f"[DEBUG] MetaDAO: Failed to decode direct payload: {e}")
+        try:
+            data, _ = _METADAO_JSON_DECODER.raw_decode(html, start)
+            result = data.get("items", [])
+            if isinstance(result, list) and result:
+                print(f"[DEBUG] MetaDAO: Found {len(result)} items via direct marker")
+                return result
+        except json.JSONDecodeError as e:
+            print(f"[DEBUG] MetaDAO: Failed to decode direct payload: {e}")
     
     # Method 3: Try to find any JSON array with project-like data
     # Look for patterns like "fundraise" or "timeRemaining" in JSON
@@ -2205,28 +2400,16 @@ def _extract_metadao_items(html: str) -> List[Dict[str, object]]:
             # Look backwards for array start
             array_start = html.rfind('[', max(0, idx - 5000), idx)
             if array_start != -1:
-                # Find matching end
-                depth = 0
-                end = None
-                for i in range(array_start, min(len(html), array_start + 50000)):
-                    if html[i] == '[':
-                        depth += 1
-                    elif html[i] == ']':
-                        depth -= 1
-                        if depth == 0:
-                            end = i + 1
-                            break
-                if end:
-                    try:
-                        data = json.loads(html[array_start:end])
-                        if isinstance(data, list) and len(data) > 0:
-                            # Check if it looks like project data
-                            first = data[0]
-                            if isinstance(first, dict) and any(k in first for k in ["name", "id", "timeRemaining", "organizationSlug"]):
-                                print(f"[DEBUG] MetaDAO: Found {len(data)} items via pattern search")
-                                return data
-                    except json.JSONDecodeError:
-                        pass
+                try:
+                    data, _ = _METADAO_JSON_DECODER.raw_decode(html, array_start)
+                    if isinstance(data, list) and len(data) > 0:
+                        # Check if it looks like project data
+                        first = data[0]
+                        if isinstance(first, dict) and any(k in first for k in ["name", "id", "timeRemaining", "organizationSlug"]):
+                            print(f"[DEBUG] MetaDAO: Found {len(data)} items via pattern search")
+                            return data
+                except json.JSONDecodeError:
+                    pass
             break  # Only try the first pattern found
     
     print(f"[DEBUG] MetaDAO: No items found in HTML (length: {len(html)})")
@@ -2258,7 +2441,7 @@ async def fetch_metadao_launches(max_retries: int = 3) -> List[Dict[str, object]
     """Fetch active MetaDAO launches with remaining time."""
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     # Headers untuk menghindari rate limiting (seperti browser biasa)
     headers = {
@@ -2275,7 +2458,14 @@ async def fetch_metadao_launches(max_retries: int = 3) -> List[Dict[str, object]
         "Upgrade-Insecure-Requests": "1",
     }
     
+    # Conditional request: server boleh balas 304 kalau halaman belum berubah
+    if metadao_page_cache.get("etag"):
+        headers["If-None-Match"] = metadao_page_cache["etag"]
+    if metadao_page_cache.get("last_modified"):
+        headers["If-Modified-Since"] = metadao_page_cache["last_modified"]
+    
     html = None
+    unchanged = False
     
     # Retry logic dengan exponential backoff
     for attempt in range(max_retries):
@@ -2286,6 +2476,10 @@ async def fetch_metadao_launches(max_retries: int = 3) -> List[Dict[str, object]
                 timeout=aiohttp.ClientTimeout(total=30)
             ) as response:
                 
+                if response.status == 304:
+                    unchanged = True
+                    break
+                
                 # Handle rate limiting (429)
                 if response.status == 429:
                     retry_after = int(response.headers.get('Retry-After', 60))
@@ -2295,7 +2489,15 @@ async def fetch_metadao_launches(max_retries: int = 3) -> List[Dict[str, object]
                     continue
                 
                 response.raise_for_status()
-                html = await response.text()
+                body = await response.read()
+                metadao_page_cache["etag"] = response.headers.get("ETag")
+                metadao_page_cache["last_modified"] = response.headers.get("Last-Modified")
+                content_hash = hashlib.sha1(body).hexdigest()
+                if content_hash == metadao_page_cache.get("content_hash"):
+                    unchanged = True
+                else:
+                    metadao_page_cache["content_hash"] = content_hash
+                    html = await response.text()
                 break  # Success, exit retry loop
                 
         except aiohttp.ClientResponseError as e:
@@ -2318,11 +2520,22 @@ async def fetch_metadao_launches(max_retries: int = 3) -> List[Dict[str, object]
             print(f"[ERROR] Failed to fetch MetaDAO projects: {e}")
             return []
     
-    if not html:
+    if unchanged or html:
+        metrics.cache_lookup("metadao_page", unchanged)
+    if unchanged:
+        # Halaman sama seperti poll sebelumnya -> pakai hasil parse yang sudah ada
+        items = metadao_page_cache["items"]
+        parsed_at = metadao_page_cache["parsed_at"]
+        print(f"[METADAO] Projects page unchanged - reusing {len(items)} parsed item(s)")
+    elif not html:
         print(f"[ERROR] Failed to fetch MetaDAO HTML after {max_retries} attempts")
         return []
+    else:
+        items = _extract_metadao_items(html)
+        parsed_at = time.time()
+        metadao_page_cache["items"] = items
+        metadao_page_cache["parsed_at"] = parsed_at
 
-    items = _extract_metadao_items(html)
     active_launches = []
     now_ts = time.time()
     for item in items:
@@ -2330,7 +2543,11 @@ async def fetch_metadao_launches(max_retries: int = 3) -> List[Dict[str, object]
         total_seconds = remaining.get("total") if isinstance(remaining, dict) else None
         if not isinstance(total_seconds, (int, float)) or total_seconds <= 0:
             continue
-        end_ts = now_ts + total_seconds
+        # timeRemaining relatif terhadap saat halaman di-parse, bukan saat poll ini
+        end_ts = parsed_at + total_seconds
+        total_seconds = end_ts - now_ts
+        if total_seconds <= 0:
+            continue
         launch = {
             "id": item.get("id"),
             "name": item.get("name"),
@@ -2359,6 +2576,14 @@ def _find_damm_channel() -> Optional[discord.TextChannel]:
                     return channel  # type: ignore[return-value]
     return None
 
+def _delivery_text(delivered: Optional[bool], what: str) -> str:
+    """Pesan hasil Delivery.wait() untuk command test/manual."""
+    if delivered:
+        return f"✅ {what} terkirim"
+    if delivered is False:
+        return f"❌ {what} gagal dikirim (lihat log [DISPATCH])"
+    return f"⏳ {what} masih di antrean dispatch"
+
 def _metadao_state_for(project_id: str) -> Dict[str, object]:
     state = metadao_notification_state.get(project_id)
     if not isinstance(state, dict):
@@ -2381,7 +2606,8 @@ def _metadao_admin_check(interaction: discord.Interaction) -> bool:
         return True
     raise app_commands.CheckFailure("Kamu butuh izin Manage Server untuk pakai command ini.")
 
-async def _send_metadao_embed(channel: discord.TextChannel, launch: Dict[str, object], *, reminder: bool):
+async def _send_metadao_embed(channel: discord.TextChannel, launch: Dict[str, object], *, reminder: bool,
+                              on_delivered=None, on_failed=None):
     title = "🚀 New MetaDAO Raise Live" if not reminder else "⏰ MetaDAO Raise Ending Soon"
     end_dt = datetime.fromtimestamp(launch["end_ts"])
     time_left_minutes = max(0, int(launch["time_remaining"] // 60))
@@ -2405,7 +2631,8 @@ async def _send_metadao_embed(channel: discord.TextChannel, launch: Dict[str, ob
     target = _format_usd_short(launch.get("target"))
     embed.add_field(name="Raised", value=f"{committed} / {target}", inline=False)
     embed.add_field(name="MetaDAO", value=f"[Open Raise]({launch.get('buy_url')})", inline=False)
-    await channel.send(embed=embed)
+    dispatch_queue.enqueue(channel, embed=embed, priority=PRIORITY_DIGEST, label="metadao",
+                           on_delivered=on_delivered, on_failed=on_failed)
 
 # --- Futardio/MetaDAO NEW ICO notifier (GraphQL v0_7_launches) ---
 # Endpoint https://www.futard.io/api/graphql: read-only query biasanya tidak diproteksi auth;
@@ -2445,7 +2672,7 @@ async def fetch_futardio_v07_launches() -> List[Dict]:
         return []
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     headers = {
         "Content-Type": "application/json",
         "User-Agent": "Mozilla/5.0 (compatible; MetinaBot/1.0)",
@@ -2533,7 +2760,7 @@ async def _send_futardio_new_ico_embed(channel: discord.TextChannel, launch: Dic
     if image_url:
         embed.set_thumbnail(url=image_url)
     embed.set_footer(text=f"Futardio/MetaDAO | {launch_addr[:8]}...")
-    await channel.send(embed=embed)
+    dispatch_queue.enqueue(channel, embed=embed, priority=PRIORITY_ALERT, label="futardio_new_ico")
 
 def _futardio_raise_closes_at(launch: Dict) -> Tuple[Optional[float], Optional[int]]:
     """Return (end_ts, seconds_remaining). None if invalid."""
@@ -2570,7 +2797,8 @@ def _format_raise_closes(launch: Dict) -> str:
     end_dt_wib = end_dt_utc.astimezone(WIB)
     return f"Raise closes in **{closes_in}** (jam **{end_dt_wib:%d %b %Y %H:%M} WIB**)"
 
-async def _send_futardio_top_funded_embed(channel: discord.TextChannel, launch: Dict, rank: Optional[int] = None):
+async def _send_futardio_top_funded_embed(channel: discord.TextChannel, launch: Dict, rank: Optional[int] = None,
+                                          on_delivered=None, on_failed=None):
     """Kirim embed: project dengan pendanaan terbanyak (Live), berdasarkan Raise closes. rank=1,2,3 untuk judul."""
     detail = launch.get("launch_detail") or {}
     token_info = launch.get("token") or {}
@@ -2605,9 +2833,14 @@ async def _send_futardio_top_funded_embed(channel: discord.TextChannel, launch:
     if image_url:
         embed.set_thumbnail(url=image_url)
     embed.set_footer(text=f"Futardio/MetaDAO | hourly top funded{rank_str}")
-    await channel.send(embed=embed)
+    dispatch_queue.enqueue(channel, embed=embed, priority=PRIORITY_DIGEST, label="futardio_top_funded",
+                           on_delivered=on_delivered, on_failed=on_failed)
+
+# Satu snapshot bersama untuk new-ICO notifier + top-funded ranking (fetch maksimal 1x per interval)
+futardio_feed = FutardioFeed(fetch_futardio_v07_launches, FUTARDIO_POLL_INTERVAL_MINUTES * 60)
 
 @tasks.loop(hours=3)
+@metrics.timed_loop("poll_futardio_top_funded_hourly")
 async def poll_futardio_top_funded_hourly():
     """Setiap 1 jam: notif top N project yang paling banyak difund (Live), berdasarkan Raise closes."""
     if not FUTARDIO_LAUNCHES_API_URL:
@@ -2618,13 +2851,10 @@ async def poll_futardio_top_funded_hourly():
     channel = bot.get_channel(channel_id)
     if not channel:
         return
-    launches = await fetch_futardio_v07_launches()
-    live = [l for l in launches if (l.get("state") or "").strip() == "Live"]
-    if not live:
+    # Urutkan dari yang paling banyak difund, ambil top N (dari snapshot feed, tanpa fetch ulang kalau masih fresh)
+    top_n = await futardio_feed.top_funded(FUTARDIO_TOP_N_HOURLY)
+    if not top_n:
         return
-    # Urutkan dari yang paling banyak difund, ambil top N
-    sorted_live = sorted(live, key=lambda l: (l.get("total_committed_amount") or 0), reverse=True)
-    top_n = sorted_live[: max(1, FUTARDIO_TOP_N_HOURLY)]
     for i, launch in enumerate(top_n, start=1):
         try:
             await _send_futardio_top_funded_embed(channel, launch, rank=i)
@@ -2638,9 +2868,9 @@ async def before_poll_futardio_top_funded_hourly():
     await bot.wait_until_ready()
 
 @tasks.loop(minutes=FUTARDIO_POLL_INTERVAL_MINUTES)
+@metrics.timed_loop("poll_futardio_new_icos")
 async def poll_futardio_new_icos():
     """Poll Futardio/MetaDAO API; kirim notifikasi ke Discord untuk ICO baru (state Live)."""
-    global futardio_known_launch_addrs
     if not FUTARDIO_LAUNCHES_API_URL:
         return
     channel_id = ICO_TRACKER_CHANNEL_ID or DAMM_CHANNEL_ID or BOT_CALL_CHANNEL_ID
@@ -2649,23 +2879,31 @@ async def poll_futardio_new_icos():
     channel = bot.get_channel(channel_id)
     if not channel:
         return
-    launches = await fetch_futardio_v07_launches()
-    if not launches:
-        return
-    current_addrs = {str(l.get("launch_addr")) for l in launches if l.get("launch_addr")}
-    if not current_addrs:
+    delta = await futardio_feed.refresh()
+    if not futardio_feed.snapshot:
         return
+    for change in delta.changed:
+        if change["committed_delta"]:
+            title = (change["launch"].get("launch_detail") or {}).get("title") or "?"
+            print(f"[FUTARDIO_ICO] {title}: committed {_futardio_amount_usd(change['committed_delta']):+,.0f} USD")
+    if delta.removed:
+        print(f"[FUTARDIO_ICO] {len(delta.removed)} launch(es) no longer listed")
     # First run: seed known set without notifying
     if not futardio_known_launch_addrs:
-        futardio_known_launch_addrs = set(current_addrs)
+        futardio_known_launch_addrs.update(futardio_feed.snapshot)
         save_futardio_ico_state()
         print(f"[FUTARDIO_ICO] Seeded {len(futardio_known_launch_addrs)} known launch(es)")
         return
-    new_addrs = current_addrs - futardio_known_launch_addrs
-    for launch in launches:
-        addr = launch.get("launch_addr")
-        if not addr or addr not in new_addrs:
-            continue
+    # Bandingkan snapshot (bukan hanya delta.added) karena refresh bisa dipicu oleh top-funded task
+    new_launches = [l for addr, l in futardio_feed.snapshot.items() if addr not in futardio_known_launch_addrs]
+    # Launch yang masih listed di-refresh supaya tidak expire lalu terdeteksi "baru" lagi
+    futardio_known_launch_addrs.update(futardio_feed.snapshot)
+    if not new_launches:
+        save_futardio_ico_state()
+        return
+    for launch in new_launches:
+        addr = str(launch.get("launch_addr"))
+        futardio_known_launch_addrs.add(addr)
         if (launch.get("state") or "").strip() != "Live":
             continue
         try:
@@ -2673,7 +2911,6 @@ async def poll_futardio_new_icos():
             print(f"[FUTARDIO_ICO] Notified new ICO: {launch.get('launch_detail', {}).get('title')} ({addr[:8]}...)")
         except Exception as e:
             print(f"[FUTARDIO_ICO] Error sending embed: {e}")
-    futardio_known_launch_addrs |= current_addrs
     save_futardio_ico_state()
 
 @poll_futardio_new_icos.before_loop
@@ -2682,6 +2919,7 @@ async def before_poll_futardio_new_icos():
     load_futardio_ico_state()
 
 @tasks.loop(minutes=1)  # Check setiap 1 menit
+@metrics.timed_loop("auto_archive_threads")
 async def auto_archive_threads():
     """Auto-archive thread setelah 15 menit dibuat"""
     global threads_to_archive
@@ -2720,7 +2958,10 @@ async def auto_archive_threads():
     for thread_id in threads_to_remove:
         threads_to_archive.pop(thread_id, None)
 
+metadao_start_pending: set = set()  # project_id yang start notification-nya masih di dispatch queue
+
 @tasks.loop(minutes=METADAO_POLL_INTERVAL_MINUTES or 10)
+@metrics.timed_loop("poll_metadao_launches")
 async def poll_metadao_launches():
     channel = _find_damm_channel()
     if not channel:
@@ -2728,7 +2969,6 @@ async def poll_metadao_launches():
         return
     launches = await fetch_metadao_launches()
     print(f"[DEBUG] MetaDAO poll: {len(launches)} active launch(es) detected")
-    now_ts = time.time()
     active_ids = set()
     for launch in launches:
         project_id = launch["id"]
@@ -2738,22 +2978,30 @@ async def poll_metadao_launches():
         state = _metadao_state_for(project_id)
         prev_end = state.get("end_ts")
         end_changed = not isinstance(prev_end, (int, float)) or abs(prev_end - launch["end_ts"]) > 60
-        if not state.get("start_notified") or end_changed:
-            try:
-                await _send_metadao_embed(channel, launch, reminder=False)
+        if (not state.get("start_notified") or end_changed) and project_id not in metadao_start_pending:
+            def delivered(state=state, project_id=project_id):
+                metadao_start_pending.discard(project_id)
                 state["start_notified"] = True
-                state["reminder_sent"] = False
+                save_metadao_state()
                 print(f"[DEBUG] MetaDAO start notification sent for {project_id}")
-            except Exception as e:
-                print(f"[ERROR] Failed to send MetaDAO start notification: {e}")
-        # Reminder logic
-        if not state.get("reminder_sent") and launch["end_ts"] - now_ts <= 3600:
+
+            def failed(project_id=project_id):
+                metadao_start_pending.discard(project_id)  # dicoba lagi di poll berikutnya
+                print(f"[ERROR] Failed to send MetaDAO start notification for {project_id}")
+
             try:
-                await _send_metadao_embed(channel, launch, reminder=True)
-                state["reminder_sent"] = True
-                print(f"[DEBUG] MetaDAO reminder sent for {project_id}")
+                metadao_start_pending.add(project_id)
+                state["reminder_sent"] = False
+                await _send_metadao_embed(channel, launch, reminder=False, on_delivered=delivered, on_failed=failed)
             except Exception as e:
-                print(f"[ERROR] Failed to send MetaDAO reminder: {e}")
+                metadao_start_pending.discard(project_id)
+                print(f"[ERROR] Failed to send MetaDAO start notification: {e}")
+        # Reminder dikirim oleh run_reminder_scheduler tepat METADAO_REMINDER_LEAD_SEC sebelum end
+        if not state.get("reminder_sent"):
+            reminder_scheduler.schedule(
+                f"metadao:{project_id}", "reminder",
+                launch["end_ts"] - METADAO_REMINDER_LEAD_SEC, launch
+            )
         state["end_ts"] = launch["end_ts"]
         state["time_remaining"] = launch["time_remaining"]
         metadao_notification_state[project_id] = state
@@ -2761,7 +3009,9 @@ async def poll_metadao_launches():
     for project_id in list(metadao_notification_state.keys()):
         if project_id not in active_ids:
             del metadao_notification_state[project_id]
+            reminder_scheduler.cancel(f"metadao:{project_id}")
     save_metadao_state()
+    reminder_scheduler.save()
 
 # --- HELPER: FETCH VOLUME/FEES FROM METEORA ---
 def _aggregate_meteora_datapi_pool_rows(rows: list, token_address: str) -> Tuple[float, float]:
@@ -2802,10 +3052,12 @@ def _fetch_meteora_datapi_volume_fees_one_base(base_url: str, token_address: str
             "page_size": 100,
             "sort_by": "volume_24h:desc",
         }
-        response = requests.get(url, params=params, timeout=15)
+        started = time.perf_counter()
+        response = http_manager.sync_session().get(url, params=params, timeout=15)
+        metrics.observe_http(url, response.status_code, time.perf_counter() - started)
         if response.status_code != 200:
             return 0.0, 0.0
-        data = response.json()
+        data = json_codec.loads(response.content)
         rows = data.get("data") or []
         return _aggregate_meteora_datapi_pool_rows(rows, token_address)
     except Exception as e:
@@ -2830,63 +3082,48 @@ def fetch_meteora_volume_and_fees(token_address: str) -> Tuple[Optional[float],
     return volume, fees
 
 # --- HELPER: FETCH SOL PRICE ---
-async def fetch_sol_price() -> float:
-    """Fetch SOL price in USD. Try multiple sources: CoinGecko, Jupiter, then default."""
+async def _sol_price_from_coingecko() -> Optional[float]:
     global http_session
-    default_price = 125.0
-    
     if not http_session:
-        http_session = aiohttp.ClientSession()
-    
-    # Try CoinGecko first (more reliable)
-    try:
-        print(f"[DEBUG] Fetching SOL price from CoinGecko...")
-        async with http_session.get("https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd", timeout=aiohttp.ClientTimeout(total=10)) as response:
-            if response.status == 200:
-                data = await response.json()
-                if "solana" in data and "usd" in data["solana"]:
-                    price = float(data["solana"]["usd"])
-                    print(f"[INFO] SOL Price from CoinGecko: ${price:.2f}")
-                    return price
-                else:
-                    print(f"[DEBUG] CoinGecko response missing solana/usd data: {data}")
-            else:
-                print(f"[DEBUG] CoinGecko returned status {response.status}")
-    except aiohttp.ClientError as e:
-        print(f"[DEBUG] CoinGecko connection error: {type(e).__name__}: {e}")
-    except asyncio.TimeoutError:
-        print(f"[DEBUG] CoinGecko request timeout")
-    except Exception as e:
-        print(f"[DEBUG] CoinGecko price fetch failed: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    # Try Jupiter as fallback
-    try:
-        print(f"[DEBUG] Fetching SOL price from Jupiter (fallback)...")
-        price_url = "https://price.jup.ag/v4/price?ids=SOL"
-        async with http_session.get(price_url, timeout=aiohttp.ClientTimeout(total=10)) as price_resp:
-            if price_resp.status == 200:
-                price_data = await price_resp.json()
-                if "data" in price_data and "SOL" in price_data["data"]:
-                    price = float(price_data["data"]["SOL"].get("price", default_price))
-                    print(f"[INFO] SOL Price from Jupiter: ${price:.2f}")
-                    return price
-                else:
-                    print(f"[DEBUG] Jupiter response missing data/SOL: {price_data}")
-            else:
-                print(f"[DEBUG] Jupiter returned status {price_resp.status}")
-    except aiohttp.ClientError as e:
-        print(f"[DEBUG] Jupiter connection error: {type(e).__name__}: {e}")
-    except asyncio.TimeoutError:
-        print(f"[DEBUG] Jupiter request timeout")
-    except Exception as e:
-        print(f"[DEBUG] Jupiter price fetch failed: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    print(f"[WARN] Could not fetch SOL price from any source, using default ${default_price}")
-    return default_price
+        http_session = http_manager.session()
+    async with http_session.get("https://api.coingecko.com/api/v3/simple/price?ids=solana&vs_currencies=usd", timeout=aiohttp.ClientTimeout(total=10)) as response:
+        if response.status != 200:
+            print(f"[DEBUG] CoinGecko returned status {response.status}")
+            return None
+        data = await response.json()
+        if "solana" in data and "usd" in data["solana"]:
+            return float(data["solana"]["usd"])
+        print(f"[DEBUG] CoinGecko response missing solana/usd data: {data}")
+        return None
+
+async def _sol_price_from_jupiter() -> Optional[float]:
+    global http_session
+    if not http_session:
+        http_session = http_manager.session()
+    async with http_session.get("https://price.jup.ag/v4/price?ids=SOL", timeout=aiohttp.ClientTimeout(total=10)) as price_resp:
+        if price_resp.status != 200:
+            print(f"[DEBUG] Jupiter returned status {price_resp.status}")
+            return None
+        price_data = await price_resp.json()
+        if "data" in price_data and "SOL" in price_data["data"]:
+            return float(price_data["data"]["SOL"].get("price") or 0) or None
+        print(f"[DEBUG] Jupiter response missing data/SOL: {price_data}")
+        return None
+
+# SOL/USD di memori: refresh background tiap SOL_PRICE_REFRESH_SEC, CoinGecko + Jupiter di-query bersamaan
+# (jawaban valid pertama dipakai). Harga > SOL_PRICE_MAX_AGE_SEC dianggap stale dan di-refresh saat dibaca.
+SOL_PRICE_REFRESH_SEC = float(os.getenv("SOL_PRICE_REFRESH_SEC", "30"))
+SOL_PRICE_MAX_AGE_SEC = float(os.getenv("SOL_PRICE_MAX_AGE_SEC", "300"))
+sol_price_oracle = PriceOracle(
+    [("coingecko", _sol_price_from_coingecko), ("jupiter", _sol_price_from_jupiter)],
+    refresh_sec=SOL_PRICE_REFRESH_SEC,
+    max_age_sec=SOL_PRICE_MAX_AGE_SEC,
+    default=125.0,
+)
+
+async def fetch_sol_price() -> float:
+    """SOL price in USD dari cache oracle (refresh hanya kalau stale; fallback harga terakhir lalu $125)."""
+    return await sol_price_oracle.get()
 
 _JUPITER_FEE_FIELD_KEYS = frozenset(["fees", "fees24h", "fees_24h", "totalFees", "total_fees"])
 
@@ -2926,39 +3163,50 @@ def _parse_jupiter_fees_sol_from_dict(data: dict, token_symbol: str, source_labe
     return None
 
 
-async def _fetch_jupiter_token_fees_via_search(token_address: str, token_symbol: str) -> Optional[float]:
-    """tokens/v2/search by mint. Jika response tidak ada field fee → None (caller tetap pakai fee dari toptraded). Mint exact only."""
+JUPITER_SEARCH_BATCH_SIZE = 100  # tokens/v2/search terima sampai 100 mint comma-separated per query
+
+async def _fetch_jupiter_fees_via_search_batch(mints: List[str], symbols: Optional[Dict[str, str]] = None) -> Dict[str, Optional[float]]:
+    """tokens/v2/search untuk banyak mint sekaligus (comma-separated, JUPITER_SEARCH_BATCH_SIZE per request).
+    Return {mint: fee SOL}; mint tanpa field fee → None, mint yang tidak ada di response / batch gagal tidak dimasukkan
+    (caller tetap pakai fee dari toptraded). Mint exact only."""
     global http_session
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
+    symbols = symbols or {}
     url = "https://api.jup.ag/tokens/v2/search"
-    params = {"query": token_address}
     headers = {"x-api-key": JUPITER_API_KEY}
-    try:
-        async with http_session.get(
-            url, params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=12)
-        ) as response:
-            if response.status == 429:
-                print(f"[WARN] Jupiter search rate limited for {token_symbol}, skip fee refetch")
-                return None
-            if response.status != 200:
-                return None
-            data = await response.json()
-    except Exception as e:
-        print(f"[DEBUG] Jupiter search fee fetch failed for {token_symbol}: {e}")
-        return None
-    items = data if isinstance(data, list) else []
-    if not items and isinstance(data, dict):
-        items = data.get("data") or data.get("tokens") or []
-    if not isinstance(items, list):
-        return None
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-        tid = item.get("id") or item.get("address")
-        if tid == token_address:
-            return _parse_jupiter_fees_sol_from_dict(item, token_symbol, "search")
-    return None
+
+    async def fetch_chunk(chunk: List[str]) -> List[Dict]:
+        try:
+            async with http_session.get(
+                url, params={"query": ",".join(chunk)}, headers=headers, timeout=aiohttp.ClientTimeout(total=12)
+            ) as response:
+                if response.status == 429:
+                    print(f"[WARN] Jupiter search rate limited for {len(chunk)} mint(s), skip fee refetch")
+                    return []
+                if response.status != 200:
+                    return []
+                data = await response.json()
+        except Exception as e:
+            print(f"[DEBUG] Jupiter search fee fetch failed for {len(chunk)} mint(s): {e}")
+            return []
+        items = data if isinstance(data, list) else []
+        if not items and isinstance(data, dict):
+            items = data.get("data") or data.get("tokens") or []
+        return items if isinstance(items, list) else []
+
+    wanted = list(dict.fromkeys(mints))
+    chunks = [wanted[i:i + JUPITER_SEARCH_BATCH_SIZE] for i in range(0, len(wanted), JUPITER_SEARCH_BATCH_SIZE)]
+    wanted_set = set(wanted)
+    fees: Dict[str, Optional[float]] = {}
+    for items in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            tid = item.get("id") or item.get("address")
+            if tid in wanted_set and tid not in fees:
+                fees[tid] = _parse_jupiter_fees_sol_from_dict(item, symbols.get(tid, tid[:8]), "search")
+    return fees
 
 
 def _extract_first_float(value) -> Optional[float]:
@@ -3163,350 +3411,717 @@ async def fetch_gmgn_token_x_url(token_address: str, token_symbol: str) -> Optio
     return None
 
 
-# --- HELPER: FETCH NEW TOKENS FROM JUPITER API ---
-async def fetch_new_tokens() -> List[Dict[str, object]]:
-    """Fetch new tokens from Jupiter API that meet criteria."""
-    global http_session
-    
-    if not http_session:
-        http_session = aiohttp.ClientSession()
-    
+def _bot_call_fees_from(fees_sol: float, fees_usd: float, origin: str, native: str, volume: Optional[float]) -> Dict[str, object]:
+    return {"fees_sol": fees_sol, "fees_usd": fees_usd, "origin": origin, "native": native, "volume": volume}
+
+async def _resolve_bot_call_fees(token: Dict, token_address: str, token_symbol: str, volume_24h_usd: Optional[float],
+                                 sol_price_usd: float, search_fees_sol: Optional[float] = None,
+                                 fee_passes: Tuple[int, ...] = (0, 1),
+                                 provider_state: Optional[Dict[str, object]] = None) -> Optional[Dict[str, object]]:
+    """Resolve 24h fees satu token lewat provider (Meteora datapi, GMGN). Mahal: dipanggil lewat cache.
+    search_fees_sol: fee dari Jupiter search (pass 2), sudah di-fetch batch oleh fetch_new_tokens.
+    fee_passes: pass yang dijalankan; tanpa pass 2 dan belum ada fee → None (caller lanjut pass 2 nanti).
+    provider_state: dict yang diisi hasil Meteora / GMGN pass 1 dan dibaca lagi di pass 2, jadi pass 2 yang
+    dijalankan terpisah (setelah search batch) tidak query ulang provider yang sama."""
+    # Fees: 2 pass — Jupiter (toptraded lalu search, search tanpa fee → tetap toptraded); Meteora DLMM+DAMM (retry tanpa fee → tetap fee Meteora lama); lalu 0.3% volume
+    total_fees_sol = 0.0
+    total_fees_usd = 0.0
+    fee_origin = "calculated"
+    jupiter_fees_sol = None
+    meteora_fees = None
+    gmgn_fees = None
+    gmgn_fees_sol = None
+    carried = bool(provider_state)
+    if carried:
+        meteora_fees = provider_state["meteora_fees"]
+        gmgn_fees = provider_state["gmgn_fees"]
+        gmgn_fees_sol = provider_state["gmgn_fees_sol"]
+        volume_24h_usd = provider_state["volume"]
+
+    for fee_pass in fee_passes:
+        jupiter_fees_sol = _parse_jupiter_fees_sol_from_dict(token, token_symbol, "token")
+        if fee_pass == 1 and search_fees_sol is not None:
+            # Search tanpa fee di response → None: jangan timpa, tetap pakai toptraded
+            jupiter_fees_sol = search_fees_sol
+
+        # Hasil provider pass 1 dibawa dari provider_state: pass 2 cukup cek fee search, tanpa query ulang
+        query_providers = not (carried and fee_pass == 1)
+        meteora_volume = None
+        if USE_METEORA_FOR_FEES and query_providers:
+            if fee_pass == 1:
+                await asyncio.sleep(0.45)  # Jeda sebelum retry datapi Meteora (pass 2 token berurutan back-to-back)
+            meteora_volume, meteora_fees_try = await asyncio.to_thread(fetch_meteora_volume_and_fees, token_address)
+            if meteora_fees_try is not None and meteora_fees_try > 0:
+                meteora_fees = meteora_fees_try
+            if meteora_volume and meteora_volume > (volume_24h_usd or 0):
+                volume_24h_usd = meteora_volume
+
+        if jupiter_fees_sol and jupiter_fees_sol > 0:
+            total_fees_sol = jupiter_fees_sol
+            total_fees_usd = (
+                total_fees_sol * sol_price_usd if sol_price_usd and total_fees_sol > 0 else 0
+            )
+            fee_origin = "jupiter"
+            log_bot_call.debug(
+                "  %s: Using fees from Jupiter API (pass %d/2): %.4f SOL ($%.2f USD)",
+                token_symbol, fee_pass + 1, total_fees_sol, total_fees_usd
+            )
+            break
+        if USE_GMGN_FOR_FEES and query_providers:
+            if gmgn_fees_sol is None:
+                gmgn_fees_sol = await fetch_gmgn_token_fees_sol(token_address, token_symbol)
+            if gmgn_fees_sol is not None and gmgn_fees_sol > 0:
+                total_fees_sol = gmgn_fees_sol
+                total_fees_usd = (
+                    total_fees_sol * sol_price_usd if sol_price_usd and total_fees_sol > 0 else 0
+                )
+                fee_origin = "gmgn"
+                log_bot_call.debug(
+                    "  %s: Using fees from GMGN token info (pass %d/2): %.4f SOL ($%.2f USD)",
+                    token_symbol, fee_pass + 1, total_fees_sol, total_fees_usd
+                )
+                break
+
+            gmgn_volume_try, gmgn_fees_try = await fetch_gmgn_volume_and_fees(token_address, token_symbol)
+            if gmgn_fees_try is not None and gmgn_fees_try > 0:
+                gmgn_fees = gmgn_fees_try
+            if gmgn_volume_try and gmgn_volume_try > (volume_24h_usd or 0):
+                volume_24h_usd = gmgn_volume_try
+        if gmgn_fees and gmgn_fees > 0:
+            total_fees_usd = gmgn_fees
+            total_fees_sol = (
+                total_fees_usd / sol_price_usd if sol_price_usd and total_fees_usd > 0 else 0
+            )
+            fee_origin = "gmgn"
+            log_bot_call.debug(
+                "  %s: Using fees from GMGN fallback (pass %d/2): %.4f SOL ($%.2f USD)",
+                token_symbol, fee_pass + 1, total_fees_sol, total_fees_usd
+            )
+            break
+        if meteora_fees and meteora_fees > 0:
+            total_fees_usd = meteora_fees
+            total_fees_sol = (
+                total_fees_usd / sol_price_usd if sol_price_usd and total_fees_usd > 0 else 0
+            )
+            fee_origin = "meteora"
+            log_bot_call.debug(
+                "  %s: Using fees from Meteora (pass %d/2): %.4f SOL ($%.2f USD)",
+                token_symbol, fee_pass + 1, total_fees_sol, total_fees_usd
+            )
+            break
+
+    if fee_origin == "calculated" and 1 not in fee_passes:
+        if provider_state is not None:
+            provider_state.update(meteora_fees=meteora_fees, gmgn_fees=gmgn_fees, gmgn_fees_sol=gmgn_fees_sol,
+                                  volume=volume_24h_usd)
+        return None
+    if fee_origin == "calculated":
+        fee_percentage = 0.003
+        total_fees_usd = volume_24h_usd * fee_percentage if volume_24h_usd else 0
+        total_fees_sol = total_fees_usd / sol_price_usd if sol_price_usd and total_fees_usd > 0 else 0
+        log_bot_call.debug(
+            "  %s: Calculated fees from volume (0.3%%) after 2 passes: %.4f SOL ($%.2f USD)",
+            token_symbol, total_fees_sol, total_fees_usd
+        )
+
+    # Unit asli fee (SOL dari Jupiter / GMGN token info, USD dari GMGN fallback / Meteora / volume) supaya cache
+    # bisa konversi ulang dengan harga SOL terbaru
+    native = "sol" if fee_origin == "jupiter" or (fee_origin == "gmgn" and gmgn_fees_sol and gmgn_fees_sol > 0) else "usd"
+    return _bot_call_fees_from(total_fees_sol, total_fees_usd, fee_origin, native, volume_24h_usd)
+
+def _bot_call_fees_from_cache(cached: Dict[str, object], token: Dict, token_symbol: str,
+                              volume_24h_usd: Optional[float], sol_price_usd: float) -> Dict[str, object]:
+    """Hasil cache + data toptraded cycle ini (fee Jupiter di payload gratis, jadi selalu dipakai kalau ada)."""
+    volume = max(volume_24h_usd or 0, cached["volume"] or 0) or volume_24h_usd
+    jupiter_fees_sol = _parse_jupiter_fees_sol_from_dict(token, token_symbol, "token")
+    if jupiter_fees_sol and jupiter_fees_sol > 0:
+        return _bot_call_fees_from(jupiter_fees_sol, jupiter_fees_sol * sol_price_usd if sol_price_usd else 0, "jupiter", "sol", volume)
+    if cached["origin"] == "calculated":
+        fees_usd = volume * 0.003 if volume else 0
+        return _bot_call_fees_from(fees_usd / sol_price_usd if sol_price_usd and fees_usd > 0 else 0, fees_usd, "calculated", "usd", volume)
+    if cached["native"] == "sol":
+        fees_sol = cached["fees_sol"]
+        return _bot_call_fees_from(fees_sol, fees_sol * sol_price_usd if sol_price_usd else 0, cached["origin"], "sol", volume)
+    fees_usd = cached["fees_usd"]
+    return _bot_call_fees_from(fees_usd / sol_price_usd if sol_price_usd and fees_usd > 0 else 0, fees_usd, cached["origin"], "usd", volume)
+
+def _bot_call_fee_ttl(origin: str) -> float:
+    return BOT_CALL_FEE_NEGATIVE_TTL_SEC if origin == "calculated" else BOT_CALL_FEE_CACHE_TTL_SEC
+
+async def _cached_bot_call_fees(token: Dict, token_address: str, token_symbol: str, volume_24h_usd: Optional[float],
+                                sol_price_usd: float, refresh_budget: Dict[str, int], force: bool = False,
+                                search_fees_sol: Optional[float] = None,
+                                fee_passes: Tuple[int, ...] = (0, 1),
+                                provider_state: Optional[Dict[str, object]] = None) -> Optional[Dict[str, object]]:
+    """Fee per mint dengan TTL. Entry lewat BOT_CALL_FEE_REFRESH_AHEAD x TTL di-refresh lebih awal, maks
+    refresh_budget["left"] token per cycle (beban provider tersebar, tidak semua expire di cycle yang sama).
+    force: abaikan cache (token berubah berarti menurut toptraded_tracker).
+    None = fee_passes tanpa pass 2 belum menemukan fee (tidak di-cache)."""
+    now = time.time()
+    cached = None if force else bot_call_fee_cache.get(token_address)
+    age = now - cached["timestamp"] if cached else None
+    ttl = _bot_call_fee_ttl(cached["origin"]) if cached else 0
+    if cached and age < ttl:
+        refresh_ahead = age >= ttl * BOT_CALL_FEE_REFRESH_AHEAD and refresh_budget["left"] > 0
+        if not refresh_ahead:
+            metrics.cache_lookup("bot_call_fees", True)
+            return _bot_call_fees_from_cache(cached, token, token_symbol, volume_24h_usd, sol_price_usd)
+        refresh_budget["left"] -= 1
+        log_bot_call.debug("  %s: refresh-ahead fee cache (age %.0fs)", token_symbol, age)
+    metrics.cache_lookup("bot_call_fees", False)
+    fee_info = await _resolve_bot_call_fees(token, token_address, token_symbol, volume_24h_usd, sol_price_usd,
+                                            search_fees_sol, fee_passes, provider_state)
+    if fee_info is None:
+        return None
+    ttl = _bot_call_fee_ttl(fee_info["origin"])
+    if ttl > 0:
+        bot_call_fee_cache.set(token_address, dict(fee_info, timestamp=now), ttl=ttl)
+    else:
+        bot_call_fee_cache.discard(token_address)
+    return fee_info
+
+async def _fetch_toptraded_window(session: aiohttp.ClientSession, window: str) -> Optional[List[Dict]]:
+    """Satu window Jupiter tokens v2 (mis. "toptraded/5m"). None kalau gagal / rate limited."""
+    url = (
+        f"https://api.jup.ag/tokens/v2/{window}?limit={BOT_CALL_TOPTRADED_LIMIT}"
+        f"&minMcap={int(BOT_CALL_MIN_MARKET_CAP)}&maxMcap={int(BOT_CALL_MAX_MARKET_CAP)}"
+    )
     try:
-        url = f"https://api.jup.ag/tokens/v2/toptraded/1h?limit=100&minMcap={int(BOT_CALL_MIN_MARKET_CAP)}&maxMcap={int(BOT_CALL_MAX_MARKET_CAP)}"
-        headers = {
-            "x-api-key": JUPITER_API_KEY
-        }
-        
-        print(f"[DEBUG] Fetching top traded tokens (1h) from Jupiter API (mcap: ${BOT_CALL_MIN_MARKET_CAP:,.0f} - ${BOT_CALL_MAX_MARKET_CAP:,.0f})...")
-        async with http_session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as response:
+        async with session.get(url, headers={"x-api-key": JUPITER_API_KEY},
+                               timeout=aiohttp.ClientTimeout(total=15)) as response:
             if response.status == 429:
-                print("[WARN] Jupiter API rate limited, skipping...")
-                return []
-            
+                log_bot_call.warning("Jupiter API rate limited on %s, skipping window...", window)
+                return None
             response.raise_for_status()
             data = await response.json()
-            
-            # Jupiter API returns list of tokens (already Solana-only)
-            tokens = data if isinstance(data, list) else []
-            print(f"[DEBUG] Jupiter API returned {len(tokens)} token(s)")
-            
-            # Log first few tokens for debugging
+    except Exception as e:
+        log_bot_call.warning("Jupiter %s failed: %s", window, e)
+        return None
+    # Jupiter API returns list of tokens (already Solana-only)
+    return data if isinstance(data, list) else []
+
+toptraded_failed_windows: List[str] = []  # Window yang gagal di fetch terakhir
+
+async def fetch_toptraded_candidates() -> List[Dict]:
+    """Fetch semua BOT_CALL_TOPTRADED_WINDOWS bersamaan, merge jadi satu list unik per mint.
+
+    Payload token diambil dari window pertama (urutan env) yang memuat token itu; field yang tidak ada
+    dilengkapi dari window lain (stats5m/stats6h dst.). Tiap token dapat `windows`: {window: rank (1-based)}.
+    """
+    global http_session, toptraded_failed_windows
+    if not http_session:
+        http_session = http_manager.session()
+    results = await asyncio.gather(*(_fetch_toptraded_window(http_session, w) for w in BOT_CALL_TOPTRADED_WINDOWS))
+    toptraded_failed_windows = [w for w, tokens in zip(BOT_CALL_TOPTRADED_WINDOWS, results) if tokens is None]
+    merged: Dict[str, Dict] = {}
+    for window, tokens in zip(BOT_CALL_TOPTRADED_WINDOWS, results):
+        if tokens is None:
+            continue
+        for rank, token in enumerate(tokens, 1):
+            if not isinstance(token, dict):
+                continue
+            mint = token.get("id") or token.get("address")
+            if not mint:
+                continue
+            candidate = merged.get(mint)
+            if candidate is None:
+                candidate = merged[mint] = dict(token, windows={})
+            else:
+                for key, value in token.items():
+                    candidate.setdefault(key, value)
+            candidate["windows"][window] = rank
+    if log_bot_call.isEnabledFor(logging.DEBUG):
+        for window, tokens in zip(BOT_CALL_TOPTRADED_WINDOWS, results):
+            only_here = sum(1 for t in merged.values() if list(t["windows"]) == [window])
+            log_bot_call.debug("  window %s: %s token(s), %d hanya di window ini", window,
+                               "gagal" if tokens is None else len(tokens), only_here)
+    return list(merged.values())
+
+def _parse_toptraded_metrics(token: Dict) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """market cap, volume 24h (buy + sell) dan price change 1h dari payload toptraded."""
+    # Get market cap from token data (toptraded uses "mcap" or "fdv")
+    market_cap = None
+    if "mcap" in token:
+        try:
+            market_cap = float(token["mcap"])
+        except (ValueError, TypeError):
+            pass
+    if not market_cap and "fdv" in token:
+        try:
+            market_cap = float(token["fdv"])
+        except (ValueError, TypeError):
+            pass
+    if not market_cap and "marketCap" in token:
+        try:
+            market_cap = float(token["marketCap"])
+        except (ValueError, TypeError):
+            pass
+
+    # Get volume 24h from stats24h (toptraded endpoint structure)
+    volume_24h_usd = None
+    stats24h = token.get("stats24h", {})
+    stats1h = token.get("stats1h", {})
+    if isinstance(stats24h, dict):
+        buy_volume = stats24h.get("buyVolume", 0) or 0
+        sell_volume = stats24h.get("sellVolume", 0) or 0
+        try:
+            volume_24h_usd = float(buy_volume) + float(sell_volume)
+        except (ValueError, TypeError):
+            pass
+
+    # Fallback to volume24h if stats24h not available
+    if not volume_24h_usd and "volume24h" in token:
+        try:
+            volume_24h_usd = float(token["volume24h"])
+        except (ValueError, TypeError):
+            pass
+
+    # Get price change 1h from stats1h
+    price_change_1h = None
+    if stats1h and isinstance(stats1h, dict):
+        price_change_1h = stats1h.get("priceChange")
+        if price_change_1h is not None:
+            try:
+                price_change_1h = float(price_change_1h)
+            except (ValueError, TypeError):
+                price_change_1h = None
+    
+    return market_cap, volume_24h_usd, price_change_1h
+
+class _PreparedToken(NamedTuple):
+    """Token toptraded setelah tahap 1 fetch_new_tokens (metrik payload + alasan enrich dari delta tracker)."""
+    token: Dict
+    address: str
+    symbol: str
+    market_cap: Optional[float]
+    volume_24h: Optional[float]
+    price_change_1h: Optional[float]
+    payload_fees_sol: Optional[float]
+    enrich_reason: Optional[str]  # None = tidak berubah berarti, pakai snapshot
+
+# --- HELPER: FETCH NEW TOKENS FROM JUPITER API ---
+async def fetch_new_tokens() -> List[Dict[str, object]]:
+    """Fetch new tokens from Jupiter API that meet criteria."""
+    try:
+        log_bot_call.info("Fetching toptraded windows %s from Jupiter API (mcap: $%s - $%s)",
+                          ",".join(BOT_CALL_TOPTRADED_WINDOWS),
+                          f"{BOT_CALL_MIN_MARKET_CAP:,.0f}", f"{BOT_CALL_MAX_MARKET_CAP:,.0f}")
+        tokens = await fetch_toptraded_candidates()
+        log_bot_call.info("Jupiter API returned %d candidate token(s)", len(tokens))
+        
+        # Log first few tokens + structure of first token (fields, especially fees) for debugging
+        if log_bot_call.isEnabledFor(logging.DEBUG):
             for i, token in enumerate(tokens[:10], 1):
                 token_id = token.get("id") or token.get("address", "N/A")
-                token_symbol = token.get("symbol", "UNKNOWN")
-                token_mcap = token.get("mcap") or token.get("fdv") or token.get("marketCap") or 0
-                try:
-                    mcap_val = float(token_mcap) if token_mcap else 0
-                    print(f"[DEBUG]   {i}. {token_symbol} ({token_id[:8]}...): mcap=${mcap_val:,.0f}")
-                except:
-                    print(f"[DEBUG]   {i}. {token_symbol} ({token_id[:8]}...): mcap=N/A")
-            
-            # Log structure of first token to see available fields (especially fees)
-            if tokens and len(tokens) > 0:
+                log_bot_call.debug("  %d. %s (%s...): mcap=%s", i, token.get("symbol", "UNKNOWN"), token_id[:8],
+                                   token.get("mcap") or token.get("fdv") or token.get("marketCap") or "N/A")
+            if tokens:
                 first_token = tokens[0]
-                print(f"[DEBUG] First token structure keys: {list(first_token.keys())}")
-                if "stats24h" in first_token and isinstance(first_token["stats24h"], dict):
-                    print(f"[DEBUG] stats24h keys: {list(first_token['stats24h'].keys())}")
-                if "stats1h" in first_token and isinstance(first_token["stats1h"], dict):
-                    print(f"[DEBUG] stats1h keys: {list(first_token['stats1h'].keys())}")
-            
+                log_bot_call.debug("First token structure keys: %s", list(first_token.keys()))
+                for stats_key in ("stats24h", "stats1h"):
+                    if isinstance(first_token.get(stats_key), dict):
+                        log_bot_call.debug("%s keys: %s", stats_key, list(first_token[stats_key].keys()))
             # Check if specific tokens are in the response (for debugging)
-            target_tokens = ["3k29upUrDXNF3cuRYArqUKw8AtUNWSqbfZfRvB6fBAGS", "GLBV9FAMhULQpD6iQMGBSchD9s1Hdzd79VqetVjgpump"]
-            for target_id in target_tokens:
-                found = any((token.get("id") or token.get("address", "")) == target_id for token in tokens)
-                if found:
-                    print(f"[DEBUG] ✅ Target token {target_id[:8]}... DITEMUKAN di Jupiter API response!")
-                else:
-                    print(f"[DEBUG] ❌ Target token {target_id[:8]}... TIDAK DITEMUKAN di Jupiter API response")
-            
-            if not tokens:
-                return []
-            
-            # Get SOL price for fee conversion (try CoinGecko first, then Jupiter)
-            sol_price_usd = await fetch_sol_price()
-            
-            qualifying_tokens = []
-            now = time.time()
-            
-            for token in tokens:
+            response_ids = {token.get("id") or token.get("address", "") for token in tokens}
+            for target_id in ["3k29upUrDXNF3cuRYArqUKw8AtUNWSqbfZfRvB6fBAGS", "GLBV9FAMhULQpD6iQMGBSchD9s1Hdzd79VqetVjgpump"]:
+                log_bot_call.debug("Target token %s... %s di Jupiter API response", target_id[:8],
+                                   "DITEMUKAN" if target_id in response_ids else "TIDAK DITEMUKAN")
+        
+        if not tokens:
+            return []
+        
+        # Get SOL price for fee conversion (try CoinGecko first, then Jupiter)
+        sol_price_usd = await fetch_sol_price()
+        
+        qualifying_tokens = []
+        now = time.time()
+        fee_refresh_budget = {"left": BOT_CALL_FEE_REFRESH_AHEAD_MAX}
+        toptraded_tracker.begin_cycle()
+        enriched_count = 0
+        deferred_count = 0
+        
+        # Tahap 1 (murah): metrik payload + delta vs cycle sebelumnya untuk semua token
+        prepared = []
+        enrich_quota = BOT_CALL_MAX_ENRICH_PER_CYCLE
+        for token in tokens:
+            try:
+                # toptraded endpoint uses "id" instead of "address"
+                token_address = token.get("id") or token.get("address")
+                if not token_address or not is_valid_solana_address(token_address):
+                    continue
+                token_symbol = token.get("symbol", "UNKNOWN")
+                market_cap, volume_24h_usd, price_change_1h = _parse_toptraded_metrics(token)
+                payload_fees_sol = _parse_jupiter_fees_sol_from_dict(token, token_symbol, "token")
+                # Token yang tidak berubah berarti pakai hasil enrich di snapshot
+                enrich_reason = toptraded_tracker.enrich_reason(
+                    token_address, market_cap, volume_24h_usd, price_change_1h, payload_fees_sol, now
+                )
+                if enrich_reason is not None and enrich_quota <= 0:
+                    # Di luar kuota cycle ini: snapshot tidak disentuh, jadi cycle berikutnya tetap terdeteksi berubah
+                    deferred_count += 1
+                    continue
+                if enrich_reason is not None:
+                    enrich_quota -= 1
+                prepared.append(_PreparedToken(token, token_address, token_symbol, market_cap, volume_24h_usd,
+                                               price_change_1h, payload_fees_sol, enrich_reason))
+            except Exception as e:
+                log_bot_call.error("Error processing token: %s", e)
+        
+        # Fees token yang perlu enrich: cache / pass 1 (payload toptraded, GMGN, Meteora) dulu untuk semua token,
+        # baru sisanya yang belum punya fee ikut Jupiter search (batch JUPITER_SEARCH_BATCH_SIZE mint per request)
+        # lalu pass 2. Token yang sudah selesai di cache / pass 1 tidak ikut di-search. Hasil GMGN / Meteora
+        # pass 1 dibawa ke pass 2 lewat provider_states, jadi pass 2 tidak query provider lagi (dan tanpa jeda).
+        fee_infos: Dict[str, Dict[str, object]] = {}
+        needs_pass2: List[_PreparedToken] = []
+        provider_states: Dict[str, Dict[str, object]] = {}
+        for item in prepared:
+            if item.enrich_reason is None:
+                continue
+            try:
+                # Token yang berubah berarti bypass cache (TTL + refresh-ahead)
+                fee_info = await _cached_bot_call_fees(
+                    item.token, item.address, item.symbol, item.volume_24h, sol_price_usd, fee_refresh_budget,
+                    force=item.enrich_reason not in ("new", "expired"), fee_passes=(0,),
+                    provider_state=provider_states.setdefault(item.address, {}),
+                )
+            except Exception as e:
+                log_bot_call.error("%s: fee pass 1 failed: %s", item.symbol, e)
+                continue
+            if fee_info is None:
+                needs_pass2.append(item)
+            else:
+                fee_infos[item.address] = fee_info
+        if needs_pass2:
+            search_symbols = {item.address: item.symbol for item in needs_pass2}
+            search_fees = await _fetch_jupiter_fees_via_search_batch(list(search_symbols), search_symbols)
+            log_bot_call.debug("Jupiter search batch: %d mint(s), %d with fees", len(search_symbols),
+                               sum(1 for v in search_fees.values() if v))
+            for item in needs_pass2:
                 try:
-                    # toptraded endpoint uses "id" instead of "address"
-                    token_address = token.get("id") or token.get("address")
-                    if not token_address or not is_valid_solana_address(token_address):
-                        continue
-                    
-                    # Get token metadata
-                    token_name = token.get("name", "Unknown")
-                    token_symbol = token.get("symbol", "UNKNOWN")
-                    
-                    # Log token being processed
-                    print(f"[DEBUG] Processing token: {token_symbol} ({token_address[:8]}...)")
-                    
-                    # Get market cap from token data (toptraded uses "mcap" or "fdv")
-                    market_cap = None
-                    if "mcap" in token:
-                        try:
-                            market_cap = float(token["mcap"])
-                        except (ValueError, TypeError):
-                            pass
-                    if not market_cap and "fdv" in token:
-                        try:
-                            market_cap = float(token["fdv"])
-                        except (ValueError, TypeError):
-                            pass
-                    if not market_cap and "marketCap" in token:
-                        try:
-                            market_cap = float(token["marketCap"])
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # Get volume 24h from stats24h (toptraded endpoint structure)
-                    volume_24h_usd = None
-                    stats24h = token.get("stats24h", {})
-                    stats1h = token.get("stats1h", {})
-                    if isinstance(stats24h, dict):
-                        buy_volume = stats24h.get("buyVolume", 0) or 0
-                        sell_volume = stats24h.get("sellVolume", 0) or 0
-                        try:
-                            volume_24h_usd = float(buy_volume) + float(sell_volume)
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # Fallback to volume24h if stats24h not available
-                    if not volume_24h_usd and "volume24h" in token:
-                        try:
-                            volume_24h_usd = float(token["volume24h"])
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # Get price change 1h from stats1h
-                    price_change_1h = None
-                    if stats1h and isinstance(stats1h, dict):
-                        price_change_1h = stats1h.get("priceChange")
-                        if price_change_1h is not None:
-                            try:
-                                price_change_1h = float(price_change_1h)
-                            except (ValueError, TypeError):
-                                price_change_1h = None
-                    
-                    # Fees: 2 pass — Jupiter (toptraded lalu search, search tanpa fee → tetap toptraded); Meteora DLMM+DAMM (retry tanpa fee → tetap fee Meteora lama); lalu 0.3% volume
-                    total_fees_sol = 0.0
-                    total_fees_usd = 0.0
-                    fee_origin = "calculated"
-                    jupiter_fees_sol = None
-                    meteora_fees = None
-                    gmgn_fees = None
-                    gmgn_fees_sol = None
-
-                    for fee_pass in range(2):
-                        if fee_pass == 1:
-                            await asyncio.sleep(0.45)
-
-                        if fee_pass == 0:
-                            jupiter_fees_sol = _parse_jupiter_fees_sol_from_dict(token, token_symbol, "token")
-                        else:
-                            refetched = await _fetch_jupiter_token_fees_via_search(
-                                token_address, token_symbol
-                            )
-                            # Search tanpa fee di response → None: jangan timpa, tetap pakai toptraded
-                            if refetched is not None:
-                                jupiter_fees_sol = refetched
-
-                        meteora_volume = None
-                        if USE_METEORA_FOR_FEES:
-                            meteora_volume, meteora_fees_try = fetch_meteora_volume_and_fees(token_address)
-                            if meteora_fees_try is not None and meteora_fees_try > 0:
-                                meteora_fees = meteora_fees_try
-                            if meteora_volume and meteora_volume > (volume_24h_usd or 0):
-                                volume_24h_usd = meteora_volume
-
-                        if jupiter_fees_sol and jupiter_fees_sol > 0:
-                            total_fees_sol = jupiter_fees_sol
-                            total_fees_usd = (
-                                total_fees_sol * sol_price_usd if sol_price_usd and total_fees_sol > 0 else 0
-                            )
-                            fee_origin = "jupiter"
-                            print(
-                                f"[DEBUG]   {token_symbol}: Using fees from Jupiter API (pass {fee_pass + 1}/2): "
-                                f"{total_fees_sol:.4f} SOL (${total_fees_usd:,.2f} USD)"
-                            )
-                            break
-                        if USE_GMGN_FOR_FEES:
-                            if gmgn_fees_sol is None:
-                                gmgn_fees_sol = await fetch_gmgn_token_fees_sol(token_address, token_symbol)
-                            if gmgn_fees_sol is not None and gmgn_fees_sol > 0:
-                                total_fees_sol = gmgn_fees_sol
-                                total_fees_usd = (
-                                    total_fees_sol * sol_price_usd if sol_price_usd and total_fees_sol > 0 else 0
-                                )
-                                fee_origin = "gmgn"
-                                print(
-                                    f"[DEBUG]   {token_symbol}: Using fees from GMGN token info (pass {fee_pass + 1}/2): "
-                                    f"{total_fees_sol:.4f} SOL (${total_fees_usd:,.2f} USD)"
-                                )
-                                break
-
-                            gmgn_volume_try, gmgn_fees_try = await fetch_gmgn_volume_and_fees(token_address, token_symbol)
-                            if gmgn_fees_try is not None and gmgn_fees_try > 0:
-                                gmgn_fees = gmgn_fees_try
-                            if gmgn_volume_try and gmgn_volume_try > (volume_24h_usd or 0):
-                                volume_24h_usd = gmgn_volume_try
-                        if gmgn_fees and gmgn_fees > 0:
-                            total_fees_usd = gmgn_fees
-                            total_fees_sol = (
-                                total_fees_usd / sol_price_usd if sol_price_usd and total_fees_usd > 0 else 0
-                            )
-                            fee_origin = "gmgn"
-                            print(
-                                f"[DEBUG]   {token_symbol}: Using fees from GMGN fallback (pass {fee_pass + 1}/2): "
-                                f"{total_fees_sol:.4f} SOL (${total_fees_usd:,.2f} USD)"
-                            )
-                            break
-                        if meteora_fees and meteora_fees > 0:
-                            total_fees_usd = meteora_fees
-                            total_fees_sol = (
-                                total_fees_usd / sol_price_usd if sol_price_usd and total_fees_usd > 0 else 0
-                            )
-                            fee_origin = "meteora"
-                            print(
-                                f"[DEBUG]   {token_symbol}: Using fees from Meteora (pass {fee_pass + 1}/2): "
-                                f"{total_fees_sol:.4f} SOL (${total_fees_usd:,.2f} USD)"
-                            )
-                            break
-
-                    if fee_origin == "calculated":
-                        fee_percentage = 0.003
-                        total_fees_usd = volume_24h_usd * fee_percentage if volume_24h_usd else 0
-                        total_fees_sol = total_fees_usd / sol_price_usd if sol_price_usd and total_fees_usd > 0 else 0
-                        print(
-                            f"[DEBUG]   {token_symbol}: Calculated fees from volume (0.3%) after 2 passes: "
-                            f"{total_fees_sol:.4f} SOL (${total_fees_usd:,.2f} USD)"
-                        )
-                    
-                    # Check criteria with detailed logging
-                    market_cap_ok = market_cap and market_cap >= BOT_CALL_MIN_MARKET_CAP and market_cap <= BOT_CALL_MAX_MARKET_CAP
-                    fees_ok = total_fees_sol >= BOT_CALL_MIN_FEES_SOL
-                    price_change_1h_ok = price_change_1h is not None and price_change_1h >= BOT_CALL_MIN_PRICE_CHANGE_1H
-                    
-                    # Log filter check results
-                    print(f"[DEBUG]   {token_symbol} filter check:")
-                    mcap_str = f"${market_cap:,.0f}" if market_cap else "$0"
-                    print(f"    - Market cap: {mcap_str} (min: ${BOT_CALL_MIN_MARKET_CAP:,.0f}, max: ${BOT_CALL_MAX_MARKET_CAP:,.0f}) -> {'✅' if market_cap_ok else '❌'}")
-                    
-                    # Show fees source (aligned with 2-pass resolution + fallback)
-                    fees_source = (
-                        "Jupiter API"
-                        if fee_origin == "jupiter"
-                        else "Meteora"
-                        if fee_origin == "meteora"
-                        else "GMGN"
-                        if fee_origin == "gmgn"
-                        else "Calculated (0.3% of volume)"
+                    fee_infos[item.address] = await _cached_bot_call_fees(
+                        item.token, item.address, item.symbol, item.volume_24h, sol_price_usd, fee_refresh_budget,
+                        force=True, search_fees_sol=search_fees.get(item.address), fee_passes=(1,),
+                        provider_state=provider_states.get(item.address),
                     )
-                    print(f"    - Fees: {total_fees_sol:.2f} SOL (${total_fees_usd:,.2f} USD) from {fees_source} (min: {BOT_CALL_MIN_FEES_SOL} SOL) -> {'✅' if fees_ok else '❌'}")
-                    
-                    price_change_str = f"{price_change_1h:.2f}%" if price_change_1h is not None else "N/A"
-                    print(f"    - Price change 1h: {price_change_str} (min: {BOT_CALL_MIN_PRICE_CHANGE_1H}%) -> {'✅' if price_change_1h_ok else '❌'}")
-                    
-                    if not (market_cap_ok and fees_ok and price_change_1h_ok):
-                        print(f"[DEBUG]   {token_symbol} TIDAK MEMENUHI kriteria, skip")
-                        continue
-                    
-                    print(f"[DEBUG]   {token_symbol} MEMENUHI semua kriteria filter, lanjut cek Meteora pools...")
-                    
-                    # Get additional data
-                    price_usd = token.get("usdPrice") or token.get("price") or None
-                    if price_usd:
+                except Exception as e:
+                    log_bot_call.error("%s: fee pass 2 failed: %s", item.symbol, e)
+        
+        # Tahap 2: enrich token yang berubah, filter kriteria, cek pool
+        for (token, token_address, token_symbol, market_cap, volume_24h_usd,
+             price_change_1h, payload_fees_sol, enrich_reason) in prepared:
+            try:
+                token_name = token.get("name", "Unknown")
+                stats24h = token.get("stats24h", {})
+                
+                log_bot_call.debug("Processing token: %s (%s...)", token_symbol, token_address[:8])
+                
+                payload_volume = volume_24h_usd
+                snapshot = toptraded_tracker.get(token_address)
+                if enrich_reason is None:
+                    snapshot = snapshot.copy()  # snapshot lama tetap utuh untuk event transisi
+                    total_fees_sol = snapshot.fees_sol
+                    total_fees_usd = snapshot.fees_usd
+                    fee_origin = snapshot.fee_origin
+                    volume_24h_usd = max(volume_24h_usd or 0, snapshot.enriched_volume or 0) or volume_24h_usd
+                else:
+                    fee_info = fee_infos.get(token_address)
+                    if fee_info is None:
+                        continue  # Resolve fee error: snapshot tidak disentuh, dicoba lagi cycle berikutnya
+                    enriched_count += 1
+                    log_bot_call.debug("  %s: enrich (%s)", token_symbol, enrich_reason)
+                    total_fees_sol = fee_info["fees_sol"]
+                    total_fees_usd = fee_info["fees_usd"]
+                    fee_origin = fee_info["origin"]
+                    volume_24h_usd = fee_info["volume"]
+                    snapshot = TokenSnapshot(
+                        symbol=token_symbol, market_cap=market_cap, volume_24h=payload_volume,
+                        price_change_1h=price_change_1h, payload_fees_sol=payload_fees_sol,
+                        fees_sol=total_fees_sol, fees_usd=total_fees_usd, fee_origin=fee_origin,
+                        enriched_volume=volume_24h_usd, enriched_at=now,
+                    )
+                snapshot.seen_at = now
+                
+                # Check criteria with detailed logging
+                market_cap_ok = market_cap and market_cap >= BOT_CALL_MIN_MARKET_CAP and market_cap <= BOT_CALL_MAX_MARKET_CAP
+                fees_ok = total_fees_sol >= BOT_CALL_MIN_FEES_SOL
+                price_change_1h_ok = price_change_1h is not None and price_change_1h >= BOT_CALL_MIN_PRICE_CHANGE_1H
+                
+                # Show fees source (aligned with 2-pass resolution + fallback)
+                fees_source = (
+                    "Jupiter API"
+                    if fee_origin == "jupiter"
+                    else "Meteora"
+                    if fee_origin == "meteora"
+                    else "GMGN"
+                    if fee_origin == "gmgn"
+                    else "Calculated (0.3% of volume)"
+                )
+                
+                # Log filter check results (one record per token)
+                log_bot_call.debug(
+                    "  %s filter check: mcap=%s -> %s | fees=%.2f SOL ($%.2f) from %s -> %s | price1h=%s -> %s",
+                    token_symbol,
+                    market_cap, "ok" if market_cap_ok else "no",
+                    total_fees_sol, total_fees_usd, fees_source, "ok" if fees_ok else "no",
+                    price_change_1h, "ok" if price_change_1h_ok else "no",
+                )
+                
+                snapshot.qualified = bool(market_cap_ok and fees_ok and price_change_1h_ok)
+                if not snapshot.qualified:
+                    toptraded_tracker.update(token_address, snapshot)
+                    continue
+                
+                log_bot_call.debug("  %s MEMENUHI semua kriteria filter, lanjut cek Meteora pools...", token_symbol)
+                
+                # Get additional data
+                price_usd = token.get("usdPrice") or token.get("price") or None
+                if price_usd:
+                    try:
+                        price_usd = float(price_usd)
+                    except (ValueError, TypeError):
+                        price_usd = None
+                
+                liquidity_usd = token.get("liquidity") or None
+                if liquidity_usd:
+                    try:
+                        liquidity_usd = float(liquidity_usd)
+                    except (ValueError, TypeError):
+                        liquidity_usd = None
+                
+                # Get price change 24h from stats24h
+                price_change_24h = None
+                if stats24h and isinstance(stats24h, dict):
+                    price_change_24h = stats24h.get("priceChange")
+                    if price_change_24h:
                         try:
-                            price_usd = float(price_usd)
+                            price_change_24h = float(price_change_24h)
                         except (ValueError, TypeError):
-                            price_usd = None
-                    
-                    liquidity_usd = token.get("liquidity") or None
-                    if liquidity_usd:
+                            price_change_24h = None
+                
+                # Fallback to priceChange24h
+                if not price_change_24h:
+                    price_change_24h = token.get("priceChange24h") or None
+                    if price_change_24h:
                         try:
-                            liquidity_usd = float(liquidity_usd)
+                            price_change_24h = float(price_change_24h)
                         except (ValueError, TypeError):
-                            liquidity_usd = None
-                    
-                    # Get price change 24h from stats24h
-                    price_change_24h = None
-                    if stats24h and isinstance(stats24h, dict):
-                        price_change_24h = stats24h.get("priceChange")
-                        if price_change_24h:
-                            try:
-                                price_change_24h = float(price_change_24h)
-                            except (ValueError, TypeError):
-                                price_change_24h = None
-                    
-                    # Fallback to priceChange24h
-                    if not price_change_24h:
-                        price_change_24h = token.get("priceChange24h") or None
-                        if price_change_24h:
-                            try:
-                                price_change_24h = float(price_change_24h)
-                            except (ValueError, TypeError):
-                                price_change_24h = None
-                    
-                    # Get created_at for reference (tidak digunakan untuk filter)
-                    created_at = token.get("createdAt") or token.get("created_at") or token.get("firstPool", {}).get("createdAt")
-                    
-                    # Check if token has Meteora pools with min liquidity 500 USD (REQUIRED for bot call notification)
+                            price_change_24h = None
+                
+                # Get created_at for reference (tidak digunakan untuk filter)
+                created_at = token.get("createdAt") or token.get("created_at") or token.get("firstPool", {}).get("createdAt")
+                
+                # Check if token has Meteora pools with min liquidity 500 USD (REQUIRED for bot call notification)
+                # Status pool dari snapshot dipakai ulang selama token tidak berubah berarti (error selalu dicek ulang)
+                if enrich_reason is not None or snapshot.pool_status not in ("ok", "none", "low_liq"):
                     try:
-                        print(f"[DEBUG]   {token_symbol}: Checking Meteora pools for {token_address[:8]}...")
-                        meteora_pools = fetch_meteora_pools(token_address)
-                        if not meteora_pools or len(meteora_pools) == 0:
-                            print(f"[DEBUG]   {token_symbol}: ❌ Tidak punya pool di Meteora, skip")
-                            continue
-                        
-                        # Check if any pool has minimum liquidity of 500 USD
-                        max_liq = max([pool.get('raw_liq', 0) for pool in meteora_pools], default=0)
-                        if max_liq < 500:
-                            print(f"[DEBUG]   {token_symbol}: ❌ Punya {len(meteora_pools)} pool di Meteora, tapi max liquidity hanya ${max_liq:.2f} (< $500), skip")
-                            continue
-                        
-                        print(f"[DEBUG]   {token_symbol}: ✅ Punya {len(meteora_pools)} pool di Meteora dengan max liquidity ${max_liq:.2f} (>= $500), QUALIFY!")
+                        # Sync (requests + sleep rate limit): jalan di thread supaya event loop tidak terblok
+                        meteora_pools = await asyncio.to_thread(fetch_meteora_pools, token_address)
+                        snapshot.pool_count = len(meteora_pools or [])
+                        snapshot.max_liq = max([pool.get('raw_liq', 0) for pool in meteora_pools or []], default=0)
+                        snapshot.pool_status = (
+                            "none" if not snapshot.pool_count else "low_liq" if snapshot.max_liq < 500 else "ok"
+                        )
                     except Exception as e:
                         # Jika error saat fetch pools, skip token ini (anggap tidak punya pool)
-                        print(f"[DEBUG]   {token_symbol}: ❌ Error checking Meteora pools: {e}, skip")
-                        import traceback
-                        traceback.print_exc()
-                        continue
-                    
-                    qualifying_tokens.append({
-                        "address": token_address,
-                        "name": token_name,
-                        "symbol": token_symbol,
-                        "market_cap": market_cap,
-                        "total_fees_sol": total_fees_sol,
-                        "total_fees_usd": total_fees_usd,
-                        "fees_source": fees_source,
-                        "price_usd": price_usd,
-                        "liquidity_usd": liquidity_usd,
-                        "volume_24h": volume_24h_usd,
-                        "price_change_24h": price_change_24h,
-                        "price_change_1h": price_change_1h,
-                        "created_at": created_at,
-                    })
-                    
-                except Exception as e:
-                    print(f"[ERROR] Error processing token: {e}")
+                        log_bot_call.warning("%s: Error checking Meteora pools: %s, skip", token_symbol, e)
+                        snapshot.pool_status = "error"
+                toptraded_tracker.update(token_address, snapshot)
+                
+                if snapshot.pool_status == "none":
+                    log_bot_call.debug("  %s: Tidak punya pool di Meteora, skip", token_symbol)
                     continue
-            
-            # Sort by market cap
-            qualifying_tokens.sort(key=lambda x: x.get("market_cap", 0), reverse=True)
-            print(f"[DEBUG] Found {len(qualifying_tokens)} qualifying token(s)")
-            return qualifying_tokens
-            
+                if snapshot.pool_status == "low_liq":
+                    log_bot_call.debug("  %s: %d pool di Meteora, max liquidity $%.2f (< $500), skip",
+                                       token_symbol, snapshot.pool_count, snapshot.max_liq)
+                    continue
+                if snapshot.pool_status != "ok":
+                    continue
+                log_bot_call.info("%s: %d pool di Meteora dengan max liquidity $%.2f (>= $500), QUALIFY!",
+                                  token_symbol, snapshot.pool_count, snapshot.max_liq)
+                
+                qualifying_tokens.append({
+                    "address": token_address,
+                    "name": token_name,
+                    "symbol": token_symbol,
+                    "market_cap": market_cap,
+                    "total_fees_sol": total_fees_sol,
+                    "total_fees_usd": total_fees_usd,
+                    "fees_source": fees_source,
+                    "price_usd": price_usd,
+                    "liquidity_usd": liquidity_usd,
+                    "volume_24h": volume_24h_usd,
+                    "price_change_24h": price_change_24h,
+                    "price_change_1h": price_change_1h,
+                    "created_at": created_at,
+                    "windows": sorted(token.get("windows") or {}, key=token.get("windows", {}).get),
+                })
+                
+            except Exception as e:
+                log_bot_call.error("Error processing token: %s", e)
+                continue
+        
+        toptraded_tracker.end_cycle(complete=not toptraded_failed_windows)
+        log_bot_call.info("Delta: %d/%d token(s) re-enriched, %d unchanged, %d deferred (max %d per cycle)",
+                          enriched_count, len(prepared), len(prepared) - enriched_count, deferred_count,
+                          BOT_CALL_MAX_ENRICH_PER_CYCLE)
+        
+        # Sort by market cap
+        qualifying_tokens.sort(key=lambda x: x.get("market_cap", 0), reverse=True)
+        log_bot_call.info("Found %d qualifying token(s)", len(qualifying_tokens))
+        return qualifying_tokens
+        
     except Exception as e:
-        print(f"[ERROR] Failed to fetch tokens from Jupiter: {e}")
-        import traceback
-        traceback.print_exc()
+        log_bot_call.exception("Failed to fetch tokens from Jupiter: %s", e)
         return []
 
+# Create button view for creating thread (admin only)
+# Module level supaya bisa dibuat ulang di proses gateway (engine_ipc)
+class CreateThreadView(discord.ui.View):
+    def __init__(self, token_address: str, token_symbol: str, token_name: str):
+        super().__init__(timeout=None)
+        self.token_address = token_address
+        self.token_symbol = token_symbol
+        self.token_name = token_name
+
+    @discord.ui.button(label="📝 Create LP Call Thread", style=discord.ButtonStyle.primary)
+    async def create_thread_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # Check if user is admin/moderator
+        admin_roles = ["Moderator", "admin", "Admin"]
+        user_roles = [role.name for role in interaction.user.roles]
+        is_admin = any(role in admin_roles for role in user_roles)
+
+        if not is_admin:
+            await interaction.response.send_message("❌ Hanya admin yang bisa membuat thread!", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            # Get LP Chat channel (untuk buat thread)
+            lp_chat_channel = bot.get_channel(THREAD_SCAN_CHANNEL_ID)
+            if not lp_chat_channel:
+                await interaction.followup.send("❌ LP Chat channel tidak ditemukan!", ephemeral=True)
+                return
+
+            # Get LP Calls channel (untuk kirim embed info)
+            lp_calls_channel = bot.get_channel(ALLOWED_CHANNEL_ID)
+            if not lp_calls_channel:
+                await interaction.followup.send("❌ LP Calls channel tidak ditemukan!", ephemeral=True)
+                return
+
+            # Fetch Meteora pools first untuk dapat pair name
+            pools = []
+            try:
+                pools = fetch_meteora_pools(self.token_address)
+                pools.sort(key=lambda x: x['raw_liq'], reverse=True)
+            except Exception as e:
+                print(f"[DEBUG] Error fetching Meteora pools: {e}")
+
+            # Create thread name (mirip !call)
+            if pools:
+                top_pool = pools[0]
+                pair_name = top_pool['pair'].replace(" ", "")
+                thread_name = f"{pair_name}"
+            else:
+                # Fallback jika pools tidak ditemukan
+                thread_name = f"{self.token_symbol}-{self.token_name[:20]}" if len(self.token_name) > 20 else f"{self.token_symbol}-{self.token_name}"
+                thread_name = thread_name.replace(" ", "").replace("/", "-")[:100]  # Discord limit
+
+            # Create thread di LP Chat (mirip !call yang buat thread di ctx.channel)
+            thread = await lp_chat_channel.create_thread(
+                name=thread_name,
+                type=discord.ChannelType.public_thread,
+                reason=f"Thread created by {interaction.user} via bot call button",
+                auto_archive_duration=60,  # Discord minimum (akan di-override oleh task 15 menit)
+            )
+
+            # Track thread untuk auto-archive setelah 15 menit
+            threads_to_archive[thread.id] = time.time()
+            print(f"[DEBUG] Thread {thread.id} ditambahkan ke auto-archive queue (15 menit)")
+
+            # Send contract info embed ke thread (sama seperti !call: contract_embed dulu)
+            contract_embed = discord.Embed(
+                title=f"💬 Thread created for `{thread_name}`",
+                description=f"**Contract Address:** `{self.token_address}`",
+                color=0x3498db
+            )
+            contract_embed.add_field(
+                name="🔗 Links",
+                value=(
+                    f"[🔍 Solscan](https://solscan.io/token/{self.token_address})\n"
+                    f"[🪐 Jupiter](https://jup.ag/tokens/{self.token_address})\n"
+                    f"[📊 GMGN](https://gmgn.ai/sol/token/{self.token_address})"
+                ),
+                inline=False
+            )
+
+            mention_text = f"<@&{MENTION_ROLE_ID}>" if MENTION_ROLE_ID else ""
+            await thread.send(f"{mention_text}", embed=contract_embed)
+
+            # Send Meteora pools embed ke thread (setelah contract_embed, sama seperti !call)
+            if pools:
+                desc = f"Found {len(pools)} Meteora DLMM pool untuk `{self.token_address}`\n\n"
+                for i, p in enumerate(pools[:10], 1):
+                    link = f"https://app.meteora.ag/dlmm/{p['address']}"
+                    desc += f"{i}. [{p['pair']}]({link}) {p['bin']} - LQ: {p['liq']}\n"
+
+                pool_embed = discord.Embed(
+                    title=f"Meteora DLMM Pools — {thread_name}",
+                    description=desc,
+                    color=0x00ff00
+                )
+                pool_embed.set_footer(text=f"Requested by {interaction.user.display_name}")
+                await thread.send(embed=pool_embed)
+
+            # Kirim embed info ke LP Calls channel (sama persis seperti !call)
+            thread_link = f"https://discord.com/channels/{interaction.guild.id}/{thread.id}"
+            top_pool_info = pools[0] if pools else None
+
+            # Build top pool info string (avoid backslash in f-string expression)
+            if top_pool_info:
+                top_pool_str = f"**Top Pool:** {top_pool_info['pair']} ({top_pool_info['liq']})"
+            else:
+                top_pool_str = "**Top Pool:** N/A"
+
+            info_embed = discord.Embed(
+                title=f"🧵 {thread_name}",
+                description=(
+                    f"**Created by:** {interaction.user.mention}\n"
+                    f"**Channel:** {lp_chat_channel.mention}\n"
+                    f"**Token:** `{self.token_address[:8]}...`\n"
+                    f"{top_pool_str}\n\n"
+                    f"[🔗 Open Thread]({thread_link})"
+                ),
+                color=0x3498db
+            )
+            await lp_calls_channel.send(embed=info_embed)
+
+            await interaction.followup.send(
+                f"✅ Thread berhasil dibuat di {lp_chat_channel.mention}!\n[🔗 Open Thread]({thread_link})",
+                ephemeral=True
+            )
+
+            print(f"[DEBUG] Thread {thread.id} created by {interaction.user.name} via bot call button (in LP Chat, copied to LP Calls)")
+
+        except discord.Forbidden:
+            await interaction.followup.send("❌ Bot tidak punya izin untuk membuat thread!", ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+            print(f"[ERROR] Error creating thread: {e}")
+            import traceback
+            traceback.print_exc()
+
+
+register_view(CreateThreadView, lambda view: {
+    "token_address": view.token_address, "token_symbol": view.token_symbol, "token_name": view.token_name,
+})
+
+
 # --- HELPER: SEND BOT CALL NOTIFICATION ---
-async def send_bot_call_notification(token_data: Dict[str, object]):
-    """Send notification to bot call channel for new token."""
+async def send_bot_call_notification(token_data: Dict[str, object], delivery: Optional[Delivery] = None):
+    """Send notification to bot call channel for new token.
+    Token ditandai sudah di-notifikasi setelah dispatch melaporkan terkirim; gagal = kembali ke antrean.
+    """
     if not BOT_CALL_CHANNEL_ID:
         print("[WARN] BOT_CALL_CHANNEL_ID not set, skipping notification")
         return
@@ -3600,150 +4215,37 @@ async def send_bot_call_notification(token_data: Dict[str, object]):
         
         embed.set_footer(text=f"Token Address: {token_address[:8]}...{token_address[-8:]}")
         
-        # Create button view for creating thread (admin only)
-        class CreateThreadView(discord.ui.View):
-            def __init__(self, token_address: str, token_symbol: str, token_name: str):
-                super().__init__(timeout=None)
-                self.token_address = token_address
-                self.token_symbol = token_symbol
-                self.token_name = token_name
-            
-            @discord.ui.button(label="📝 Create LP Call Thread", style=discord.ButtonStyle.primary)
-            async def create_thread_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-                # Check if user is admin/moderator
-                admin_roles = ["Moderator", "admin", "Admin"]
-                user_roles = [role.name for role in interaction.user.roles]
-                is_admin = any(role in admin_roles for role in user_roles)
-                
-                if not is_admin:
-                    await interaction.response.send_message("❌ Hanya admin yang bisa membuat thread!", ephemeral=True)
-                    return
-                
-                await interaction.response.defer(ephemeral=True)
-                
-                try:
-                    # Get LP Chat channel (untuk buat thread)
-                    lp_chat_channel = bot.get_channel(THREAD_SCAN_CHANNEL_ID)
-                    if not lp_chat_channel:
-                        await interaction.followup.send("❌ LP Chat channel tidak ditemukan!", ephemeral=True)
-                        return
-                    
-                    # Get LP Calls channel (untuk kirim embed info)
-                    lp_calls_channel = bot.get_channel(ALLOWED_CHANNEL_ID)
-                    if not lp_calls_channel:
-                        await interaction.followup.send("❌ LP Calls channel tidak ditemukan!", ephemeral=True)
-                        return
-                    
-                    # Fetch Meteora pools first untuk dapat pair name
-                    pools = []
-                    try:
-                        pools = fetch_meteora_pools(self.token_address)
-                        pools.sort(key=lambda x: x['raw_liq'], reverse=True)
-                    except Exception as e:
-                        print(f"[DEBUG] Error fetching Meteora pools: {e}")
-                    
-                    # Create thread name (mirip !call)
-                    if pools:
-                        top_pool = pools[0]
-                        pair_name = top_pool['pair'].replace(" ", "")
-                        thread_name = f"{pair_name}"
-                    else:
-                        # Fallback jika pools tidak ditemukan
-                        thread_name = f"{self.token_symbol}-{self.token_name[:20]}" if len(self.token_name) > 20 else f"{self.token_symbol}-{self.token_name}"
-                        thread_name = thread_name.replace(" ", "").replace("/", "-")[:100]  # Discord limit
-                    
-                    # Create thread di LP Chat (mirip !call yang buat thread di ctx.channel)
-                    thread = await lp_chat_channel.create_thread(
-                        name=thread_name,
-                        type=discord.ChannelType.public_thread,
-                        reason=f"Thread created by {interaction.user} via bot call button",
-                        auto_archive_duration=60,  # Discord minimum (akan di-override oleh task 15 menit)
-                    )
-                    
-                    # Track thread untuk auto-archive setelah 15 menit
-                    threads_to_archive[thread.id] = time.time()
-                    print(f"[DEBUG] Thread {thread.id} ditambahkan ke auto-archive queue (15 menit)")
-                    
-                    # Send contract info embed ke thread (sama seperti !call: contract_embed dulu)
-                    contract_embed = discord.Embed(
-                        title=f"💬 Thread created for `{thread_name}`",
-                        description=f"**Contract Address:** `{self.token_address}`",
-                        color=0x3498db
-                    )
-                    contract_embed.add_field(
-                        name="🔗 Links",
-                        value=(
-                            f"[🔍 Solscan](https://solscan.io/token/{self.token_address})\n"
-                            f"[🪐 Jupiter](https://jup.ag/tokens/{self.token_address})\n"
-                            f"[📊 GMGN](https://gmgn.ai/sol/token/{self.token_address})"
-                        ),
-                        inline=False
-                    )
-                    
-                    mention_text = f"<@&{MENTION_ROLE_ID}>" if MENTION_ROLE_ID else ""
-                    await thread.send(f"{mention_text}", embed=contract_embed)
-                    
-                    # Send Meteora pools embed ke thread (setelah contract_embed, sama seperti !call)
-                    if pools:
-                        desc = f"Found {len(pools)} Meteora DLMM pool untuk `{self.token_address}`\n\n"
-                        for i, p in enumerate(pools[:10], 1):
-                            link = f"https://app.meteora.ag/dlmm/{p['address']}"
-                            desc += f"{i}. [{p['pair']}]({link}) {p['bin']} - LQ: {p['liq']}\n"
-                        
-                        pool_embed = discord.Embed(
-                            title=f"Meteora DLMM Pools — {thread_name}",
-                            description=desc,
-                            color=0x00ff00
-                        )
-                        pool_embed.set_footer(text=f"Requested by {interaction.user.display_name}")
-                        await thread.send(embed=pool_embed)
-                    
-                    # Kirim embed info ke LP Calls channel (sama persis seperti !call)
-                    thread_link = f"https://discord.com/channels/{interaction.guild.id}/{thread.id}"
-                    top_pool_info = pools[0] if pools else None
-                    
-                    # Build top pool info string (avoid backslash in f-string expression)
-                    if top_pool_info:
-                        top_pool_str = f"**Top Pool:** {top_pool_info['pair']} ({top_pool_info['liq']})"
-                    else:
-                        top_pool_str = "**Top Pool:** N/A"
-                    
-                    info_embed = discord.Embed(
-                        title=f"🧵 {thread_name}",
-                        description=(
-                            f"**Created by:** {interaction.user.mention}\n"
-                            f"**Channel:** {lp_chat_channel.mention}\n"
-                            f"**Token:** `{self.token_address[:8]}...`\n"
-                            f"{top_pool_str}\n\n"
-                            f"[🔗 Open Thread]({thread_link})"
-                        ),
-                        color=0x3498db
-                    )
-                    await lp_calls_channel.send(embed=info_embed)
-                    
-                    await interaction.followup.send(
-                        f"✅ Thread berhasil dibuat di {lp_chat_channel.mention}!\n[🔗 Open Thread]({thread_link})",
-                        ephemeral=True
-                    )
-                    
-                    print(f"[DEBUG] Thread {thread.id} created by {interaction.user.name} via bot call button (in LP Chat, copied to LP Calls)")
-                    
-                except discord.Forbidden:
-                    await interaction.followup.send("❌ Bot tidak punya izin untuk membuat thread!", ephemeral=True)
-                except Exception as e:
-                    await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
-                    print(f"[ERROR] Error creating thread: {e}")
-                    import traceback
-                    traceback.print_exc()
-        
         view = CreateThreadView(token_address, token_symbol, token_name)
-        await channel.send(embed=embed, view=view)
-        print(f"[DEBUG] Bot call notification sent for {token_symbol} ({token_address[:8]}...)")
+        score = bot_call_ranking.score(token_data)
         
-        # Mark as notified (with today's date)
-        today = datetime.now().strftime("%Y-%m-%d")
-        bot_call_notified_tokens[token_address] = today
-        save_bot_call_state()
+        def delivered():
+            # Mark as notified (with today's date) baru setelah message benar-benar terkirim
+            today = datetime.now().strftime("%Y-%m-%d")
+            bot_call_pending_tokens.discard(token_address)
+            bot_call_notified_tokens.set(token_address, today, expires_at=_end_of_day(today))
+            save_bot_call_state()
+            bot_call_queue.save()
+            log_bot_call.info("Bot call notification delivered for %s (%s...)", token_symbol, token_address[:8])
+            if delivery is not None:
+                delivery.delivered()
+        
+        def failed():
+            # Gagal kirim: kembalikan ke antrean supaya dicoba lagi di tick notifier berikutnya
+            bot_call_pending_tokens.discard(token_address)
+            bot_call_queue.offer(token_address, token_data, score)
+            bot_call_queue.save()
+            log_bot_call.warning("Bot call notification for %s (%s...) failed, re-queued", token_symbol, token_address[:8])
+            if delivery is not None:
+                delivery.failed()
+        
+        # Varian tanpa button untuk webhook (BOT_CALL_WEBHOOK_URL): thread dibuat manual lewat !call
+        webhook_embed = embed.copy()
+        webhook_embed.add_field(name="📝 LP Call Thread", value=f"`!call {token_address}`", inline=False)
+        
+        bot_call_pending_tokens.add(token_address)
+        dispatch_queue.enqueue(channel, embed=embed, view=view, priority=PRIORITY_ALERT, label="bot_call",
+                               on_delivered=delivered, on_failed=failed, webhook_embeds=[webhook_embed])
+        log_bot_call.debug("Bot call notification queued for %s (%s...)", token_symbol, token_address[:8])
         
         # Trigger auto-trade if enabled
         if TRADING_ENABLED and TRADING_CONFIG.get("auto_trade_from_bot_call"):
@@ -3757,150 +4259,121 @@ async def send_bot_call_notification(token_data: Dict[str, object]):
         import traceback
         traceback.print_exc()
 
+def _cleanup_bot_call_state():
+    """Cleanup tokens from previous days (entry expire tengah malam, hanya bucket yang lewat yang disentuh)."""
+    if bot_call_notified_tokens.expire():
+        save_bot_call_state()
+
+def enqueue_bot_call_candidates(tokens: List[Dict[str, object]]) -> int:
+    """Masukkan / refresh token qualified yang belum di-notifikasi hari ini ke antrean. Return jumlah yang masuk."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    queued = 0
+    for token in tokens:
+        token_address = token.get("address")
+        token_symbol = token.get("symbol", "UNKNOWN")
+        if bot_call_notified_tokens.get(token_address) == today:
+            log_bot_call.debug("  %s (%s...) sudah di-notifikasi hari ini, skip", token_symbol, token_address[:8])
+            bot_call_queue.discard(token_address)
+            continue
+        if token_address in bot_call_pending_tokens:
+            continue  # notifikasi sedang dikirim
+        score = bot_call_ranking.score(token)
+        refresh = token_address in bot_call_queue
+        if bot_call_queue.offer(token_address, token, score):
+            queued += 1
+            log_bot_call.debug("  %s (%s...): score=%.2f, mcap=$%s, fees=%.2f SOL, %s", token_symbol, token_address[:8],
+                               score, f"{token.get('market_cap', 0):,.0f}", token.get("total_fees_sol", 0),
+                               "refresh" if refresh else "masuk antrean")
+        else:
+            log_bot_call.debug("  %s (%s...): score=%.2f di bawah top %d, skip", token_symbol, token_address[:8],
+                               score, bot_call_queue.capacity)
+    bot_call_queue.save()
+    return queued
+
+def pop_bot_call_candidate() -> Optional[Dict[str, object]]:
+    """Kandidat dengan skor efektif tertinggi yang belum di-notifikasi hari ini (dikeluarkan dari antrean).
+    Antrean tidak disimpan di sini: file baru ditulis setelah hasil kirim diketahui (send_bot_call_notification),
+    jadi kandidat tidak hilang kalau proses mati sebelum terkirim."""
+    today = datetime.now().strftime("%Y-%m-%d")
+    entry = bot_call_queue.pop(skip=lambda mint: bot_call_notified_tokens.get(mint) == today or mint in bot_call_pending_tokens)
+    if entry is None:
+        return None
+    log_bot_call.info("Selected BEST token: %s (%s...) score=%.2f (refresh terakhir %.2f, %.0fs lalu), mcap=$%s, fees=%.2f SOL",
+                      entry.token.get("symbol"), entry.mint[:8], bot_call_queue.effective_score(entry), entry.score,
+                      time.time() - entry.refreshed_at, f"{entry.token.get('market_cap', 0):,.0f}",
+                      entry.token.get("total_fees_sol", 0))
+    return entry.token
+
 # --- BACKGROUND TASK: POLL NEW TOKENS ---
 @tasks.loop(minutes=BOT_CALL_POLL_INTERVAL_MINUTES or 2)
+@metrics.timed_loop("poll_new_tokens")
 async def poll_new_tokens():
-    """Poll Jupiter API for new tokens and send notifications."""
+    """Discovery: poll Jupiter API dan isi antrean kandidat bot call (dikirim oleh notify_bot_call_queue)."""
     if not BOT_CALL_CHANNEL_ID:
         return
     
     try:
         new_tokens = await fetch_new_tokens()
-        
-        # Get today's date
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        # Cleanup tokens from previous days (keep only today's)
-        old_tokens = [
-            addr for addr, date in bot_call_notified_tokens.items()
-            if date != today
-        ]
-        for addr in old_tokens:
-            del bot_call_notified_tokens[addr]
-        if old_tokens:
-            save_bot_call_state()
+        _cleanup_bot_call_state()
         
         if not new_tokens:
-            print(f"[DEBUG] No qualifying tokens found after filter checks")
+            log_bot_call.debug("No qualifying tokens found after filter checks")
             return
         
-        print(f"[DEBUG] Found {len(new_tokens)} qualifying token(s), checking if already notified...")
-        
-        # Filter out tokens already notified today with detailed logging
-        unnotified_tokens = []
-        for token in new_tokens:
-            token_address = token.get("address")
-            token_symbol = token.get("symbol", "UNKNOWN")
+        log_bot_call.debug("Found %d qualifying token(s), ranking ke antrean...", len(new_tokens))
+        queued = enqueue_bot_call_candidates(new_tokens)
+        log_bot_call.info("%d token(s) masuk/refresh antrean, %d kandidat menunggu notifikasi", queued, len(bot_call_queue))
             
-            if token_address not in bot_call_notified_tokens:
-                print(f"[DEBUG]   {token_symbol} ({token_address[:8]}...) belum pernah di-notifikasi, ✅ tambahkan ke list")
-                unnotified_tokens.append(token)
-            elif bot_call_notified_tokens.get(token_address) != today:
-                notified_date = bot_call_notified_tokens.get(token_address)
-                print(f"[DEBUG]   {token_symbol} ({token_address[:8]}...) sudah di-notifikasi sebelumnya (date: {notified_date}), tapi bukan hari ini ({today}), ✅ tambahkan ke list")
-                unnotified_tokens.append(token)
-            else:
-                print(f"[DEBUG]   {token_symbol} ({token_address[:8]}...) sudah di-notifikasi hari ini, ❌ skip")
-        
-        if not unnotified_tokens:
-            print(f"[DEBUG] Semua token sudah di-notifikasi hari ini, tidak ada yang perlu di-notifikasi")
+    except Exception as e:
+        log_bot_call.exception("Error in poll_new_tokens: %s", e)
+
+# --- BACKGROUND TASK: KIRIM BOT CALL DARI ANTREAN ---
+@tasks.loop(seconds=BOT_CALL_NOTIFY_INTERVAL_SEC)
+@metrics.timed_loop("notify_bot_call_queue")
+async def notify_bot_call_queue():
+    """Kirim satu kandidat bot call dengan skor tertinggi dari antrean (ritme terpisah dari discovery)."""
+    if not BOT_CALL_CHANNEL_ID:
+        return
+    
+    try:
+        _cleanup_bot_call_state()
+        best_token = pop_bot_call_candidate()
+        if best_token is None:
             return
-        
-        print(f"[DEBUG] {len(unnotified_tokens)} token(s) perlu di-notifikasi")
-        
-        # Calculate score for each token (prioritize market cap 60%, fees 40%)
-        def calculate_score(token):
-            market_cap = token.get("market_cap", 0) or 0
-            fees_sol = token.get("total_fees_sol", 0) or 0
-            market_cap_score = (market_cap / 1_000_000) * 0.6
-            fees_score = (fees_sol / 100) * 0.4
-            return market_cap_score + fees_score
-        
-        # Log all qualifying tokens before sorting
-        print(f"[DEBUG] All qualifying tokens:")
-        for i, token in enumerate(unnotified_tokens, 1):
-            token_symbol = token.get("symbol", "UNKNOWN")
-            token_address = token.get("address", "N/A")
-            score = calculate_score(token)
-            print(f"  {i}. {token_symbol} ({token_address[:8]}...): score={score:.2f}, mcap=${token.get('market_cap', 0):,.0f}, fees={token.get('total_fees_sol', 0):.2f} SOL")
-        
-        # Sort by score and get best token
-        unnotified_tokens.sort(key=calculate_score, reverse=True)
-        best_token = unnotified_tokens[0]
-        
-        print(f"[DEBUG] ✅ Selected BEST token: {best_token.get('symbol')} ({best_token.get('address', 'N/A')[:8]}...)")
-        print(f"[DEBUG]    Score: {calculate_score(best_token):.2f}")
-        print(f"[DEBUG]    Market cap: ${best_token.get('market_cap', 0):,.0f}")
-        print(f"[DEBUG]    Fees: {best_token.get('total_fees_sol', 0):.2f} SOL")
-        
         await send_bot_call_notification(best_token)
-        
-        # Cleanup tokens from previous days (keep only today's)
-        today = datetime.now().strftime("%Y-%m-%d")
-        old_tokens = [
-            addr for addr, date in bot_call_notified_tokens.items()
-            if date != today
-        ]
-        for addr in old_tokens:
-            del bot_call_notified_tokens[addr]
-        if old_tokens:
-            save_bot_call_state()
-            
     except Exception as e:
-        print(f"[ERROR] Error in poll_new_tokens: {e}")
-        import traceback
-        traceback.print_exc()
+        log_bot_call.exception("Error in notify_bot_call_queue: %s", e)
 
 async def trigger_bot_call_manual():
     """Manually trigger bot call notification (for testing)."""
     if not BOT_CALL_CHANNEL_ID:
         return False, "BOT_CALL_CHANNEL_ID not set"
+    if lease_manager is not None and not lease_manager.holds("poll_new_tokens"):
+        # Antrean + dedup bot call hanya boleh diubah replica pemegang lease discovery
+        return False, "Bot call handled by another replica (poll_new_tokens lease)"
     
     try:
         new_tokens = await fetch_new_tokens()
+        _cleanup_bot_call_state()
         
-        # Get today's date
-        today = datetime.now().strftime("%Y-%m-%d")
-        
-        # Cleanup tokens from previous days (keep only today's)
-        old_tokens = [
-            addr for addr, date in bot_call_notified_tokens.items()
-            if date != today
-        ]
-        for addr in old_tokens:
-            del bot_call_notified_tokens[addr]
-        if old_tokens:
-            save_bot_call_state()
-        
-        if not new_tokens:
+        if new_tokens:
+            enqueue_bot_call_candidates(new_tokens)
+        elif not len(bot_call_queue):
             return False, "No tokens found that meet the criteria"
         
-        # Filter out tokens already notified today
-        unnotified_tokens = [
-            token for token in new_tokens
-            if token.get("address") not in bot_call_notified_tokens or 
-               bot_call_notified_tokens.get(token.get("address")) != today
-        ]
-        
-        if not unnotified_tokens:
+        best_token = pop_bot_call_candidate()
+        if best_token is None:
             return False, "All tokens have already been notified today"
         
-        # Calculate score for each token (prioritize market cap 60%, fees 40%)
-        def calculate_score(token):
-            market_cap = token.get("market_cap", 0) or 0
-            fees_sol = token.get("total_fees_sol", 0) or 0
-            market_cap_score = (market_cap / 1_000_000) * 0.6
-            fees_score = (fees_sol / 100) * 0.4
-            return market_cap_score + fees_score
-        
-        # Sort by score and get best token
-        unnotified_tokens.sort(key=calculate_score, reverse=True)
-        best_token = unnotified_tokens[0]
-        
-        print(f"[DEBUG] Manual trigger - Selected BEST token: {best_token.get('symbol')} (score: {calculate_score(best_token):.2f}, market cap: ${best_token.get('market_cap', 0):,.0f}, fees: {best_token.get('total_fees_sol', 0):.2f} SOL)")
-        
-        await send_bot_call_notification(best_token)
+        print(f"[DEBUG] Manual trigger - Selected BEST token: {best_token.get('symbol')} (market cap: ${best_token.get('market_cap', 0):,.0f}, fees: {best_token.get('total_fees_sol', 0):.2f} SOL)")
         
+        delivery = Delivery()
+        await send_bot_call_notification(best_token, delivery)
+        delivered = await delivery.wait()
+        if delivered is False:
+            return False, f"Failed to send notification for {best_token.get('symbol')} (re-queued)"
+        if delivered is None:
+            return True, f"Notification for {best_token.get('symbol')} ({best_token.get('name')}) queued, not delivered yet"
         return True, f"Sent notification for {best_token.get('symbol')} ({best_token.get('name')})"
         
     except Exception as e:
@@ -3915,6 +4388,7 @@ async def trigger_bot_call_manual():
 # ============================================================================
 
 @tasks.loop(seconds=15)  # Check every 15 seconds (configurable via TRADING_CHECK_INTERVAL)
+@metrics.timed_loop("monitor_trading_positions")
 async def monitor_trading_positions():
     """Background task to monitor active trading positions and auto-sell at TP/SL."""
     if not TRADING_ENABLED or not active_positions:
@@ -4048,6 +4522,7 @@ async def auto_trade_from_bot_call(token_data: Dict):
 # ============================================================================
 
 @tasks.loop(seconds=60)  # Scan setiap 60 detik (configurable via HYPE_SCAN_INTERVAL)
+@metrics.timed_loop("scan_hype_tokens")
 async def scan_hype_tokens():
     """Background task untuk scan token dengan volume spike dan hype signals."""
     if not TRADING_ENABLED or not TRADING_CONFIG.get("hype_trading_enabled"):
@@ -4120,14 +4595,14 @@ async def fetch_recent_swaps(wallet: str, max_retries: int = 2) -> List[Dict]:
     
     # Check circuit breaker first
     if circuit_breaker_active and time.time() < circuit_breaker_until:
-        print(f"[SKIP] Circuit breaker active, skipping wallet {wallet[:8]}...")
+        log_wallet.debug("Circuit breaker active, skipping wallet %s...", wallet[:8])
         return []
     
     # Wait for rate limit before making request
     await wait_for_rate_limit()
     
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
     
     url = f"https://api.helius.xyz/v0/addresses/{wallet}/transactions"
     params = {
@@ -4150,17 +4625,17 @@ async def fetch_recent_swaps(wallet: str, max_retries: int = 2) -> List[Dict]:
                     # If multiple 429s, activate circuit breaker
                     if consecutive_429s >= 2:
                         activate_circuit_breaker(duration=600)  # 10 minutes
-                        print(f"[ERROR] Multiple 429 errors, circuit breaker activated for 10 minutes")
+                        log_wallet.error("Multiple 429 errors, circuit breaker activated for 10 minutes")
                         return []
                     
                     if attempt < max_retries - 1:
-                        print(f"[WARN] Rate limited (429) for {wallet[:8]}... - waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
+                        log_wallet.warning("Rate limited (429) for %s... - waiting %ss before retry %d/%d", wallet[:8], wait_time, attempt + 1, max_retries)
                         await asyncio.sleep(wait_time)
                         # Wait again for rate limit after backoff
                         await wait_for_rate_limit()
                         continue
                     else:
-                        print(f"[ERROR] Rate limited (429) for {wallet[:8]}... - max retries reached, activating circuit breaker")
+                        log_wallet.error("Rate limited (429) for %s... - max retries reached, activating circuit breaker", wallet[:8])
                         activate_circuit_breaker(duration=300)  # 5 minutes
                         return []
                 
@@ -4175,25 +4650,25 @@ async def fetch_recent_swaps(wallet: str, max_retries: int = 2) -> List[Dict]:
                 # If multiple 429s, activate circuit breaker
                 if consecutive_429s >= 2:
                     activate_circuit_breaker(duration=600)  # 10 minutes
-                    print(f"[ERROR] Multiple 429 errors, circuit breaker activated for 10 minutes")
+                    log_wallet.error("Multiple 429 errors, circuit breaker activated for 10 minutes")
                     return []
                 
                 if attempt < max_retries - 1:
                     wait_time = 120 * (2 ** attempt)  # Exponential backoff: 120s, 240s
                     wait_time = min(wait_time, 300)  # Cap at 5 minutes
-                    print(f"[WARN] Rate limited (429) for {wallet[:8]}... - waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
+                    log_wallet.warning("Rate limited (429) for %s... - waiting %ss before retry %d/%d", wallet[:8], wait_time, attempt + 1, max_retries)
                     await asyncio.sleep(wait_time)
                     await wait_for_rate_limit()
                     continue
                 else:
-                    print(f"[ERROR] Rate limited (429) for {wallet[:8]}... - max retries reached, activating circuit breaker")
+                    log_wallet.error("Rate limited (429) for %s... - max retries reached, activating circuit breaker", wallet[:8])
                     activate_circuit_breaker(duration=300)  # 5 minutes
                     return []
             else:
-                print(f"[ERROR] HTTP {e.status} error fetching swaps for {wallet[:8]}...: {e}")
+                log_wallet.error("HTTP %s error fetching swaps for %s...: %s", e.status, wallet[:8], e)
                 return []
         except Exception as e:
-            print(f"[ERROR] Failed to fetch swaps for {wallet[:8]}...: {e}")
+            log_wallet.error("Failed to fetch swaps for %s...: %s", wallet[:8], e)
             return []
     
     return []
@@ -4224,6 +4699,31 @@ def is_buy_transaction(tx: Dict, wallet: str) -> bool:
     
     return sol_out and token_in
 
+# --- WALLET CURSOR (last_sig) ---
+def _wallet_cursor(key: str, fallback: Optional[str]) -> Optional[str]:
+    """last_sig untuk wallet; worker yang dikoordinasi gateway membaca cursor dari wallet_cursors/ (bukan file tracked wallets)."""
+    if wallet_partition.coordinated:
+        sig = wallet_partition.cursors.get(key)
+        if sig is not None:
+            return sig
+    return fallback
+
+def _commit_user_wallet_cursor(user, wallet: str, sig: Optional[str]):
+    """Simpan last_sig wallet user. poll_wallet_buys mengirim copy dict, jadi update entry aslinya di sini."""
+    if wallet_partition.coordinated:
+        wallet_partition.cursors.set(f"{user.id}:{wallet}", sig)
+        return
+    entry = tracked_wallets.get(str(user.id), {}).get(wallet)
+    if entry is not None:
+        entry['last_sig'] = sig
+    save_tracked_wallets()
+
+def _commit_default_wallet_cursor(wallet: str, sig: Optional[str]):
+    if wallet_partition.coordinated:
+        wallet_partition.cursors.set(f"default:{wallet}", sig)
+        return
+    save_default_wallets()
+
 # --- HELPER: SEND BUY NOTIFICATION ---
 async def send_buy_notification(user: discord.User, wallet_data: Dict):
     """Send DM or channel notification for buy event"""
@@ -4237,7 +4737,7 @@ async def send_buy_notification(user: discord.User, wallet_data: Dict):
     # Inisialisasi pointer pertama kali: jangan spam notifikasi lama
     if last_sig is None:
         wallet_data['last_sig'] = swaps[0].get('signature')
-        save_tracked_wallets()
+        _commit_user_wallet_cursor(user, wallet, wallet_data['last_sig'])
         return
 
     # Kumpulkan tx yang lebih baru dari last_sig (data dari Helius: newest-first)
@@ -4299,25 +4799,23 @@ async def send_buy_notification(user: discord.User, wallet_data: Dict):
         embed.add_field(name="Tx", value=f"[View Tx](https://solscan.io/tx/{signature})", inline=True)
         embed.add_field(name="Links", value=links_text, inline=False)
         
-        try:
-            await user.send(embed=embed)
-            print(f"[DEBUG] Buy notification sent to {user.name} for {signature}")
-        except discord.Forbidden:
-            # Fallback to tracker channel
-            channel = bot.get_channel(TRACK_WALLET_CHANNEL_ID)
-            if channel:
-                role_mention = f"<@&{TRACK_WALLET_ROLE_ID}>" if TRACK_WALLET_ROLE_ID else ""
-                mention_text = f"{user.mention} {role_mention}".strip()
-                await channel.send(mention_text, embed=embed)
+        # Fallback to tracker channel kalau DM ditolak (Forbidden)
+        fallback = None
+        channel = bot.get_channel(TRACK_WALLET_CHANNEL_ID)
+        if channel:
+            role_mention = f"<@&{TRACK_WALLET_ROLE_ID}>" if TRACK_WALLET_ROLE_ID else ""
+            fallback = (channel, f"{user.mention} {role_mention}".strip())
+        dispatch_queue.enqueue(user, embed=embed, priority=PRIORITY_ALERT, fallback=fallback, label="buy")
+        log_wallet.info("Buy notification queued for %s for %s", user.name, signature)
         
         # Update last_sig ke signature terbaru yang diproses
         wallet_data['last_sig'] = signature
-        save_tracked_wallets()
+        _commit_user_wallet_cursor(user, wallet, wallet_data['last_sig'])
         return
 
     # Tidak ada buy baru yang fresh, tetap majukan pointer ke paling baru untuk hindari spam lama
     wallet_data['last_sig'] = swaps[0].get('signature')
-    save_tracked_wallets()
+    _commit_user_wallet_cursor(user, wallet, wallet_data['last_sig'])
 
 async def send_buy_notification_global(wallet_data: Dict):
     """Send channel notification (role-wide) for buy event from default wallets."""
@@ -4335,7 +4833,7 @@ async def send_buy_notification_global(wallet_data: Dict):
     # Inisialisasi pointer pertama kali
     if last_sig is None:
         wallet_data['last_sig'] = swaps[0].get('signature')
-        save_default_wallets()
+        _commit_default_wallet_cursor(wallet, wallet_data['last_sig'])
         return
 
     new_txs = []
@@ -4396,21 +4894,41 @@ async def send_buy_notification_global(wallet_data: Dict):
         embed.add_field(name="Links", value=links_text, inline=False)
 
         role_mention = f"<@&{TRACK_WALLET_ROLE_ID}>" if TRACK_WALLET_ROLE_ID else ""
-        await channel.send(role_mention, embed=embed)
-        print(f"[DEBUG] Global buy notification sent for {signature}")
+        dispatch_queue.enqueue(channel, role_mention, embed=embed, priority=PRIORITY_ALERT, label="buy_global")
+        log_wallet.info("Global buy notification queued for %s", signature)
 
         wallet_data['last_sig'] = signature
-        save_default_wallets()
+        _commit_default_wallet_cursor(wallet, wallet_data['last_sig'])
         return
 
     wallet_data['last_sig'] = swaps[0].get('signature')
-    save_default_wallets()
+    _commit_default_wallet_cursor(wallet, wallet_data['last_sig'])
+
+def apply_wallet_partition(members: List[str]):
+    """Rebalance setelah worker wallet join/leave: rebuild hash ring + bagi budget request Helius."""
+    global RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW, MIN_DELAY_BETWEEN_REQUESTS, MAX_DELAY_BETWEEN_REQUESTS
+    wallets = [w for wallets in tracked_wallets.values() for w in wallets] + [item['wallet'] for item in default_tracked_wallets]
+    gained, lost = wallet_partition.set_members(members, wallets)
+    RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW = wallet_partition.budget_share(HELIUS_RATE_LIMIT_PER_MIN, _HELIUS_RATE_WINDOW)
+    if wallet_partition.active:
+        # Jeda antar request mengikuti bagian budget, supaya total semua worker tetap <= budget
+        MIN_DELAY_BETWEEN_REQUESTS = RATE_LIMIT_WINDOW / RATE_LIMIT_REQUESTS
+        MAX_DELAY_BETWEEN_REQUESTS = MIN_DELAY_BETWEEN_REQUESTS * 1.5
+    else:
+        MIN_DELAY_BETWEEN_REQUESTS, MAX_DELAY_BETWEEN_REQUESTS = _HELIUS_DEFAULT_DELAYS
+    owned = sum(1 for w in wallets if wallet_partition.owns(w))
+    if members and wallet_partition.worker_id not in members:
+        log_wallet.warning("Wallet partition: %s is not in the announced members %s; polling no wallets",
+                           wallet_partition.worker_id, ", ".join(sorted(members)))
+    log_wallet.info("Wallet partition: %d worker(s), %s owns %d/%d wallet(s) (+%d/-%d), budget %d req/%.0fs",
+                    len(members), wallet_partition.worker_id, owned, len(wallets), gained, lost, RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW)
 
 # --- BACKGROUND TASK: POLL FOR BUYS ---
 @tasks.loop(minutes=5)  # Poll every 5 minutes (increased to reduce rate limit issues)
+@metrics.timed_loop("poll_wallet_buys")
 async def poll_wallet_buys():
     if not HELIUS_API_KEY:
-        print("[DEBUG] Skipping poll - No Helius API key")
+        log_wallet.debug("Skipping poll - No Helius API key")
         return
     
     global circuit_breaker_active, circuit_breaker_until
@@ -4418,15 +4936,16 @@ async def poll_wallet_buys():
     # Check circuit breaker - skip entire cycle if active
     if circuit_breaker_active and time.time() < circuit_breaker_until:
         remaining = circuit_breaker_until - time.time()
-        print(f"[SKIP] Polling skipped - Circuit breaker active for {remaining:.0f}s more")
+        log_wallet.info("Polling skipped - Circuit breaker active for %.0fs more", remaining)
         return
     
-    # Count total wallets to track progress
-    total_wallets = sum(len(wallets) for wallets in tracked_wallets.values()) + len(default_tracked_wallets)
+    # Count total wallets to track progress (hanya wallet milik partisi worker ini)
+    total_wallets = sum(1 for wallets in tracked_wallets.values() for w in wallets if wallet_partition.owns(w))
+    total_wallets += sum(1 for item in default_tracked_wallets if wallet_partition.owns(item['wallet']))
     if total_wallets == 0:
         return
     
-    print(f"[DEBUG] Polling {total_wallets} wallet(s) for buy transactions...")
+    log_wallet.info("Polling %d wallet(s) for buy transactions...", total_wallets)
     
     processed = 0
     skipped = 0
@@ -4435,54 +4954,62 @@ async def poll_wallet_buys():
     for user_id_str, wallets_data in tracked_wallets.items():
         # Check circuit breaker before each user
         if circuit_breaker_active and time.time() < circuit_breaker_until:
-            print(f"[SKIP] Stopping polling due to circuit breaker")
+            log_wallet.info("Stopping polling due to circuit breaker")
             break
+        owned = [w for w in wallets_data if wallet_partition.owns(w)]
+        if not owned:
+            continue
             
         try:
             user = await bot.fetch_user(int(user_id_str))
-            for wallet, wallet_data in wallets_data.items():
+            for wallet in owned:
+                wallet_data = wallets_data[wallet]
                 # Check circuit breaker before each wallet
                 if circuit_breaker_active and time.time() < circuit_breaker_until:
-                    print(f"[SKIP] Stopping polling due to circuit breaker")
+                    log_wallet.info("Stopping polling due to circuit breaker")
                     break
                     
                 try:
-                    await send_buy_notification(user, {'wallet': wallet, 'alias': wallet_data['alias'], 'last_sig': wallet_data['last_sig']})
+                    last_sig = _wallet_cursor(f"{user_id_str}:{wallet}", wallet_data['last_sig'])
+                    await send_buy_notification(user, {'wallet': wallet, 'alias': wallet_data['alias'], 'last_sig': last_sig})
                     processed += 1
                     # Rate limiting is handled in fetch_recent_swaps via wait_for_rate_limit()
                 except Exception as e:
-                    print(f"[ERROR] Poll error for wallet {wallet[:8]}... of user {user_id_str}: {e}")
+                    log_wallet.error("Poll error for wallet %s... of user %s: %s", wallet[:8], user_id_str, e)
                     skipped += 1
                     # If it's a rate limit error, wait a bit before continuing
                     if "429" in str(e) or "rate limit" in str(e).lower():
                         await asyncio.sleep(10)
                     continue
         except Exception as e:
-            print(f"[ERROR] Poll error for user {user_id_str}: {e}")
+            log_wallet.error("Poll error for user %s: %s", user_id_str, e)
             skipped += 1
             continue
     
     # Poll global default wallets (role-wide) - only if circuit breaker not active
     if not (circuit_breaker_active and time.time() < circuit_breaker_until):
         for item in default_tracked_wallets:
+            if not wallet_partition.owns(item['wallet']):
+                continue
             # Check circuit breaker before each wallet
             if circuit_breaker_active and time.time() < circuit_breaker_until:
-                print(f"[SKIP] Stopping polling due to circuit breaker")
+                log_wallet.info("Stopping polling due to circuit breaker")
                 break
                 
             try:
+                item['last_sig'] = _wallet_cursor(f"default:{item['wallet']}", item.get('last_sig'))
                 await send_buy_notification_global(item)
                 processed += 1
                 # Rate limiting is handled in fetch_recent_swaps via wait_for_rate_limit()
             except Exception as e:
-                print(f"[ERROR] Poll error for default wallet {item.get('wallet', 'unknown')[:8]}...: {e}")
+                log_wallet.error("Poll error for default wallet %s...: %s", item.get('wallet', 'unknown')[:8], e)
                 skipped += 1
                 # If it's a rate limit error, wait a bit before continuing
                 if "429" in str(e) or "rate limit" in str(e).lower():
                     await asyncio.sleep(10)
                 continue
     
-    print(f"[DEBUG] Completed polling cycle: {processed} processed, {skipped} skipped")
+    log_wallet.info("Completed polling cycle: %d processed, %d skipped", processed, skipped)
 
 # --- HELPER: SETUP VERIFY MESSAGE ---
 async def setup_verify_message():
@@ -4714,47 +5241,44 @@ async def scan_and_archive_old_threads():
                     print(f"[DEBUG] Archived old thread '{thread.name}' (umur: {thread_age_minutes:.1f} menit)")
                 except discord.Forbidden:
                     print(f"[WARN] Tidak punya izin untuk archive thread {thread.id}")
-                except Exception as e:
-                    print(f"[ERROR] Gagal archive thread {thread.id}: {e}")
-            else:
-                # Thread masih baru, tambahkan ke tracking untuk auto-archive nanti
-                remaining_minutes = THREAD_AUTO_ARCHIVE_MINUTES - thread_age_minutes
-                # Simpan dengan timestamp yang sudah adjusted
-                threads_to_archive[thread.id] = now - (thread_age_minutes * 60)
-                print(f"[DEBUG] Added existing thread '{thread.name}' to tracking (akan di-archive dalam {remaining_minutes:.1f} menit)")
-        
-        print(f"[DEBUG] Scan thread lama selesai: {scanned_count} thread scanned, {archived_count} thread di-archive")
-        
-    except Exception as e:
-        print(f"[ERROR] Error saat scan thread lama: {e}")
-        import traceback
-        traceback.print_exc()
-
-# --- EVENT: BOT ONLINE ---
-@bot.event
-async def on_ready():
-    global http_session
-    print(f"✅ {bot.user} sudah online dan siap digunakan!")
-    print(f"[DEBUG] Connected to {len(bot.guilds)} guild(s): {[g.name for g in bot.guilds]}")
-    
-    # Initialize aiohttp session
-    if not http_session:
-        http_session = aiohttp.ClientSession()
-        print("[DEBUG] Initialized aiohttp session")
-    
-    # Sync slash commands
-    try:
-        synced = await bot.tree.sync()
-        print(f"[DEBUG] Synced {len(synced)} slash commands")
+                except Exception as e:
+                    print(f"[ERROR] Gagal archive thread {thread.id}: {e}")
+            else:
+                # Thread masih baru, tambahkan ke tracking untuk auto-archive nanti
+                remaining_minutes = THREAD_AUTO_ARCHIVE_MINUTES - thread_age_minutes
+                # Simpan dengan timestamp yang sudah adjusted
+                threads_to_archive[thread.id] = now - (thread_age_minutes * 60)
+                print(f"[DEBUG] Added existing thread '{thread.name}' to tracking (akan di-archive dalam {remaining_minutes:.1f} menit)")
+        
+        print(f"[DEBUG] Scan thread lama selesai: {scanned_count} thread scanned, {archived_count} thread di-archive")
+        
     except Exception as e:
-        print(f"[ERROR] Failed to sync slash commands: {e}")
-    
-    # Setup pesan verifikasi
-    await setup_verify_message()
-    
-    # Setup pesan fitur (BARU)
-    await setup_feature_message()
-    
+        print(f"[ERROR] Error saat scan thread lama: {e}")
+        import traceback
+        traceback.print_exc()
+
+# --- METRICS: GAUGE RUNTIME STATE ---
+def register_runtime_gauges():
+    """Gauge yang dihitung saat scrape: panjang queue, ukuran cache, jumlah event terjadwal."""
+    queue_gauge = metrics.REGISTRY.gauge("bot_queue_depth", "Items waiting in an in-process queue", ("queue",))
+    queue_gauge.set_function(lambda: len(dispatch_queue), queue="dispatch")
+    queue_gauge.set_function(lambda: len(reminder_scheduler), queue="reminder_scheduler")
+    cache_gauge = metrics.REGISTRY.gauge("bot_cache_entries", "Entries held by an in-memory cache", ("cache",))
+    cache_gauge.set_function(lambda: len(token_metadata_cache), cache="token_metadata")
+    cache_gauge.set_function(lambda: len(bot_call_fee_cache), cache="bot_call_fees")
+    cache_gauge.set_function(lambda: len(futardio_feed.snapshot), cache="futardio_feed")
+    cache_gauge.set_function(lambda: len(metadao_page_cache.get("items") or []), cache="metadao_page")
+    dispatch_gauge = metrics.REGISTRY.gauge("bot_dispatch_stats", "Outbound dispatch queue counters (since start)", ("stat",))
+    for stat in dispatch_queue.stats:
+        dispatch_gauge.set_function(lambda stat=stat: dispatch_queue.stats[stat], stat=stat)
+    breaker_gauge = metrics.REGISTRY.gauge("bot_circuit_breaker_open", "1 while the circuit breaker is open", ("breaker",))
+    breaker_gauge.set_function(lambda: int(circuit_breaker_active and time.time() < circuit_breaker_until), breaker="helius")
+    breaker_gauge.set_function(lambda: int(meteora_circuit_breaker_active and time.time() < meteora_circuit_breaker_until), breaker="meteora")
+    price_gauge = metrics.REGISTRY.gauge("bot_price_age_seconds", "Age of the cached price (-1 = never fetched)", ("price",))
+    price_gauge.set_function(lambda: sol_price_oracle.age if sol_price_oracle.age is not None else -1, price="sol_usd")
+
+def start_engine_loops():
+    """Start poller engine (wallet, MetaDAO, Futardio, bot call, trading/hype, launch tracker) di proses ini."""
     # Start polling task if Helius key available
     if HELIUS_API_KEY:
         poll_wallet_buys.start()
@@ -4776,24 +5300,15 @@ async def on_ready():
     
     # Start bot call polling task if channel ID is set
     if BOT_CALL_CHANNEL_ID:
+        if not notify_bot_call_queue.is_running():
+            notify_bot_call_queue.start()
         if not poll_new_tokens.is_running():
             poll_new_tokens.start()
+            print(f"[DEBUG] Bot call notifier every {BOT_CALL_NOTIFY_INTERVAL_SEC}s (queue top {BOT_CALL_QUEUE_SIZE}, weights {BOT_CALL_SCORE_WEIGHTS})")
             print(f"[DEBUG] Bot call polling started (market cap: {BOT_CALL_MIN_MARKET_CAP:,.0f} - {BOT_CALL_MAX_MARKET_CAP:,.0f}, fees >= {BOT_CALL_MIN_FEES_SOL} SOL, price change 1h >= {BOT_CALL_MIN_PRICE_CHANGE_1H}%)")
     else:
         print("[WARN] BOT_CALL_CHANNEL_ID not set - bot call monitoring disabled")
     
-    # Scan dan archive thread lama yang sudah ada (hanya jika flag enabled)
-    if AUTO_SCAN_OLD_THREADS_ON_STARTUP:
-        print("[DEBUG] Auto-scan thread lama enabled, scanning...")
-        await scan_and_archive_old_threads()
-    else:
-        print("[DEBUG] Auto-scan thread lama disabled (set AUTO_SCAN_OLD_THREADS=true untuk enable)")
-    
-    # Start auto-archive thread task
-    if not auto_archive_threads.is_running():
-        auto_archive_threads.start()
-        print("[DEBUG] Thread auto-archive task started (15 menit)")
-    
     # Start trading position monitor task if trading is enabled
     if TRADING_ENABLED:
         if not monitor_trading_positions.is_running():
@@ -4820,14 +5335,142 @@ async def on_ready():
             print(f"[LAUNCH_TRACKER] Tracking {len(launch_tracker_tokens)} token(s)")
     else:
         print("[LAUNCH_TRACKER] DISABLED - set LAUNCH_TRACKER_ENABLED=true to enable")
+
+# --- ENGINE SPLIT (gateway <-> worker) ---
+# State file bersama: nama -> loader (reload dari disk saat proses lain menyimpan)
+STATE_RELOADERS = {
+    "tracked_wallets": load_tracked_wallets,
+    "default_wallets": load_default_wallets,
+    "launch_tracker": load_launch_tracker_state,
+    "trading_positions": load_trading_positions,
+    "hype": load_hype_state,
+}
+
+def reload_shared_state(name: str):
+    loader = STATE_RELOADERS.get(name)
+    if loader is None:
+        print(f"[ENGINE] Unknown shared state: {name}")
+        return
+    loader()
+
+async def _resolve_ipc_target(spec: Dict):
+    """Channel/user asli untuk target dari worker."""
+    target_id = int(spec["id"])
+    try:
+        if spec.get("kind") == "user":
+            return bot.get_user(target_id) or await bot.fetch_user(target_id)
+        return bot.get_channel(target_id) or await bot.fetch_channel(target_id)
+    except discord.HTTPException as e:
+        print(f"[ENGINE] Failed to resolve {spec}: {e}")
+        return None
+
+async def start_engine_bridge():
+    """Gateway mode: terima notifikasi dari worker lewat Unix socket dan kirim lewat dispatch_queue."""
+    global engine_link
+    if engine_link is not None:
+        return
+    # View dibangun ulang di gateway lewat register_view (CreateThreadView, RefreshICOView)
+    bridge = EngineBridge(ENGINE_IPC_SOCKET, dispatch_queue, _resolve_ipc_target, on_state=reload_shared_state)
+    try:
+        await bridge.start()
+    except OSError as e:
+        print(f"[ERROR] Failed to start engine bridge on {ENGINE_IPC_SOCKET}: {e}")
+        return
+    engine_link = bridge
+    print(f"[ENGINE] Gateway mode: pollers run in worker processes (python headless.py --gateway {ENGINE_IPC_SOCKET})")
+
+# --- EVENT: BOT ONLINE ---
+@bot.event
+async def on_ready():
+    global http_session
+    print(f"✅ {bot.user} sudah online dan siap digunakan!")
+    print(f"[DEBUG] Connected to {len(bot.guilds)} guild(s): {[g.name for g in bot.guilds]}")
     
-    # Start ICO tracker task
-    if ICO_TRACKER_ENABLED:
-        if not poll_ico_tracker.is_running():
-            poll_ico_tracker.start()
-            print(f"[ICO_TRACKER] Started (check every 30 minutes)")
-            print(f"[ICO_TRACKER] Tracking {len(ico_tracker_list)} ICO(s)")
+    # Initialize aiohttp session
+    if not http_session:
+        http_session = http_manager.session()
+        print("[DEBUG] Initialized aiohttp session")
+    
+    # Start outbound notification queue sebelum poller mulai enqueue
+    if not dispatch_queue.running:
+        webhook_owner = {}
+        for env_name, channel_id, url in (
+            ("BOT_CALL_WEBHOOK_URL", BOT_CALL_CHANNEL_ID, BOT_CALL_WEBHOOK_URL),
+            ("DAMM_WEBHOOK_URL", DAMM_CHANNEL_ID, DAMM_WEBHOOK_URL),
+            ("ICO_WEBHOOK_URL", ICO_TRACKER_CHANNEL_ID, ICO_WEBHOOK_URL),
+            ("TRADING_WEBHOOK_URL", TRADING_CHANNEL_ID, TRADING_WEBHOOK_URL),
+        ):
+            if not channel_id or not url:
+                continue
+            # Mis. ICO_TRACKER_CHANNEL_ID default = DAMM_CHANNEL_ID: URL terakhir menimpa yang sebelumnya
+            if channel_id in webhook_owner and webhook_owner[channel_id][1] != url:
+                print(f"[WARN] {env_name} and {webhook_owner[channel_id][0]} map to the same channel {channel_id}; "
+                      f"{env_name} overrides {webhook_owner[channel_id][0]}")
+            webhook_owner[channel_id] = (env_name, url)
+            dispatch_queue.set_webhook(channel_id, url)
+        dispatch_queue.webhook_username = bot.user.name
+        dispatch_queue.webhook_avatar_url = bot.user.display_avatar.url
+        if dispatch_queue.webhook_channels:
+            print(f"[DISPATCH] Webhook transport enabled for {len(dispatch_queue.webhook_channels)} channel(s)")
+        dispatch_queue.start()
+        print(f"[DISPATCH] Notification queue started ({DISPATCH_RATE_LIMIT} msg / {DISPATCH_RATE_WINDOW_SEC:g}s per channel)")
+
+    if not sol_price_oracle.running:
+        sol_price_oracle.start()
+        print(f"[PRICE] SOL price oracle started (refresh every {SOL_PRICE_REFRESH_SEC:g}s, max age {SOL_PRICE_MAX_AGE_SEC:g}s)")
+
+    if LOOP_LAG_MONITOR_ENABLED and not loop_lag_monitor.running:
+        loop_lag_monitor.start()
+        print(f"[LOOP_LAG] Monitor started (interval {LOOP_LAG_INTERVAL_SEC:g}s, threshold {LOOP_LAG_THRESHOLD_SEC * 1000:.0f}ms)")
+
+    # Metrics endpoint (on_ready bisa terpanggil lagi setelah reconnect -> start sekali saja)
+    global metrics_runner
+    if METRICS_ENABLED and metrics_runner is None:
+        register_runtime_gauges()
+        try:
+            metrics_runner = await metrics.start_metrics_server(METRICS_HOST, METRICS_PORT)
+            print(f"[METRICS] Serving http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        except OSError as e:
+            print(f"[ERROR] Failed to start metrics endpoint on {METRICS_HOST}:{METRICS_PORT}: {e}")
+
+    # Leader election sebelum loop apa pun start (on_ready bisa terpanggil lagi -> start sekali saja)
+    await start_lease_manager(handles_messages=True)
+
+    # Sync slash commands
+    try:
+        synced = await bot.tree.sync()
+        print(f"[DEBUG] Synced {len(synced)} slash commands")
+    except Exception as e:
+        print(f"[ERROR] Failed to sync slash commands: {e}")
+    
+    # Setup pesan verifikasi
+    await setup_verify_message()
+    
+    # Setup pesan fitur (BARU)
+    await setup_feature_message()
+    
+    # Scan dan archive thread lama yang sudah ada (hanya jika flag enabled)
+    if AUTO_SCAN_OLD_THREADS_ON_STARTUP:
+        print("[DEBUG] Auto-scan thread lama enabled, scanning...")
+        await scan_and_archive_old_threads()
     else:
+        print("[DEBUG] Auto-scan thread lama disabled (set AUTO_SCAN_OLD_THREADS=true untuk enable)")
+    
+    # Start auto-archive thread task
+    if not auto_archive_threads.is_running():
+        auto_archive_threads.start()
+        print("[DEBUG] Thread auto-archive task started (15 menit)")
+    
+    if ENGINE_MODE == "gateway":
+        await start_engine_bridge()
+    else:
+        start_engine_loops()
+
+    # Start deadline scheduler (ICO tracker reminders + MetaDAO 1-hour reminder)
+    if not run_reminder_scheduler.is_running():
+        run_reminder_scheduler.start()
+        print(f"[SCHEDULER] Reminder scheduler started ({len(reminder_scheduler)} event(s) pending)")
+    if not ICO_TRACKER_ENABLED:
         print("[ICO_TRACKER] DISABLED - set ICO_TRACKER_ENABLED=true to enable")
 
 # --- EVENT: MEMBER BARU JOIN ---
@@ -4882,7 +5525,7 @@ def fetch_meteora_pools(ca: str, max_retries: int = 3):
     """Fetch Meteora DLMM pools via Data API (dlmm.datapi.meteora.ag)."""
     global meteora_last_request_time, meteora_circuit_breaker_active, meteora_circuit_breaker_until
     
-    print(f"[DEBUG] Fetching Meteora pools for {ca} using DLMM Data API ({METEORA_DLMM_DATAPI})")
+    log_meteora.debug("Fetching Meteora pools for %s using DLMM Data API (%s)", ca, METEORA_DLMM_DATAPI)
     base_url = f"{METEORA_DLMM_DATAPI}/pools"
     target_contract = ca
     
@@ -4890,7 +5533,7 @@ def fetch_meteora_pools(ca: str, max_retries: int = 3):
     now = time.time()
     if meteora_circuit_breaker_active and now < meteora_circuit_breaker_until:
         remaining = meteora_circuit_breaker_until - now
-        print(f"[METEORA] Circuit breaker active, waiting {remaining:.1f}s...")
+        log_meteora.warning("Circuit breaker active, waiting %.1fs...", remaining)
         raise Exception(f"API sedang rate limited. Coba lagi dalam {int(remaining)} detik.")
     
     # Rate limiting: ensure minimum delay between requests
@@ -4898,7 +5541,7 @@ def fetch_meteora_pools(ca: str, max_retries: int = 3):
         time_since_last = now - meteora_last_request_time
         if time_since_last < METEORA_MIN_DELAY:
             wait_time = METEORA_MIN_DELAY - time_since_last
-            print(f"[METEORA] Rate limiting: waiting {wait_time:.1f}s before request...")
+            log_meteora.debug("Rate limiting: waiting %.1fs before request...", wait_time)
             time.sleep(wait_time)
             now = time.time()
     
@@ -4912,14 +5555,10 @@ def fetch_meteora_pools(ca: str, max_retries: int = 3):
     for attempt in range(max_retries):
         try:
             start_time = time.time()
-            print(f"[DEBUG] DLMM Data API: {base_url} (attempt {attempt + 1}/{max_retries})")
-            print(f"[DEBUG] Query: {target_contract}")
-            sys.stdout.flush()
+            log_meteora.debug("DLMM Data API: %s query=%s (attempt %d/%d)", base_url, target_contract, attempt + 1, max_retries)
             
-            print(f"[DEBUG] Making request...")
-            sys.stdout.flush()
-            
-            response = requests.get(base_url, params=params, timeout=30)
+            response = http_manager.sync_session().get(base_url, params=params, timeout=30)
+            metrics.observe_http(base_url, response.status_code, time.time() - start_time)
             
             # Handle 429 (Too Many Requests) with retry
             if response.status_code == 429:
@@ -4927,18 +5566,19 @@ def fetch_meteora_pools(ca: str, max_retries: int = 3):
                 wait_time = min(retry_after, 120)  # Cap at 2 minutes
                 
                 if attempt < max_retries - 1:
-                    print(f"[METEORA] Rate limited (429) - waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
+                    log_meteora.warning("Rate limited (429) - waiting %ss before retry %d/%d", wait_time, attempt + 1, max_retries)
                     time.sleep(wait_time)
                     continue
                 else:
                     # Activate circuit breaker on final failure
                     meteora_circuit_breaker_active = True
                     meteora_circuit_breaker_until = time.time() + wait_time
-                    print(f"[METEORA] Max retries reached, activating circuit breaker for {wait_time}s")
+                    metrics.trip_circuit_breaker("meteora")
+                    log_meteora.error("Max retries reached, activating circuit breaker for %ss", wait_time)
                     raise Exception(f"API rate limited. Coba lagi dalam {wait_time} detik.")
             
             response.raise_for_status()
-            data = response.json()
+            data = json_codec.loads(response.content)
             
             # Update last request time on success
             meteora_last_request_time = time.time()
@@ -5002,9 +5642,7 @@ def fetch_meteora_pools(ca: str, max_retries: int = 3):
                     continue
             
             total_time = time.time() - start_time
-            print(f"[DEBUG] ✅ API request completed in {total_time:.2f} seconds!")
-            print(f"[DEBUG] ✅ Found {len(matching_pools)} matching pool(s)")
-            sys.stdout.flush()
+            log_meteora.debug("API request completed in %.2fs, found %d matching pool(s)", total_time, len(matching_pools))
             
             return matching_pools
             
@@ -5014,38 +5652,36 @@ def fetch_meteora_pools(ca: str, max_retries: int = 3):
                 if attempt < max_retries - 1:
                     wait_time = 60 * (2 ** attempt)  # Exponential backoff: 60s, 120s, 240s
                     wait_time = min(wait_time, 120)  # Cap at 2 minutes
-                    print(f"[METEORA] Rate limited (429) - waiting {wait_time}s before retry {attempt + 1}/{max_retries}")
+                    log_meteora.warning("Rate limited (429) - waiting %ss before retry %d/%d", wait_time, attempt + 1, max_retries)
                     time.sleep(wait_time)
                     continue
                 else:
                     meteora_circuit_breaker_active = True
                     meteora_circuit_breaker_until = time.time() + wait_time
+                    metrics.trip_circuit_breaker("meteora")
                     raise Exception(f"API rate limited setelah {max_retries} percobaan. Coba lagi dalam {wait_time} detik.")
             else:
-                print(f"[ERROR] HTTP error: {e}")
+                log_meteora.error("HTTP error: %s", e)
                 raise Exception(f"HTTP error: {e}")
         except requests.exceptions.Timeout:
             if attempt < max_retries - 1:
                 wait_time = 10 * (attempt + 1)  # 10s, 20s, 30s
-                print(f"[METEORA] Request timeout - retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                log_meteora.warning("Request timeout - retrying in %ss (attempt %d/%d)", wait_time, attempt + 1, max_retries)
                 time.sleep(wait_time)
                 continue
-            print("[ERROR] Request timeout - API tidak merespons dalam 30 detik")
+            log_meteora.error("Request timeout - API tidak merespons dalam 30 detik")
             raise Exception("Request timeout - API tidak merespons. Coba lagi nanti.")
         except requests.exceptions.ConnectionError as e:
             if attempt < max_retries - 1:
                 wait_time = 5 * (attempt + 1)  # 5s, 10s, 15s
-                print(f"[METEORA] Connection error - retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                log_meteora.warning("Connection error - retrying in %ss (attempt %d/%d)", wait_time, attempt + 1, max_retries)
                 time.sleep(wait_time)
                 continue
-            print(f"[ERROR] Connection error: {e}")
+            log_meteora.error("Connection error: %s", e)
             raise Exception(f"Connection error: Tidak bisa connect ke API. {str(e)}")
         except Exception as e:
             # Don't retry on other exceptions
-            print(f"[ERROR] Unexpected error in fetch_meteora_pools: {e}")
-            import traceback
-            traceback.print_exc()
-            sys.stdout.flush()
+            log_meteora.exception("Unexpected error in fetch_meteora_pools: %s", e)
             raise
     
     # Should not reach here, but just in case
@@ -5062,7 +5698,7 @@ async def fetch_dammv2_pools(token_address: str) -> List[Dict]:
     global http_session
 
     if not http_session:
-        http_session = aiohttp.ClientSession()
+        http_session = http_manager.session()
 
     pools: List[Dict] = []
     tl = token_address.lower()
@@ -5260,8 +5896,9 @@ async def send_launch_notification(token_address: str, token_data: Dict, pools:
         if MENTION_ROLE_ID:
             mention_text = f"<@&{MENTION_ROLE_ID}> "
         
-        await channel.send(content=f"{mention_text}🚀 **Token Launch Detected!**", embed=embed)
-        print(f"[LAUNCH_TRACKER] ✅ Sent notification for {token_symbol} ({token_address[:8]}...)")
+        dispatch_queue.enqueue(channel, f"{mention_text}🚀 **Token Launch Detected!**", embed=embed,
+                               priority=PRIORITY_ALERT, label="launch")
+        print(f"[LAUNCH_TRACKER] ✅ Queued notification for {token_symbol} ({token_address[:8]}...)")
         
     except Exception as e:
         print(f"[LAUNCH_TRACKER] Error sending notification: {e}")
@@ -5270,6 +5907,7 @@ async def send_launch_notification(token_address: str, token_data: Dict, pools:
 
 # Background task untuk poll token launches
 @tasks.loop(seconds=LAUNCH_TRACKER_POLL_INTERVAL_SEC)
+@metrics.timed_loop("poll_token_launches")
 async def poll_token_launches():
     """Poll tracked tokens to detect when their NEW pools go live AND tradeable on Jupiter."""
     global launch_tracker_tokens, launch_detected_pools
@@ -5369,10 +6007,147 @@ async def before_poll_launches():
 # --- ICO TRACKER BACKGROUND TASK ---
 # ============================================================================
 
-async def send_ico_notification(ico_data: Dict, notification_type: str = "daily", ico_id: str = None):
+# View tombol refresh ICO (module level supaya bisa dibuat ulang di proses gateway, lihat engine_ipc)
+class RefreshICOView(discord.ui.View):
+    def __init__(self, ico_id: str):
+        super().__init__(timeout=None)
+        self.ico_id = ico_id
+
+    @discord.ui.button(label="🔄 Refresh", style=discord.ButtonStyle.secondary)
+    async def refresh_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer()
+
+        try:
+            # Access global ico_tracker_list
+            global ico_tracker_list
+
+            # Get latest ICO data
+            if self.ico_id not in ico_tracker_list:
+                await interaction.followup.send("❌ ICO tidak ditemukan lagi di tracker!", ephemeral=True)
+                return
+
+            latest_ico_data = ico_tracker_list[self.ico_id]
+
+            # Recalculate time remaining
+            end_time_str = latest_ico_data.get("end_time", "")
+            time_remaining_str = "N/A"
+            total_seconds = 0
+            is_ended = False
+
+            if end_time_str:
+                try:
+                    # Parse end_time and ensure it's treated as UTC
+                    end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
+                    if end_time.tzinfo is None:
+                        # If no timezone info, assume it's UTC
+                        end_time = end_time.replace(tzinfo=timezone.utc)
+                    now = datetime.now(timezone.utc)
+                    diff = end_time - now
+
+                    total_seconds = int(diff.total_seconds())
+                    if total_seconds > 0:
+                        days = total_seconds // 86400
+                        hours = (total_seconds % 86400) // 3600
+                        minutes = (total_seconds % 3600) // 60
+
+                        if days > 0:
+                            time_remaining_str = f"{days}D {hours}H {minutes}M"
+                        elif hours > 0:
+                            time_remaining_str = f"{hours}H {minutes}M"
+                        else:
+                            time_remaining_str = f"{minutes} menit"
+                    else:
+                        time_remaining_str = "ENDED"
+                        is_ended = True
+                except:
+                    pass
+
+            # Get updated values
+            latest_name = latest_ico_data.get("name", "Unknown")
+            latest_symbol = latest_ico_data.get("token_symbol", "???")
+            latest_target = latest_ico_data.get("target", 0)
+            latest_committed = latest_ico_data.get("committed", 0)
+            latest_url = latest_ico_data.get("url", "")
+            latest_token_address = latest_ico_data.get("token_address", "")
+
+            # Format updated values
+            target_str = f"${latest_target:,.0f}" if latest_target else "N/A"
+            committed_str = f"${latest_committed:,.0f}" if latest_committed else "N/A"
+            progress_pct = (latest_committed / latest_target * 100) if latest_target and latest_committed else 0
+
+            # Update embed based on status
+            if is_ended or time_remaining_str == "ENDED":
+                new_title = f"🏁 ICO ENDED: {latest_symbol}"
+                new_description = f"**{latest_name}** ICO sudah berakhir!"
+                new_color = 0x888888  # Gray
+            elif total_seconds > 0 and total_seconds <= 3600:  # Less than 1 hour
+                new_title = f"⏰ ICO ENDING SOON! {latest_symbol}"
+                new_description = (
+                    f"**{latest_name}** ICO akan berakhir dalam **{time_remaining_str}**!\n\n"
+                    f"🚨 **LAST CHANCE TO PARTICIPATE!**"
+                )
+                new_color = 0xFF6600  # Orange
+            else:
+                new_title = f"📊 ICO Update: {latest_symbol}"
+                new_description = (
+                    f"**{latest_name}** ICO masih berlangsung!\n\n"
+                    f"⏱️ Sisa waktu: **{time_remaining_str}**"
+                )
+                new_color = 0x00AAFF  # Blue
+
+            # Create updated embed
+            updated_embed = discord.Embed(
+                title=new_title,
+                description=new_description,
+                color=new_color,
+                timestamp=datetime.now(timezone.utc)
+            )
+
+            updated_embed.add_field(name="💰 Committed", value=committed_str, inline=True)
+            updated_embed.add_field(name="🎯 Target", value=target_str, inline=True)
+            updated_embed.add_field(name="📈 Progress", value=f"{progress_pct:.1f}%", inline=True)
+            updated_embed.add_field(name="⏱️ Time Left", value=time_remaining_str, inline=True)
+
+            # Links
+            links = []
+            if latest_url:
+                links.append(f"[🍎 MetaDAO ICO]({latest_url})")
+            if latest_token_address:
+                links.extend([
+                    f"[🔍 Solscan](https://solscan.io/token/{latest_token_address})",
+                    f"[📊 GMGN](https://gmgn.ai/sol/token/{latest_token_address})"
+                ])
+
+            if links:
+                updated_embed.add_field(name="🔗 Links", value="\n".join(links), inline=False)
+
+            updated_embed.set_footer(text=f"ICO Tracker | {latest_name} | Updated")
+
+            # Update view - remove button if ended
+            if is_ended or time_remaining_str == "ENDED":
+                new_view = None
+            else:
+                new_view = self
+
+            await interaction.message.edit(embed=updated_embed, view=new_view)
+            await interaction.followup.send("✅ ICO info diperbarui!", ephemeral=True)
+
+        except Exception as e:
+            await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
+            print(f"[ICO_TRACKER] Error refreshing ICO: {e}")
+            import traceback
+            traceback.print_exc()
+
+
+register_view(RefreshICOView, lambda view: {"ico_id": view.ico_id})
+
+
+async def send_ico_notification(ico_data: Dict, notification_type: str = "daily", ico_id: str = None,
+                                on_delivered=None, on_failed=None):
     """Send ICO notification to channel.
     notification_type: 'daily', 'hour_warning', 'ended'
     ico_id: Optional ICO ID for refresh button functionality
+    on_delivered / on_failed: callback hasil kirim dari dispatch queue
     """
     channel_id = ICO_TRACKER_CHANNEL_ID or DAMM_CHANNEL_ID or BOT_CALL_CHANNEL_ID
     if not channel_id:
@@ -5382,6 +6157,8 @@ async def send_ico_notification(ico_data: Dict, notification_type: str = "daily"
     channel = bot.get_channel(channel_id)
     if not channel:
         print(f"[ICO_TRACKER] Channel {channel_id} not found")
+        if on_failed is not None:
+            on_failed()
         return
     
     try:
@@ -5477,136 +6254,6 @@ async def send_ico_notification(ico_data: Dict, notification_type: str = "daily"
         # Create refresh button view if ICO is still ongoing
         view = None
         if notification_type != "ended" and ico_id:
-            class RefreshICOView(discord.ui.View):
-                def __init__(self, ico_id: str):
-                    super().__init__(timeout=None)
-                    self.ico_id = ico_id
-                
-                @discord.ui.button(label="🔄 Refresh", style=discord.ButtonStyle.secondary)
-                async def refresh_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-                    await interaction.response.defer()
-                    
-                    try:
-                        # Access global ico_tracker_list
-                        global ico_tracker_list
-                        
-                        # Get latest ICO data
-                        if self.ico_id not in ico_tracker_list:
-                            await interaction.followup.send("❌ ICO tidak ditemukan lagi di tracker!", ephemeral=True)
-                            return
-                        
-                        latest_ico_data = ico_tracker_list[self.ico_id]
-                        
-                        # Recalculate time remaining
-                        end_time_str = latest_ico_data.get("end_time", "")
-                        time_remaining_str = "N/A"
-                        total_seconds = 0
-                        is_ended = False
-                        
-                        if end_time_str:
-                            try:
-                                # Parse end_time and ensure it's treated as UTC
-                                end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-                                if end_time.tzinfo is None:
-                                    # If no timezone info, assume it's UTC
-                                    end_time = end_time.replace(tzinfo=timezone.utc)
-                                now = datetime.now(timezone.utc)
-                                diff = end_time - now
-                                
-                                total_seconds = int(diff.total_seconds())
-                                if total_seconds > 0:
-                                    days = total_seconds // 86400
-                                    hours = (total_seconds % 86400) // 3600
-                                    minutes = (total_seconds % 3600) // 60
-                                    
-                                    if days > 0:
-                                        time_remaining_str = f"{days}D {hours}H {minutes}M"
-                                    elif hours > 0:
-                                        time_remaining_str = f"{hours}H {minutes}M"
-                                    else:
-                                        time_remaining_str = f"{minutes} menit"
-                                else:
-                                    time_remaining_str = "ENDED"
-                                    is_ended = True
-                            except:
-                                pass
-                        
-                        # Get updated values
-                        latest_name = latest_ico_data.get("name", "Unknown")
-                        latest_symbol = latest_ico_data.get("token_symbol", "???")
-                        latest_target = latest_ico_data.get("target", 0)
-                        latest_committed = latest_ico_data.get("committed", 0)
-                        latest_url = latest_ico_data.get("url", "")
-                        latest_token_address = latest_ico_data.get("token_address", "")
-                        
-                        # Format updated values
-                        target_str = f"${latest_target:,.0f}" if latest_target else "N/A"
-                        committed_str = f"${latest_committed:,.0f}" if latest_committed else "N/A"
-                        progress_pct = (latest_committed / latest_target * 100) if latest_target and latest_committed else 0
-                        
-                        # Update embed based on status
-                        if is_ended or time_remaining_str == "ENDED":
-                            new_title = f"🏁 ICO ENDED: {latest_symbol}"
-                            new_description = f"**{latest_name}** ICO sudah berakhir!"
-                            new_color = 0x888888  # Gray
-                        elif total_seconds > 0 and total_seconds <= 3600:  # Less than 1 hour
-                            new_title = f"⏰ ICO ENDING SOON! {latest_symbol}"
-                            new_description = (
-                                f"**{latest_name}** ICO akan berakhir dalam **{time_remaining_str}**!\n\n"
-                                f"🚨 **LAST CHANCE TO PARTICIPATE!**"
-                            )
-                            new_color = 0xFF6600  # Orange
-                        else:
-                            new_title = f"📊 ICO Update: {latest_symbol}"
-                            new_description = (
-                                f"**{latest_name}** ICO masih berlangsung!\n\n"
-                                f"⏱️ Sisa waktu: **{time_remaining_str}**"
-                            )
-                            new_color = 0x00AAFF  # Blue
-                        
-                        # Create updated embed
-                        updated_embed = discord.Embed(
-                            title=new_title,
-                            description=new_description,
-                            color=new_color,
-                            timestamp=datetime.now(timezone.utc)
-                        )
-                        
-                        updated_embed.add_field(name="💰 Committed", value=committed_str, inline=True)
-                        updated_embed.add_field(name="🎯 Target", value=target_str, inline=True)
-                        updated_embed.add_field(name="📈 Progress", value=f"{progress_pct:.1f}%", inline=True)
-                        updated_embed.add_field(name="⏱️ Time Left", value=time_remaining_str, inline=True)
-                        
-                        # Links
-                        links = []
-                        if latest_url:
-                            links.append(f"[🍎 MetaDAO ICO]({latest_url})")
-                        if latest_token_address:
-                            links.extend([
-                                f"[🔍 Solscan](https://solscan.io/token/{latest_token_address})",
-                                f"[📊 GMGN](https://gmgn.ai/sol/token/{latest_token_address})"
-                            ])
-                        
-                        if links:
-                            updated_embed.add_field(name="🔗 Links", value="\n".join(links), inline=False)
-                        
-                        updated_embed.set_footer(text=f"ICO Tracker | {latest_name} | Updated")
-                        
-                        # Update view - remove button if ended
-                        if is_ended or time_remaining_str == "ENDED":
-                            new_view = None
-                        else:
-                            new_view = self
-                        
-                        await interaction.message.edit(embed=updated_embed, view=new_view)
-                        await interaction.followup.send("✅ ICO info diperbarui!", ephemeral=True)
-                        
-                    except Exception as e:
-                        await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
-                        print(f"[ICO_TRACKER] Error refreshing ICO: {e}")
-                        import traceback
-                        traceback.print_exc()
-            
             view = RefreshICOView(ico_id)
         
         # Mention role for hour warning
@@ -5614,94 +6261,265 @@ async def send_ico_notification(ico_data: Dict, notification_type: str = "daily"
         if notification_type == "hour_warning" and MENTION_ROLE_ID:
             mention_text = f"<@&{MENTION_ROLE_ID}> "
         
-        await channel.send(content=f"{mention_text}", embed=embed, view=view)
-        print(f"[ICO_TRACKER] Sent {notification_type} notification for {ico_name}")
+        priority = PRIORITY_ALERT if notification_type == "hour_warning" else PRIORITY_DIGEST
+        # Lewat webhook (ICO_WEBHOOK_URL) tanpa tombol refresh; data terbaru tetap ada di /ico_list
+        dispatch_queue.enqueue(channel, mention_text, embed=embed, view=view, priority=priority, label=f"ico_{notification_type}",
+                               on_delivered=on_delivered, on_failed=on_failed, webhook_embeds=[embed])
+        print(f"[ICO_TRACKER] Queued {notification_type} notification for {ico_name}")
         
     except Exception as e:
         print(f"[ICO_TRACKER] Error sending notification: {e}")
+        if on_failed is not None:
+            on_failed()
         import traceback
         traceback.print_exc()
 
-@tasks.loop(minutes=30)  # Check setiap 30 menit
-async def poll_ico_tracker():
-    """Poll ICO tracker for daily notifications and hour warnings."""
-    global ico_tracker_list
-    
-    if not ICO_TRACKER_ENABLED:
+def _parse_ico_end_ts(ico_data: Dict) -> Optional[float]:
+    """Parse ICO end_time (ISO string, assumed UTC if naive) into a unix timestamp."""
+    end_time_str = ico_data.get("end_time", "")
+    if not end_time_str:
+        return None
+    try:
+        end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
+        if end_time.tzinfo is None:
+            # If no timezone info, assume it's UTC
+            end_time = end_time.replace(tzinfo=timezone.utc)
+        return end_time.timestamp()
+    except ValueError:
+        return None
+
+def _next_utc_midnight_ts(now_ts: float) -> float:
+    now_dt = datetime.fromtimestamp(now_ts, timezone.utc)
+    midnight = now_dt.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return midnight.timestamp()
+
+def schedule_ico_events(ico_id: str):
+    """(Re)compute daily, hour_warning and ended deadlines for one tracked ICO."""
+    key = f"ico:{ico_id}"
+    reminder_scheduler.cancel(key)
+    ico_data = ico_tracker_list.get(ico_id)
+    if not ICO_TRACKER_ENABLED or not ico_data:
         return
-    
-    if not ico_tracker_list:
+    end_ts = _parse_ico_end_ts(ico_data)
+    if end_ts is None:
+        print(f"[ICO_TRACKER] Invalid end_time for {ico_id}")
         return
-    
-    print(f"[ICO_TRACKER] Checking {len(ico_tracker_list)} tracked ICO(s)...")
-    now_utc = datetime.now(timezone.utc)
-    today_str = now_utc.strftime("%Y-%m-%d")
-    print(f"[ICO_TRACKER] Current UTC time: {now_utc.isoformat()}")
-    
-    for ico_id, ico_data in list(ico_tracker_list.items()):
+    now_ts = time.time()
+    if not ico_data.get("ended_notified"):
+        reminder_scheduler.schedule(key, "ended", end_ts)
+    if now_ts >= end_ts:
+        return
+    if not ico_data.get("hour_reminder_sent"):
+        reminder_scheduler.schedule(key, "hour_warning", end_ts - ICO_HOUR_WARNING_LEAD_SEC)
+    today_str = datetime.fromtimestamp(now_ts, timezone.utc).strftime("%Y-%m-%d")
+    if today_str not in ico_data.get("daily_notified_dates", []):
+        daily_ts = now_ts
+    else:
+        daily_ts = _next_utc_midnight_ts(now_ts)
+    if daily_ts < end_ts:
+        reminder_scheduler.schedule(key, "daily", daily_ts)
+
+def rebuild_reminder_schedule():
+    """Rebuild the reminder heap from ICO + MetaDAO state (dipanggil saat startup)."""
+    for key in reminder_scheduler.keys():
+        source, _, item_id = key.partition(":")
+        if source == "ico" and item_id not in ico_tracker_list:
+            reminder_scheduler.cancel(key)
+        elif source == "metadao":
+            state = metadao_notification_state.get(item_id)
+            if not isinstance(state, dict) or state.get("reminder_sent"):
+                reminder_scheduler.cancel(key)
+    for ico_id in list(ico_tracker_list.keys()):
+        schedule_ico_events(ico_id)
+    reminder_scheduler.save()
+
+async def _fire_ico_event(ico_id: str, kind: str):
+    ico_data = ico_tracker_list.get(ico_id)
+    if not ICO_TRACKER_ENABLED or not ico_data:
+        return
+    end_ts = _parse_ico_end_ts(ico_data)
+    now_ts = time.time()
+    today_str = datetime.fromtimestamp(now_ts, timezone.utc).strftime("%Y-%m-%d")
+    send = False
+    if kind == "ended":
+        send = not ico_data.get("ended_notified")
+    elif end_ts is not None and now_ts < end_ts:
+        if kind == "hour_warning" and not ico_data.get("hour_reminder_sent"):
+            print(f"[ICO_TRACKER] 🚨 Sending 1-hour warning for {ico_data.get('name')}")
+            send = True
+        elif kind == "daily" and today_str not in ico_data.get("daily_notified_dates", []):
+            print(f"[ICO_TRACKER] 📊 Sending daily update for {ico_data.get('name')}")
+            send = True
+    if not send:
+        save_ico_tracker_state()
+        schedule_ico_events(ico_id)
+        return
+
+    # Flag state di-set setelah terkirim; jadwal berikutnya dibangun ulang dari flag itu
+    def delivered():
+        data = ico_tracker_list.get(ico_id)
+        if not data:
+            return
+        if kind == "ended":
+            data["ended_notified"] = True
+        elif kind == "hour_warning":
+            data["hour_reminder_sent"] = True
+        elif today_str not in data.setdefault("daily_notified_dates", []):
+            data["daily_notified_dates"].append(today_str)
+        save_ico_tracker_state()
+        schedule_ico_events(ico_id)
+        reminder_scheduler.save()
+
+    def failed():
+        if ico_id in ico_tracker_list:
+            print(f"[ICO_TRACKER] {kind} notification for {ico_id} failed, retry in {NOTIFY_RETRY_DELAY_SEC:.0f}s")
+            reminder_scheduler.schedule(f"ico:{ico_id}", kind, time.time() + NOTIFY_RETRY_DELAY_SEC)
+            reminder_scheduler.save()
+
+    await send_ico_notification(ico_data, kind, ico_id, on_delivered=delivered, on_failed=failed)
+
+async def _fire_metadao_reminder(project_id: str, launch: Dict):
+    state = metadao_notification_state.get(project_id)
+    if not isinstance(state, dict) or state.get("reminder_sent"):
+        return
+    channel = _find_damm_channel()
+    if not channel:
+        print("[WARN] MetaDAO reminder: damm-v2 channel not found")
+        return
+    launch = dict(launch)
+    launch["end_ts"] = state.get("end_ts", launch.get("end_ts"))
+    launch["time_remaining"] = max(0, launch["end_ts"] - time.time())
+    def delivered():
+        state["reminder_sent"] = True
+        save_metadao_state()
+        print(f"[DEBUG] MetaDAO reminder sent for {project_id}")
+
+    def failed():
+        print(f"[ERROR] Failed to send MetaDAO reminder for {project_id}, retry in {NOTIFY_RETRY_DELAY_SEC:.0f}s")
+        if project_id in metadao_notification_state and time.time() < launch["end_ts"]:
+            reminder_scheduler.schedule(f"metadao:{project_id}", "reminder", time.time() + NOTIFY_RETRY_DELAY_SEC, launch)
+            reminder_scheduler.save()
+
+    try:
+        await _send_metadao_embed(channel, launch, reminder=True, on_delivered=delivered, on_failed=failed)
+    except Exception as e:
+        print(f"[ERROR] Failed to send MetaDAO reminder: {e}")
+        failed()
+
+# Hanya bagian fire yang diukur: iterasi loop sebagian besar idle di wait_due()
+@metrics.timed_loop("run_reminder_scheduler")
+async def _fire_due_reminders(due: List[Tuple[str, str, Dict]]):
+    for key, kind, payload in due:
+        source, _, item_id = key.partition(":")
         try:
-            end_time_str = ico_data.get("end_time", "")
-            if not end_time_str:
-                continue
-            
-            # Parse end time
-            try:
-                end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-                if end_time.tzinfo is None:
-                    # If no timezone info, assume it's UTC
-                    end_time = end_time.replace(tzinfo=timezone.utc)
-            except:
-                print(f"[ICO_TRACKER] Invalid end_time for {ico_id}")
-                continue
-            
-            # Calculate time remaining
-            diff = end_time - now_utc
-            total_seconds = int(diff.total_seconds())
-            
-            # Debug log
-            days_left = total_seconds // 86400
-            hours_left = (total_seconds % 86400) // 3600
-            print(f"[ICO_TRACKER] {ico_data.get('name')}: end_time={end_time_str}, remaining={days_left}d {hours_left}h ({total_seconds}s)")
-            
-            # Skip if already ended
-            if total_seconds <= 0:
-                # Send ended notification if not sent
-                if not ico_data.get("ended_notified"):
-                    await send_ico_notification(ico_data, "ended", ico_id)
-                    ico_tracker_list[ico_id]["ended_notified"] = True
-                    save_ico_tracker_state()
-                continue
-            
-            # Check for 1 hour warning (between 30-90 minutes remaining)
-            if 1800 <= total_seconds <= 5400:  # 30-90 minutes
-                if not ico_data.get("hour_reminder_sent"):
-                    print(f"[ICO_TRACKER] 🚨 Sending 1-hour warning for {ico_data.get('name')}")
-                    await send_ico_notification(ico_data, "hour_warning", ico_id)
-                    ico_tracker_list[ico_id]["hour_reminder_sent"] = True
-                    save_ico_tracker_state()
-            
-            # Check for daily notification (once per day)
-            daily_notified = ico_data.get("daily_notified_dates", [])
-            if today_str not in daily_notified:
-                print(f"[ICO_TRACKER] 📊 Sending daily update for {ico_data.get('name')}")
-                await send_ico_notification(ico_data, "daily", ico_id)
-                
-                # Update notified dates
-                if "daily_notified_dates" not in ico_tracker_list[ico_id]:
-                    ico_tracker_list[ico_id]["daily_notified_dates"] = []
-                ico_tracker_list[ico_id]["daily_notified_dates"].append(today_str)
-                save_ico_tracker_state()
-            
+            if source == "ico":
+                await _fire_ico_event(item_id, kind)
+            elif source == "metadao" and kind == "reminder":
+                await _fire_metadao_reminder(item_id, payload)
         except Exception as e:
-            print(f"[ICO_TRACKER] Error processing ICO {ico_id}: {e}")
-            continue
-
-@poll_ico_tracker.before_loop
-async def before_poll_ico():
-    """Wait for bot to be ready before starting ICO tracker."""
+            print(f"[SCHEDULER] Error firing {kind} for {key}: {e}")
+    reminder_scheduler.save()
+
+@tasks.loop(seconds=0)  # Deadline-driven: tiap iterasi tidur sampai event terdekat
+async def run_reminder_scheduler():
+    """Fire ICO and MetaDAO reminders exactly at their scheduled deadlines."""
+    if lease_manager is not None and not lease_manager.holds("run_reminder_scheduler"):
+        await asyncio.sleep(lease_manager.renew_interval)  # standby: replica lain yang kirim reminder
+        return
+    due = await reminder_scheduler.wait_due()
+    if lease_manager is not None and not lease_manager.holds("run_reminder_scheduler"):
+        return  # lease lepas selagi menunggu; pemegang baru rebuild jadwal dari state di disk
+    current_loop.set("run_reminder_scheduler")  # tidak lewat loop_scheduler: fencing dispatch pakai lease ini
+    if due:
+        await _fire_due_reminders(due)
+
+@run_reminder_scheduler.before_loop
+async def before_run_reminder_scheduler():
+    """Wait for bot to be ready, then rebuild the schedule from persisted state."""
     await bot.wait_until_ready()
+    if ICO_TRACKER_ENABLED:
+        load_ico_tracker_state()
+        print(f"[ICO_TRACKER] Started with {len(ico_tracker_list)} tracked ICO(s)")
+    rebuild_reminder_schedule()
+    next_due = reminder_scheduler.next_due()
+    if next_due is not None:
+        print(f"[SCHEDULER] {len(reminder_scheduler)} event(s), next in {max(0, next_due - time.time()):.0f}s")
+
+# --- LOOP SCHEDULER: OVERRUN POLICY + START JITTER ---
+# coalesce = iterasi terlewat digabung jadi 1 run, skip = buang tick terlewat (fase tetap),
+# shift = run berikutnya 1 interval setelah run yang overrun selesai. Override: LOOP_POLICIES="poll_new_tokens=shift,..."
+loop_scheduler = LoopScheduler()
+loop_scheduler.manage(poll_token_launches, policy="coalesce")
+loop_scheduler.manage(monitor_trading_positions, policy="coalesce")  # exit posisi jangan sampai ada tick yang dibuang
+loop_scheduler.manage(scan_hype_tokens, policy="skip", jitter_sec=15)
+loop_scheduler.manage(poll_new_tokens, policy="skip", jitter_sec=30)
+loop_scheduler.manage(notify_bot_call_queue, policy="skip")
+loop_scheduler.manage(poll_wallet_buys, policy="shift", jitter_sec=45)  # jaga jarak request Helius
+loop_scheduler.manage(poll_metadao_launches, policy="skip", jitter_sec=60)
+loop_scheduler.manage(poll_futardio_new_icos, policy="skip", jitter_sec=60)
+loop_scheduler.manage(poll_futardio_top_funded_hourly, policy="coalesce", jitter_sec=60)
+loop_scheduler.manage(auto_archive_threads, policy="coalesce", jitter_sec=20)
+loop_scheduler.apply_overrides(os.getenv("LOOP_POLICIES", ""))
+
+# --- LEADER LEASE: BEBERAPA REPLICA TANPA DOUBLE-POLLING ---
+def _reload_reminder_state():
     load_ico_tracker_state()
-    print(f"[ICO_TRACKER] Started with {len(ico_tracker_list)} tracked ICO(s)")
+    load_metadao_state()
+    rebuild_reminder_schedule()
+
+# Loop -> loader state: replica yang baru jadi pemegang lease membaca state terakhir dari disk dulu
+# (dedup bot call / Futardio dll. ditulis replica sebelumnya), supaya tidak kirim ulang notifikasi
+LEASE_STATE_RELOADERS = {
+    "poll_new_tokens": [load_bot_call_state, toptraded_tracker.load, bot_call_queue.load],
+    "poll_futardio_new_icos": [load_futardio_ico_state],
+    "poll_futardio_top_funded_hourly": [load_futardio_ico_state],
+    "poll_metadao_launches": [load_metadao_state],
+    "poll_wallet_buys": [load_tracked_wallets, load_default_wallets],
+    "monitor_trading_positions": [load_trading_positions, load_trading_history],
+    "scan_hype_tokens": [load_hype_state],
+    "poll_token_launches": [load_launch_tracker_state],
+    "run_reminder_scheduler": [_reload_reminder_state],
+}
+
+# Notifier antrean bot call selalu di replica yang sama dengan discovery: antrean, pending dan dedup hanya
+# hidup di memori satu replica (file cuma untuk restart / failover), tidak ada load-mutate-save lintas replica
+LEASE_ALIASES = {"notify_bot_call_queue": "poll_new_tokens"}
+
+def _on_lease_acquired(name: str):
+    for loader in LEASE_STATE_RELOADERS.get(name, ()):
+        loader()
+
+async def start_lease_manager(handles_messages: bool = False):
+    """Mulai leader election (LEADER_LEASE_DB). Gate loop_scheduler tertutup untuk loop yang dipegang replica lain.
+    handles_messages: replica terhubung ke Discord ikut bersaing untuk lease reply on_message (headless tidak)."""
+    global lease_manager
+    if not LEADER_LEASE_DB or lease_manager is not None:
+        return
+    try:
+        store = LeaseStore(LEADER_LEASE_DB)
+    except Exception as e:
+        print(f"[ERROR] Failed to open lease store {LEADER_LEASE_DB}: {e} - running without leader election")
+        return
+    names = list(loop_scheduler.loops) + ["run_reminder_scheduler"]
+    if handles_messages:
+        names.append(MESSAGE_REPLIES_LEASE)
+    unknown = [n for n in LEADER_PREFERRED_LOOPS if n not in names]
+    aliased = [n for n in LEADER_PREFERRED_LOOPS if n in LEASE_ALIASES]
+    if aliased:
+        print(f"[WARN] LEADER_PREFERRED_LOOPS: {', '.join(aliased)} ikut lease {', '.join(LEASE_ALIASES[n] for n in aliased)}")
+    if unknown:
+        print(f"[WARN] LEADER_PREFERRED_LOOPS: unknown loop(s) {', '.join(unknown)}")
+    lease_manager = LeaseManager(store, LEASE_HOLDER_ID, names, ttl=LEADER_LEASE_TTL_SEC,
+                                 preferred=LEADER_PREFERRED_LOOPS or None, on_acquire=_on_lease_acquired,
+                                 aliases=LEASE_ALIASES)
+    loop_scheduler.gate = lease_manager.holds
+    # Enqueue cuma cek lokal (murah, di event loop); cek holder + token di database sekali per batch di thread
+    # dispatch worker, dengan nama loop yang dicatat saat enqueue
+    dispatch_queue.gate = lambda: lease_fence_ok("notification", verify=False)
+    dispatch_queue.fence_key = current_loop.get
+    dispatch_queue.fence = lambda name: lease_manager is None or lease_manager.verify(name)
+    await lease_manager.start()
+    print(f"[LEASE] {LEASE_HOLDER_ID} holds {len(lease_manager.tokens)}/{len(lease_manager.names)} loop lease(s) ({LEADER_LEASE_DB}, ttl {LEADER_LEASE_TTL_SEC:g}s)")
 
 # --- SLASH COMMANDS UNTUK TRACK WALLET ---
 @bot.tree.command(name="add_wallet", description="Tambah wallet address untuk tracking (hanya buy transactions)")
@@ -5815,7 +6633,8 @@ async def futardio_test(interaction: discord.Interaction):
         await interaction.followup.send(f"❌ Channel ID `{channel_id}` tidak ditemukan.", ephemeral=True)
         return
     try:
-        launches = await fetch_futardio_v07_launches()
+        await futardio_feed.refresh(force=True)
+        launches = list(futardio_feed.snapshot.values())
     except Exception as e:
         await interaction.followup.send(f"❌ Fetch error: {e}", ephemeral=True)
         return
@@ -5833,17 +6652,19 @@ async def futardio_test(interaction: discord.Interaction):
         )
         return
     top = max(live, key=lambda l: (l.get("total_committed_amount") or 0))
+    delivery = Delivery()
     try:
-        await _send_futardio_top_funded_embed(channel, top)
+        await _send_futardio_top_funded_embed(channel, top, on_delivered=delivery.delivered, on_failed=delivery.failed)
     except Exception as e:
         await interaction.followup.send(f"❌ Gagal kirim embed: {e}", ephemeral=True)
         return
+    delivered = await delivery.wait()
     title = (top.get("launch_detail") or {}).get("title") or "?"
     await interaction.followup.send(
-        f"✅ **Test berhasil.**\n"
+        f"{'✅ **Test berhasil.**' if delivered else '⚠️ **Fetch OK, embed belum terkirim.**'}\n"
         f"• Fetch: {len(launches)} launches, {len(live)} Live\n"
         f"• Top funded: **{title}**\n"
-        f"• Embed dikirim ke {channel.mention}",
+        f"• {_delivery_text(delivered, f'Embed ke {channel.mention}')}",
         ephemeral=True,
     )
 
@@ -6368,7 +7189,7 @@ async def hype_test_cmd(interaction: discord.Interaction):
     try:
         global http_session
         if not http_session:
-            http_session = aiohttp.ClientSession()
+            http_session = http_manager.session()
         
         results = []
         
@@ -6997,6 +7818,8 @@ async def ico_add(
         "ended_notified": False
     }
     save_ico_tracker_state()
+    schedule_ico_events(ico_id)
+    reminder_scheduler.save()
     
     # Format time remaining
     if days_remaining > 0:
@@ -7031,6 +7854,8 @@ async def ico_remove(interaction: discord.Interaction, ico_id: str):
     
     ico_data = ico_tracker_list.pop(ico_id)
     save_ico_tracker_state()
+    reminder_scheduler.cancel(f"ico:{ico_id}")
+    reminder_scheduler.save()
     
     await interaction.response.send_message(
         f"✅ ICO dihapus dari tracker!\n"
@@ -7183,8 +8008,10 @@ async def ico_notify(
     await interaction.response.defer(ephemeral=True)
     
     try:
-        await send_ico_notification(ico_tracker_list[ico_id], notification_type, ico_id)
-        await interaction.followup.send(f"✅ Notifikasi `{notification_type}` dikirim!", ephemeral=True)
+        delivery = Delivery()
+        await send_ico_notification(ico_tracker_list[ico_id], notification_type, ico_id,
+                                    on_delivered=delivery.delivered, on_failed=delivery.failed)
+        await interaction.followup.send(_delivery_text(await delivery.wait(), f"Notifikasi `{notification_type}`"), ephemeral=True)
     except Exception as e:
         await interaction.followup.send(f"❌ Error: {str(e)}", ephemeral=True)
 
@@ -7239,12 +8066,14 @@ async def metadao_test(
         "end_ts": end_ts,
     }
     
+    await interaction.response.defer(ephemeral=True)
     try:
-        await _send_metadao_embed(channel, launch, reminder=reminder)
-        await interaction.response.send_message(f"✅ Notif MetaDAO test dikirim ke {channel.mention}", ephemeral=True)
+        delivery = Delivery()
+        await _send_metadao_embed(channel, launch, reminder=reminder, on_delivered=delivery.delivered, on_failed=delivery.failed)
+        await interaction.followup.send(_delivery_text(await delivery.wait(), f"Notif MetaDAO test ke {channel.mention}"), ephemeral=True)
     except Exception as e:
         print(f"[ERROR] Failed to send MetaDAO test notification: {e}")
-        await interaction.response.send_message(f"❌ Gagal kirim notif: {e}", ephemeral=True)
+        await interaction.followup.send(f"❌ Gagal kirim notif: {e}", ephemeral=True)
 
 @metadao_test.error
 async def metadao_test_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
@@ -7262,7 +8091,7 @@ async def metadao_fetch(interaction: discord.Interaction):
     try:
         global http_session
         if not http_session:
-            http_session = aiohttp.ClientSession()
+            http_session = http_manager.session()
         
         # Headers untuk request
         headers = {
@@ -7418,16 +8247,170 @@ async def scan_threads_error(interaction: discord.Interaction, error: app_comman
     else:
         await interaction.response.send_message(f"❌ Error: {error}", ephemeral=True)
 
+@bot.tree.command(name="log_level", description="Lihat / ubah log level per subsystem saat runtime (admin only)")
+@app_commands.describe(
+    subsystem="Subsystem (all = semua)",
+    level="DEBUG / INFO / WARNING / ERROR (kosong = tampilkan level sekarang)",
+)
+@app_commands.choices(subsystem=[app_commands.Choice(name=n, value=n) for n in ("all",) + bot_logging.SUBSYSTEMS])
+@app_commands.check(_metadao_admin_check)
+async def log_level_cmd(interaction: discord.Interaction, subsystem: Optional[str] = None, level: Optional[str] = None):
+    if subsystem and level:
+        try:
+            new_level = bot_logging.set_level(subsystem, level)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        print(f"[LOG] {interaction.user} set log level {subsystem}={new_level}")
+        await interaction.response.send_message(f"✅ Log level `{subsystem}` = **{new_level}**", ephemeral=True)
+        return
+    lines = [f"`{name}`: {lvl}" for name, lvl in bot_logging.get_levels().items()]
+    await interaction.response.send_message("📋 **Log levels**\n" + "\n".join(lines), ephemeral=True)
+
+@log_level_cmd.error
+async def log_level_cmd_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.CheckFailure):
+        await interaction.response.send_message("❌ Kamu tidak punya izin untuk menjalankan command ini.", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"❌ Error: {error}", ephemeral=True)
+
+def _fit_message_lines(lines: List[str], limit: int = 2000) -> str:
+    """Gabung baris untuk satu pesan Discord. Kalau lewat limit, baris utuh dibuang dari belakang (bukan potong
+    karakter) supaya blok ``` tidak kehilangan penutupnya."""
+    text = "\n".join(lines)
+    if len(text) <= limit:
+        return text
+    kept: List[str] = []
+    size = 0
+    for i, line in enumerate(lines):
+        note = f"… {len(lines) - i} baris lagi tidak ditampilkan"
+        if size + len(line) + 1 + len(note) > limit:
+            return "\n".join(kept + [note])
+        kept.append(line)
+        size += len(line) + 1
+    return "\n".join(kept)
+
+@bot.tree.command(name="loop_lag", description="Event loop lag + callback yang paling lama blocking (admin only)")
+@app_commands.describe(top="Jumlah pelaku teratas (default 5)", show_stack="Tampilkan stack pelaku #1", reset="Reset statistik setelah ditampilkan")
+@app_commands.check(_metadao_admin_check)
+async def loop_lag_cmd(interaction: discord.Interaction, top: int = 5, show_stack: bool = False, reset: bool = False):
+    if not loop_lag_monitor.running:
+        await interaction.response.send_message("⚠️ Loop lag monitor tidak aktif (LOOP_LAG_MONITOR_ENABLED=false).", ephemeral=True)
+        return
+    worst = loop_lag_monitor.worst(max(1, min(top, 10)))
+    lines = [
+        "⏱️ **Event Loop Lag**",
+        f"Lag terakhir: **{loop_lag_monitor.last_lag * 1000:.1f}ms** | Max: **{loop_lag_monitor.max_lag * 1000:.0f}ms**",
+        f"Stall (> {loop_lag_monitor.threshold * 1000:.0f}ms): **{loop_lag_monitor.stall_count}**",
+    ]
+    if worst:
+        lines.append("")
+        lines.append("**Pelaku terbesar (total blocked):**")
+        for i, item in enumerate(worst, 1):
+            last_seen = datetime.fromtimestamp(item["last_seen"], tz=timezone.utc).strftime("%H:%M:%S")
+            lines.append(
+                f"{i}. `{item['location']}` — {item['count']}x, total {item['total_lag']:.2f}s, "
+                f"max {item['max_lag'] * 1000:.0f}ms (last {last_seen} UTC)"
+            )
+        if show_stack and worst[0]["stack"]:
+            lines.append(f"```\n{worst[0]['stack'][-1500:]}\n```")
+    else:
+        lines.append("✅ Belum ada callback yang blocking di atas threshold.")
+    if reset:
+        loop_lag_monitor.reset()
+        lines.append("_Statistik di-reset._")
+    await interaction.response.send_message(_fit_message_lines(lines), ephemeral=True)
+
+@loop_lag_cmd.error
+async def loop_lag_cmd_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.CheckFailure):
+        await interaction.response.send_message("❌ Kamu tidak punya izin untuk menjalankan command ini.", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"❌ Error: {error}", ephemeral=True)
+
+@bot.tree.command(name="loops", description="Status background loop: durasi terakhir, run berikutnya, overrun (admin only)")
+@app_commands.describe(loop_name="Nama loop yang policy-nya mau diubah (opsional)", policy="Overrun policy baru")
+@app_commands.choices(policy=[app_commands.Choice(name=p, value=p) for p in ("coalesce", "skip", "shift")])
+@app_commands.check(_metadao_admin_check)
+async def loops_cmd(interaction: discord.Interaction, loop_name: Optional[str] = None, policy: Optional[str] = None):
+    if loop_name and policy:
+        try:
+            loop_scheduler.set_policy(loop_name, policy)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+        print(f"[LOOP] {interaction.user} set {loop_name} policy={policy}")
+    now = time.time()
+    lines = ["🔁 **Background Loops**"]
+    for row in loop_scheduler.snapshot():
+        if not row["active"]:
+            status = "⏹️"
+        elif row["running"]:
+            status = "▶️"
+        else:
+            status = "⏸️"
+        last = f"{row['last_duration']:.1f}s" if row["last_duration"] is not None else "-"
+        if row["running"]:
+            next_run = "running"
+        elif row["next_run"] is not None:
+            next_run = f"in {max(0, row['next_run'] - now):.0f}s"
+        else:
+            next_run = "-"
+        lease = ""
+        if lease_manager is not None:
+            lease = " | 👑 leader" if lease_manager.holds(row["name"]) else f" | standby ({row['standby_ticks']} tick)"
+        lines.append(
+            f"{status} `{row['name']}` every {row['interval']:g}s ({row['policy']}) | "
+            f"last {last} | next {next_run} | overruns {row['overruns']} | skipped {row['skipped_ticks']}{lease}"
+        )
+    await interaction.response.send_message(_fit_message_lines(lines), ephemeral=True)
+
+@loops_cmd.error
+async def loops_cmd_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.CheckFailure):
+        await interaction.response.send_message("❌ Kamu tidak punya izin untuk menjalankan command ini.", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"❌ Error: {error}", ephemeral=True)
+
+@bot.tree.command(name="http_stats", description="Statistik pool HTTP per host: request, error, reuse koneksi, latency (admin only)")
+@app_commands.check(_metadao_admin_check)
+async def http_stats_cmd(interaction: discord.Interaction):
+    rows = http_manager.snapshot()
+    lines = [
+        "🌐 **HTTP Pools**",
+        f"Limit {http_manager.limit} koneksi ({http_manager.limit_per_host}/host) | keep-alive {http_manager.keepalive_sec:g}s | DNS cache {http_manager.dns_cache_sec}s",
+    ]
+    if not rows:
+        lines.append("Belum ada request.")
+    for row in rows[:15]:
+        reuse = f"{row['reuse_ratio'] * 100:.0f}%" if row["reuse_ratio"] is not None else "-"
+        avg = f"{row['avg_latency'] * 1000:.0f}ms" if row["avg_latency"] is not None else "-"
+        lines.append(
+            f"`{row['host']}` — {row['requests']} req, {row['errors']} err | "
+            f"reuse {reuse} ({row['new_connections']} new) | avg {avg}, max {row['max_latency'] * 1000:.0f}ms"
+        )
+    await interaction.response.send_message(_fit_message_lines(lines), ephemeral=True)
+
+@http_stats_cmd.error
+async def http_stats_cmd_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.CheckFailure):
+        await interaction.response.send_message("❌ Kamu tidak punya izin untuk menjalankan command ini.", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"❌ Error: {error}", ephemeral=True)
+
 # --- AUTO DETECT: USER PASTE CONTRACT ADDRESS (DISABLE AUTO-TRACK UNTUK WALLET YANG UDAH DI-ADD) ---
 @bot.event
 async def on_message(message: discord.Message):
     if message.author.bot:
         return
 
-    print(f"[DEBUG] Message detected in #{message.channel}: {message.content[:40]}")
+    log_message.debug("Message detected in #%s: %s", message.channel, message.content[:40])
 
     content = message.content.strip()
     if is_valid_solana_address(content):
+        if lease_manager is not None and not lease_manager.holds(MESSAGE_REPLIES_LEASE):
+            await bot.process_commands(message)
+            return  # replica lain yang membalas paste address
         # Cek apakah ini di channel tracker wallet DAN bukan wallet yang sudah di-add
         if message.channel.id == TRACK_WALLET_CHANNEL_ID:
             user_id = str(message.author.id)
@@ -7451,7 +8434,7 @@ async def on_message(message: discord.Message):
             return  # Exit setelah handle tracker channel
         else:
             # Handle sebagai token pool check (kode lama)
-            print(f"[DEBUG] Valid Solana address detected: {content}")
+            log_message.info("Valid Solana address detected: %s", content)
             try:
                 await message.channel.send(f"🔍 Cek pool DLMM untuk token: `{content[:8]}...`")
             except Exception as e:
@@ -7459,11 +8442,8 @@ async def on_message(message: discord.Message):
                 return
 
             try:
-                print(f"[DEBUG] Starting to fetch pools for {content}")
-                sys.stdout.flush()
                 pools = fetch_meteora_pools(content)
-                print(f"[DEBUG] Fetch completed, found {len(pools)} pools")
-                sys.stdout.flush()
+                log_message.debug("Fetch completed, found %d pools for %s", len(pools), content)
                 
                 if not pools:
                     gmgn_fees_sol = None
@@ -7517,11 +8497,8 @@ async def on_message(message: discord.Message):
                 except Exception as e:
                     print(f"[DEBUG] Could not fetch GMGN X link for CA check: {e}")
 
-                print(f"[DEBUG] Creating embed object...")
                 embed = discord.Embed(title="Meteora Pool Bot", description=desc, color=0x00ff00)
                 embed.set_footer(text=f"Requested by {message.author.display_name}")
-                print(f"[DEBUG] Sending embed with {len(pools[:10])} pools to channel {message.channel.id}")
-                sys.stdout.flush()
                 try:
                     # Create button view for creating thread
                     class CreateLPThreadView(discord.ui.View):
@@ -7651,8 +8628,7 @@ async def on_message(message: discord.Message):
                     
                     view = CreateLPThreadView(content, pools, gmgn_x_url)
                     await message.channel.send(embed=embed, view=view)
-                    print(f"[DEBUG] ✅ Embed sent successfully!")
-                    sys.stdout.flush()
+                    log_message.debug("Sent pool embed (%d pools) to channel %s", len(pools[:10]), message.channel.id)
                     
                     # Fetch and display token safety information
                     print(f"[DEBUG] Fetching token safety data for {content}")
@@ -8689,5 +9665,26 @@ async def lp_command_error(interaction: discord.Interaction, error: app_commands
             )
 
 # --- RUN BOT ---
-print("[DEBUG] Bot starting...")
-bot.run(TOKEN)
\ No newline at end of file
+# Guard supaya main.py bisa di-import (benchmark / tooling) tanpa connect ke Discord
+async def run_bot():
+    """bot.run() + shutdown rapi: tutup pool HTTP dan lepas leader lease (standby langsung ambil alih)."""
+    async with bot:
+        try:
+            await bot.start(TOKEN)
+        finally:
+            if lease_manager is not None:
+                await lease_manager.stop()
+            await http_manager.close()
+            print("[DEBUG] HTTP pools closed")
+
+if __name__ == "__main__":
+    print(f"[DEBUG] Loaded TOKEN? {'✅ Yes' if TOKEN else '❌ No'}")
+    if not TOKEN:
+        print("❌ ERROR: DISCORD_BOT_TOKEN environment variable not set!")
+        exit(1)
+    print("[DEBUG] Bot starting...")
+    discord.utils.setup_logging()
+    try:
+        asyncio.run(run_bot())
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
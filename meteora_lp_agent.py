@@ -8,6 +8,7 @@ import json
 import base58
 import base64
 import aiohttp
+import http_client
 from typing import Dict, List, Optional, Tuple
 from solders.keypair import Keypair
 from solders.transaction import VersionedTransaction
@@ -54,9 +55,9 @@ class MeteoraLPAgent:
             print("[LP_AGENT] ⚠️ No private key provided - agent will be read-only")
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session"""
-        if not self.http_session:
-            self.http_session = aiohttp.ClientSession()
+        """Shared HTTP session (pool koneksi bersama dengan bot, lihat http_client.py)"""
+        if not self.http_session or self.http_session.closed:
+            self.http_session = http_client.shared().session()
         return self.http_session
     
     async def _call_solana_mcp(self, method: str, params: Dict) -> Dict:
@@ -1395,10 +1396,8 @@ main();
             return None
     
     async def close(self):
-        """Close HTTP session"""
-        if self.http_session:
-            await self.http_session.close()
-            self.http_session = None
+        """Lepas HTTP session (pool bersama ditutup oleh pemiliknya, bukan per agent)"""
+        self.http_session = None
 
 # Global agent instance
 _lp_agent: Optional[MeteoraLPAgent] = None
@@ -0,0 +1,274 @@
+"""
+Bot Metrics - registry counter / gauge / histogram dengan output format Prometheus text
+Dipasang di setiap tasks.loop (durasi + error per iterasi), di session aiohttp (latency + status per provider)
+dan di circuit breaker / cache. Diekspos lewat endpoint HTTP lokal /metrics.
+"""
+
+import time
+import bisect
+import functools
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Host substring -> nama provider (label `provider` di metric HTTP)
+PROVIDER_HOSTS = (
+    ("jup.ag", "jupiter"),
+    ("helius", "helius"),
+    ("solana.com", "solana_rpc"),
+    ("dexscreener.com", "dexscreener"),
+    ("meteora.ag", "meteora"),
+    ("gmgn.ai", "gmgn"),
+    ("rugcheck.xyz", "rugcheck"),
+    ("metina.id", "metina"),
+    ("coingecko.com", "coingecko"),
+    ("metadao.fi", "metadao"),
+    ("futard.io", "futardio"),
+    ("discord.com", "discord"),
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        """Evaluate `fn` at scrape time (mis. panjang queue / ukuran cache)."""
+        self._functions[self._key(labels)] = fn
+
+    def get(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return self._functions[key]()
+        return self._values.get(key, 0)
+
+    def _samples(self) -> List[str]:
+        values = dict(self._values)
+        for key, fn in self._functions.items():
+            try:
+                values[key] = fn()
+            except Exception:
+                continue
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]  # [bucket counts, count, sum]
+        idx = bisect.bisect_left(self.buckets, value)
+        if idx < len(self.buckets):
+            state[0][idx] += 1
+        state[1] += 1
+        state[2] += value
+
+    def get(self, **labels) -> Tuple[int, float]:
+        """(count, sum) for one label set."""
+        state = self._values.get(self._key(labels))
+        return (state[1], state[2]) if state else (0, 0.0)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        inf_le = 'le="+Inf"'
+        for key, (counts, count, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf_le)} {count}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics; `counter`/`gauge`/`histogram` return the existing metric if already registered."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.kind}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+LOOP_DURATION = REGISTRY.histogram("bot_loop_duration_seconds", "Duration of one tasks.loop iteration", ("loop",))
+LOOP_ERRORS = REGISTRY.counter("bot_loop_errors_total", "tasks.loop iterations that raised", ("loop",))
+LOOP_LAST_RUN = REGISTRY.gauge("bot_loop_last_run_timestamp_seconds", "Unix time the loop iteration last finished", ("loop",))
+HTTP_REQUESTS = REGISTRY.counter("bot_http_requests_total", "Outbound HTTP requests by provider and status", ("provider", "status"))
+HTTP_LATENCY = REGISTRY.histogram("bot_http_request_duration_seconds", "Outbound HTTP request latency by provider", ("provider",))
+CIRCUIT_BREAKER_TRIPS = REGISTRY.counter("bot_circuit_breaker_trips_total", "Circuit breaker activations", ("breaker",))
+CACHE_LOOKUPS = REGISTRY.counter("bot_cache_lookups_total", "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+
+
+def provider_for(url) -> str:
+    host = (urlsplit(str(url)).hostname or "").lower()
+    for needle, provider in PROVIDER_HOSTS:
+        if needle in host:
+            return provider
+    return "other"
+
+
+def observe_http(url, status, duration: float):
+    """Record one outbound request (status = HTTP code, or 'error' for exceptions)."""
+    provider = provider_for(url)
+    HTTP_REQUESTS.inc(provider=provider, status=status)
+    HTTP_LATENCY.observe(duration, provider=provider)
+
+
+def trip_circuit_breaker(name: str):
+    CIRCUIT_BREAKER_TRIPS.inc(breaker=name)
+
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def timed_loop(name: str):
+    """Decorator for a tasks.loop coroutine: records duration, errors and last-run time.
+
+    Letakkan di bawah @tasks.loop(...) supaya before_loop / start() tetap milik Loop object.
+    """
+    def decorator(coro):
+        @functools.wraps(coro)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await coro(*args, **kwargs)
+            except Exception:
+                LOOP_ERRORS.inc(loop=name)
+                raise
+            finally:
+                LOOP_DURATION.observe(time.perf_counter() - start, loop=name)
+                LOOP_LAST_RUN.set(time.time(), loop=name)
+        return wrapper
+    return decorator
+
+
+def http_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp TraceConfig that feeds HTTP_REQUESTS / HTTP_LATENCY for every request on the session."""
+    async def on_request_start(session, ctx, params):
+        ctx.start = time.perf_counter()
+
+    async def on_request_end(session, ctx, params):
+        observe_http(params.url, params.response.status, time.perf_counter() - ctx.start)
+
+    async def on_request_exception(session, ctx, params):
+        observe_http(params.url, "error", time.perf_counter() - ctx.start)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
+
+
+async def start_metrics_server(host: str = "127.0.0.1", port: int = 9108, registry: Optional[MetricsRegistry] = None) -> web.AppRunner:
+    """Serve `registry.render()` at http://host:port/metrics. Returns the runner (call `cleanup()` to stop)."""
+    registry = registry or REGISTRY
+
+    async def handle_metrics(request):
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,124 @@
+"""
+Price Oracle - harga SOL/USD di memori, di-refresh di background dari beberapa source sekaligus
+Semua source di-query bersamaan; jawaban valid pertama dipakai dan sisanya dibatalkan (hedged request).
+Pembaca (bot call, paste CA di on_message) cukup baca cache; refresh sinkron hanya kalau harga lebih
+tua dari `max_age`. Kalau semua source gagal, harga terakhir tetap dipakai (stale) sebelum default.
+"""
+
+import time
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+PriceSource = Callable[[], Awaitable[Optional[float]]]
+
+
+class PriceOracle:
+    """Cached price with background refresh.
+
+    sources: [(nama, async fn() -> harga atau None)]
+    refresh_sec: interval refresh background; max_age_sec: batas umur harga sebelum get() refresh sinkron.
+    """
+
+    def __init__(self, sources: List[Tuple[str, PriceSource]], refresh_sec: float = 30.0, max_age_sec: float = 300.0,
+                 timeout_sec: float = 10.0, default: float = 125.0, min_valid: float = 1.0, max_valid: float = 100000.0):
+        self.sources = sources
+        self.refresh_sec = refresh_sec
+        self.max_age_sec = max_age_sec
+        self.timeout_sec = timeout_sec
+        self.default = default
+        self.min_valid = min_valid
+        self.max_valid = max_valid
+        self.price: Optional[float] = None
+        self.source: Optional[str] = None
+        self.updated_at: Optional[float] = None  # time.time() harga terakhir yang valid
+        self.stats = {"refreshes": 0, "failures": 0, "defaults": 0, "wins": Counter()}
+        self._failed_at: Optional[float] = None  # refresh gagal terakhir (semua source)
+        self._inflight: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        return None if self.updated_at is None else time.time() - self.updated_at
+
+    @property
+    def stale(self) -> bool:
+        return self.updated_at is None or self.age > self.max_age_sec
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _valid(self, value) -> bool:
+        return isinstance(value, (int, float)) and self.min_valid <= value <= self.max_valid
+
+    async def _query(self, name: str, fn: PriceSource) -> Tuple[str, Optional[float]]:
+        try:
+            return name, await fn()
+        except Exception as e:
+            print(f"[PRICE] {name} failed: {type(e).__name__}: {e}")
+            return name, None
+
+    async def _refresh(self) -> Optional[float]:
+        pending = {asyncio.create_task(self._query(name, fn)) for name, fn in self.sources}
+        deadline = time.monotonic() + self.timeout_sec
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break  # timeout
+                for task in done:
+                    name, value = task.result()
+                    if self._valid(value):
+                        self.price, self.source, self.updated_at = float(value), name, time.time()
+                        self.stats["wins"][name] += 1
+                        return self.price
+        finally:
+            for task in pending:
+                task.cancel()
+        self.stats["failures"] += 1
+        self._failed_at = time.time()
+        return None
+
+    async def refresh(self) -> Optional[float]:
+        """Query semua source sekarang. Pemanggil bersamaan berbagi satu refresh yang sedang jalan."""
+        if self._inflight is None or self._inflight.done():
+            self.stats["refreshes"] += 1
+            self._inflight = asyncio.create_task(self._refresh())
+        return await asyncio.shield(self._inflight)
+
+    async def get(self) -> float:
+        """Harga dari cache; refresh dulu hanya kalau stale. Fallback: harga terakhir, lalu default."""
+        if not self.stale:
+            return self.price
+        if self.price is not None and self._failed_at is not None and time.time() - self._failed_at < self.refresh_sec:
+            return self.price  # source baru saja gagal semua: jangan tahan pembaca sampai timeout lagi
+        price = await self.refresh()
+        if price is not None:
+            return price
+        if self.price is not None:
+            print(f"[PRICE] All sources failed, using last price ${self.price:.2f} ({self.age:.0f}s old, {self.source})")
+            return self.price
+        self.stats["defaults"] += 1
+        print(f"[WARN] Could not fetch SOL price from any source, using default ${self.default}")
+        return self.default
+
+    def start(self):
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_sec)
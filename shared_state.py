@@ -0,0 +1,113 @@
+"""
+Shared State - state file JSON yang ditulis lebih dari satu proses (gateway + worker engine_ipc, replica lease)
+Tulis selalu atomik (file sementara + os.replace) di bawah flock, jadi proses lain yang reload tidak pernah
+membaca file setengah jadi. Kalau file di disk berubah sejak terakhir dibaca/ditulis proses ini (proses lain
+menulis di antaranya), perubahan digabung 3-way per key dict secara rekursif: key yang diubah proses ini
+menang, key lain ikut versi disk. Bentuk non-dict (list) tetap last-writer-wins dengan peringatan.
+"""
+
+import os
+import json
+from contextlib import contextmanager
+from typing import Any, Optional, Tuple
+
+import json_codec
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: tanpa lock antar proses, tulis tetap atomik
+    fcntl = None
+
+_MISSING = object()
+
+
+def _normalized(data: Any) -> Any:
+    """Salinan bentuk JSON (key int jadi string, tuple jadi list) supaya bisa dibandingkan dengan isi file."""
+    return json_codec.loads(json_codec.dumps_bytes(data))
+
+
+def merge3(base: Any, ours: Any, theirs: Any) -> Any:
+    """3-way merge: perubahan `ours` terhadap `base` diterapkan di atas `theirs` (dict rekursif per key)."""
+    if ours == base:
+        return theirs
+    if theirs == base or not (isinstance(base, dict) and isinstance(ours, dict) and isinstance(theirs, dict)):
+        return ours
+    merged = {}
+    for key in list(theirs) + [k for k in ours if k not in theirs]:
+        value = merge3(base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING))
+        if value is not _MISSING:
+            merged[key] = value
+    return merged
+
+
+class SharedStateFile:
+    """One JSON state file shared between processes. `read()` / `write()` replace open()+json.load/dump."""
+
+    def __init__(self, path: str, pretty: bool = False):
+        self.path = path
+        self.pretty = pretty  # indent 4 untuk file yang juga diedit manusia (tracked wallets)
+        self._base: Any = _MISSING  # isi file saat terakhir dibaca / ditulis proses ini (_MISSING = belum ada)
+        self._synced = False  # pernah read/write: tanpa ini belum ada base untuk merge
+        self.stats = {"writes": 0, "merged": 0, "overwritten": 0}
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_disk(self, strict: bool = True) -> Any:
+        if not os.path.exists(self.path):
+            return _MISSING
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        try:
+            return json_codec.loads(raw)
+        except ValueError:
+            if strict:
+                raise
+            print(f"[STATE] {self.path} is not valid JSON; overwriting")
+            return _MISSING
+
+    def _encode(self, data: Any) -> bytes:
+        if self.pretty:
+            return json.dumps(data, indent=4).encode("utf-8")
+        return json_codec.dumps_bytes(data)
+
+    def read(self) -> Optional[Any]:
+        """Isi file (None kalau belum ada); dicatat sebagai base untuk merge saat write berikutnya."""
+        with self._locked(exclusive=False):
+            data = self._read_disk()
+        self._base = _normalized(data) if data is not _MISSING else _MISSING
+        self._synced = True
+        return None if data is _MISSING else data
+
+    def write(self, data: Any) -> Tuple[Any, bool]:
+        """Tulis `data`. Return (isi yang ditulis, merged): merged=True berarti perubahan proses lain ikut
+        digabung, caller sebaiknya reload state in-memory dari file."""
+        with self._locked(exclusive=True):
+            disk = self._read_disk(strict=False)
+            merged = False
+            if self._synced and disk is not _MISSING and disk != self._base:
+                ours = _normalized(data)
+                base = {} if self._base is _MISSING and isinstance(disk, dict) else self._base
+                if ours != base and not (isinstance(ours, dict) and isinstance(disk, dict)):
+                    self.stats["overwritten"] += 1
+                    print(f"[STATE] {self.path} changed in another process; overwriting (not mergeable)")
+                data = merge3(base, ours, disk)
+                merged = data != ours
+                self.stats["merged"] += merged
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(self._encode(data))
+            os.replace(tmp, self.path)
+        self._base = _normalized(data)
+        self._synced = True
+        self.stats["writes"] += 1
+        return data, merged
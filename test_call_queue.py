@@ -0,0 +1,92 @@
+"""
+Test Call Queue - offer / refresh, eviction top-K, urutan pop dengan peluruhan skor, dan persist (pytest)
+"""
+
+from call_queue import CallQueue, RankingEngine
+
+
+def make_queue(tmp_path, **kwargs) -> CallQueue:
+    kwargs.setdefault("half_life_sec", 100.0)
+    kwargs.setdefault("max_age_sec", 0)
+    return CallQueue(str(tmp_path / "queue.json"), **kwargs)
+
+
+def test_pop_returns_highest_score_first(tmp_path):
+    q = make_queue(tmp_path)
+    for mint, score in (("a", 1.0), ("b", 3.0), ("c", 2.0)):
+        assert q.offer(mint, {"symbol": mint}, score, now=0)
+    assert [q.pop(now=0).mint for _ in range(3)] == ["b", "c", "a"]
+    assert q.pop(now=0) is None
+    assert q.stats["popped"] == 3
+
+
+def test_decay_ranks_fresh_candidate_above_older_higher_score(tmp_path):
+    q = make_queue(tmp_path)
+    q.offer("old", {}, 4.0, now=0)
+    q.offer("fresh", {}, 3.0, now=100)  # "old" sudah meluruh jadi 2.0 di t=100
+    assert q.effective_score(q.entries["old"], now=100) == 2.0
+    assert [e.mint for e, _ in q.ranked(now=100)] == ["fresh", "old"]
+    assert q.pop(now=100).mint == "fresh"
+
+
+def test_refresh_updates_score_and_order(tmp_path):
+    q = make_queue(tmp_path)
+    q.offer("a", {"v": 1}, 1.0, now=0)
+    q.offer("b", {}, 2.0, now=0)
+    q.offer("a", {"v": 2}, 5.0, now=0)
+    assert len(q) == 2
+    assert q.stats["refreshed"] == 1
+    entry = q.pop(now=0)
+    assert (entry.mint, entry.token, entry.refreshes) == ("a", {"v": 2}, 1)
+    assert q.pop(now=0).mint == "b"
+    assert q.pop(now=0) is None  # entry heap versi lama "a" dilewati
+
+
+def test_full_queue_evicts_lowest_and_rejects_weaker_offer(tmp_path):
+    q = make_queue(tmp_path, capacity=2)
+    q.offer("a", {}, 1.0, now=0)
+    q.offer("b", {}, 2.0, now=0)
+    assert q.offer("c", {}, 3.0, now=0)
+    assert set(q.entries) == {"b", "c"}
+    assert q.stats["evicted"] == 1
+    assert not q.offer("d", {}, 0.5, now=0)
+    assert "d" not in q
+    assert q.stats["rejected"] == 1
+    assert [q.pop(now=0).mint for _ in range(2)] == ["c", "b"]
+
+
+def test_pop_skip_drops_entry(tmp_path):
+    q = make_queue(tmp_path)
+    q.offer("notified", {}, 5.0, now=0)
+    q.offer("next", {}, 1.0, now=0)
+    assert q.pop(skip=lambda mint: mint == "notified", now=0).mint == "next"
+    assert len(q) == 0
+
+
+def test_pop_prunes_stale_entries(tmp_path):
+    q = make_queue(tmp_path, max_age_sec=60)
+    q.offer("stale", {}, 9.0, now=0)
+    q.offer("live", {}, 1.0, now=50)
+    assert q.pop(now=70).mint == "live"
+    assert q.stats["expired"] == 1
+
+
+def test_save_load_keeps_order(tmp_path):
+    q = make_queue(tmp_path)
+    q.offer("a", {"symbol": "A"}, 1.0, now=0)
+    q.offer("b", {"symbol": "B"}, 2.0, now=10)
+    q.save()
+    restored = make_queue(tmp_path)
+    restored.load()
+    assert set(restored.entries) == {"a", "b"}
+    assert restored.entries["b"].token == {"symbol": "B"}
+    assert [restored.pop(now=10).mint for _ in range(2)] == ["b", "a"]
+
+
+def test_ranking_engine_weights():
+    engine = RankingEngine()
+    engine.register("mcap", lambda t: t["mcap"], weight=1.0)
+    engine.register("fees", lambda t: t["fees"])
+    engine.apply_weights("fees=2,unknown=1")
+    assert engine.breakdown({"mcap": 3, "fees": 4}) == {"mcap": 3.0, "fees": 8.0}
+    assert engine.score({"mcap": 3, "fees": None}) == 3.0
@@ -0,0 +1,136 @@
+"""
+Test TTL Map - expiry per key, eviction max_size, dan snapshot/restore (pytest)
+"""
+
+from ttl_map import TTLMap, TTLSet
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_hides_expired_entry_before_bucket_is_processed():
+    clock = FakeClock()
+    m = TTLMap(ttl=10, bucket_sec=100, clock=clock)
+    m.set("a", 1)
+    assert m.get("a") == 1
+    clock.now += 10
+    assert m.get("a") is None
+    assert "a" not in m
+    assert m.items() == []
+
+
+def test_expire_removes_only_passed_buckets():
+    clock = FakeClock(0.0)
+    m = TTLMap(ttl=None, bucket_sec=10, clock=clock)
+    m.set("short", expires_at=5)
+    m.set("long", expires_at=25)
+    assert m.expire(now=9) == 0  # bucket [0, 10) belum lewat seluruhnya
+    assert m.expire(now=10) == 1
+    assert m.expires_at("short") is None
+    assert m.expire(now=30) == 1
+    assert m.stats["expired"] == 2
+
+
+def test_refresh_moves_key_to_new_expiry():
+    clock = FakeClock(0.0)
+    m = TTLMap(ttl=10, bucket_sec=1, clock=clock)
+    m.set("a", 1)
+    clock.now = 8
+    m.set("a", 2)  # expiry jadi 18, bucket lama tidak boleh menghapusnya
+    clock.now = 12
+    assert m.expire() == 0
+    assert m["a"] == 2
+    assert len(m) == 1
+
+
+def test_ttl_none_never_expires():
+    clock = FakeClock()
+    m = TTLMap(ttl=None, clock=clock)
+    m.set("a", 1)
+    clock.now += 10**9
+    assert m.get("a") == 1
+    assert m.snapshot() == {"a": (1, None)}
+
+
+def test_max_size_evicts_soonest_expiring_first():
+    clock = FakeClock(0.0)
+    m = TTLMap(ttl=None, bucket_sec=1, max_size=2, clock=clock)
+    m.set("late", expires_at=300)
+    m.set("soon", expires_at=100)
+    m.set("mid", expires_at=200)
+    assert set(m.keys()) == {"late", "mid"}
+    assert m.stats["evicted"] == 1
+
+
+def test_max_size_evicts_oldest_non_expiring_last():
+    clock = FakeClock(0.0)
+    m = TTLMap(ttl=None, max_size=2, clock=clock)
+    m.set("first", 1)
+    m.set("expiring", 2, expires_at=50)
+    m.set("second", 3)
+    assert set(m.keys()) == {"first", "second"}
+    m.set("third", 4)
+    assert set(m.keys()) == {"second", "third"}
+
+
+def test_updating_existing_key_does_not_evict():
+    m = TTLMap(ttl=10, max_size=2, clock=FakeClock())
+    m.set("a", 1)
+    m.set("b", 2)
+    m.set("a", 3)
+    assert dict(m.items()) == {"a": 3, "b": 2}
+    assert m.stats["evicted"] == 0
+
+
+def test_pop_and_discard():
+    m = TTLMap(ttl=10, clock=FakeClock())
+    m.set("a", 1)
+    assert m.pop("a") == 1
+    assert m.pop("a", None) is None
+    assert not m.discard("a")
+    m["b"] = 2
+    del m["b"]
+    assert len(m) == 0
+
+
+def test_snapshot_restore_round_trip_skips_expired():
+    clock = FakeClock(0.0)
+    m = TTLMap(ttl=None, clock=clock)
+    m.set("a", {"x": 1}, ttl=100)
+    m.set("b", 2, ttl=10)
+    m.set("forever", 3)
+    snap = m.snapshot()
+    assert snap == {"a": ({"x": 1}, 100), "b": (2, 10), "forever": (3, None)}
+
+    clock.now = 50
+    restored = TTLMap(ttl=100, clock=clock)
+    restored.set("stale", 0)
+    restored.restore(snap)
+    assert set(restored.keys()) == {"a", "forever"}  # "b" sudah expire, "stale" diganti
+    assert restored.expires_at("a") == 100
+    clock.now = 100
+    assert restored.keys() == ["forever"]
+    clock.now = 110  # bucket entry "a" (lebar 100 / 16) sudah lewat seluruhnya
+    assert restored.expire() == 1
+    assert restored.keys() == ["forever"]
+
+
+def test_restore_applies_max_size():
+    clock = FakeClock(0.0)
+    m = TTLMap(ttl=None, bucket_sec=1, max_size=2, clock=clock)
+    m.restore({"a": (1, 30), "b": (2, 10), "c": (3, 20)})
+    assert set(m.keys()) == {"a", "c"}
+
+
+def test_ttl_set():
+    clock = FakeClock(0.0)
+    s = TTLSet(ttl=10, clock=clock)
+    s.update(["a", "b"])
+    s.add("c", ttl=100)
+    clock.now = 20
+    assert list(s) == ["c"]
@@ -0,0 +1,209 @@
+"""
+Toptraded Delta - snapshot per token antar cycle bot call (Jupiter toptraded) + deteksi perubahan
+Response toptraded hampir sama tiap cycle; hanya token baru atau yang berubah berarti (mcap, volume,
+price change, fee di payload lewat threshold, atau melewati batas kriteria) yang di-enrich ulang
+(resolusi fee, cek pool Meteora). Token lain memakai hasil enrich di snapshot sampai `max_age_sec`.
+Perubahan status dikirim sebagai event ke subscriber:
+  entered       - token baru masuk list toptraded
+  exited        - token keluar dari list toptraded
+  qualified     - token masuk range kriteria (mcap, fees, price change 1h)
+  disqualified  - token keluar dari range kriteria
+  pool_ready    - token qualified dan punya pool Meteora dengan likuiditas cukup (kandidat call)
+"""
+
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+import json_codec
+import metrics
+
+DELTA_EVENTS = metrics.REGISTRY.counter("bot_call_delta_events_total", "Toptraded token state changes between cycles", ("event",))
+DELTA_ENRICH = metrics.REGISTRY.counter("bot_call_delta_enrich_total", "Toptraded tokens re-enriched, by reason", ("reason",))
+
+
+@dataclass
+class TokenSnapshot:
+    symbol: str = "UNKNOWN"
+    # Field murah dari payload toptraded (dibandingkan antar cycle)
+    market_cap: Optional[float] = None
+    volume_24h: Optional[float] = None
+    price_change_1h: Optional[float] = None
+    payload_fees_sol: Optional[float] = None
+    # Hasil enrich (mahal)
+    fees_sol: float = 0.0
+    fees_usd: float = 0.0
+    fee_origin: str = "calculated"
+    enriched_volume: Optional[float] = None
+    qualified: bool = False
+    pool_status: Optional[str] = None  # None = belum dicek, "ok" / "none" / "low_liq" / "error"
+    pool_count: int = 0
+    max_liq: float = 0.0
+    seen_at: float = 0.0
+    enriched_at: float = 0.0
+
+    def copy(self) -> "TokenSnapshot":
+        return replace(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TokenSnapshot":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+@dataclass
+class DeltaEvent:
+    kind: str
+    mint: str
+    symbol: str
+    at: float
+    snapshot: TokenSnapshot
+    previous: Optional[TokenSnapshot] = None
+
+
+@dataclass
+class DeltaThresholds:
+    """Perubahan minimum yang dianggap berarti. pct = relatif terhadap nilai lama, pts = selisih absolut."""
+    market_cap_pct: float = 10.0
+    volume_pct: float = 15.0
+    price_change_pts: float = 5.0
+    fees_pct: float = 10.0
+    # Batas kriteria per field: melewati salah satu nilai ini selalu dianggap berubah, sekecil apa pun deltanya
+    bounds: Dict[str, Tuple[float, ...]] = field(default_factory=dict)
+
+
+def _pct_change(old: Optional[float], new: Optional[float]) -> float:
+    if old is None or new is None:
+        return 0.0 if old == new else float("inf")
+    if old == 0:
+        return 0.0 if new == 0 else float("inf")
+    return abs(new - old) / abs(old) * 100
+
+
+def _abs_change(old: Optional[float], new: Optional[float]) -> float:
+    if old is None or new is None:
+        return 0.0 if old == new else float("inf")
+    return abs(new - old)
+
+
+def _crosses(old: Optional[float], new: Optional[float], bounds: Iterable[float]) -> bool:
+    if old is None or new is None:
+        return old is not new
+    return any((old >= b) != (new >= b) for b in bounds)
+
+
+class DeltaTracker:
+    """Snapshot per mint (persist ke JSON) + deteksi delta antar cycle."""
+
+    def __init__(self, path: str, thresholds: Optional[DeltaThresholds] = None, max_age_sec: float = 900.0,
+                 recent_events: int = 200, origin_max_age: Optional[Dict[str, float]] = None):
+        self.path = path
+        self.thresholds = thresholds or DeltaThresholds()
+        self.max_age_sec = max_age_sec
+        # Umur maks snapshot per fee_origin (mis. "calculated" = provider gagal: enrich ulang lebih cepat)
+        self.origin_max_age = origin_max_age or {}
+        self.snapshots: Dict[str, TokenSnapshot] = {}
+        self.recent: Deque[DeltaEvent] = deque(maxlen=recent_events)
+        self._subscribers: List[Callable[[DeltaEvent], None]] = []
+        self._cycle_seen: set = set()
+
+    # --- persistence ---
+    def load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    data = json_codec.load(f)
+                if isinstance(data, dict):
+                    self.snapshots = {mint: TokenSnapshot.from_dict(s) for mint, s in data.items() if isinstance(s, dict)}
+                    print(f"[DELTA] Loaded {len(self.snapshots)} toptraded snapshot(s)")
+        except Exception as e:
+            print(f"[DELTA] Failed to load snapshots: {e}")
+            self.snapshots = {}
+
+    def save(self):
+        try:
+            with open(self.path, "w") as f:
+                json_codec.dump({mint: asdict(s) for mint, s in self.snapshots.items()}, f)
+        except Exception as e:
+            print(f"[DELTA] Failed to save snapshots: {e}")
+
+    # --- events ---
+    def subscribe(self, callback: Callable[[DeltaEvent], None]):
+        self._subscribers.append(callback)
+
+    def _emit(self, kind: str, mint: str, snapshot: TokenSnapshot, previous: Optional[TokenSnapshot]):
+        event = DeltaEvent(kind=kind, mint=mint, symbol=snapshot.symbol, at=time.time(), snapshot=snapshot, previous=previous)
+        self.recent.append(event)
+        DELTA_EVENTS.inc(event=kind)
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"[DELTA] Subscriber failed on {kind} {mint[:8]}...: {e}")
+
+    # --- cycle ---
+    def begin_cycle(self):
+        self._cycle_seen = set()
+
+    def enrich_reason(self, mint: str, market_cap: Optional[float], volume_24h: Optional[float],
+                      price_change_1h: Optional[float], payload_fees_sol: Optional[float],
+                      now: Optional[float] = None) -> Optional[str]:
+        """Alasan token perlu di-enrich ulang ("new", "expired", nama field yang berubah), None kalau snapshot masih berlaku."""
+        now = time.time() if now is None else now
+        self._cycle_seen.add(mint)  # token yang error saat diproses tetap dianggap masih di list
+        prev = self.snapshots.get(mint)
+        if prev is None:
+            reason = "new"
+        elif now - prev.enriched_at >= self.origin_max_age.get(prev.fee_origin, self.max_age_sec):
+            reason = "expired"
+        else:
+            t = self.thresholds
+            checks = (
+                ("market_cap", prev.market_cap, market_cap, _pct_change(prev.market_cap, market_cap) >= t.market_cap_pct),
+                ("volume_24h", prev.volume_24h, volume_24h, _pct_change(prev.volume_24h, volume_24h) >= t.volume_pct),
+                ("price_change_1h", prev.price_change_1h, price_change_1h,
+                 _abs_change(prev.price_change_1h, price_change_1h) >= t.price_change_pts),
+                ("payload_fees_sol", prev.payload_fees_sol, payload_fees_sol,
+                 _pct_change(prev.payload_fees_sol, payload_fees_sol) >= t.fees_pct),
+            )
+            reason = None
+            for name, old, new, moved in checks:
+                if moved or _crosses(old, new, t.bounds.get(name, ())):
+                    reason = name
+                    break
+        if reason is not None:
+            DELTA_ENRICH.inc(reason=reason)
+        return reason
+
+    def get(self, mint: str) -> Optional[TokenSnapshot]:
+        return self.snapshots.get(mint)
+
+    def update(self, mint: str, snapshot: TokenSnapshot):
+        """Simpan snapshot cycle ini dan kirim event transisi status."""
+        self._cycle_seen.add(mint)
+        prev = self.snapshots.get(mint)
+        self.snapshots[mint] = snapshot
+        if prev is None:
+            self._emit("entered", mint, snapshot, prev)
+        if snapshot.qualified and not (prev and prev.qualified):
+            self._emit("qualified", mint, snapshot, prev)
+        elif prev and prev.qualified and not snapshot.qualified:
+            self._emit("disqualified", mint, snapshot, prev)
+        ready = snapshot.qualified and snapshot.pool_status == "ok"
+        was_ready = prev is not None and prev.qualified and prev.pool_status == "ok"
+        if ready and not was_ready:
+            self._emit("pool_ready", mint, snapshot, prev)
+
+    def end_cycle(self, save: bool = True, complete: bool = True) -> List[str]:
+        """Token yang tidak muncul lagi di response: event exited + hapus snapshot. Return mint yang keluar.
+
+        complete=False (sebagian source gagal cycle ini): token yang hilang belum dianggap keluar.
+        """
+        exited = [mint for mint in self.snapshots if mint not in self._cycle_seen] if complete else []
+        for mint in exited:
+            self._emit("exited", mint, self.snapshots.pop(mint), None)
+        if save:
+            self.save()
+        return exited
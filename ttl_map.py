@@ -0,0 +1,196 @@
+"""
+TTL Map - dict / set dengan expiry per key untuk state dedup (bot call, hype, Futardio) dan cache
+Key dikelompokkan ke bucket waktu expiry (lebar `bucket_sec`): insert O(1), expiry mengambil bucket
+terlama yang sudah lewat saja (amortized O(1) per key), bukan scan semua entry tiap poll.
+Opsional `max_size`: kalau penuh, key yang paling cepat expire dibuang duluan.
+snapshot() / restore() untuk persist ke JSON (entry yang sudah expire tidak ikut dimuat).
+"""
+
+import time
+import heapq
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLMap:
+    """Mapping key -> value yang hilang sendiri setelah expires_at.
+
+    ttl: umur default (detik) untuk set() tanpa ttl/expires_at; None = tidak expire kecuali diberi expires_at.
+    bucket_sec: granularity bucket expiry (default ttl/16, min 1 detik).
+    """
+
+    def __init__(self, ttl: Optional[float] = None, bucket_sec: Optional[float] = None, max_size: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
+        self.ttl = ttl
+        self.bucket_sec = bucket_sec or max(1.0, (ttl or 3600.0) / 16)
+        self.max_size = max_size
+        self.clock = clock
+        self.stats = {"expired": 0, "evicted": 0}
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}  # key -> (value, expires_at)
+        self._buckets: Dict[int, Dict[Hashable, None]] = {}  # bucket -> key (urutan insert)
+        self._order: List[int] = []  # min-heap index bucket
+
+    # --- internal ---
+    def _bucket_of(self, expires_at: float) -> int:
+        return int(expires_at // self.bucket_sec) if expires_at != float("inf") else -1
+
+    def _link(self, key, expires_at: float):
+        idx = self._bucket_of(expires_at)
+        if idx < 0:
+            return  # tidak pernah expire: tidak masuk bucket (tetap bisa dibuang oleh max_size lewat _evict)
+        bucket = self._buckets.get(idx)
+        if bucket is None:
+            bucket = self._buckets[idx] = {}
+            heapq.heappush(self._order, idx)
+        bucket[key] = None
+
+    def _unlink(self, key, expires_at: float):
+        bucket = self._buckets.get(self._bucket_of(expires_at))
+        if bucket is not None:
+            bucket.pop(key, None)
+
+    def _expire_at(self, ttl: Optional[float], expires_at: Optional[float], now: float) -> float:
+        if expires_at is not None:
+            return expires_at
+        ttl = self.ttl if ttl is None else ttl
+        return now + ttl if ttl is not None else float("inf")
+
+    def _evict(self):
+        """Buang key yang paling cepat expire sampai ukuran <= max_size."""
+        while self.max_size is not None and len(self._data) > self.max_size:
+            while self._order and not self._buckets.get(self._order[0]):
+                self._buckets.pop(heapq.heappop(self._order), None)
+            if self._order:
+                bucket = self._buckets[self._order[0]]
+                key = next(iter(bucket))
+                del bucket[key]
+            else:
+                key = next(iter(self._data))  # sisa key tanpa expiry: yang paling lama dimasukkan
+            del self._data[key]
+            self.stats["evicted"] += 1
+
+    # --- expiry ---
+    def expire(self, now: Optional[float] = None) -> int:
+        """Hapus key yang sudah lewat expires_at. Hanya bucket yang seluruh rentangnya sudah lewat yang disentuh."""
+        now = self.clock() if now is None else now
+        removed = 0
+        while self._order and (self._order[0] + 1) * self.bucket_sec <= now:
+            bucket = self._buckets.pop(heapq.heappop(self._order), None) or {}
+            for key in bucket:
+                entry = self._data.get(key)
+                if entry is not None and entry[1] <= now:
+                    del self._data[key]
+                    removed += 1
+        self.stats["expired"] += removed
+        return removed
+
+    # --- mapping API ---
+    def set(self, key, value: Any = True, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        now = self.clock()
+        self.expire(now)
+        old = self._data.get(key)
+        if old is not None:
+            self._unlink(key, old[1])
+        expires = self._expire_at(ttl, expires_at, now)
+        self._data[key] = (value, expires)
+        self._link(key, expires)
+        if old is None:
+            self._evict()
+
+    def get(self, key, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry[1] <= self.clock():
+            return default  # sudah expire, dihapus saat bucket-nya diproses
+        return entry[0]
+
+    def expires_at(self, key) -> Optional[float]:
+        entry = self._data.get(key)
+        return entry[1] if entry is not None else None
+
+    def pop(self, key, default: Any = _MISSING) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        self._unlink(key, entry[1])
+        return entry[0]
+
+    def discard(self, key) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self._unlink(key, entry[1])
+        return True
+
+    def clear(self):
+        self._data.clear()
+        self._buckets.clear()
+        self._order.clear()
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        self.expire()
+        return len(self._data)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator:
+        now = self.clock()
+        return iter([k for k, (_, exp) in self._data.items() if exp > now])
+
+    def keys(self) -> List:
+        return list(self)
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        now = self.clock()
+        return [(k, v) for k, (v, exp) in self._data.items() if exp > now]
+
+    def values(self) -> List[Any]:
+        return [v for _, v in self.items()]
+
+    # --- persistence ---
+    def snapshot(self) -> Dict[Hashable, Tuple[Any, Optional[float]]]:
+        """{key: (value, expires_at)} untuk entry yang masih hidup (expires_at None = tidak expire)."""
+        now = self.clock()
+        return {k: (v, None if exp == float("inf") else exp) for k, (v, exp) in self._data.items() if exp > now}
+
+    def restore(self, entries: Dict[Hashable, Tuple[Any, Optional[float]]]):
+        """Ganti isi dengan hasil snapshot(); entry yang sudah expire dilewati."""
+        self.clear()
+        now = self.clock()
+        for key, (value, expires) in entries.items():
+            expires = float("inf") if expires is None else float(expires)
+            if expires > now:
+                self._data[key] = (value, expires)
+                self._link(key, expires)
+        self._evict()
+
+
+class TTLSet(TTLMap):
+    """Set dengan expiry per key (value selalu True)."""
+
+    def add(self, key, ttl: Optional[float] = None, expires_at: Optional[float] = None):
+        self.set(key, True, ttl=ttl, expires_at=expires_at)
+
+    def update(self, keys, ttl: Optional[float] = None):
+        for key in keys:
+            self.add(key, ttl=ttl)
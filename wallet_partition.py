@@ -0,0 +1,145 @@
+"""
+Wallet Partition - bagi wallet tracking antar worker dengan consistent hashing
+Tiap worker wallet (headless.py --gateway ... -e wallets) hanya polling wallet yang jatuh ke node-nya
+di hash ring. Saat worker join/leave, gateway mengumumkan daftar member baru dan ring dibangun ulang:
+hanya ~1/N wallet yang pindah. Cursor last_sig per wallet disimpan per worker (wallet_cursors/<id>.json)
+supaya worker tidak saling menimpa tracked_wallets.json; pemilik baru mengambil cursor terbaru.
+"""
+
+import os
+import json
+import time
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring with `vnodes` virtual nodes per member."""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 64):
+        self.vnodes = vnodes
+        self.nodes: List[str] = sorted(set(nodes))
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        ring = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        for point, node in ring:
+            self._points.append(point)
+            self._owners.append(node)
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        idx = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[idx]
+
+
+class CursorStore:
+    """last_sig per wallet: file milik worker ini + cache file worker lain (untuk wallet yang pindah)."""
+
+    def __init__(self, directory: str, worker_id: str):
+        self.directory = directory
+        self.worker_id = worker_id
+        self.path = os.path.join(directory, f"{worker_id}.json")
+        self._own: Dict[str, Dict] = {}  # {wallet: {"sig", "ts"}}
+        self._others: Dict[str, Dict] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self._own = json.load(f)
+
+    def refresh(self):
+        """Baca ulang cursor worker lain (dipanggil saat rebalance)."""
+        merged: Dict[str, Dict] = {}
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if not name.endswith(".json") or path == self.path:
+                    continue
+                try:
+                    with open(path, "r") as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                for wallet, entry in data.items():
+                    if wallet not in merged or entry.get("ts", 0) > merged[wallet].get("ts", 0):
+                        merged[wallet] = entry
+        self._others = merged
+
+    def get(self, wallet: str) -> Optional[str]:
+        own, other = self._own.get(wallet), self._others.get(wallet)
+        if own and other:
+            return (own if own.get("ts", 0) >= other.get("ts", 0) else other).get("sig")
+        return (own or other or {}).get("sig")
+
+    def set(self, wallet: str, sig: Optional[str]):
+        self._own[wallet] = {"sig": sig, "ts": time.time()}
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._own, f)
+        os.replace(tmp, self.path)
+
+
+class WalletPartition:
+    """Membership + ownership untuk worker ini. Tanpa member (mode local / worker tunggal) = pegang semua wallet."""
+
+    def __init__(self, worker_id: str, cursor_dir: str = "wallet_cursors", vnodes: int = 64):
+        self.worker_id = worker_id
+        self.cursor_dir = cursor_dir
+        self.vnodes = vnodes
+        self.ring = HashRing((), vnodes)
+        self.rebalances = 0
+        self._cursors: Optional[CursorStore] = None
+
+    @property
+    def members(self) -> List[str]:
+        return self.ring.nodes
+
+    @property
+    def active(self) -> bool:
+        """Partisi aktif kalau worker ini salah satu member dari >1 worker."""
+        return len(self.members) > 1 and self.worker_id in self.members
+
+    @property
+    def coordinated(self) -> bool:
+        """Membership pernah diumumkan gateway: cursor disimpan di wallet_cursors/, bukan file tracked wallets."""
+        return self.rebalances > 0
+
+    @property
+    def cursors(self) -> CursorStore:
+        if self._cursors is None:
+            self._cursors = CursorStore(self.cursor_dir, self.worker_id)
+        return self._cursors
+
+    def owns(self, wallet: str) -> bool:
+        """Tanpa member = pegang semua. Worker yang tidak ada di daftar member (mis. belum terdaftar di gateway)
+        tidak memegang wallet apa pun, supaya tidak polling ganda dengan pemilik di ring."""
+        if not self.members:
+            return True
+        return self.ring.owner(wallet) == self.worker_id
+
+    def set_members(self, members: Iterable[str], wallets: Iterable[str] = ()) -> Tuple[int, int]:
+        """Rebuild the ring. Returns (gained, lost) wallet counts for this worker."""
+        wallets = list(wallets)
+        before = {w for w in wallets if self.owns(w)}
+        self.ring = HashRing(members, self.vnodes)
+        self.rebalances += 1
+        self.cursors.refresh()
+        after = {w for w in wallets if self.owns(w)}
+        return len(after - before), len(before - after)
+
+    def budget_share(self, total: int, window: float) -> Tuple[int, float]:
+        """Bagian worker ini dari budget `total` request per `window` detik: (request, window).
+        Jumlah bagian semua member tidak pernah melebihi total (sisa bagi ke member urutan awal). Kalau total
+        lebih kecil dari jumlah worker, tiap worker dapat 1 request per window yang diperpanjang (n / total x window)."""
+        if not self.active or total <= 0:
+            return total, window
+        n = len(self.members)
+        if total < n:
+            return 1, window * n / total
+        index = self.members.index(self.worker_id)
+        return total // n + (1 if index < total % n else 0), window